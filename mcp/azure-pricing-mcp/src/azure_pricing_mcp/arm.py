@@ -0,0 +1,1013 @@
+"""
+ARM template pricing for Azure Pricing MCP Server.
+
+Turns a compiled ARM template, such as the `main.json` bicep builds, into a bill
+of materials (see bom.py) that is priced in one batched pass. Parameter values
+come from the caller, then from a `.bicepparam` file next to the template, then
+from the template's defaults. Nested deployments (bicep modules) are walked with
+their own parameters. Template expressions are evaluated as far as they can be
+offline: functions that need a live deployment, such as `reference()` or
+`uniqueString()`, evaluate to UNRESOLVED, and so does anything built from them.
+
+Each resource type with a price mapping becomes a BOM line (service, SKU and
+quantity derived from its `sku` and properties). Resources that are free, only
+billed by usage, or have no mapping are listed with the reason they weren't priced.
+
+Usage:
+    python -m azure_pricing_mcp.arm infra/bicep/ecommerce
+    python -m azure_pricing_mcp.arm infra/bicep/ecommerce/main.json --param environment=dev --json
+"""
+
+import json
+import re
+from collections.abc import Callable, Iterator, Mapping
+from pathlib import Path
+from typing import Any, NamedTuple, cast
+
+TEMPLATE_FILENAME = "main.json"
+BICEPPARAM_FILENAME = "main.bicepparam"
+DEPLOYMENTS_TYPE = "microsoft.resources/deployments"
+
+
+class _Unresolved:
+    """Value of an expression that can only be evaluated during a deployment."""
+
+    _instance = None
+
+    def __new__(cls) -> "_Unresolved":
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __repr__(self) -> str:
+        return "UNRESOLVED"
+
+    def __bool__(self) -> bool:
+        return False
+
+
+UNRESOLVED = _Unresolved()
+
+
+class TemplateError(ValueError):
+    """A template, parameter file or expression that can't be read."""
+
+
+# ---------------------------------------------------------------------------
+# Expressions
+# ---------------------------------------------------------------------------
+
+_TOKEN = re.compile(
+    r"\s*(?:(?P<string>'(?:[^']|'')*')|(?P<number>-?\d+(?:\.\d+)?)|(?P<name>[A-Za-z_]\w*)|(?P<punct>[()\[\],.]))"
+)
+
+
+def _tokenize(text: str) -> list[tuple[str, Any]]:
+    """Split an expression into (kind, value) tokens."""
+    tokens: list[tuple[str, Any]] = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = _TOKEN.match(text, position)
+        if not match:
+            raise TemplateError(f"Cannot parse expression at '{text[position:position + 20]}'")
+        position = match.end()
+        kind = cast(str, match.lastgroup)  # every alternative is a named group
+        value: Any = match.group(kind)
+        if kind == "string":
+            value = value[1:-1].replace("''", "'")
+        elif kind == "number":
+            value = float(value) if "." in value else int(value)
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """Recursive-descent parser building a small AST of nested tuples."""
+
+    def __init__(self, tokens: list[tuple[str, Any]]):
+        self.tokens = tokens
+        self.position = 0
+
+    def peek(self) -> tuple[str | None, Any]:
+        return self.tokens[self.position] if self.position < len(self.tokens) else (None, None)
+
+    def take(self, punct: str | None = None) -> tuple[str | None, Any]:
+        token = self.peek()
+        if token[0] is None or (punct is not None and token != ("punct", punct)):
+            raise TemplateError(f"Expected '{punct or 'a value'}' in expression, got {token[1]!r}")
+        self.position += 1
+        return token
+
+    def parse(self) -> tuple:
+        node = self.expression()
+        if self.peek()[0] is not None:
+            raise TemplateError(f"Unexpected {self.peek()[1]!r} in expression")
+        return node
+
+    def expression(self) -> tuple:
+        kind, value = self.take()
+        if kind in ("string", "number"):
+            node: tuple = ("literal", value)
+        elif kind == "name":
+            self.take("(")
+            arguments = []
+            if self.peek() != ("punct", ")"):
+                arguments.append(self.expression())
+                while self.peek() == ("punct", ","):
+                    self.take(",")
+                    arguments.append(self.expression())
+            self.take(")")
+            node = ("call", value.lower(), arguments)
+        else:
+            raise TemplateError(f"Unexpected {value!r} in expression")
+
+        while True:
+            if self.peek() == ("punct", "."):
+                self.take(".")
+                node = ("index", node, ("literal", self.take()[1]))
+            elif self.peek() == ("punct", "["):
+                self.take("[")
+                node = ("index", node, self.expression())
+                self.take("]")
+            else:
+                return node
+
+
+def is_expression(value: Any) -> bool:
+    """Whether a template string is an expression rather than a literal."""
+    return isinstance(value, str) and value.startswith("[") and value.endswith("]") and not value.startswith("[[")
+
+
+def _lookup(mapping: Mapping[str, Any], key: str) -> Any:
+    """Case-insensitive key lookup, as ARM resolves property and parameter names."""
+    if key in mapping:
+        return mapping[key]
+    folded = key.casefold()
+    for name, value in mapping.items():
+        if name.casefold() == folded:
+            return value
+    return UNRESOLVED
+
+
+def _index(target: Any, key: Any) -> Any:
+    """Evaluate `target[key]` or `target.key`."""
+    if target is UNRESOLVED or key is UNRESOLVED:
+        return UNRESOLVED
+    if isinstance(target, Mapping) and isinstance(key, str):
+        return _lookup(target, key)
+    if isinstance(target, (list, str)) and isinstance(key, int) and -len(target) <= key < len(target):
+        return target[key]
+    return UNRESOLVED
+
+
+def _equals(left: Any, right: Any) -> bool:
+    if isinstance(left, str) and isinstance(right, str):
+        return left.casefold() == right.casefold()
+    return bool(left == right)
+
+
+def _format(template: str, *values: Any) -> str:
+    """ARM's format(), with .NET's zero-padding specifier ("{0:D3}") for integers."""
+
+    def replace(match: re.Match) -> str:
+        value = values[int(match.group(1))]
+        padding = re.fullmatch(r"[Dd](\d+)", match.group(2) or "")
+        if padding and isinstance(value, int) and not isinstance(value, bool):
+            return str(value).zfill(int(padding.group(1)))
+        return str(value).lower() if isinstance(value, bool) else str(value)
+
+    return re.sub(r"\{(\d+)(?::([^}]*))?\}", replace, template)
+
+
+def _contains(container: Any, item: Any) -> bool:
+    if isinstance(container, str):
+        return str(item).casefold() in container.casefold()
+    if isinstance(container, Mapping):
+        return _lookup(container, str(item)) is not UNRESOLVED
+    return any(_equals(element, item) for element in container)
+
+
+def _union(*values: Any) -> Any:
+    if all(isinstance(value, Mapping) for value in values):
+        merged: dict[str, Any] = {}
+        for value in values:
+            merged.update(value)
+        return merged
+    merged_list: list[Any] = []
+    for value in values:
+        merged_list.extend(element for element in value if element not in merged_list)
+    return merged_list
+
+
+def _concat(*values: Any) -> Any:
+    if values and all(isinstance(value, list) for value in values):
+        return [element for value in values for element in value]
+    return "".join(str(value) for value in values)
+
+
+# Functions evaluated offline; all others evaluate to UNRESOLVED
+_FUNCTIONS: dict[str, Callable[..., Any]] = {
+    "equals": _equals,
+    "not": lambda value: not value,
+    "format": _format,
+    "concat": _concat,
+    "tolower": lambda value: value.lower(),
+    "toupper": lambda value: value.upper(),
+    "empty": lambda value: value is None or len(value) == 0,
+    "contains": _contains,
+    "length": len,
+    "createarray": lambda *values: list(values),
+    "createobject": lambda *pairs: dict(zip(pairs[::2], pairs[1::2], strict=True)),
+    "union": _union,
+    "take": lambda value, count: value[: max(0, count)],
+    "skip": lambda value, count: value[max(0, count) :],
+    "first": lambda value: value[0] if value else None,
+    "last": lambda value: value[-1] if value else None,
+    "split": lambda value, delimiter: value.split(delimiter) if isinstance(delimiter, str) else [value],
+    "replace": lambda value, old, new: value.replace(old, new),
+    "substring": lambda value, start, length=None: value[start : None if length is None else start + length],
+    "startswith": lambda value, prefix: value.casefold().startswith(prefix.casefold()),
+    "endswith": lambda value, suffix: value.casefold().endswith(suffix.casefold()),
+    "indexof": lambda value, item: value.casefold().find(item.casefold()),
+    "lastindexof": lambda value, item: value.casefold().rfind(item.casefold()),
+    "trim": lambda value: value.strip(),
+    "join": lambda values, delimiter: delimiter.join(str(value) for value in values),
+    "string": lambda value: value if isinstance(value, str) else json.dumps(value),
+    "int": int,
+    "bool": lambda value: value.casefold() == "true" if isinstance(value, str) else bool(value),
+    "json": lambda value: json.loads(value),
+    "add": lambda left, right: left + right,
+    "sub": lambda left, right: left - right,
+    "mul": lambda left, right: left * right,
+    "div": lambda left, right: left // right,
+    "mod": lambda left, right: left % right,
+    "min": lambda *values: min(values[0] if len(values) == 1 else values),
+    "max": lambda *values: max(values[0] if len(values) == 1 else values),
+    "greater": lambda left, right: left > right,
+    "greaterorequals": lambda left, right: left >= right,
+    "less": lambda left, right: left < right,
+    "lessorequals": lambda left, right: left <= right,
+    "range": lambda start, count: list(range(start, start + count)),
+}
+
+
+class TemplateScope:
+    """Parameters and variables of one (nested) template, evaluated lazily."""
+
+    def __init__(self, template: Mapping[str, Any], values: Mapping[str, Any], region: str | None = None):
+        self.template = template
+        self.values = dict(values)
+        self.region = region
+        self._parameters: dict[str, Any] = {}
+        self._variables: dict[str, Any] = {}
+        self._evaluating: set[tuple[str, str]] = set()
+        self._expressions: dict[str, tuple] = {}
+
+    def parameter(self, name: str) -> Any:
+        """Value of a parameter: as passed in, else its evaluated default."""
+        key = name.casefold()
+        if key not in self._parameters:
+            value = _lookup(self.values, name)
+            if value is UNRESOLVED:
+                definition = _lookup(self.template.get("parameters", {}), name)
+                if not isinstance(definition, Mapping):
+                    default = UNRESOLVED
+                else:
+                    # Bicep's optional parameters (`type?`) are null unless set
+                    default = definition.get("defaultValue", None if definition.get("nullable") else UNRESOLVED)
+                value = self._guarded(("parameter", key), default)
+            self._parameters[key] = value
+        return self._parameters[key]
+
+    def variable(self, name: str) -> Any:
+        """Value of a template variable."""
+        key = name.casefold()
+        if key not in self._variables:
+            self._variables[key] = self._guarded(("variable", key), _lookup(self.template.get("variables", {}), name))
+        return self._variables[key]
+
+    def _guarded(self, key: tuple[str, str], value: Any) -> Any:
+        """Evaluate a definition, treating self-referencing definitions as UNRESOLVED."""
+        if key in self._evaluating:
+            return UNRESOLVED
+        self._evaluating.add(key)
+        try:
+            return self.evaluate(value)
+        finally:
+            self._evaluating.discard(key)
+
+    def evaluate(self, value: Any) -> Any:
+        """Evaluate the expressions in a template value, recursing into objects and arrays."""
+        if isinstance(value, str):
+            if is_expression(value):
+                node = self._expressions.get(value)
+                if node is None:
+                    node = self._expressions[value] = _Parser(_tokenize(value[1:-1])).parse()
+                return self._evaluate_node(node)
+            return value[1:] if value.startswith("[[") else value
+        if isinstance(value, Mapping):
+            return {key: self.evaluate(element) for key, element in value.items()}
+        if isinstance(value, list):
+            return [self.evaluate(element) for element in value]
+        return value
+
+    def describe(self, value: Any) -> str:
+        """
+        Render a value such as a resource name for display.
+
+        Unresolved parts of `format()` and `concat()` show as "*", so a name like
+        `[format('kv-{0}', uniqueString(...))]` reads "kv-*".
+        """
+        if not is_expression(value):
+            return str(self.evaluate(value))
+        node = self._expressions.get(value) or _Parser(_tokenize(value[1:-1])).parse()
+        if node[0] == "call" and node[1] in ("format", "concat"):
+            parts = [self._evaluate_node(argument) for argument in node[2]]
+            parts = ["*" if part is UNRESOLVED else part for part in parts]
+            if all(isinstance(part, (str, int, float, bool)) for part in parts):
+                return str(_FUNCTIONS[node[1]](*parts))
+        resolved = self._evaluate_node(node)
+        return resolved if isinstance(resolved, str) else "*"
+
+    def _evaluate_node(self, node: tuple) -> Any:
+        kind = node[0]
+        if kind == "literal":
+            return node[1]
+        if kind == "index":
+            return _index(self._evaluate_node(node[1]), self._evaluate_node(node[2]))
+
+        _, name, arguments = node
+        # Functions that only evaluate the arguments they need
+        if name == "if":
+            if len(arguments) != 3:
+                return UNRESOLVED
+            condition = self._evaluate_node(arguments[0])
+            if condition is UNRESOLVED:
+                return UNRESOLVED
+            return self._evaluate_node(arguments[1] if condition else arguments[2])
+        if name in ("and", "or"):
+            stop = name == "or"
+            unresolved = False
+            for argument in arguments:
+                value = self._evaluate_node(argument)
+                if value is UNRESOLVED:
+                    unresolved = True
+                elif bool(value) is stop:
+                    return stop
+            return UNRESOLVED if unresolved else not stop
+        if name == "coalesce":
+            for argument in arguments:
+                value = self._evaluate_node(argument)
+                if value is UNRESOLVED:
+                    return UNRESOLVED
+                if value is not None:
+                    return value
+            return None
+        if name == "tryget":
+            value = self._evaluate_node(arguments[0]) if arguments else UNRESOLVED
+            for argument in arguments[1:]:
+                if value is None:
+                    return None
+                key = self._evaluate_node(argument)
+                if value is UNRESOLVED or key is UNRESOLVED:
+                    return UNRESOLVED
+                if isinstance(value, Mapping):
+                    found = _lookup(value, key) if isinstance(key, str) else UNRESOLVED
+                    value = None if found is UNRESOLVED else found
+                else:
+                    value = _index(value, key)
+            return value
+
+        values = [self._evaluate_node(argument) for argument in arguments]
+        if name in ("true", "false", "null"):
+            return {"true": True, "false": False, "null": None}[name]
+        if name == "parameters" and len(values) == 1 and isinstance(values[0], str):
+            return self.parameter(values[0])
+        if name == "variables" and len(values) == 1 and isinstance(values[0], str):
+            return self.variable(values[0])
+        if name == "resourcegroup" and not values:
+            return {"location": self.region if self.region else UNRESOLVED}
+        function = _FUNCTIONS.get(name)
+        if function is None or any(value is UNRESOLVED for value in _flatten(values)):
+            return UNRESOLVED
+        try:
+            return function(*values)
+        except (TypeError, ValueError, KeyError, IndexError, AttributeError, ZeroDivisionError):
+            return UNRESOLVED
+
+
+def _flatten(values: Any) -> Iterator[Any]:
+    """Every value nested in lists and objects."""
+    for value in values:
+        yield value
+        if isinstance(value, list):
+            yield from _flatten(value)
+        elif isinstance(value, Mapping):
+            yield from _flatten(value.values())
+
+
+# ---------------------------------------------------------------------------
+# Parameter files
+# ---------------------------------------------------------------------------
+
+_BICEP_TOKEN = re.compile(
+    r"[ \t\r]*(?:(?P<comment>//[^\n]*|/\*.*?\*/)|(?P<string>'(?:[^'\\]|\\.)*')|(?P<number>-?\d+(?:\.\d+)?)"
+    r"|(?P<name>[A-Za-z_][\w-]*)|(?P<punct>[{}\[\]:=,\n])|(?P<operator>[^\s]))",
+    re.DOTALL,
+)
+_BICEP_ESCAPES = {"n": "\n", "r": "\r", "t": "\t", "\\": "\\", "'": "'", "$": "$"}
+
+
+def _bicep_tokens(text: str) -> list[tuple[str, Any]]:
+    tokens = []
+    position = 0
+    while position < len(text):
+        match = _BICEP_TOKEN.match(text, position)
+        if not match:
+            if text[position:].strip():
+                raise TemplateError(f"Cannot parse parameter file at '{text[position:position + 20].strip()}'")
+            break
+        position = match.end()
+        kind = cast(str, match.lastgroup)  # every alternative is a named group
+        if kind == "comment":
+            continue
+        value: Any = match.group(kind)
+        if kind == "string":
+            value = re.sub(r"\\(.)", lambda escape: _BICEP_ESCAPES.get(escape.group(1), escape.group(1)), value[1:-1])
+        elif kind == "number":
+            value = float(value) if "." in value else int(value)
+        tokens.append((kind, value))
+    return tokens
+
+
+def parse_bicepparam(text: str) -> dict[str, Any]:
+    """
+    Read the `param name = value` assignments of a .bicepparam file.
+
+    Values may be strings, numbers, booleans, null, arrays and objects. Assignments
+    whose value is an expression (such as `readEnvironmentVariable(...)`) are skipped.
+    """
+    tokens = _bicep_tokens(text)
+    position = 0
+
+    def skip_newlines() -> None:
+        nonlocal position
+        while position < len(tokens) and tokens[position] == ("punct", "\n"):
+            position += 1
+
+    def literal() -> Any:
+        nonlocal position
+        skip_newlines()
+        kind, value = tokens[position]
+        position += 1
+        if kind in ("string", "number"):
+            return value
+        if kind == "name" and value in ("true", "false", "null"):
+            return {"true": True, "false": False, "null": None}[value]
+        if (kind, value) == ("punct", "["):
+            items: list[Any] = []
+            while True:
+                skip_newlines()
+                if tokens[position] == ("punct", "]"):
+                    position += 1
+                    return items
+                items.append(literal())
+                if position < len(tokens) and tokens[position] == ("punct", ","):
+                    position += 1
+        if (kind, value) == ("punct", "{"):
+            members: dict[str, Any] = {}
+            while True:
+                skip_newlines()
+                if tokens[position] == ("punct", "}"):
+                    position += 1
+                    return members
+                key_kind, key = tokens[position]
+                if key_kind not in ("name", "string") or tokens[position + 1] != ("punct", ":"):
+                    raise TemplateError(f"Expected an object key in parameter file, got {key!r}")
+                position += 2
+                members[key] = literal()
+                if position < len(tokens) and tokens[position] == ("punct", ","):
+                    position += 1
+        raise TemplateError(f"Unsupported parameter value {value!r}")
+
+    parameters: dict[str, Any] = {}
+    while position < len(tokens):
+        if tokens[position] == ("name", "param") and position + 2 < len(tokens) and tokens[position + 2][1] == "=":
+            name = tokens[position + 1][1]
+            position += 3
+            start = position
+            try:
+                value = literal()
+                if position < len(tokens) and tokens[position] != ("punct", "\n"):
+                    raise TemplateError("Not a literal value")
+                parameters[name] = value
+            except (TemplateError, IndexError):
+                # An expression: skip to the end of the line
+                position = start
+                while position < len(tokens) and tokens[position] != ("punct", "\n"):
+                    position += 1
+        else:
+            position += 1
+    return parameters
+
+
+# ---------------------------------------------------------------------------
+# Resources
+# ---------------------------------------------------------------------------
+
+
+class ArmResource(NamedTuple):
+    """A resource declared by a template, with the scope its expressions evaluate in."""
+
+    path: str  # names of the deployments leading to the resource
+    type: str
+    name: str  # see TemplateScope.describe
+    definition: Mapping[str, Any]
+    scope: TemplateScope
+    quantity: int | _Unresolved
+
+    @property
+    def label(self) -> str:
+        """Readable name: the resource name, or where it is declared when the name isn't known."""
+        if self.name != "*":
+            return self.name
+        return f"{self.path}/{self.type.rsplit('/', 1)[-1]}" if self.path else self.type
+
+    def value(self, *keys: str) -> Any:
+        """Evaluate the definition's value at a property path, such as ("sku", "name")."""
+        value: Any = self.definition
+        for key in keys:
+            if is_expression(value):
+                value = self.scope.evaluate(value)
+            if not isinstance(value, Mapping):
+                return UNRESOLVED if value is UNRESOLVED else None
+            value = value.get(key) if key in value else _lookup(value, key)
+            if value is UNRESOLVED:
+                return None
+        return self.scope.evaluate(value)
+
+    @property
+    def location(self) -> Any:
+        return self.value("location")
+
+
+def _resource_list(resources: Any) -> list[Mapping[str, Any]]:
+    """Resources of a template; languageVersion 2.0 templates key them by symbolic name."""
+    if isinstance(resources, Mapping):
+        return list(resources.values())
+    return list(resources or [])
+
+
+def template_resources(
+    template: Mapping[str, Any], parameters: Mapping[str, Any] | None = None, region: str | None = None
+) -> list[ArmResource]:
+    """
+    List the resources a template deploys, walking nested deployments.
+
+    Resources whose condition evaluates to false are left out. Copy loops set the
+    quantity, multiplied through enclosing loops of nested deployments.
+    """
+    resources: list[ArmResource] = []
+    _walk(template, TemplateScope(template, parameters or {}, region), "", 1, resources)
+    return resources
+
+
+def _walk(
+    template: Mapping[str, Any],
+    scope: TemplateScope,
+    path: str,
+    multiplier: int | _Unresolved,
+    out: list[ArmResource],
+    parent_type: str = "",
+) -> None:
+    for definition in _resource_list(template.get("resources")):
+        if not isinstance(definition, Mapping) or definition.get("existing"):
+            continue
+        if "condition" in definition and scope.evaluate(definition["condition"]) is False:
+            continue
+
+        resource_type = str(definition.get("type", ""))
+        if parent_type and "/" not in resource_type:
+            # Child resources declared inside their parent may use a relative type
+            resource_type = f"{parent_type}/{resource_type}"
+        quantity = multiplier
+        if "copy" in definition:
+            count = scope.evaluate(definition["copy"].get("count")) if isinstance(definition["copy"], Mapping) else None
+            if isinstance(quantity, int) and isinstance(count, int) and not isinstance(count, bool):
+                quantity = quantity * count
+            else:
+                quantity = UNRESOLVED
+        if quantity == 0:
+            continue
+        name = scope.describe(definition.get("name"))
+
+        if resource_type.casefold() == DEPLOYMENTS_TYPE:
+            properties = definition.get("properties", {})
+            nested = properties.get("template")
+            if not isinstance(nested, Mapping):
+                continue
+            child_path = f"{path}/{name}" if path else str(name)
+            options = properties.get("expressionEvaluationOptions") or {}
+            if str(options.get("scope", "outer")).casefold() == "inner":
+                values = {
+                    key: scope.evaluate(spec["value"])
+                    for key, spec in (properties.get("parameters") or {}).items()
+                    if isinstance(spec, Mapping) and "value" in spec
+                }
+                child_scope = TemplateScope(nested, values, scope.region)
+            else:
+                child_scope = scope
+            _walk(nested, child_scope, child_path, quantity, out)
+            continue
+
+        out.append(ArmResource(path, resource_type, name, definition, scope, quantity))
+        if definition.get("resources"):
+            _walk(definition, scope, path, quantity, out, parent_type=resource_type)
+
+
+# ---------------------------------------------------------------------------
+# Price mappings
+# ---------------------------------------------------------------------------
+
+
+class NotPriced(Exception):
+    """Raised by a price mapping for a resource it can't turn into a BOM line."""
+
+
+USAGE_BASED = "Billed by usage only; not included"
+
+# Resource types with no charge of their own
+FREE_TYPES = frozenset(
+    name.casefold()
+    for name in (
+        "Microsoft.Authorization/locks",
+        "Microsoft.Authorization/roleAssignments",
+        "Microsoft.Authorization/roleDefinitions",
+        "Microsoft.Insights/diagnosticSettings",
+        "Microsoft.ManagedIdentity/userAssignedIdentities",
+        "Microsoft.Network/networkSecurityGroups",
+        "Microsoft.Network/routeTables",
+        "Microsoft.Network/virtualNetworks",
+        "Microsoft.Sql/servers",
+        "Microsoft.Web/sites",
+    )
+)
+
+# Resource types billed only by consumption (ingestion, executions, queries, ...)
+USAGE_BASED_TYPES = frozenset(
+    name.casefold()
+    for name in (
+        "Microsoft.App/containerApps",
+        "Microsoft.App/managedEnvironments",
+        "Microsoft.Automation/automationAccounts",
+        "Microsoft.Insights/components",
+        "Microsoft.Network/privateDnsZones",
+        "Microsoft.OperationalInsights/workspaces",
+        "Microsoft.OperationsManagement/solutions",
+        "Microsoft.SecurityInsights/onboardingStates",
+    )
+)
+
+# DTU levels of single databases by (tier, DTUs)
+_SQL_DTU_SKUS = {
+    "standard": {10: "S0", 20: "S1", 50: "S2", 100: "S3", 200: "S4", 400: "S6", 800: "S7", 1600: "S9", 3000: "S12"},
+    "premium": {125: "P1", 250: "P2", 500: "P4", 1000: "P6", 1750: "P11", 4000: "P15"},
+}
+_SQL_VCORE_TIERS = {"GP": "General Purpose", "BC": "Business Critical", "HS": "Hyperscale"}
+
+_SEARCH_SKUS = {
+    "free": "Free",
+    "basic": "Basic",
+    "standard": "Standard S1",
+    "standard2": "Standard S2",
+    "standard3": "Standard S3",
+    "storage_optimized_l1": "Storage Optimized L1",
+    "storage_optimized_l2": "Storage Optimized L2",
+}
+
+
+def _text(value: Any, what: str) -> str:
+    """A resolved, non-empty string setting of a resource."""
+    if not isinstance(value, str) or not value:
+        raise NotPriced(f"{what} could not be resolved from the template")
+    return value
+
+
+def _count(value: Any, default: int = 1) -> int:
+    """A resolved instance count, defaulting when the template leaves it out."""
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise NotPriced("Instance count could not be resolved from the template")
+    return int(value)
+
+
+def _spaced_version(sku: str) -> str:
+    """Write versioned SKUs the way the Retail Prices API does ("P1v3" is "P1 v3")."""
+    return re.sub(r"(?<=\w)(v\d+)$", r" \1", sku)
+
+
+def _app_service_plan(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("sku", "name"), "Plan SKU")
+    tier = str(resource.value("sku", "tier") or "")
+    if sku.upper() in ("Y1", "FC1") or tier.casefold() in ("dynamic", "flexconsumption"):
+        raise NotPriced(USAGE_BASED)
+    return {
+        "service_name": "Azure App Service",
+        "sku_name": _spaced_version(sku),
+        "quantity": _count(resource.value("sku", "capacity")),
+    }
+
+
+def _static_web_app(resource: ArmResource) -> dict[str, Any]:
+    return {"service_name": "Azure Static Web Apps", "sku_name": _text(resource.value("sku", "name"), "SKU")}
+
+
+def _sql_database(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("sku", "name"), "Database SKU")
+    capacity = resource.value("sku", "capacity")
+    tier = str(resource.value("sku", "tier") or sku)
+    if re.fullmatch(r"[SP]\d+|Basic", sku, re.IGNORECASE):
+        return {"service_name": "SQL Database", "sku_name": sku.capitalize(), "product_name": "Single"}
+    dtu_skus = _SQL_DTU_SKUS.get(tier.casefold())
+    if dtu_skus is not None:
+        level = dtu_skus.get(_count(capacity, default=min(dtu_skus)))
+        if level is None:
+            raise NotPriced(f"No {tier} database level has {capacity} DTUs")
+        return {"service_name": "SQL Database", "sku_name": level, "product_name": "Single"}
+    match = re.fullmatch(r"(GP|BC|HS)(_S)?_\w+?_(\d+)", sku, re.IGNORECASE)
+    if match:
+        if match.group(2):
+            raise NotPriced(USAGE_BASED)
+        return {
+            "service_name": "SQL Database",
+            "sku_name": f"{match.group(3)} vCore",
+            "product_name": _SQL_VCORE_TIERS[match.group(1).upper()],
+        }
+    raise NotPriced(f"No price mapping for database SKU {sku}")
+
+
+def _redis(resource: ArmResource) -> dict[str, Any]:
+    name = _text(resource.value("properties", "sku", "name"), "Cache SKU")
+    family = _text(resource.value("properties", "sku", "family"), "Cache family")
+    capacity = _count(resource.value("properties", "sku", "capacity"), default=0)
+    return {"service_name": "Redis Cache", "sku_name": f"{family}{capacity}", "product_name": name}
+
+
+def _search(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("sku", "name"), "Search SKU")
+    replicas = _count(resource.value("properties", "replicaCount"))
+    partitions = _count(resource.value("properties", "partitionCount"))
+    return {
+        "service_name": "Azure Cognitive Search",
+        "sku_name": _SEARCH_SKUS.get(sku.casefold(), sku),
+        "quantity": replicas * partitions,
+    }
+
+
+def _service_bus(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("sku", "name"), "Namespace SKU").capitalize()
+    if sku == "Basic":
+        raise NotPriced(USAGE_BASED)
+    quantity = _count(resource.value("sku", "capacity")) if sku == "Premium" else 1
+    return {"service_name": "Service Bus", "sku_name": sku, "quantity": quantity}
+
+
+def _storage_account(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("sku", "name"), "Storage SKU")
+    performance, _, redundancy = sku.partition("_")
+    if performance.casefold() == "premium":
+        return {"service_name": "Storage", "sku_name": f"Premium {redundancy}", "product_name": "Block Blob"}
+    access_tier = resource.value("properties", "accessTier")
+    tier = access_tier if isinstance(access_tier, str) and access_tier else "Hot"
+    return {"service_name": "Storage", "sku_name": f"{tier} {redundancy}", "product_name": "General Block Blob v2"}
+
+
+def _key_vault(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("properties", "sku", "name"), "Vault SKU")
+    return {"service_name": "Key Vault", "sku_name": sku.capitalize()}
+
+
+def _front_door(resource: ArmResource) -> dict[str, Any]:
+    sku = _text(resource.value("sku", "name"), "Profile SKU")
+    tier, _, product = sku.partition("_")
+    if product.casefold() != "azurefrontdoor":
+        raise NotPriced(USAGE_BASED)
+    return {"service_name": "Azure Front Door Service", "sku_name": tier.capitalize()}
+
+
+def _front_door_waf(resource: ArmResource) -> None:
+    sku = _text(resource.value("sku", "name"), "Policy SKU")
+    if sku.casefold() != "premium_azurefrontdoor":
+        raise NotPriced(USAGE_BASED)
+    # Included in the Front Door Premium base fee
+
+
+def _private_endpoint(resource: ArmResource) -> dict[str, Any]:
+    return {"service_name": "Virtual Network", "sku_name": "Standard", "product_name": "Private Link"}
+
+
+def _virtual_machine(resource: ArmResource) -> dict[str, Any]:
+    size = _text(resource.value("properties", "hardwareProfile", "vmSize"), "VM size")
+    line = {"service_name": "Virtual Machines", "sku_name": size}
+    if resource.value("properties", "osProfile", "windowsConfiguration"):
+        line["product_name"] = "Windows"
+    return line
+
+
+def _container_registry(resource: ArmResource) -> dict[str, Any]:
+    return {"service_name": "Container Registry", "sku_name": _text(resource.value("sku", "name"), "Registry SKU")}
+
+
+# Price mapping per resource type: a BOM line for the resource, or None when it's free
+PRICE_MAPPINGS: dict[str, Callable[[ArmResource], dict[str, Any] | None]] = {
+    name.casefold(): mapping
+    for name, mapping in (
+        ("Microsoft.Web/serverfarms", _app_service_plan),
+        ("Microsoft.Web/staticSites", _static_web_app),
+        ("Microsoft.Sql/servers/databases", _sql_database),
+        ("Microsoft.Cache/redis", _redis),
+        ("Microsoft.Search/searchServices", _search),
+        ("Microsoft.ServiceBus/namespaces", _service_bus),
+        ("Microsoft.Storage/storageAccounts", _storage_account),
+        ("Microsoft.KeyVault/vaults", _key_vault),
+        ("Microsoft.Cdn/profiles", _front_door),
+        ("Microsoft.Network/FrontDoorWebApplicationFirewallPolicies", _front_door_waf),
+        ("Microsoft.Network/privateEndpoints", _private_endpoint),
+        ("Microsoft.Compute/virtualMachines", _virtual_machine),
+        ("Microsoft.ContainerRegistry/registries", _container_registry),
+    )
+}
+
+
+def template_bom(
+    resources: list[ArmResource],
+    region: str | None = None,
+    usage: Mapping[str, Mapping[str, Any]] | None = None,
+) -> tuple[list[dict[str, Any]], list[dict[str, Any]], int]:
+    """
+    Map template resources to BOM lines.
+
+    Args:
+        resources: Resources from `template_resources`
+        region: Region for resources whose location can't be resolved
+        usage: Usage fields (storage_gb, transactions, hours_per_month) merged into
+               the BOM line of resources by name or by type
+
+    Returns:
+        Tuple of (BOM lines, resources not priced with the reason, free resources)
+    """
+    usage = {key.casefold(): value for key, value in (usage or {}).items()}
+    lines: list[dict[str, Any]] = []
+    not_priced: list[dict[str, Any]] = []
+    free = 0
+    for resource in resources:
+        resource_type = resource.type.casefold()
+        mapping = PRICE_MAPPINGS.get(resource_type)
+        try:
+            if mapping is None:
+                if resource_type in FREE_TYPES or resource_type.count("/") > 1:
+                    # Child resources are billed through their parent
+                    free += 1
+                    continue
+                raise NotPriced(USAGE_BASED if resource_type in USAGE_BASED_TYPES else "No price mapping")
+            line = mapping(resource)
+            if line is None:
+                free += 1
+                continue
+            if resource.quantity is UNRESOLVED:
+                raise NotPriced("Copy count could not be resolved from the template")
+            location = resource.location
+            if not isinstance(location, str) or not location:
+                if not region:
+                    raise NotPriced("Location could not be resolved from the template")
+                location = region
+        except NotPriced as e:
+            not_priced.append({"name": resource.label, "type": resource.type, "reason": str(e)})
+            continue
+
+        line = {"name": resource.label, **line, "region": location}
+        line["quantity"] = line.get("quantity", 1) * resource.quantity
+        overrides = usage.get(resource.label.casefold()) or usage.get(resource_type)
+        if overrides:
+            line.update(
+                {
+                    key: value
+                    for key, value in overrides.items()
+                    if key in ("storage_gb", "transactions", "hours_per_month")
+                }
+            )
+        lines.append(line)
+    return lines, not_priced, free
+
+
+# ---------------------------------------------------------------------------
+# Loading
+# ---------------------------------------------------------------------------
+
+
+def resolve_template_path(path: str | Path) -> Path:
+    """The template of a path naming either the template file or its project directory."""
+    path = Path(path).expanduser()
+    if path.is_dir():
+        path = path / TEMPLATE_FILENAME
+    if not path.is_file():
+        raise TemplateError(f"Template not found: {path}")
+    return path
+
+
+def load_template(path: str | Path, parameters_file: str | Path | None = None) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    Read a template and the parameter values to deploy it with.
+
+    Values come from `parameters_file` (a .bicepparam file or an ARM parameters
+    JSON file), or from a `main.bicepparam` next to the template when none is given.
+    """
+    template_path = resolve_template_path(path)
+    try:
+        template = json.loads(template_path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        raise TemplateError(f"Cannot read template {template_path}: {e}") from e
+    if not isinstance(template, dict) or "resources" not in template:
+        raise TemplateError(f"{template_path} is not an ARM template")
+
+    if parameters_file is None:
+        candidate = template_path.with_name(BICEPPARAM_FILENAME)
+        parameters_file = candidate if candidate.is_file() else None
+    values: dict[str, Any] = {}
+    if parameters_file is not None:
+        parameters_path = Path(parameters_file).expanduser()
+        try:
+            text = parameters_path.read_text(encoding="utf-8")
+        except OSError as e:
+            raise TemplateError(f"Cannot read parameters {parameters_path}: {e}") from e
+        if parameters_path.suffix == ".bicepparam":
+            values = parse_bicepparam(text)
+        else:
+            try:
+                document = json.loads(text)
+            except json.JSONDecodeError as e:
+                raise TemplateError(f"Cannot read parameters {parameters_path}: {e}") from e
+            values = {
+                name: spec["value"]
+                for name, spec in document.get("parameters", {}).items()
+                if isinstance(spec, Mapping) and "value" in spec
+            }
+    return template, values
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point for pricing a template."""
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Price the resources of a compiled ARM template")
+    parser.add_argument("template", help=f"Template file, or a project directory holding {TEMPLATE_FILENAME}")
+    parser.add_argument(
+        "--parameters-file", help=f"A .bicepparam or parameters JSON file (default: {BICEPPARAM_FILENAME} if present)"
+    )
+    parser.add_argument(
+        "--param", action="append", default=[], metavar="NAME=VALUE", help="Override a parameter (repeatable)"
+    )
+    parser.add_argument("--region", help="Region for resources whose location isn't resolved")
+    parser.add_argument("--currency", default="USD", help="Currency code (default: USD)")
+    parser.add_argument("--json", action="store_true", help="Print the full result as JSON")
+    args = parser.parse_args(argv)
+
+    parameters = {}
+    for assignment in args.param:
+        name, separator, value = assignment.partition("=")
+        if not separator:
+            parser.error(f"--param expects NAME=VALUE, got {assignment!r}")
+        try:
+            parameters[name] = json.loads(value)
+        except json.JSONDecodeError:
+            parameters[name] = value
+
+    from .handlers import format_template_estimate
+    from .server import AzurePricingServer
+
+    async def run() -> dict[str, Any]:
+        try:
+            return await AzurePricingServer().estimate_template(
+                args.template,
+                parameters=parameters,
+                parameters_file=args.parameters_file,
+                region=args.region,
+                currency_code=args.currency.upper(),
+            )
+        finally:
+            await AzurePricingServer.close_session()
+
+    result = asyncio.run(run())
+    if args.json or "error" in result:
+        print(json.dumps(result, indent=2))
+    else:
+        print(format_template_estimate(result))
+    if "error" in result:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
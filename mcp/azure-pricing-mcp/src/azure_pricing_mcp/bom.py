@@ -0,0 +1,354 @@
+"""
+Bill-of-materials cost estimation for Azure Pricing MCP Server.
+
+A bill of materials (BOM) lists the resources of an architecture: service, SKU,
+region, quantity and usage (hours per month, stored GB, transactions). The server
+looks up the price items of every distinct (service, SKU, region) once, all
+concurrently. This module then picks each resource's meters from those items and
+prices the whole BOM column by column: the rates, usage and quantities of every
+charge are laid out as float arrays, and the monthly and savings-plan costs of
+all charges are computed in one pass over them.
+"""
+
+import math
+import re
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, NamedTuple
+
+from .odata import normalize_value
+
+HOURS_PER_MONTH = 730
+MONTHS_PER_YEAR = 12
+MAX_BOM_RESOURCES = 100  # resources accepted by a single azure_bom_estimate call
+
+# Charges of a resource, by the kind of usage they bill
+COMPUTE = "compute"  # running time: per hour, per day or a flat monthly fee
+STORAGE = "storage"  # data stored per month
+TRANSACTIONS = "transactions"  # operations, billed in blocks such as 10K
+
+# unitOfMeasure such as "1 Hour", "1/Day", "1 GB/Month", "10K" or "1M"
+_UNIT = re.compile(r"^\s*(\d+(?:[.,]\d+)*)?\s*([KM](?![a-z]))?\s*(.*)$", re.IGNORECASE)
+_BLOCK_SCALES = {"": 1, "K": 1_000, "M": 1_000_000}
+
+# Rank of the time units a compute charge can be billed in (most precise first)
+_TIME_UNITS = {"hour": 0, "day": 1, "month": 2}
+
+# SKU variants that are only priced when asked for by name
+_VARIANT_MARKERS = ("Spot", "Low Priority")
+
+
+class BomResource(NamedTuple):
+    """One line of a bill of materials."""
+
+    name: str | None
+    service_name: str
+    sku_name: str
+    region: str
+    quantity: float = 1
+    hours_per_month: float = HOURS_PER_MONTH
+    storage_gb: float = 0
+    transactions: float = 0
+    product_name: str | None = None
+
+
+def parse_unit(unit_of_measure: str | None) -> tuple[float, str | None]:
+    """
+    Split a unitOfMeasure into its block size and usage kind.
+
+    "1 Hour" is (1, "hour"), "1 GB/Month" is (1, "gb_month"), "10K" is (10000, "count")
+    and "1/Month" is (1, "month"). Units no BOM usage maps to have kind None.
+    """
+    match = _UNIT.match(unit_of_measure or "")
+    if not match:
+        return 1.0, None
+    number, scale, rest = match.groups()
+    size = float(number.replace(",", "")) if number else 1.0
+    size *= _BLOCK_SCALES[(scale or "").upper()]
+    rest = rest.strip().lower()
+    if "hour" in rest:
+        kind = "hour"
+    elif "gb/month" in rest or "gib/month" in rest:
+        kind = "gb_month"
+    elif "day" in rest:
+        kind = "day"
+    elif "month" in rest:
+        kind = "count" if scale else "month"
+    elif not rest:
+        kind = "count"
+    else:
+        kind = None
+    return size, kind
+
+
+def _number(resource: Mapping[str, Any], field: str, default: float, position: int) -> float:
+    """Read a non-negative number field of a raw resource."""
+    value = resource.get(field, default)
+    if value is None:
+        return default
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value) or value < 0:
+        raise ValueError(f"Resource {position}: {field} must be a non-negative number")
+    return float(value)
+
+
+def parse_resources(resources: Any, default_region: str | None = None) -> list[BomResource]:
+    """
+    Validate the raw resources of a BOM.
+
+    Each resource needs service_name and sku_name, and a region unless
+    `default_region` is given. Raises ValueError naming the first invalid resource.
+    """
+    if not isinstance(resources, list) or not resources:
+        raise ValueError("resources must be a non-empty list of resource objects")
+    if len(resources) > MAX_BOM_RESOURCES:
+        raise ValueError(f"A bill of materials holds at most {MAX_BOM_RESOURCES} resources, got {len(resources)}")
+
+    parsed = []
+    for position, resource in enumerate(resources):
+        if not isinstance(resource, dict):
+            raise ValueError(f"Resource {position}: must be an object")
+        fields = {}
+        for field in ("service_name", "sku_name", "region"):
+            value = resource.get(field) or (default_region if field == "region" else None)
+            if not isinstance(value, str) or not value.strip():
+                raise ValueError(f"Resource {position}: {field} is required")
+            fields[field] = value.strip()
+        name = resource.get("name")
+        product_name = resource.get("product_name")
+        parsed.append(
+            BomResource(
+                name=str(name) if name is not None else None,
+                service_name=fields["service_name"],
+                sku_name=fields["sku_name"],
+                region=normalize_value("armRegionName", fields["region"]),
+                quantity=_number(resource, "quantity", 1, position),
+                hours_per_month=_number(resource, "hours_per_month", HOURS_PER_MONTH, position),
+                storage_gb=_number(resource, "storage_gb", 0, position),
+                transactions=_number(resource, "transactions", 0, position),
+                product_name=str(product_name) if product_name else None,
+            )
+        )
+    return parsed
+
+
+def lookup_key(resource: BomResource) -> tuple[str, str, str]:
+    """The (service, SKU, region) whose price items a resource is priced from."""
+    return resource.service_name, resource.sku_name, resource.region
+
+
+def _component(kind: str | None) -> str | None:
+    """The resource charge a usage kind bills."""
+    if kind in _TIME_UNITS:
+        return COMPUTE
+    if kind == "gb_month":
+        return STORAGE
+    if kind == "count":
+        return TRANSACTIONS
+    return None
+
+
+def select_meters(
+    resource: BomResource, items: Sequence[Mapping[str, Any]], sku_names: Sequence[str] = ()
+) -> dict[str, Mapping[str, Any]]:
+    """
+    Pick the Consumption meter billing each charge of a resource.
+
+    Spot and Low Priority meters are skipped unless the SKU names them, and
+    `product_name` narrows the products considered (e.g. "Windows"). Among the
+    remaining meters of a charge, the one whose SKU matches one of `sku_names`
+    exactly wins, then the finest time unit, the base price tier and the lowest price.
+    """
+    wanted = {name.lower() for name in (resource.sku_name, *sku_names)}
+    allowed_variants = [marker for marker in _VARIANT_MARKERS if marker.lower() in resource.sku_name.lower()]
+    best: dict[str, tuple[tuple[Any, ...], Mapping[str, Any]]] = {}
+    for item in items:
+        if item.get("type", "Consumption") != "Consumption":
+            continue
+        sku = str(item.get("skuName") or "")
+        if any(marker in sku and marker not in allowed_variants for marker in _VARIANT_MARKERS):
+            continue
+        if resource.product_name and resource.product_name.lower() not in str(item.get("productName", "")).lower():
+            continue
+        _, kind = parse_unit(item.get("unitOfMeasure"))
+        component = _component(kind)
+        if component is None or kind is None:
+            continue
+        exact = sku.lower() in wanted or str(item.get("armSkuName") or "").lower() in wanted
+        rank = (
+            not exact,
+            _TIME_UNITS.get(kind, 0),
+            item.get("tierMinimumUnits") or 0,
+            item.get("retailPrice") or 0,
+        )
+        if component not in best or rank < best[component][0]:
+            best[component] = (rank, item)
+    return {component: item for component, (_, item) in best.items()}
+
+
+def _usage(resource: BomResource, component: str, kind: str | None) -> float:
+    """Monthly usage of one unit of a resource billed by a charge, in the meter's units."""
+    if component == STORAGE:
+        return resource.storage_gb
+    if component == TRANSACTIONS:
+        return resource.transactions
+    if kind == "day":
+        return resource.hours_per_month / 24
+    if kind == "month":
+        return resource.hours_per_month / HOURS_PER_MONTH
+    return resource.hours_per_month
+
+
+def price_bom(
+    resources: Sequence[BomResource],
+    meters: Sequence[dict[str, Mapping[str, Any]] | Exception],
+    discount_percentage: float | None = None,
+) -> dict[str, Any]:
+    """
+    Price a BOM from the meters selected for each of its resources.
+
+    Args:
+        resources: Parsed BOM resources
+        meters: Per resource, its meters by charge (see `select_meters`), or the
+                exception raised while looking up its prices
+        discount_percentage: Optional discount applied to every rate
+
+    Returns:
+        Dict with per-resource costs and charges, monthly and annual totals, totals
+        per service family, and totals if compute were covered by savings plans
+    """
+    factor = 1 - discount_percentage / 100 if discount_percentage else 1.0
+
+    # Lay every charge of every resource out as columns
+    owners = array("I")
+    rates = array("d")
+    usage = array("d")
+    blocks = array("d")
+    quantities = array("d")
+    plan_rates: dict[str, array] = {}
+    charges: list[tuple[str, Mapping[str, Any]]] = []
+    entries: list[dict[str, Any]] = []
+    for index, (resource, found) in enumerate(zip(resources, meters, strict=True)):
+        entry: dict[str, Any] = {"index": index}
+        if resource.name is not None:
+            entry["name"] = resource.name
+        entry.update(
+            service_name=resource.service_name,
+            sku_name=resource.sku_name,
+            region=resource.region,
+            quantity=resource.quantity,
+        )
+        entries.append(entry)
+        if isinstance(found, Exception):
+            entry.update(status="error", error=f"Price lookup failed: {found}")
+            continue
+
+        unpriced = []
+        for component in (COMPUTE, STORAGE, TRANSACTIONS):
+            item = found.get(component)
+            requested = {STORAGE: resource.storage_gb, TRANSACTIONS: resource.transactions}.get(component)
+            if item is None:
+                if requested:
+                    unpriced.append(component)
+                continue
+            size, kind = parse_unit(item.get("unitOfMeasure"))
+            amount = _usage(resource, component, kind)
+            if amount <= 0:
+                continue
+            owners.append(index)
+            rates.append(float(item.get("retailPrice") or 0))
+            usage.append(amount)
+            blocks.append(size or 1.0)
+            quantities.append(resource.quantity)
+            # Savings plans cover compute only
+            for plan in (item.get("savingsPlan") or ()) if component == COMPUTE else ():
+                term = plan.get("term")
+                if term not in plan_rates:
+                    plan_rates[term] = array("d", [math.nan] * (len(rates) - 1))
+                plan_rates[term].append(float(plan.get("retailPrice") or 0))
+            for column in plan_rates.values():
+                if len(column) < len(rates):
+                    column.append(math.nan)
+            charges.append((component, item))
+
+        if not found:
+            entry.update(status="error", error=f"No price found for {resource.sku_name} in {resource.region}")
+            continue
+        family = next(item for item in (found.get(COMPUTE), *found.values()) if item is not None).get("serviceFamily")
+        entry.update(status="ok", service_family=family or "Other", components=[], monthly_cost=0.0)
+        if unpriced:
+            entry["unpriced"] = unpriced
+
+    # One pass over the columns prices every charge on demand and under each savings plan
+    scale = [
+        factor * amount / block * quantity for amount, block, quantity in zip(usage, blocks, quantities, strict=True)
+    ]
+    monthly = [rate * charge_scale for rate, charge_scale in zip(rates, scale, strict=True)]
+    plan_monthly = {
+        term: [
+            on_demand if math.isnan(plan_rate) else plan_rate * charge_scale
+            for plan_rate, charge_scale, on_demand in zip(column, scale, monthly, strict=True)
+        ]
+        for term, column in plan_rates.items()
+    }
+
+    families: dict[str, dict[str, Any]] = {}
+    for position, (component, item) in enumerate(charges):
+        entry = entries[owners[position]]
+        entry["monthly_cost"] += monthly[position]
+        entry["components"].append(
+            {
+                "component": component,
+                "meter_name": item.get("meterName"),
+                "product_name": item.get("productName"),
+                "sku_name": item.get("skuName"),
+                "unit_of_measure": item.get("unitOfMeasure"),
+                "unit_price": round(rates[position] * factor, 6),
+                "usage": round(usage[position] * quantities[position], 4),
+                "monthly_cost": round(monthly[position], 2),
+            }
+        )
+
+    for entry in entries:
+        if entry["status"] != "ok":
+            continue
+        family = families.setdefault(
+            entry["service_family"], {"service_family": entry["service_family"], "monthly_cost": 0.0, "resources": 0}
+        )
+        family["monthly_cost"] += entry["monthly_cost"]
+        family["resources"] += 1
+        entry["annual_cost"] = round(entry["monthly_cost"] * MONTHS_PER_YEAR, 2)
+        entry["monthly_cost"] = round(entry["monthly_cost"], 2)
+
+    total_monthly = math.fsum(monthly)
+    by_family = sorted(families.values(), key=lambda family: -family["monthly_cost"])
+    for family in by_family:
+        family["share_percent"] = round(family["monthly_cost"] / total_monthly * 100, 1) if total_monthly else 0.0
+        family["annual_cost"] = round(family["monthly_cost"] * MONTHS_PER_YEAR, 2)
+        family["monthly_cost"] = round(family["monthly_cost"], 2)
+
+    savings_plans = []
+    for term in sorted(plan_monthly):
+        term_monthly = math.fsum(plan_monthly[term])
+        savings_plans.append(
+            {
+                "term": term,
+                "monthly_cost": round(term_monthly, 2),
+                "annual_cost": round(term_monthly * MONTHS_PER_YEAR, 2),
+                "annual_savings": round((total_monthly - term_monthly) * MONTHS_PER_YEAR, 2),
+                "savings_percent": round((1 - term_monthly / total_monthly) * 100, 2) if total_monthly else 0.0,
+            }
+        )
+
+    failed = sum(1 for entry in entries if entry["status"] != "ok")
+    return {
+        "totals": {
+            "monthly_cost": round(total_monthly, 2),
+            "annual_cost": round(total_monthly * MONTHS_PER_YEAR, 2),
+        },
+        "savings_plans": savings_plans,
+        "by_service_family": by_family,
+        "resources": entries,
+        "total_resources": len(entries),
+        "priced_resources": len(entries) - failed,
+        "failed_resources": failed,
+    }
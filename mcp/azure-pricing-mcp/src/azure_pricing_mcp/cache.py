@@ -0,0 +1,151 @@
+"""
+Persistent response cache for Azure Pricing MCP Server.
+
+Backs the in-memory TTL cache of AzurePricingServer with an on-disk tier so that
+container restarts and new stdio sessions don't start cold. Several server
+processes can share one cache file; fetch leases let them agree on which process
+fetches a missing response while the others wait for it to appear on disk.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from collections.abc import Iterator
+from typing import Any
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+DEFAULT_DISK_CACHE_MAX_BYTES = 256 * 1024 * 1024  # 256 MB of compressed responses
+DEFAULT_DISK_CACHE_TTL = 24 * 3600  # seconds
+DISK_CACHE_FILENAME = "responses.db"
+DEFAULT_LEASE_TTL = 120.0  # seconds before a fetch lease of a crashed or stuck process lapses
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS ix_entries_last_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+class DiskCache:
+    """
+    SQLite-backed cache tier storing zlib-compressed JSON responses.
+
+    Entries expire `ttl` seconds after they were written. When the total compressed
+    size exceeds `max_bytes`, the least recently used entries are evicted first.
+    Each process opening the cache leases keys as its own (see `acquire_lease`).
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_DISK_CACHE_MAX_BYTES, ttl: float = DEFAULT_DISK_CACHE_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.owner = str(os.getpid())
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def get(self, key: str) -> Any | None:
+        """Return the cached value for `key`, or None if missing or expired."""
+        entry = self.get_entry(key)
+        return entry[0] if entry is not None else None
+
+    def get_entry(self, key: str) -> tuple[Any, float] | None:
+        """Return `(value, created_at)` for `key`, or None if missing or expired."""
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM entries WHERE key = ? AND created_at > ?", (key, now - self.ttl)
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE entries SET last_access = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[0])), row[1]
+
+    def set(self, key: str, value: Any) -> None:
+        """Store `value` under `key`, evicting entries if the byte budget is exceeded."""
+        blob = zlib.compress(json.dumps(value, separators=(",", ":")).encode())
+        if len(blob) > self.max_bytes:
+            logger.debug(f"Skipping disk cache for {key}: {len(blob)} bytes exceeds budget")
+            return
+
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)", (key, blob, len(blob), now, now)
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones until within the byte budget."""
+        self._conn.execute("DELETE FROM entries WHERE created_at <= ?", (now - self.ttl,))
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+        logger.debug(f"Disk cache evicted {len(victims)} entries ({freed} bytes)")
+
+    def acquire_lease(self, key: str, ttl: float = DEFAULT_LEASE_TTL) -> bool:
+        """
+        Claim the right to fetch `key` for `ttl` seconds.
+
+        Returns False while another process holds an unexpired lease on the key.
+        Leases are re-entrant within a process, since its own concurrent fetches
+        are already coalesced in memory.
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND expires_at <= ?", (key, now))
+            self._conn.execute("INSERT OR IGNORE INTO leases VALUES (?, ?, ?)", (key, self.owner, now + ttl))
+            row = self._conn.execute("SELECT owner FROM leases WHERE key = ?", (key,)).fetchone()
+        return row is not None and row[0] == self.owner
+
+    def release_lease(self, key: str) -> None:
+        """Release this process's lease on `key`, if it holds one."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM leases WHERE key = ? AND owner = ?", (key, self.owner))
+
+    def recent(self, limit: int) -> Iterator[tuple[str, Any, float]]:
+        """Yield up to `limit` unexpired `(key, value, created_at)` entries, most recently used first."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT key, value, created_at FROM entries WHERE created_at > ? ORDER BY last_access DESC LIMIT ?",
+                (time.time() - self.ttl, limit),
+            ).fetchall()
+        for key, blob, created_at in rows:
+            yield key, json.loads(zlib.decompress(blob)), created_at
+
+    def stats(self) -> dict[str, Any]:
+        """Summarize the disk tier."""
+        with self._lock:
+            count, total = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        return {"path": self.path, "entries": count, "bytes": total, "max_bytes": self.max_bytes, "ttl": self.ttl}
@@ -0,0 +1,520 @@
+"""
+Offline price catalog for Azure Pricing MCP Server.
+
+Snapshots the Azure Retail Prices catalog (or a configured set of services and
+regions) into a local SQLite database and answers pricing queries from it, so
+air-gapped runners and busy agent fleets don't need an upstream round-trip per call.
+
+Usage:
+    python -m azure_pricing_mcp.catalog download --service "Virtual Machines" --region eastus
+    python -m azure_pricing_mcp.catalog sync
+    python -m azure_pricing_mcp.catalog stats
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime, timezone
+from typing import Any
+
+from .odata import Condition, ODataFilter, compare, eq, normalize_value
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+DEFAULT_CATALOG_PATH = os.path.join(os.path.expanduser("~"), ".cache", "azure-pricing-mcp", "catalog.db")
+ALL = "*"  # scope wildcard for "every service" / "every region"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS prices (
+    currency_code TEXT NOT NULL COLLATE NOCASE,
+    meter_id TEXT NOT NULL,
+    sku_id TEXT NOT NULL DEFAULT '',
+    price_type TEXT NOT NULL DEFAULT '' COLLATE NOCASE,
+    tier_minimum_units REAL NOT NULL DEFAULT 0,
+    reservation_term TEXT NOT NULL DEFAULT '',
+    service_name TEXT COLLATE NOCASE,
+    service_family TEXT COLLATE NOCASE,
+    region TEXT COLLATE NOCASE,
+    sku_name TEXT,
+    product_name TEXT,
+    effective_start_date TEXT,
+    synced_at TEXT NOT NULL,
+    item TEXT NOT NULL,
+    PRIMARY KEY (currency_code, meter_id, sku_id, price_type, tier_minimum_units, reservation_term)
+);
+CREATE INDEX IF NOT EXISTS ix_prices_service_region ON prices (currency_code, service_name, region);
+CREATE INDEX IF NOT EXISTS ix_prices_family ON prices (currency_code, service_family);
+CREATE INDEX IF NOT EXISTS ix_prices_region ON prices (currency_code, region);
+CREATE TABLE IF NOT EXISTS scopes (
+    service_name TEXT NOT NULL COLLATE NOCASE,
+    region TEXT NOT NULL COLLATE NOCASE,
+    currency_code TEXT NOT NULL COLLATE NOCASE,
+    downloaded_at TEXT NOT NULL,
+    item_count INTEGER NOT NULL,
+    PRIMARY KEY (service_name, region, currency_code)
+);
+CREATE TABLE IF NOT EXISTS sync_checkpoints (
+    service_name TEXT NOT NULL COLLATE NOCASE,
+    region TEXT NOT NULL COLLATE NOCASE,
+    currency_code TEXT NOT NULL COLLATE NOCASE,
+    watermark TEXT NOT NULL,
+    last_sync_at TEXT NOT NULL,
+    last_rows_upserted INTEGER NOT NULL,
+    total_rows_upserted INTEGER NOT NULL,
+    PRIMARY KEY (service_name, region, currency_code)
+);
+"""
+
+_UPSERT = """
+INSERT OR REPLACE INTO prices (
+    currency_code, meter_id, sku_id, price_type, tier_minimum_units, reservation_term,
+    service_name, service_family, region, sku_name, product_name, effective_start_date,
+    synced_at, item
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+
+def _utc_now() -> str:
+    """Current UTC time as an ISO 8601 string."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _scope_params(
+    service_name: str | None,
+    region: str | None,
+    currency_code: str,
+    extra_conditions: list[Condition] | None = None,
+) -> dict[str, str]:
+    """Build Retail Prices query parameters for a catalog scope."""
+    from .server import DEFAULT_API_VERSION
+
+    filter_conditions = []
+    if service_name and service_name != ALL:
+        filter_conditions.append(eq("serviceName", service_name))
+    if region and region != ALL:
+        filter_conditions.append(eq("armRegionName", region))
+    filter_conditions.extend(extra_conditions or [])
+    odata_filter = ODataFilter(filter_conditions)
+
+    params = {"api-version": DEFAULT_API_VERSION, "currencyCode": currency_code}
+    if odata_filter:
+        params["$filter"] = str(odata_filter)
+    return params
+
+
+def _normalize_region(region: str | None) -> str | None:
+    """Normalize a region argument ("East US") to the armRegionName the prices are stored under ("eastus")."""
+    return normalize_value("armRegionName", region) if region else region
+
+
+def _scope_clauses(service_name: str, region: str, currency_code: str) -> tuple[list[str], list[Any]]:
+    """Build SQL clauses selecting the `prices` rows belonging to a scope."""
+    clauses = ["currency_code = ?"]
+    args: list[Any] = [currency_code]
+    if service_name != ALL:
+        clauses.append("service_name = ?")
+        args.append(service_name)
+    if region != ALL:
+        clauses.append("region = ?")
+        args.append(region)
+    return clauses, args
+
+
+def _item_row(item: dict[str, Any], currency_code: str, synced_at: str) -> tuple:
+    """Flatten a Retail Prices item into a `prices` table row."""
+    return (
+        item.get("currencyCode") or currency_code,
+        item.get("meterId") or "",
+        item.get("skuId") or "",
+        item.get("type") or "",
+        item.get("tierMinimumUnits") or 0,
+        item.get("reservationTerm") or "",
+        item.get("serviceName"),
+        item.get("serviceFamily"),
+        item.get("armRegionName"),
+        item.get("skuName"),
+        item.get("productName"),
+        item.get("effectiveStartDate"),
+        synced_at,
+        json.dumps(item, separators=(",", ":")),
+    )
+
+
+class PriceCatalog:
+    """Local SQLite snapshot of Azure retail prices with indexed lookups."""
+
+    def __init__(self, path: str = DEFAULT_CATALOG_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        self._conn.close()
+
+    def upsert_items(self, items: list[dict[str, Any]], currency_code: str, synced_at: str | None = None) -> int:
+        """Insert or replace price items in one transaction. Returns the number of rows written."""
+        synced_at = synced_at or _utc_now()
+        rows = [_item_row(item, currency_code, synced_at) for item in items if item.get("meterId")]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+        return len(rows)
+
+    def record_scope(
+        self, service_name: str | None, region: str | None, currency_code: str, started_at: str, item_count: int
+    ) -> None:
+        """Mark a (service, region, currency) scope as fully downloaded and drop rows it no longer has."""
+        service = service_name or ALL
+        area = _normalize_region(region) or ALL
+        clauses, args = _scope_clauses(service, area, currency_code)
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"DELETE FROM prices WHERE {' AND '.join(clauses)} AND synced_at < ?", [*args, started_at]
+            )
+            self._conn.execute(
+                "INSERT OR REPLACE INTO scopes VALUES (?, ?, ?, ?, ?)",
+                (service, area, currency_code, started_at, item_count),
+            )
+            # A full snapshot restarts delta sync from its newest price
+            self._conn.execute(
+                "DELETE FROM sync_checkpoints WHERE service_name = ? AND region = ? AND currency_code = ?",
+                (service, area, currency_code),
+            )
+
+    def scope_watermark(self, service_name: str, region: str, currency_code: str) -> str | None:
+        """
+        Get the delta sync watermark of a scope.
+
+        This is the checkpointed watermark if the scope was synced before, otherwise the
+        newest `effectiveStartDate` stored for it.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT watermark FROM sync_checkpoints WHERE service_name = ? AND region = ? AND currency_code = ?",
+                (service_name, region, currency_code),
+            ).fetchone()
+            if row:
+                watermark: str = row[0]
+                return watermark
+            clauses, args = _scope_clauses(service_name, region, currency_code)
+            row = self._conn.execute(
+                f"SELECT MAX(effective_start_date) FROM prices WHERE {' AND '.join(clauses)}", args
+            ).fetchone()
+        return row[0] if row else None
+
+    def apply_delta(
+        self,
+        items: list[dict[str, Any]],
+        service_name: str,
+        region: str,
+        currency_code: str,
+        watermark: str,
+        synced_at: str | None = None,
+    ) -> int:
+        """
+        Upsert changed prices and advance the scope checkpoint in a single transaction.
+
+        Returns:
+            Number of rows upserted
+        """
+        synced_at = synced_at or _utc_now()
+        rows = [_item_row(item, currency_code, synced_at) for item in items if item.get("meterId")]
+        with self._lock, self._conn:
+            self._conn.executemany(_UPSERT, rows)
+            self._conn.execute(
+                """
+                INSERT INTO sync_checkpoints VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (service_name, region, currency_code) DO UPDATE SET
+                    watermark = excluded.watermark,
+                    last_sync_at = excluded.last_sync_at,
+                    last_rows_upserted = excluded.last_rows_upserted,
+                    total_rows_upserted = total_rows_upserted + excluded.last_rows_upserted
+                """,
+                (service_name, region, currency_code, watermark, synced_at, len(rows), len(rows)),
+            )
+        return len(rows)
+
+    def sync_status(self) -> list[dict[str, Any]]:
+        """Report the delta sync watermark and row counts for every downloaded scope."""
+        with self._lock:
+            rows = self._conn.execute(
+                """
+                SELECT s.service_name, s.region, s.currency_code, s.downloaded_at, s.item_count,
+                       c.watermark, c.last_sync_at, c.last_rows_upserted, c.total_rows_upserted
+                FROM scopes s LEFT JOIN sync_checkpoints c
+                    ON c.service_name = s.service_name AND c.region = s.region AND c.currency_code = s.currency_code
+                ORDER BY 1, 2, 3
+                """
+            ).fetchall()
+
+        status = []
+        for service, region, currency, downloaded_at, item_count, watermark, last_sync, last_rows, total_rows in rows:
+            clauses, args = _scope_clauses(service, region, currency)
+            with self._lock:
+                row_count = self._conn.execute(
+                    f"SELECT COUNT(*) FROM prices WHERE {' AND '.join(clauses)}", args
+                ).fetchone()[0]
+            status.append(
+                {
+                    "service_name": service,
+                    "region": region,
+                    "currency": currency,
+                    "downloaded_at": downloaded_at,
+                    "snapshot_rows": item_count,
+                    "current_rows": row_count,
+                    "watermark": watermark or self.scope_watermark(service, region, currency),
+                    "last_sync_at": last_sync,
+                    "last_rows_upserted": last_rows or 0,
+                    "total_rows_upserted": total_rows or 0,
+                }
+            )
+        return status
+
+    def covers(self, service_name: str | None, region: str | None, currency_code: str) -> bool:
+        """Check whether a downloaded scope contains every price a query could match."""
+        sql = (
+            "SELECT 1 FROM scopes WHERE currency_code = ?"
+            " AND (service_name = ? OR service_name = ?)"
+            " AND (region = ? OR region = ?) LIMIT 1"
+        )
+        args = (currency_code, ALL, service_name or ALL, ALL, _normalize_region(region) or ALL)
+        with self._lock:
+            return self._conn.execute(sql, args).fetchone() is not None
+
+    def query(
+        self,
+        service_name: str | None = None,
+        service_family: str | None = None,
+        region: str | None = None,
+        sku_name: str | None = None,
+        price_type: str | None = None,
+        currency_code: str = "USD",
+        limit: int = 50,
+    ) -> tuple[list[dict[str, Any]], bool]:
+        """
+        Query cached prices with the same semantics as the Retail Prices API filters.
+
+        Equality filters are case-insensitive and `sku_name` is a substring match,
+        mirroring `eq` and `contains()` in the API's `$filter`. `region` may be a
+        display name such as "East US", as in the API queries.
+
+        Returns:
+            Tuple of (items, has_more)
+        """
+        clauses = ["currency_code = ?"]
+        args: list[Any] = [currency_code]
+        for column, value in (
+            ("service_name", service_name),
+            ("service_family", service_family),
+            ("region", _normalize_region(region)),
+            ("price_type", price_type),
+        ):
+            if value:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if sku_name:
+            clauses.append("instr(lower(sku_name), lower(?)) > 0")
+            args.append(sku_name)
+
+        sql = f"SELECT item FROM prices WHERE {' AND '.join(clauses)} ORDER BY rowid LIMIT ?"
+        with self._lock:
+            rows = self._conn.execute(sql, [*args, limit + 1]).fetchall()
+
+        items = [json.loads(row[0]) for row in rows[:limit]]
+        return items, len(rows) > limit
+
+    def regions(
+        self, service_name: str, sku_name: str, price_type: str | None = None, currency_code: str = "USD"
+    ) -> list[str]:
+        """Distinct regions with prices for a service and SKU substring, matched like `query`."""
+        clauses = ["currency_code = ?", "service_name = ?", "instr(lower(sku_name), lower(?)) > 0", "region != ''"]
+        args: list[Any] = [currency_code, service_name, sku_name]
+        if price_type:
+            clauses.append("price_type = ?")
+            args.append(price_type)
+
+        sql = f"SELECT DISTINCT region FROM prices WHERE {' AND '.join(clauses)} ORDER BY 1"
+        with self._lock:
+            return [row[0] for row in self._conn.execute(sql, args).fetchall()]
+
+    def service_names(self) -> list[tuple[str, str, str]]:
+        """Distinct (service_name, service_family, product_name) combinations held in the catalog."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT DISTINCT service_name, service_family, product_name FROM prices ORDER BY 1, 3"
+            ).fetchall()
+
+    def stats(self) -> dict[str, Any]:
+        """Summarize catalog contents and downloaded scopes."""
+        with self._lock:
+            total = self._conn.execute("SELECT COUNT(*) FROM prices").fetchone()[0]
+            scopes = self._conn.execute(
+                "SELECT service_name, region, currency_code, downloaded_at, item_count FROM scopes ORDER BY 1, 2, 3"
+            ).fetchall()
+        return {
+            "path": self.path,
+            "total_items": total,
+            "scopes": [
+                {
+                    "service_name": service,
+                    "region": region,
+                    "currency": currency,
+                    "downloaded_at": downloaded_at,
+                    "item_count": count,
+                }
+                for service, region, currency, downloaded_at, count in scopes
+            ],
+        }
+
+
+async def download_catalog(
+    pricing_server: Any,
+    catalog: PriceCatalog,
+    services: list[str] | None = None,
+    regions: list[str] | None = None,
+    currency_code: str = "USD",
+) -> dict[str, Any]:
+    """
+    Bulk-download Retail Prices into the catalog.
+
+    Each (service, region) combination is fetched with the paginated page walker and
+    written page by page, so memory stays bounded even for a full-catalog snapshot.
+    With no services or regions the whole catalog for the currency is downloaded.
+    """
+    from .server import AZURE_PRICING_BASE_URL
+
+    summary: dict[str, Any] = {"currency": currency_code, "scopes": []}
+
+    # None stands for every service or region of the scope
+    scope_services: list[str | None] = [*services] if services else [None]
+    scope_regions: list[str | None] = [_normalize_region(region) for region in regions] if regions else [None]
+    for service_name in scope_services:
+        for region in scope_regions:
+            params = _scope_params(service_name, region, currency_code)
+            started_at = _utc_now()
+            item_count = 0
+            pages = pricing_server._iter_pages(AZURE_PRICING_BASE_URL, params, max_items=sys.maxsize, use_cache=False)
+            try:
+                async for page in pages:
+                    item_count += catalog.upsert_items(page.get("Items", []), currency_code, started_at)
+            finally:
+                await pages.aclose()
+
+            catalog.record_scope(service_name, region, currency_code, started_at, item_count)
+            logger.info(f"Catalog: stored {item_count} prices for {service_name or ALL} in {region or ALL}")
+            summary["scopes"].append(
+                {"service_name": service_name or ALL, "region": region or ALL, "items": item_count}
+            )
+
+    summary["total_items"] = catalog.stats()["total_items"]
+    return summary
+
+
+async def sync_catalog(pricing_server: Any, catalog: PriceCatalog, currency_code: str | None = None) -> dict[str, Any]:
+    """
+    Incrementally refresh every downloaded scope.
+
+    Only meters whose `effectiveStartDate` is at or after the scope watermark are
+    fetched, so the cost of a refresh tracks the number of price changes rather than
+    the catalog size. Each scope's changes and its new watermark are committed together.
+    Meters retired upstream are not detected; a periodic full download removes them.
+    """
+    from .server import AZURE_PRICING_BASE_URL
+
+    summary: dict[str, Any] = {"scopes": [], "rows_upserted": 0}
+
+    for scope in catalog.stats()["scopes"]:
+        service_name, region, currency = scope["service_name"], scope["region"], scope["currency"]
+        if currency_code and currency.upper() != currency_code.upper():
+            continue
+
+        watermark = catalog.scope_watermark(service_name, region, currency) or scope["downloaded_at"]
+        params = _scope_params(service_name, region, currency, [compare("effectiveStartDate", "ge", watermark)])
+
+        synced_at = _utc_now()
+        changed: list[dict[str, Any]] = []
+        pages = pricing_server._iter_pages(AZURE_PRICING_BASE_URL, params, max_items=sys.maxsize, use_cache=False)
+        try:
+            async for page in pages:
+                changed.extend(page.get("Items", []))
+        finally:
+            await pages.aclose()
+
+        new_watermark = max(
+            [watermark, *(item["effectiveStartDate"] for item in changed if item.get("effectiveStartDate"))]
+        )
+        rows = catalog.apply_delta(changed, service_name, region, currency, new_watermark, synced_at)
+        logger.info(f"Catalog sync: {rows} changed prices for {service_name} in {region} since {watermark}")
+
+        summary["rows_upserted"] += rows
+        summary["scopes"].append(
+            {
+                "service_name": service_name,
+                "region": region,
+                "currency": currency,
+                "watermark": new_watermark,
+                "rows_upserted": rows,
+            }
+        )
+
+    return summary
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Command-line entry point for managing the local price catalog."""
+    import argparse
+    import asyncio
+
+    parser = argparse.ArgumentParser(description="Azure Pricing MCP local price catalog")
+    parser.add_argument(
+        "--db", default=DEFAULT_CATALOG_PATH, help=f"Catalog database path (default: {DEFAULT_CATALOG_PATH})"
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    download = subparsers.add_parser("download", help="Snapshot prices into the catalog")
+    download.add_argument("--service", action="append", help="Service name to download (repeatable, default: all)")
+    download.add_argument("--region", action="append", help="ARM region to download (repeatable, default: all)")
+    download.add_argument("--currency", default="USD", help="Currency code (default: USD)")
+
+    sync = subparsers.add_parser("sync", help="Fetch only prices changed since the last download or sync")
+    sync.add_argument("--currency", help="Only sync scopes in this currency (default: all)")
+
+    subparsers.add_parser("stats", help="Show catalog contents")
+    subparsers.add_parser("status", help="Show delta sync watermarks and row counts")
+
+    args = parser.parse_args(argv)
+    catalog = PriceCatalog(args.db)
+
+    if args.command in ("download", "sync"):
+        from .server import AzurePricingServer
+
+        async def run() -> dict[str, Any]:
+            try:
+                if args.command == "sync":
+                    return await sync_catalog(AzurePricingServer(), catalog, args.currency)
+                return await download_catalog(
+                    AzurePricingServer(), catalog, args.service, args.region, args.currency.upper()
+                )
+            finally:
+                await AzurePricingServer.close_session()
+
+        result: Any = asyncio.run(run())
+    elif args.command == "status":
+        result = catalog.sync_status()
+    else:
+        result = catalog.stats()
+
+    catalog.close()
+    print(json.dumps(result, indent=2))
+
+
+if __name__ == "__main__":
+    main()
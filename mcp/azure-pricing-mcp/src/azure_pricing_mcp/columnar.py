@@ -0,0 +1,213 @@
+"""
+Compact columnar storage for cached Retail Prices items.
+
+API responses arrive as lists of ~25-key dicts whose string values repeat across
+items (serviceName, armRegionName, unitOfMeasure, ...). ItemTable stores them
+column by column instead: repeating values are dictionary-encoded per column with
+interned strings, mostly distinct strings (IDs) are packed into one string, prices
+are packed into float arrays, and each item only keeps a small code per column.
+PriceRow exposes one item as a read-only Mapping so code reading `item.get(...)`
+works unchanged; plain dicts are only built on demand.
+"""
+
+import math
+import sys
+from array import array
+from collections.abc import Hashable, Iterable, Iterator, Mapping, Sequence
+from typing import Any
+
+# Numeric fields packed into float arrays when every value is a number
+FLOAT_COLUMNS = frozenset({"retailPrice", "unitPrice", "tierMinimumUnits"})
+
+_MISSING = object()
+
+
+class _CategoricalColumn:
+    """Dictionary-encoded column of hashable values."""
+
+    __slots__ = ("values", "codes")
+
+    def __init__(self, values: list[Any], codes: array):
+        self.values = values
+        self.codes = codes
+
+    def __getitem__(self, index: int) -> Any:
+        return self.values[self.codes[index]]
+
+
+class _StringBlobColumn:
+    """Column of mostly distinct strings packed into one string with offsets."""
+
+    __slots__ = ("blob", "offsets")
+
+    def __init__(self, blob: str, offsets: array):
+        self.blob = blob
+        self.offsets = offsets
+
+    def __getitem__(self, index: int) -> str:
+        return self.blob[self.offsets[index] : self.offsets[index + 1]]
+
+
+def _intern(value: Any) -> Any:
+    """Share one copy of each distinct string across all tables."""
+    return sys.intern(value) if type(value) is str else value
+
+
+def _build_column(name: str, cells: list[Any]) -> Any:
+    """Pick the most compact representation for a column's values (missing cells are _MISSING)."""
+    present = [cell for cell in cells if cell is not _MISSING]
+    if name in FLOAT_COLUMNS and all(type(cell) in (int, float) for cell in present):
+        return array("d", (math.nan if cell is _MISSING else cell for cell in cells))
+    if present and all(type(cell) is str for cell in present) and len(set(present)) > len(present) // 2:
+        # IDs such as meterId and skuId barely repeat, so dictionary encoding wouldn't help
+        offsets = array("I", [0])
+        for cell in cells:
+            offsets.append(offsets[-1] + (0 if cell is _MISSING else len(cell)))
+        return _StringBlobColumn("".join(cell for cell in cells if cell is not _MISSING), offsets)
+    if all(isinstance(cell, Hashable) for cell in present):
+        lookup: dict[Any, int] = {}
+        values: list[Any] = []
+        codes = []
+        for cell in cells:
+            # Keep ints, floats and bools apart even though 1 == 1.0 == True
+            key = (type(cell), cell)
+            code = lookup.get(key)
+            if code is None:
+                code = lookup[key] = len(values)
+                values.append(_intern(cell))
+            codes.append(code)
+        typecode = "B" if len(values) <= 0xFF else "H" if len(values) <= 0xFFFF else "I"
+        return _CategoricalColumn(values, array(typecode, codes))
+    return cells
+
+
+class ItemTable(Sequence):
+    """
+    Read-only sequence of price items stored column by column.
+
+    Indexing returns PriceRow views; slicing returns a list of them. Items keep
+    their own key order and keys missing from an item stay missing.
+    """
+
+    __slots__ = ("_columns", "_shapes", "_shape_keys", "_shape_ids")
+
+    def __init__(self, items: Iterable[Mapping[str, Any]] = ()):
+        items = list(items)
+        shape_lookup: dict[tuple[str, ...], int] = {}
+        self._shapes: list[tuple[str, ...]] = []
+        self._shape_ids = array("H")
+        names: dict[str, None] = {}
+        for item in items:
+            shape = tuple(item)
+            shape_id = shape_lookup.get(shape)
+            if shape_id is None:
+                shape_id = shape_lookup[shape] = len(self._shapes)
+                self._shapes.append(tuple(_intern(key) for key in shape))
+                names.update(dict.fromkeys(shape))
+            self._shape_ids.append(shape_id)
+        self._shape_keys = [frozenset(shape) for shape in self._shapes]
+        self._columns: dict[str, Any] = {
+            _intern(name): _build_column(name, [item.get(name, _MISSING) for item in items]) for name in names
+        }
+
+    def __len__(self) -> int:
+        return len(self._shape_ids)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [PriceRow(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ItemTable index out of range")
+        return PriceRow(self, index)
+
+    def __iter__(self) -> Iterator["PriceRow"]:
+        for index in range(len(self)):
+            yield PriceRow(self, index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, Sequence) or isinstance(other, (str, bytes)):
+            return NotImplemented
+        return len(self) == len(other) and all(row == item for row, item in zip(self, other, strict=True))
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"ItemTable({len(self)} items, {len(self._columns)} columns)"
+
+    def _value(self, index: int, key: str) -> Any:
+        """Value of `key` for the item at `index` (KeyError if the item lacks it)."""
+        if key not in self._shape_keys[self._shape_ids[index]]:
+            raise KeyError(key)
+        return self._columns[key][index]
+
+    def _keys(self, index: int) -> tuple[str, ...]:
+        """Keys of the item at `index`, in their original order."""
+        return self._shapes[self._shape_ids[index]]
+
+    def to_dicts(self) -> list[dict[str, Any]]:
+        """Materialize every item as a plain dict."""
+        return [row.to_dict() for row in self]
+
+
+class PriceRow(Mapping):
+    """
+    Read-only view of one item in an ItemTable.
+
+    `with_values()` derives a row with some fields replaced or added without
+    copying the others, which is how discounts are applied.
+    """
+
+    __slots__ = ("_table", "_index", "_overrides")
+
+    def __init__(self, table: ItemTable, index: int, overrides: dict[str, Any] | None = None):
+        self._table = table
+        self._index = index
+        self._overrides = overrides
+
+    def __getitem__(self, key: str) -> Any:
+        if self._overrides is not None and key in self._overrides:
+            return self._overrides[key]
+        return self._table._value(self._index, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __iter__(self) -> Iterator[str]:
+        keys = self._table._keys(self._index)
+        yield from keys
+        if self._overrides is not None:
+            yield from (key for key in self._overrides if key not in keys)
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"PriceRow({self.to_dict()!r})"
+
+    def with_values(self, **values: Any) -> "PriceRow":
+        """Return a view of this item with `values` replacing or adding fields."""
+        return PriceRow(self._table, self._index, {**(self._overrides or {}), **values})
+
+    def to_dict(self) -> dict[str, Any]:
+        """Materialize the item as a plain dict."""
+        return {key: self[key] for key in self}
+
+
+def with_values(item: Mapping[str, Any], **values: Any) -> Mapping[str, Any]:
+    """Replace or add fields of an item, without copying it if it's a PriceRow."""
+    if isinstance(item, PriceRow):
+        return item.with_values(**values)
+    return {**item, **values}
+
+
+def compact_page(data: dict[str, Any]) -> dict[str, Any]:
+    """Return an API response page with its Items stored as an ItemTable."""
+    items = data.get("Items")
+    if not isinstance(items, list):
+        return data
+    return {**data, "Items": ItemTable(items)}
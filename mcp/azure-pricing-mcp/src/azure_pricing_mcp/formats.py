@@ -0,0 +1,102 @@
+"""
+Output formats of tool results for Azure Pricing MCP Server.
+
+Tools that return rows of prices accept a `format` argument:
+
+    markdown    Readable text for people (the default)
+    compact     A pipe-separated table for agents: columns that hold the same
+                value in every row are stated once above it, empty columns
+                are dropped
+    structured  MCP structured content: the columns in a fixed order and one
+                list of values per row, with a JSON copy as text for clients
+                that don't read structured content
+
+A tool supporting these describes its result as a ResultTable (see the
+ToolHandler `table` extractors in handlers.py); markdown keeps using the
+tool's own formatter.
+"""
+
+import json
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from mcp.types import TextContent
+
+MARKDOWN, COMPACT, STRUCTURED = "markdown", "compact", "structured"
+OUTPUT_FORMATS = (MARKDOWN, COMPACT, STRUCTURED)
+DEFAULT_FORMAT = MARKDOWN
+
+FORMAT_SCHEMA: dict[str, Any] = {
+    "type": "string",
+    "enum": list(OUTPUT_FORMATS),
+    "description": (
+        "Output format: 'markdown' (readable text), 'compact' (minimal table, fewest tokens) "
+        "or 'structured' (structured content with fixed columns). Default: markdown"
+    ),
+    "default": DEFAULT_FORMAT,
+}
+
+
+class ResultTable(NamedTuple):
+    """Rows of a tool result with the context an agent needs to read them."""
+
+    summary: str
+    columns: tuple[str, ...]
+    rows: list[tuple[Any, ...]]
+    meta: dict[str, Any] = {}  # values describing the whole result (service, currency, ...)
+    notes: Sequence[str] = ()  # warnings and hints shown with the rows
+
+
+def _cell(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return ",".join(_cell(element) for element in value)
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).replace("|", "/").replace("\n", " ")
+
+
+def compact_text(table: ResultTable) -> str:
+    """Render a table as a summary line, shared values and pipe-separated rows."""
+    lines = [table.summary, *table.notes]
+
+    shared = {key: value for key, value in table.meta.items() if value is not None}
+    columns = []
+    for index, column in enumerate(table.columns):
+        values = {_cell(row[index]) for row in table.rows}
+        if values == {""}:
+            continue  # empty in every row
+        if len(values) == 1 and len(table.rows) > 1:
+            shared[column] = table.rows[0][index]
+        else:
+            columns.append(index)
+
+    if shared:
+        lines.append("; ".join(f"{key}: {_cell(value)}" for key, value in shared.items()))
+    if table.rows and columns:
+        lines.append("|".join(table.columns[index] for index in columns))
+        lines.extend("|".join(_cell(row[index]) for index in columns) for row in table.rows)
+    return "\n".join(lines)
+
+
+def structured_content(table: ResultTable) -> dict[str, Any]:
+    """Build the structured content of a table; every row lists its values in `columns` order."""
+    return {
+        "summary": table.summary,
+        **({"meta": table.meta} if table.meta else {}),
+        **({"notes": list(table.notes)} if table.notes else {}),
+        "columns": list(table.columns),
+        "rows": [list(row) for row in table.rows],
+    }
+
+
+def render_table(
+    table: ResultTable, output_format: str
+) -> list[TextContent] | tuple[list[TextContent], dict[str, Any]]:
+    """Render a table in the compact or structured format."""
+    if output_format == STRUCTURED:
+        content = structured_content(table)
+        text = json.dumps(content, separators=(",", ":"), ensure_ascii=False)
+        return [TextContent(type="text", text=text)], content
+    return [TextContent(type="text", text=compact_text(table))]
@@ -2,60 +2,105 @@
 
 import json
 import logging
-from typing import Any
+from collections.abc import Callable
+from typing import TYPE_CHECKING, Any, NamedTuple
 
-from mcp.types import TextContent
+from mcp.types import CallToolResult, TextContent, Tool
+
+from .formats import DEFAULT_FORMAT, ResultTable, render_table
+from .paging import RESULT_STORE
+
+if TYPE_CHECKING:
+    from .tools import ToolRegistry
 
 # Use the same logger namespace as server.py to ensure consistent stderr output
 logger = logging.getLogger("azure_pricing_mcp")
 
 
-def register_tool_handlers(server: Any, pricing_server: Any) -> None:
-    """Register all tool call handlers with the server.
+def register_tool_handlers(server: Any, pricing_server: Any, registry: "ToolRegistry | None" = None) -> None:
+    """Register the tools/list and tools/call handlers with the server.
 
     Args:
         server: The MCP server instance
         pricing_server: The AzurePricingServer instance
+        registry: The ToolRegistry to serve (default: all tools, see tools.py)
     """
+    if registry is None:
+        from .tools import TOOL_REGISTRY
 
-    @server.call_tool()
-    async def handle_call_tool(name: str, arguments: dict[str, Any]) -> list[TextContent]:
-        """Handle tool calls."""
-
-        try:
-            async with pricing_server:
-                if name == "azure_price_search":
-                    return await _handle_price_search(pricing_server, arguments)
-
-                elif name == "azure_price_compare":
-                    return await _handle_price_compare(pricing_server, arguments)
-
-                elif name == "azure_cost_estimate":
-                    return await _handle_cost_estimate(pricing_server, arguments)
+        registry = TOOL_REGISTRY
 
-                elif name == "azure_discover_skus":
-                    return await _handle_discover_skus(pricing_server, arguments)
+    @server.list_tools()
+    async def handle_list_tools() -> list[Tool]:
+        """List available tools."""
+        return registry.tools
 
-                elif name == "azure_sku_discovery":
-                    return await _handle_sku_discovery(pricing_server, arguments)
-
-                elif name == "azure_region_recommend":
-                    return await _handle_region_recommend(pricing_server, arguments)
+    # The registry validates arguments against its precompiled schemas
+    @server.call_tool(validate_input=False)
+    async def handle_call_tool(
+        name: str, arguments: dict[str, Any]
+    ) -> list[TextContent] | tuple[list[TextContent], dict[str, Any]] | CallToolResult:
+        """Handle tool calls."""
+        return await registry.call(pricing_server, name, arguments)
+
+
+class ToolHandler(NamedTuple):
+    """Implementation and formatters of one tool."""
+
+    method: str  # AzurePricingServer coroutine called with the tool arguments
+    formatter: Callable[[dict[str, Any]], list[TextContent]]  # the markdown format
+    # Rows of the result for the compact and structured formats (see formats.py);
+    # tools without one don't take a `format` argument
+    table: Callable[[dict[str, Any]], ResultTable | None] | None = None
+    # Result key of the list returned page by page (see paging.py); tools
+    # without one don't take `page_size` and `cursor` arguments
+    pages: str | None = None
+
+    async def __call__(
+        self, pricing_server: Any, arguments: dict[str, Any]
+    ) -> list[TextContent] | tuple[list[TextContent], dict[str, Any]]:
+        content, _ = await self.run(pricing_server, arguments)
+        return content
+
+    async def run(
+        self, pricing_server: Any, arguments: dict[str, Any]
+    ) -> tuple[list[TextContent] | tuple[list[TextContent], dict[str, Any]], bool]:
+        """Run the tool and return its formatted content and whether the result reports an error."""
+        arguments = dict(arguments)
+        output_format = arguments.pop("format", DEFAULT_FORMAT) if self.table is not None else DEFAULT_FORMAT
+
+        if self.pages is None:
+            result = await getattr(pricing_server, self.method)(**arguments)
+        else:
+            cursor, page_size = arguments.pop("cursor", None), arguments.pop("page_size", None)
+            if cursor:
+                result = RESULT_STORE.page(cursor, page_size, self.method)
+            else:
+                result = RESULT_STORE.first_page(
+                    await getattr(pricing_server, self.method)(**arguments), self.pages, page_size, self.method
+                )
 
-                elif name == "get_customer_discount":
-                    return await _handle_customer_discount(pricing_server, arguments)
+        is_error = isinstance(result, dict) and "error" in result
+        # Results without rows (errors, suggestions) are reported as text in every format
+        table = self.table(result) if self.table is not None and output_format != DEFAULT_FORMAT else None
+        if table is not None:
+            return render_table(table, output_format), is_error
+        return self.formatter(result), is_error
 
-                else:
-                    return [TextContent(type="text", text=f"Unknown tool: {name}")]
 
-        except Exception as e:
-            logger.error(f"Error handling tool call {name}: {e}")
-            return [TextContent(type="text", text=f"Error: {str(e)}")]
+def _page_note(result: dict[str, Any]) -> str | None:
+    """Where a page sits in its result and how to fetch the next one."""
+    page = result.get("page")
+    if page is None:
+        return None
+    shown = f"Entries {page['offset'] + 1}-{page['offset'] + page['count']}"
+    if page["next_cursor"] is None:
+        return f"{shown} of {page['total']} (last page)"
+    return f"{shown} of {page['total']}; pass cursor \"{page['next_cursor']}\" for the next page"
 
 
-async def _handle_price_search(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle azure_price_search tool calls."""
-    result = await pricing_server.search_azure_prices(**arguments)
+def _format_price_search(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_price_search results."""
 
     # Format the response
     if result["items"]:
@@ -91,6 +136,9 @@ async def _handle_price_search(pricing_server, arguments: dict) -> list[TextCont
         if result["count"] > 0:
             response_text = f"Found {result['count']} Azure pricing results:\n\n"
 
+            if result.get("stale"):
+                response_text += "⏳ Cached prices shown while a refresh runs in the background.\n\n"
+
             # Add discount information if applied
             if "discount_applied" in result:
                 response_text += f"💰 **Customer Discount Applied: {result['discount_applied']['percentage']}%**\n"
@@ -161,9 +209,8 @@ async def _handle_price_search(pricing_server, arguments: dict) -> list[TextCont
         return [TextContent(type="text", text=response_text)]
 
 
-async def _handle_price_compare(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle azure_price_compare tool calls."""
-    result = await pricing_server.compare_prices(**arguments)
+def _format_price_compare(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_price_compare results."""
 
     response_text = f"Price comparison for {result['service_name']}:\n\n"
 
@@ -171,14 +218,22 @@ async def _handle_price_compare(pricing_server, arguments: dict) -> list[TextCon
     if "discount_applied" in result:
         response_text += f"💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n\n"
 
+    if result.get("failed_regions"):
+        response_text += f"⚠️ Prices could not be retrieved for: {', '.join(result['failed_regions'])}\n\n"
+
     response_text += json.dumps(result["comparisons"], indent=2)
 
     return [TextContent(type="text", text=response_text)]
 
 
-async def _handle_region_recommend(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle azure_region_recommend tool calls."""
-    result = await pricing_server.recommend_regions(**arguments)
+# Shown when region discovery saw only the first page of a SKU's prices
+REGIONS_INCOMPLETE_NOTE = (
+    "Region discovery stopped at its item limit; regions listed only in later prices are not ranked"
+)
+
+
+def _format_region_recommend(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_region_recommend results."""
 
     # Check for errors
     if "error" in result:
@@ -200,6 +255,11 @@ Showing top: {result['showing_top']}
     if "discount_applied" in result:
         response_text += f"\n💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
 
+    if result.get("failed_regions"):
+        response_text += f"\n⚠️ Prices could not be retrieved for: {', '.join(result['failed_regions'])}\n"
+    if result.get("regions_incomplete"):
+        response_text += f"\n⚠️ {REGIONS_INCOMPLETE_NOTE}\n"
+
     # Add summary
     if "summary" in result:
         summary = result["summary"]
@@ -210,12 +270,13 @@ Showing top: {result['showing_top']}
    💰 Max Savings: {summary['max_savings_percentage']:.1f}% by choosing the cheapest region
 """
 
-    # Build recommendations table
+    # Build recommendations table, ranked from the first entry of this page
+    first_rank = result.get("page", {}).get("offset", 0) + 1
     response_text += "\n📋 Ranked Recommendations (On-Demand Pricing):\n\n"
     response_text += "| Rank | Region | Location | On-Demand Price | Spot Price | Savings vs Max |\n"
     response_text += "|------|--------|----------|-----------------|------------|----------------|\n"
 
-    for i, rec in enumerate(recommendations, 1):
+    for i, rec in enumerate(recommendations, first_rank):
         region = rec.get("region", "N/A")
         location = rec.get("location", "N/A")
         price = rec.get("retail_price", 0)
@@ -252,17 +313,20 @@ Showing top: {result['showing_top']}
     if "discount_applied" in result and recommendations and "original_price" in recommendations[0]:
         response_text += "\n💵 Original prices (before discount):\n"
         # Show top 3 original prices
-        for i, rec in enumerate(recommendations[:3], 1):
+        for i, rec in enumerate(recommendations[:3], first_rank):
             location = rec.get("location", "N/A")
             original = rec.get("original_price", 0)
             response_text += f"   {i}. {location}: ${original:.6f}\n"
 
+    page_note = _page_note(result)
+    if page_note:
+        response_text += f"\n📄 {page_note}\n"
+
     return [TextContent(type="text", text=response_text)]
 
 
-async def _handle_cost_estimate(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle azure_cost_estimate tool calls."""
-    result = await pricing_server.estimate_costs(**arguments)
+def _format_cost_estimate(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_cost_estimate results."""
 
     if "error" in result:
         return [TextContent(type="text", text=f"Error: {result['error']}")]
@@ -322,17 +386,137 @@ Original Pricing (before discount):
     return [TextContent(type="text", text=estimate_text)]
 
 
-async def _handle_discover_skus(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle azure_discover_skus tool calls."""
-    result = await pricing_server.discover_skus(**arguments)
+def _format_price_batch(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_price_batch results."""
+
+    if "error" in result:
+        return [TextContent(type="text", text=f"Error: {result['error']}")]
+
+    response_text = (
+        f"Batch of {result['total_queries']} queries: {result['succeeded']} succeeded, {result['failed']} failed\n"
+    )
+    for currency, total in result.get("monthly_cost_totals", {}).items():
+        response_text += f"💰 Estimated monthly total: {total:.2f} {currency}\n"
+    if any(entry.get("stale") for entry in result["results"]):
+        response_text += "⏳ Some cached prices shown while a refresh runs in the background.\n"
+
+    response_text += "\n" + json.dumps(result["results"], indent=2)
+
+    return [TextContent(type="text", text=response_text)]
+
+
+def _format_bom_estimate(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_bom_estimate results."""
+
+    if "error" in result:
+        return [TextContent(type="text", text=f"Error: {result['error']}")]
+
+    return [TextContent(type="text", text=_bom_estimate_text(result))]
+
+
+def _format_template_estimate(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_template_estimate results."""
+
+    if "error" in result:
+        return [TextContent(type="text", text=f"Error: {result['error']}")]
+
+    return [TextContent(type="text", text=format_template_estimate(result))]
+
+
+def format_template_estimate(result: dict[str, Any]) -> str:
+    """Format a template estimate for display (shared by the tool and the CLI)."""
+    template = result["template"]
+    counts = f"{template['priced']} priced, {template['free']} free, {len(template['not_priced'])} not priced"
+    response_text = f"""📄 Template: {template['path']}
+Resources: {template['resources']} ({counts})
+
+"""
+    response_text += _bom_estimate_text(result)
+
+    if template["not_priced"]:
+        response_text += "\n\n🔍 Resources not priced:\n"
+        for resource in template["not_priced"]:
+            response_text += f"   • {resource['name']} ({resource['type']}): {resource['reason']}\n"
+
+    return response_text
+
+
+def _bom_estimate_text(result: dict[str, Any]) -> str:
+    """Format a bill of materials estimate."""
+    currency = result["currency"]
+    totals = result["totals"]
+    response_text = f"""🧾 Bill of Materials Estimate ({result['total_resources']} resources)
+
+💵 Monthly Total: {totals['monthly_cost']:,.2f} {currency}
+📅 Annual Total: {totals['annual_cost']:,.2f} {currency}
+"""
+
+    if "discount_applied" in result:
+        response_text += f"💰 {result['discount_applied']['percentage']}% discount applied - {result['discount_applied']['note']}\n"
+    if result.get("stale"):
+        response_text += "⏳ Some cached prices shown while a refresh runs in the background.\n"
+
+    for plan in result["savings_plans"]:
+        response_text += (
+            f"💡 {plan['term']} savings plan: {plan['monthly_cost']:,.2f} {currency}/month "
+            f"(saves {plan['annual_savings']:,.2f} {currency}/year, {plan['savings_percent']}%)\n"
+        )
+
+    response_text += "\n📊 By Service Family:\n\n"
+    response_text += "| Service Family | Resources | Monthly Cost | Annual Cost | % of Total |\n"
+    response_text += "|----------------|-----------|--------------|-------------|------------|\n"
+    for family in result["by_service_family"]:
+        response_text += (
+            f"| {family['service_family']} | {family['resources']} | {family['monthly_cost']:,.2f} "
+            f"| {family['annual_cost']:,.2f} | {family['share_percent']}% |\n"
+        )
+
+    response_text += "\n📋 By Resource:\n\n"
+    response_text += "| # | Resource | SKU | Region | Qty | Monthly Cost | Annual Cost |\n"
+    response_text += "|---|----------|-----|--------|-----|--------------|-------------|\n"
+    for entry in result["resources"]:
+        label = entry.get("name") or entry["service_name"]
+        if entry["status"] == "ok":
+            costs = f"{entry['monthly_cost']:,.2f} | {entry['annual_cost']:,.2f}"
+        else:
+            costs = "N/A | N/A"
+        response_text += (
+            f"| {entry['index'] + 1} | {label} | {entry['sku_name']} | {entry['region']} "
+            f"| {entry['quantity']:g} | {costs} |\n"
+        )
+
+    failed = [entry for entry in result["resources"] if entry["status"] != "ok"]
+    unpriced = [entry for entry in result["resources"] if entry.get("unpriced")]
+    if failed or unpriced:
+        response_text += "\n⚠️ Not included in the totals:\n"
+        for entry in failed:
+            response_text += (
+                f"   • {entry.get('name') or entry['service_name']} ({entry['sku_name']}): {entry['error']}\n"
+            )
+        for entry in unpriced:
+            response_text += (
+                f"   • {entry.get('name') or entry['service_name']} ({entry['sku_name']}): "
+                f"no meter for {', '.join(entry['unpriced'])}\n"
+            )
+
+    response_text += "\nResource details:\n" + json.dumps(result["resources"], indent=2)
+
+    return response_text
+
+
+def _format_discover_skus(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_discover_skus results."""
 
     # Format the response
     skus = result.get("skus", [])
     if skus:
+        page_note = _page_note(result)
         return [
             TextContent(
                 type="text",
                 text=f"Found {result['total_skus']} SKUs for {result['service_name']}:\n\n"
+                + ("⏳ Cached prices shown while a refresh runs in the background.\n\n" if result.get("stale") else "")
+                + (f"📄 {page_note}\n\n" if page_note else "")
                 + json.dumps(skus, indent=2),
             )
         ]
@@ -340,9 +524,8 @@ async def _handle_discover_skus(pricing_server, arguments: dict) -> list[TextCon
         return [TextContent(type="text", text="No SKUs found for the specified service.")]
 
 
-async def _handle_sku_discovery(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle azure_sku_discovery tool calls."""
-    result = await pricing_server.discover_service_skus(**arguments)
+def _format_sku_discovery(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_sku_discovery results."""
 
     if result["service_found"]:
         # Format successful SKU discovery
@@ -422,9 +605,41 @@ async def _handle_sku_discovery(pricing_server, arguments: dict) -> list[TextCon
         return [TextContent(type="text", text=response_text)]
 
 
-async def _handle_customer_discount(pricing_server, arguments: dict) -> list[TextContent]:
-    """Handle get_customer_discount tool calls."""
-    result = await pricing_server.get_customer_discount(**arguments)
+def _format_catalog_status(result: dict[str, Any]) -> list[TextContent]:
+    """Format azure_catalog_status results."""
+
+    if not result["configured"]:
+        return [
+            TextContent(
+                type="text",
+                text="No local price catalog is configured. Start the server with --catalog PATH to enable it.",
+            )
+        ]
+
+    response_text = f"""Local Price Catalog
+
+Path: {result['path']}
+Total prices: {result['total_items']}
+"""
+
+    if not result["scopes"]:
+        response_text += "\nNo scopes downloaded yet. Run: python -m azure_pricing_mcp.catalog download\n"
+        return [TextContent(type="text", text=response_text)]
+
+    response_text += "\n| Service | Region | Currency | Rows | Watermark | Last Sync | Last Upserted | Total Upserted |\n"
+    response_text += "|---------|--------|----------|------|-----------|-----------|---------------|----------------|\n"
+    for scope in result["scopes"]:
+        response_text += (
+            f"| {scope['service_name']} | {scope['region']} | {scope['currency']} | {scope['current_rows']} "
+            f"| {scope['watermark'] or 'N/A'} | {scope['last_sync_at'] or 'never'} "
+            f"| {scope['last_rows_upserted']} | {scope['total_rows_upserted']} |\n"
+        )
+
+    return [TextContent(type="text", text=response_text)]
+
+
+def _format_customer_discount(result: dict[str, Any]) -> list[TextContent]:
+    """Format get_customer_discount results."""
 
     response_text = f"""Customer Discount Information
 
@@ -438,3 +653,200 @@ Applicable Services: {result['applicable_services']}
 """
 
     return [TextContent(type="text", text=response_text)]
+
+
+def _stale_notes(stale: bool) -> list[str]:
+    return ["Cached prices shown while a refresh runs in the background."] if stale else []
+
+
+def _discount_meta(result: dict[str, Any]) -> dict[str, Any]:
+    return {"discount_percentage": result["discount_applied"]["percentage"]} if "discount_applied" in result else {}
+
+
+def _page_meta(result: dict[str, Any], notes: list[str]) -> dict[str, Any]:
+    """The cursor of the next page as table meta, noting where the page sits."""
+    page_note = _page_note(result)
+    if page_note is None:
+        return {}
+    notes.append(page_note)
+    return {"next_cursor": result["page"]["next_cursor"]}
+
+
+def _savings_plan_prices(item: dict[str, Any]) -> dict[int, Any]:
+    """Savings plan prices of an item keyed by term in years ("1 Year" -> 1)."""
+    prices: dict[int, Any] = {}
+    for plan in item.get("savingsPlan") or []:
+        term = str(plan.get("term", "")).split(" ", 1)[0]
+        if term.isdigit():
+            prices[int(term)] = plan.get("retailPrice")
+    return prices
+
+
+PRICE_SEARCH_COLUMNS = (
+    "service",
+    "product",
+    "sku",
+    "meter",
+    "region",
+    "type",
+    "unit",
+    "price",
+    "original_price",
+    "savings_plan_1y",
+    "savings_plan_3y",
+)
+
+
+def _price_search_table(result: dict[str, Any]) -> ResultTable:
+    """Rows of azure_price_search results."""
+    rows = []
+    for item in result["items"]:
+        savings_plans = _savings_plan_prices(item)
+        rows.append(
+            (
+                item.get("serviceName"),
+                item.get("productName"),
+                item.get("skuName"),
+                item.get("meterName"),
+                item.get("armRegionName"),
+                item.get("type"),
+                item.get("unitOfMeasure"),
+                item.get("retailPrice"),
+                item.get("originalPrice"),
+                savings_plans.get(1),
+                savings_plans.get(3),
+            )
+        )
+
+    notes = _stale_notes(result.get("stale", False))
+    for key in ("sku_validation", "clarification"):
+        if key in result:
+            notes.append(result[key]["message"])
+    if "sku_validation" in result and result["sku_validation"]["suggestions"]:
+        suggestions = result["sku_validation"]["suggestions"][:5]
+        notes.append("Suggested SKUs: " + ", ".join(suggestion["sku_name"] for suggestion in suggestions))
+    if "clarification" in result and result["clarification"]["suggestions"]:
+        notes.append("Top matches: " + ", ".join(map(str, result["clarification"]["suggestions"])))
+
+    summary = (
+        f"Found {result['count']} Azure pricing results"
+        if rows
+        else "No pricing results found for the specified criteria."
+    )
+    return ResultTable(summary, PRICE_SEARCH_COLUMNS, rows, _discount_meta(result), notes)
+
+
+PRICE_COMPARE_COLUMNS = ("region", "sku", "product", "meter", "unit", "price", "original_price")
+
+
+def _price_compare_table(result: dict[str, Any]) -> ResultTable:
+    """Rows of azure_price_compare results."""
+    rows = [
+        (
+            comparison.get("region"),
+            comparison.get("sku_name"),
+            comparison.get("product_name"),
+            comparison.get("meter_name"),
+            comparison.get("unit_of_measure"),
+            comparison.get("retail_price"),
+            comparison.get("original_price"),
+        )
+        for comparison in result["comparisons"]
+    ]
+    notes = []
+    if result.get("failed_regions"):
+        notes.append(f"Prices could not be retrieved for: {', '.join(result['failed_regions'])}")
+    meta = {"service": result["service_name"], "currency": result["currency"], **_discount_meta(result)}
+    summary = f"Price comparison of {len(rows)} {result['comparison_type']}"
+    return ResultTable(summary, PRICE_COMPARE_COLUMNS, rows, meta, notes)
+
+
+REGION_RECOMMEND_COLUMNS = (
+    "rank",
+    "region",
+    "location",
+    "unit",
+    "price",
+    "original_price",
+    "spot_price",
+    "savings_pct",
+)
+
+
+def _region_recommend_table(result: dict[str, Any]) -> ResultTable | None:
+    """Rows of azure_region_recommend results."""
+    if "error" in result or not result.get("recommendations"):
+        return None
+    rows = [
+        (
+            rank,
+            rec.get("region"),
+            rec.get("location"),
+            rec.get("unit_of_measure"),
+            rec.get("retail_price"),
+            rec.get("original_price"),
+            rec.get("spot_price"),
+            rec.get("savings_vs_most_expensive"),
+        )
+        for rank, rec in enumerate(result["recommendations"], result.get("page", {}).get("offset", 0) + 1)
+    ]
+    notes = []
+    if result.get("failed_regions"):
+        notes.append(f"Prices could not be retrieved for: {', '.join(result['failed_regions'])}")
+    if result.get("regions_incomplete"):
+        notes.append(REGIONS_INCOMPLETE_NOTE)
+    meta = {
+        "service": result["service_name"],
+        "sku": result["sku_name"],
+        "currency": result["currency"],
+        "regions_found": result["total_regions_found"],
+        **_discount_meta(result),
+        **_page_meta(result, notes),
+    }
+    summary = f"Cheapest {result['showing_top']} of {result['total_regions_found']} regions"
+    return ResultTable(summary, REGION_RECOMMEND_COLUMNS, rows, meta, notes)
+
+
+DISCOVER_SKUS_COLUMNS = ("sku", "arm_sku", "product", "meter", "unit", "sample_price", "sample_region", "regions")
+
+
+def _discover_skus_table(result: dict[str, Any]) -> ResultTable:
+    """Rows of azure_discover_skus results."""
+    rows = [
+        (
+            sku.get("sku_name"),
+            sku.get("arm_sku_name"),
+            sku.get("product_name"),
+            sku.get("meter_name"),
+            sku.get("unit_of_measure"),
+            sku.get("sample_price"),
+            sku.get("sample_region"),
+            sku.get("available_regions"),
+        )
+        for sku in result.get("skus", [])
+    ]
+    summary = f"Found {result['total_skus']} SKUs" if rows else "No SKUs found for the specified service."
+    notes = _stale_notes(result.get("stale", False))
+    meta = {
+        "service": result["service_name"],
+        "region": result["region_filter"],
+        "price_type": result["price_type"],
+        **_page_meta(result, notes),
+    }
+    return ResultTable(summary, DISCOVER_SKUS_COLUMNS, rows, meta, notes)
+
+
+# Handlers of the tools declared in tools.py
+_handle_price_search = ToolHandler("search_azure_prices", _format_price_search, _price_search_table)
+_handle_price_compare = ToolHandler("compare_prices", _format_price_compare, _price_compare_table)
+_handle_region_recommend = ToolHandler(
+    "recommend_regions", _format_region_recommend, _region_recommend_table, "recommendations"
+)
+_handle_cost_estimate = ToolHandler("estimate_costs", _format_cost_estimate)
+_handle_price_batch = ToolHandler("price_batch", _format_price_batch)
+_handle_bom_estimate = ToolHandler("estimate_bom", _format_bom_estimate)
+_handle_template_estimate = ToolHandler("estimate_template", _format_template_estimate)
+_handle_discover_skus = ToolHandler("discover_skus", _format_discover_skus, _discover_skus_table, "skus")
+_handle_sku_discovery = ToolHandler("discover_service_skus", _format_sku_discovery)
+_handle_catalog_status = ToolHandler("get_catalog_status", _format_catalog_status)
+_handle_customer_discount = ToolHandler("get_customer_discount", _format_customer_discount)
@@ -0,0 +1,230 @@
+"""
+Prometheus-style metrics for Azure Pricing MCP Server.
+
+A dependency-free subset of the Prometheus client: counters and histograms are
+plain dict updates on the hot path, gauges are callbacks evaluated only when
+`/metrics` is scraped, and the text exposition format is rendered on demand.
+"""
+
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    """Render a label set such as `{tool="azure_price_search"}`."""
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    """Format a sample value."""
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class _Metric:
+    """Base class holding a metric's name, help text and label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = label_names
+
+    def samples(self) -> Iterator[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonically increasing count, optionally split by labels."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, label_names: tuple[str, ...] = ()):
+        super().__init__(name, documentation, label_names)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, *label_values: str, amount: float = 1.0) -> None:
+        """Increase the counter for a label combination."""
+        self._values[label_values] = self._values.get(label_values, 0.0) + amount
+
+    def value(self, *label_values: str) -> float:
+        """Current value for a label combination."""
+        return self._values.get(label_values, 0.0)
+
+    def samples(self) -> Iterator[str]:
+        if not self._values and not self.label_names:
+            yield f"{self.name} 0"
+        for label_values, value in sorted(self._values.items()):
+            yield f"{self.name}{_labels(self.label_names, label_values)} {_number(value)}"
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets, optionally split by labels."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ):
+        super().__init__(name, documentation, label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label combination: non-cumulative bucket counts (last slot is +Inf) and the sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, *label_values: str) -> None:
+        """Record one observation."""
+        counts = self._counts.get(label_values)
+        if counts is None:
+            counts = self._counts[label_values] = [0] * (len(self.buckets) + 1)
+            self._sums[label_values] = 0.0
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[label_values] += value
+
+    @contextmanager
+    def time(self, *label_values: str) -> Iterator[None]:
+        """Observe the duration of a block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *label_values)
+
+    def count(self, *label_values: str) -> int:
+        """Number of observations for a label combination."""
+        return sum(self._counts.get(label_values, ()))
+
+    def samples(self) -> Iterator[str]:
+        for label_values, counts in sorted(self._counts.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts, strict=True):
+                cumulative += count
+                le = _labels(self.label_names, label_values, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{le} {cumulative}"
+            labels = _labels(self.label_names, label_values)
+            yield f"{self.name}_sum{labels} {_number(self._sums[label_values])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class GaugeCallback(_Metric):
+    """Gauge whose value is read from a callback at scrape time, costing nothing in between."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, callback: Callable[[], float]):
+        super().__init__(name, documentation)
+        self.callback = callback
+
+    def samples(self) -> Iterator[str]:
+        yield f"{self.name} {_number(self.callback())}"
+
+
+class Registry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        """Add a metric, replacing any previous one of the same name."""
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, label_names: tuple[str, ...] = ()) -> Counter:
+        """Create and register a counter."""
+        metric = Counter(name, documentation, label_names)
+        self.register(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """Create and register a histogram."""
+        metric = Histogram(name, documentation, label_names, buckets)
+        self.register(metric)
+        return metric
+
+    def gauge(self, name: str, documentation: str, callback: Callable[[], float]) -> GaugeCallback:
+        """Create and register a callback gauge."""
+        metric = GaugeCallback(name, documentation, callback)
+        self.register(metric)
+        return metric
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        return "\n".join(metric.render() for metric in self._metrics.values()) + "\n"
+
+
+REGISTRY = Registry()
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "azure_pricing_cache_lookups_total",
+    "Response cache lookups by tier and result (hit, stale, miss).",
+    ("tier", "result"),
+)
+COALESCED_REQUESTS = REGISTRY.counter(
+    "azure_pricing_coalesced_requests_total",
+    "Requests that joined an identical request already in flight.",
+)
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "azure_pricing_upstream_requests_total",
+    "HTTP requests sent to the Retail Prices API by response status (or 'error').",
+    ("status",),
+)
+UPSTREAM_LATENCY = REGISTRY.histogram(
+    "azure_pricing_upstream_request_duration_seconds",
+    "Latency of HTTP requests to the Retail Prices API, excluding rate limiter waits.",
+)
+RATE_LIMIT_WAIT = REGISTRY.histogram(
+    "azure_pricing_rate_limit_wait_seconds",
+    "Time requests spent queued in the upstream rate limiter.",
+)
+PREWARM_QUERIES = REGISTRY.counter(
+    "azure_pricing_prewarm_queries_total",
+    "Manifest queries handled by cache pre-warming by result (warmed, fresh, catalog, error).",
+    ("result",),
+)
+TOOL_CALLS = REGISTRY.counter(
+    "azure_pricing_tool_calls_total",
+    "MCP tool calls by tool name and outcome (ok, invalid, error).",
+    ("tool", "outcome"),
+)
+TOOL_LATENCY = REGISTRY.histogram(
+    "azure_pricing_tool_duration_seconds",
+    "Latency of MCP tool calls by tool name.",
+    ("tool",),
+)
+
+
+def render_latest() -> str:
+    """Render the process-wide registry."""
+    return REGISTRY.render()
@@ -0,0 +1,206 @@
+"""
+Service name index for Azure Pricing MCP Server.
+
+An informal or misspelt service name ("cosmo db", "app servce", "aks") has to
+be resolved to the `serviceName` the Retail Prices API filters on. Instead of
+probing the API with candidate names, ServiceNameIndex ranks every known
+serviceName, productName and serviceFamily by trigram similarity locally.
+
+Names come from SERVICE_SNAPSHOT (the services of the Retail Prices API,
+embedded), the aliases of SERVICE_NAME_MAPPINGS and, when a local price
+catalog is attached, every service and product name it holds.
+"""
+
+import re
+from collections import Counter
+from collections.abc import Iterable, Mapping
+from typing import NamedTuple
+
+MIN_SIMILARITY = 0.3  # Dice coefficient of trigram sets below which names are not suggested
+MAX_SUGGESTIONS = 5
+
+SERVICE_NAME, PRODUCT_NAME, SERVICE_FAMILY, ALIAS = "serviceName", "productName", "serviceFamily", "alias"
+# A family names many services, so a match on it ranks below a match on a service's own names
+FIELD_WEIGHTS = {SERVICE_NAME: 1.0, ALIAS: 1.0, PRODUCT_NAME: 0.95, SERVICE_FAMILY: 0.8}
+
+# (serviceName, serviceFamily) of the Retail Prices API
+SERVICE_SNAPSHOT: tuple[tuple[str, str], ...] = (
+    ("API Management", "Developer Tools"),
+    ("Application Gateway", "Networking"),
+    ("Application Insights", "Management and Governance"),
+    ("Automation", "Management and Governance"),
+    ("Azure AI Search", "Web"),
+    ("Azure API for FHIR", "Internet of Things"),
+    ("Azure App Service", "Compute"),
+    ("Azure Arc", "Management and Governance"),
+    ("Azure Bastion", "Networking"),
+    ("Azure Cognitive Search", "Web"),
+    ("Azure Container Apps", "Containers"),
+    ("Azure Cosmos DB", "Databases"),
+    ("Azure Data Explorer", "Analytics"),
+    ("Azure Data Factory v2", "Analytics"),
+    ("Azure Database for MariaDB", "Databases"),
+    ("Azure Database for MySQL", "Databases"),
+    ("Azure Database for PostgreSQL", "Databases"),
+    ("Azure Databricks", "Analytics"),
+    ("Azure DDOS Protection", "Networking"),
+    ("Azure Digital Twins", "Internet of Things"),
+    ("Azure DNS", "Networking"),
+    ("Azure Firewall", "Networking"),
+    ("Azure Firewall Manager", "Networking"),
+    ("Azure Front Door Service", "Networking"),
+    ("Azure Kubernetes Service", "Compute"),
+    ("Azure Machine Learning", "AI + Machine Learning"),
+    ("Azure Managed Grafana", "Management and Governance"),
+    ("Azure Maps", "Internet of Things"),
+    ("Azure Monitor", "Management and Governance"),
+    ("Azure NetApp Files", "Storage"),
+    ("Azure Purview", "Analytics"),
+    ("Azure Site Recovery", "Management and Governance"),
+    ("Azure Spring Apps", "Compute"),
+    ("Azure Static Web Apps", "Web"),
+    ("Azure Synapse Analytics", "Analytics"),
+    ("Azure Virtual Desktop", "Windows Virtual Desktop"),
+    ("Azure Web PubSub", "Web"),
+    ("Backup", "Management and Governance"),
+    ("Bandwidth", "Networking"),
+    ("Batch", "Compute"),
+    ("Cloud Services", "Compute"),
+    ("Cognitive Services", "AI + Machine Learning"),
+    ("Container Instances", "Containers"),
+    ("Container Registry", "Containers"),
+    ("Content Delivery Network", "Networking"),
+    ("Data Lake Analytics", "Analytics"),
+    ("Event Grid", "Integration"),
+    ("Event Hubs", "Analytics"),
+    ("ExpressRoute", "Networking"),
+    ("Functions", "Compute"),
+    ("HDInsight", "Analytics"),
+    ("IoT Central", "Internet of Things"),
+    ("IoT Hub", "Internet of Things"),
+    ("Key Vault", "Security"),
+    ("Load Balancer", "Networking"),
+    ("Log Analytics", "Management and Governance"),
+    ("Logic Apps", "Integration"),
+    ("Microsoft Defender for Cloud", "Security"),
+    ("Microsoft Entra ID", "Security"),
+    ("Microsoft Fabric", "Analytics"),
+    ("Microsoft Sentinel", "Security"),
+    ("NAT Gateway", "Networking"),
+    ("Network Watcher", "Networking"),
+    ("Notification Hubs", "Web"),
+    ("Power BI Embedded", "Analytics"),
+    ("Private Link", "Networking"),
+    ("Redis Cache", "Databases"),
+    ("Service Bus", "Integration"),
+    ("SignalR", "Web"),
+    ("SQL Database", "Databases"),
+    ("SQL Managed Instance", "Databases"),
+    ("Storage", "Storage"),
+    ("Stream Analytics", "Analytics"),
+    ("Traffic Manager", "Networking"),
+    ("Virtual Machines", "Compute"),
+    ("Virtual Machines Licenses", "Compute"),
+    ("Virtual Network", "Networking"),
+    ("VPN Gateway", "Networking"),
+)
+
+_NON_ALPHANUMERIC = re.compile(r"[^0-9a-z]+")
+
+
+class NameMatch(NamedTuple):
+    """A service whose indexed name resembles the query."""
+
+    service_name: str
+    matched: str  # the indexed name that matched
+    field: str  # SERVICE_NAME, PRODUCT_NAME, SERVICE_FAMILY or ALIAS
+    score: float
+    exact: bool  # the names are equal after normalization
+
+
+def normalize(name: str) -> str:
+    """Lowercase a name and reduce punctuation to single spaces."""
+    return _NON_ALPHANUMERIC.sub(" ", name.lower()).strip()
+
+
+def trigrams(name: str) -> frozenset[str]:
+    """Trigrams of each word of a normalized name, padded so word starts weigh more."""
+    grams: set[str] = set()
+    for word in name.split():
+        padded = f"  {word} "
+        grams.update(padded[i : i + 3] for i in range(len(word) + 1))
+    return frozenset(grams)
+
+
+class ServiceNameIndex:
+    """Trigram index over service, product and family names, mapping each to its serviceName."""
+
+    def __init__(self, entries: Iterable[tuple[str, str, str]]):
+        """Index (name, service_name, field) entries."""
+        self._entries: list[tuple[str, str, str, str, frozenset[str]]] = []
+        self._postings: dict[str, list[int]] = {}
+        for name, service_name, field in dict.fromkeys(entries):
+            key = normalize(name)
+            if not key or not service_name:
+                continue
+            grams = trigrams(key)
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(len(self._entries))
+            self._entries.append((name, key, service_name, field, grams))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @classmethod
+    def build(
+        cls,
+        aliases: Mapping[str, str] | None = None,
+        catalog_names: Iterable[tuple[str | None, str | None, str | None]] = (),
+    ) -> "ServiceNameIndex":
+        """
+        Index SERVICE_SNAPSHOT, alias -> serviceName mappings and the
+        (serviceName, serviceFamily, productName) rows of a local catalog.
+        """
+        entries: list[tuple[str, str, str]] = []
+        for service_name, family in SERVICE_SNAPSHOT:
+            entries += [(service_name, service_name, SERVICE_NAME), (family, service_name, SERVICE_FAMILY)]
+        for alias, service_name in (aliases or {}).items():
+            entries.append((alias, service_name, ALIAS))
+        for catalog_service, catalog_family, product_name in catalog_names:
+            if catalog_service:
+                entries.append((catalog_service, catalog_service, SERVICE_NAME))
+                if catalog_family:
+                    entries.append((catalog_family, catalog_service, SERVICE_FAMILY))
+                if product_name:
+                    entries.append((product_name, catalog_service, PRODUCT_NAME))
+        return cls(entries)
+
+    def search(
+        self, query: str, limit: int = MAX_SUGGESTIONS, min_similarity: float = MIN_SIMILARITY
+    ) -> list[NameMatch]:
+        """Rank services by their most similar indexed name, best first."""
+        key = normalize(query)
+        if not key:
+            return []
+
+        query_grams = trigrams(key)
+        shared = Counter(index for gram in query_grams for index in self._postings.get(gram, ()))
+
+        best: dict[str, NameMatch] = {}
+        for index, count in shared.items():
+            name, name_key, service_name, field, grams = self._entries[index]
+            # Dice coefficient of the trigram sets
+            score = 2 * count / (len(query_grams) + len(grams)) * FIELD_WEIGHTS[field]
+            current = best.get(service_name)
+            if score >= min_similarity and (current is None or score > current.score):
+                best[service_name] = NameMatch(service_name, name, field, score, name_key == key)
+
+        return sorted(best.values(), key=lambda match: (-match.score, match.service_name))[:limit]
+
+
+def suggestion_reason(match: NameMatch, query: str) -> str:
+    """Explain a match for a suggestion list."""
+    if match.field == SERVICE_NAME:
+        return f"Similar to '{query}'"
+    labels = {PRODUCT_NAME: "product", SERVICE_FAMILY: "service family", ALIAS: "alias"}
+    return f"{labels[match.field].capitalize()} '{match.matched}' is similar to '{query}'"
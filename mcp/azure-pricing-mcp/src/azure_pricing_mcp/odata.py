@@ -0,0 +1,228 @@
+"""
+OData `$filter` handling for Azure Pricing MCP Server.
+
+Filters are built as a small AST of conjunctive conditions and serialized in a
+canonical form: values are normalized (region names, price types) and conditions
+are emitted in a fixed order. Queries that mean the same thing therefore produce
+the same `$filter` string and share cache entries, whichever tool built them.
+
+Like the Retail Prices API, local evaluation compares quoted values case-insensitively.
+"""
+
+import operator
+import re
+from collections.abc import Iterable, Iterator
+from typing import Any, NamedTuple
+
+COMPARISON_OPERATORS = ("eq", "ne", "gt", "ge", "lt", "le")
+CONTAINS = "contains"
+
+# Canonical condition order; fields not listed follow in alphabetical order
+FIELD_ORDER = (
+    "serviceName",
+    "serviceFamily",
+    "armRegionName",
+    "armSkuName",
+    "skuName",
+    "productName",
+    "meterName",
+    "priceType",
+    "effectiveStartDate",
+)
+
+# Filter fields stored under a different name in response items
+ITEM_FIELDS = {"priceType": "type"}
+
+PRICE_TYPES = {name.lower(): name for name in ("Consumption", "Reservation", "DevTestConsumption")}
+
+_COMPARATORS = {
+    "eq": operator.eq,
+    "ne": operator.ne,
+    "gt": operator.gt,
+    "ge": operator.ge,
+    "lt": operator.lt,
+    "le": operator.le,
+}
+
+_QUOTED_CONDITION = re.compile(r"^(\w+)\s+(eq|ne|gt|ge|lt|le)\s+'((?:[^']|'')*)'$", re.IGNORECASE)
+_LITERAL_CONDITION = re.compile(r"^(\w+)\s+(eq|ne|gt|ge|lt|le)\s+([^\s']+)$", re.IGNORECASE)
+_CONTAINS_CONDITION = re.compile(r"^contains\(\s*(\w+)\s*,\s*'((?:[^']|'')*)'\s*\)$", re.IGNORECASE)
+
+
+def normalize_value(field: str, value: str) -> str:
+    """Normalize a filter value to the form the Retail Prices API stores it in."""
+    value = value.strip()
+    if field == "armRegionName":
+        return value.replace(" ", "").lower()
+    if field == "priceType":
+        return PRICE_TYPES.get(value.lower(), value)
+    return value
+
+
+class Condition(NamedTuple):
+    """A single `$filter` predicate such as `armRegionName eq 'eastus'`."""
+
+    field: str
+    op: str
+    value: str
+    quoted: bool = True
+
+    def normalized(self) -> "Condition":
+        """Return the condition with its operator and value in canonical form."""
+        return Condition(self.field, self.op.lower(), normalize_value(self.field, self.value), self.quoted)
+
+    def to_odata(self) -> str:
+        """Serialize the condition as OData."""
+        value = "'" + self.value.replace("'", "''") + "'" if self.quoted else self.value
+        if self.op == CONTAINS:
+            return f"contains({self.field}, {value})"
+        return f"{self.field} {self.op} {value}"
+
+    def matches(self, item: dict[str, Any]) -> bool:
+        """Evaluate the condition against a Retail Prices item, as the API would."""
+        actual = item.get(ITEM_FIELDS.get(self.field, self.field))
+        if actual is None:
+            return False
+        if self.op == CONTAINS:
+            return self.value.casefold() in str(actual).casefold()
+        if self.quoted:
+            left: Any = normalize_value(self.field, str(actual)).casefold()
+            right: Any = self.value.casefold()
+        else:
+            try:
+                left, right = float(actual), float(self.value)
+            except (TypeError, ValueError):
+                left, right = str(actual), self.value
+        return bool(_COMPARATORS[self.op](left, right))
+
+    def implies(self, other: "Condition") -> bool:
+        """Whether every item matching this condition also matches `other`."""
+        if self.field != other.field:
+            return False
+        if self.op == other.op and self.quoted == other.quoted:
+            if self.value == other.value or (self.quoted and self.value.casefold() == other.value.casefold()):
+                return True
+        if other.op != CONTAINS or self.op not in ("eq", CONTAINS):
+            return False
+        return other.value.casefold() in self.value.casefold()
+
+    def sort_key(self) -> tuple[int, str, str, str]:
+        """Position of the condition in canonical order."""
+        rank = FIELD_ORDER.index(self.field) if self.field in FIELD_ORDER else len(FIELD_ORDER)
+        return rank, self.field, self.op, self.value
+
+
+def eq(field: str, value: str) -> Condition:
+    """Build an `eq` condition on a string field."""
+    return Condition(field, "eq", value)
+
+
+def contains(field: str, value: str) -> Condition:
+    """Build a `contains()` condition on a string field."""
+    return Condition(field, CONTAINS, value)
+
+
+def compare(field: str, op: str, literal: str) -> Condition:
+    """Build a comparison against an unquoted literal such as a date."""
+    if op not in COMPARISON_OPERATORS:
+        raise ValueError(f"Unsupported OData operator: {op}")
+    return Condition(field, op, literal, quoted=False)
+
+
+def _split_conjunction(text: str) -> Iterator[str]:
+    """Split a filter on top-level `and`, ignoring any inside quoted values."""
+    start = 0
+    in_quotes = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if char == "'":
+            in_quotes = not in_quotes
+        elif not in_quotes and text[i : i + 5].lower() == " and ":
+            yield text[start:i].strip()
+            start = i + 5
+            i += 4
+        i += 1
+    yield text[start:].strip()
+
+
+def parse_condition(text: str) -> Condition:
+    """Parse a single predicate, raising ValueError for unsupported syntax."""
+    match = _CONTAINS_CONDITION.match(text)
+    if match:
+        return Condition(match.group(1), CONTAINS, match.group(2).replace("''", "'"))
+    match = _QUOTED_CONDITION.match(text)
+    if match:
+        return Condition(match.group(1), match.group(2), match.group(3).replace("''", "'"))
+    match = _LITERAL_CONDITION.match(text)
+    if match:
+        return Condition(match.group(1), match.group(2), match.group(3), quoted=False)
+    raise ValueError(f"Unsupported OData condition: {text}")
+
+
+class ODataFilter:
+    """A conjunction of conditions with a canonical serialization."""
+
+    __slots__ = ("conditions",)
+
+    def __init__(self, conditions: Iterable[Condition] = ()):
+        normalized = {condition.normalized() for condition in conditions}
+        self.conditions: tuple[Condition, ...] = tuple(sorted(normalized, key=Condition.sort_key))
+
+    @classmethod
+    def parse(cls, text: str) -> "ODataFilter":
+        """Parse a `$filter` string of `and`-joined conditions, raising ValueError if unsupported."""
+        if not text or not text.strip():
+            return cls()
+        return cls(parse_condition(part) for part in _split_conjunction(text.strip()))
+
+    def __str__(self) -> str:
+        return " and ".join(condition.to_odata() for condition in self.conditions)
+
+    def __repr__(self) -> str:
+        return f"ODataFilter({str(self)!r})"
+
+    def __bool__(self) -> bool:
+        return bool(self.conditions)
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, ODataFilter) and self.conditions == other.conditions
+
+    def __hash__(self) -> int:
+        return hash(self.conditions)
+
+    def matches(self, item: dict[str, Any]) -> bool:
+        """Whether an item satisfies every condition."""
+        return all(condition.matches(item) for condition in self.conditions)
+
+    def subsumes(self, other: "ODataFilter") -> bool:
+        """
+        Whether every item matching `other` also matches this filter.
+
+        Holds when each of our conditions is implied by one of `other`'s, e.g.
+        `serviceName eq 'X'` subsumes `serviceName eq 'X' and armRegionName eq 'eastus'`,
+        and `contains(skuName, 'D4')` subsumes `skuName eq 'D4s v3'`.
+        """
+        return all(any(theirs.implies(mine) for theirs in other.conditions) for mine in self.conditions)
+
+    def to_list(self) -> list[str]:
+        """Serialize each condition separately, in canonical order."""
+        return [condition.to_odata() for condition in self.conditions]
+
+
+def canonical_filter(text: str) -> str:
+    """Return the canonical form of a `$filter` string, or the string unchanged if it can't be parsed."""
+    try:
+        return str(ODataFilter.parse(text))
+    except ValueError:
+        return text
+
+
+def canonical_params(params: dict[str, Any] | None) -> dict[str, Any]:
+    """Return a copy of Retail Prices query parameters with `$filter` and `currencyCode` in canonical form."""
+    canonical = dict(params or {})
+    if canonical.get("$filter"):
+        canonical["$filter"] = canonical_filter(str(canonical["$filter"]))
+    if canonical.get("currencyCode"):
+        canonical["currencyCode"] = str(canonical["currencyCode"]).strip().upper()
+    return canonical
@@ -0,0 +1,115 @@
+"""
+Result cursors for Azure Pricing MCP Server.
+
+Tools that can return hundreds of entries (azure_discover_skus,
+azure_region_recommend) answer with one page and an opaque cursor. The whole
+result stays in a bounded, TTL-evicted ResultStore, so the call for the next
+page reads it from memory instead of querying the API and ranking again.
+
+A cursor is "<token>.<offset>": the token names a stored result, the offset
+the first entry of the page it fetches. A stored result remembers the tool that
+produced it, and a cursor passed to any other tool is rejected.
+"""
+
+import secrets
+from typing import Any, NamedTuple
+
+from cachetools import TTLCache
+
+DEFAULT_PAGE_SIZE = 50  # entries per page when the call doesn't set page_size
+MAX_PAGE_SIZE = 500
+RESULT_STORE_MAX_ENTRIES = 64  # results kept for paging; the least recently used is dropped first
+RESULT_STORE_TTL = 15 * 60  # seconds a result stays pageable after its last page was read
+
+PAGE_SIZE_SCHEMA: dict[str, Any] = {
+    "type": "integer",
+    "description": (
+        f"Entries per page (default: {DEFAULT_PAGE_SIZE}). Longer results return a next_cursor for the next page"
+    ),
+    "minimum": 1,
+    "maximum": MAX_PAGE_SIZE,
+    "default": DEFAULT_PAGE_SIZE,
+}
+CURSOR_SCHEMA: dict[str, Any] = {
+    "type": "string",
+    "description": (
+        "next_cursor of a previous result: returns its next page without a new query (other arguments are ignored)"
+    ),
+}
+
+
+class StoredResult(NamedTuple):
+    """A tool result kept for paging."""
+
+    result: dict[str, Any]
+    key: str  # result key of the list that is paged
+    page_size: int
+    tool: str | None  # tool whose cursors may page the result
+
+
+class ResultStore:
+    """Keeps whole tool results for paging, keyed by the token of their cursors."""
+
+    def __init__(self, max_entries: int = RESULT_STORE_MAX_ENTRIES, ttl: float = RESULT_STORE_TTL):
+        self._results: TTLCache = TTLCache(maxsize=max_entries, ttl=ttl)
+
+    def __len__(self) -> int:
+        return len(self._results)
+
+    def first_page(
+        self, result: dict[str, Any], key: str, page_size: int | None = None, tool: str | None = None
+    ) -> dict[str, Any]:
+        """
+        Return the first page of `result[key]`.
+
+        Results that fit on one page (and results without the list, such as
+        errors) are returned unchanged; longer ones are stored for `tool` and
+        their page carries a `page` entry with the cursor of the next one.
+        """
+        page_size = page_size or DEFAULT_PAGE_SIZE
+        entries = result.get(key)
+        if not isinstance(entries, list) or len(entries) <= page_size:
+            return result
+
+        token = secrets.token_urlsafe(12)
+        stored = StoredResult(result, key, page_size, tool)
+        self._results[token] = stored
+        return self._page(token, stored, 0, page_size)
+
+    def page(self, cursor: str, page_size: int | None = None, tool: str | None = None) -> dict[str, Any]:
+        """
+        Return the page a cursor points to.
+
+        Raises:
+            ValueError: If the cursor is malformed, its result has expired or
+                `tool` didn't produce it
+        """
+        token, _, offset = cursor.rpartition(".")
+        stored = self._results.get(token)
+        if stored is None or not offset.isdigit():
+            raise ValueError("Cursor is unknown or expired; repeat the query without a cursor")
+        if stored.tool != tool:
+            raise ValueError("Cursor belongs to a result of another tool; pass it to the tool that returned it")
+
+        # Reading a page keeps the result alive for the next one
+        self._results[token] = stored
+        return self._page(token, stored, int(offset), page_size or stored.page_size)
+
+    @staticmethod
+    def _page(token: str, stored: StoredResult, offset: int, page_size: int) -> dict[str, Any]:
+        entries = stored.result[stored.key]
+        end = offset + page_size
+        page = entries[offset:end]
+        return {
+            **stored.result,
+            stored.key: page,
+            "page": {
+                "offset": offset,
+                "count": len(page),
+                "total": len(entries),
+                "next_cursor": f"{token}.{end}" if end < len(entries) else None,
+            },
+        }
+
+
+RESULT_STORE = ResultStore()
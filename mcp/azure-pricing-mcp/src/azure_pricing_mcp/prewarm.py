@@ -0,0 +1,187 @@
+"""
+Background cache pre-warming for Azure Pricing MCP Server.
+
+Agents keep asking about the same services in the same regions, yet every new
+process starts with an empty response cache. A pre-warmer reads a manifest of
+these hot queries and fetches them into the cache in the background once the
+server is up, then again on a schedule before the cached pages expire, so the
+first call for a hot query is served at cache speed. Its requests run at
+background priority in the rate limiter and never delay interactive calls.
+
+Manifest (JSON):
+    {
+      "interval_seconds": 2700,
+      "currency_code": "USD",
+      "queries": [
+        {"service_name": "Azure App Service", "regions": ["swedencentral", "westeurope"]},
+        {"service_name": "Virtual Machines", "region": "eastus", "price_type": "Consumption"}
+      ]
+    }
+
+Usage:
+    python -m azure_pricing_mcp --prewarm              # built-in manifest (DEFAULT_MANIFEST)
+    python -m azure_pricing_mcp --prewarm hot.json
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, NamedTuple
+
+from .metrics import PREWARM_QUERIES
+from .ratelimit import background_priority
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+DEFAULT_INTERVAL = 45 * 60  # seconds between passes, inside the response cache's one-hour freshness
+DEFAULT_START_DELAY = 1.0  # seconds after startup before the first pass
+PREWARM_CONCURRENCY = 2  # manifest queries warmed at once
+
+DEFAULT_MANIFEST: dict[str, Any] = {
+    "queries": [
+        {"service_name": service_name, "regions": ["swedencentral", "westeurope", "eastus"]}
+        for service_name in ("Azure App Service", "SQL Database", "Storage", "Azure Static Web Apps")
+    ]
+}
+
+_QUERY_FIELDS = {"service_name", "region", "regions", "sku_name", "price_type", "currency_code"}
+
+
+class WarmQuery(NamedTuple):
+    """One search to keep in the response cache."""
+
+    service_name: str
+    region: str | None = None
+    sku_name: str | None = None
+    price_type: str | None = None
+    currency_code: str = "USD"
+
+
+def parse_manifest(manifest: Any) -> tuple[list[WarmQuery], float]:
+    """
+    Validate a manifest and expand its entries into one query per region.
+
+    Returns:
+        Tuple of (queries, interval in seconds)
+
+    Raises:
+        ValueError: Naming the first invalid entry
+    """
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("queries"), list):
+        raise ValueError("Manifest must be an object with a 'queries' list")
+    interval = manifest.get("interval_seconds", DEFAULT_INTERVAL)
+    if isinstance(interval, bool) or not isinstance(interval, (int, float)) or interval <= 0:
+        raise ValueError("interval_seconds must be a positive number")
+    default_currency = manifest.get("currency_code", "USD")
+
+    queries: list[WarmQuery] = []
+    for index, entry in enumerate(manifest["queries"]):
+        if not isinstance(entry, dict):
+            raise ValueError(f"Query {index}: must be an object")
+        unknown = set(entry) - _QUERY_FIELDS
+        if unknown:
+            raise ValueError(f"Query {index}: unknown fields {', '.join(sorted(unknown))}")
+        service_name = entry.get("service_name")
+        if not isinstance(service_name, str) or not service_name:
+            raise ValueError(f"Query {index}: service_name is required")
+        regions = entry.get("regions", [entry.get("region")])
+        if not isinstance(regions, list) or not regions:
+            raise ValueError(f"Query {index}: regions must be a non-empty list")
+        for region in regions:
+            if region is not None and not isinstance(region, str):
+                raise ValueError(f"Query {index}: regions must be strings")
+            queries.append(
+                WarmQuery(
+                    service_name,
+                    region,
+                    entry.get("sku_name"),
+                    entry.get("price_type"),
+                    str(entry.get("currency_code", default_currency)).upper(),
+                )
+            )
+    # Entries may overlap; warm each query once per pass
+    return list(dict.fromkeys(queries)), float(interval)
+
+
+def load_manifest(path: str | None = None) -> tuple[list[WarmQuery], float]:
+    """Read and parse a manifest file, or the built-in DEFAULT_MANIFEST when no path is given."""
+    if not path:
+        return parse_manifest(DEFAULT_MANIFEST)
+    try:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot read pre-warm manifest {path}: {e}") from e
+    return parse_manifest(manifest)
+
+
+class CachePrewarmer:
+    """
+    Keeps the queries of a manifest warm in the response cache.
+
+    `start()` schedules a pass `start_delay` seconds later and then every
+    `interval` seconds. A pass refreshes every query whose cached page would
+    otherwise expire before the next pass (see AzurePricingServer.warm_query).
+    """
+
+    def __init__(
+        self,
+        server: Any,
+        queries: list[WarmQuery],
+        interval: float = DEFAULT_INTERVAL,
+        start_delay: float = DEFAULT_START_DELAY,
+        concurrency: int = PREWARM_CONCURRENCY,
+    ):
+        self.server = server
+        self.queries = queries
+        self.interval = interval
+        self.start_delay = start_delay
+        self.concurrency = max(1, concurrency)
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> asyncio.Task:
+        """Run passes in a background task until `stop()`."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name="azure-pricing-prewarm")
+        return self._task
+
+    async def stop(self) -> None:
+        """Cancel the background task and wait for it to end."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def warm_once(self) -> dict[str, int]:
+        """Run one pass over the manifest and count its queries by result."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        counts: dict[str, int] = {}
+
+        async def warm(query: WarmQuery) -> None:
+            async with semaphore:
+                try:
+                    result = await self.server.warm_query(**query._asdict(), fresh_for=self.interval)
+                except Exception as e:
+                    logger.warning(f"Pre-warming {query.service_name} in {query.region} failed: {e}")
+                    result = "error"
+            counts[result] = counts.get(result, 0) + 1
+            PREWARM_QUERIES.inc(result)
+
+        with background_priority():
+            await asyncio.gather(*(warm(query) for query in self.queries))
+        return counts
+
+    async def _run(self) -> None:
+        await asyncio.sleep(self.start_delay)
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            counts = await self.warm_once()
+            logger.info(
+                f"Pre-warmed {len(self.queries)} queries in {loop.time() - started:.1f}s "
+                f"({', '.join(f'{count} {result}' for result, count in sorted(counts.items()))})"
+            )
+            await asyncio.sleep(max(0.0, self.interval - (loop.time() - started)))
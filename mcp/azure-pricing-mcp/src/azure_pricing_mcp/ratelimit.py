@@ -0,0 +1,229 @@
+"""
+Adaptive upstream rate limiting for Azure Pricing MCP Server.
+
+All requests to the Retail Prices API share one token bucket. Its rate grows
+slowly while requests succeed and is cut multiplicatively on every 429
+(AIMD), and a Retry-After header pauses the whole bucket, so concurrent callers
+back off together instead of retrying in synchronized bursts.
+
+Background work (such as cache pre-warming) runs inside `background_priority()`,
+and its requests only take a token while no interactive request is queued. A
+background context can be promoted, e.g. when an interactive caller starts
+waiting on a request it made, and its requests then queue like any other.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any
+
+DEFAULT_RATE = 10.0  # requests per second
+MIN_RATE = 0.2
+MAX_RATE = 20.0
+DEFAULT_BURST = 5  # tokens available at once
+RECOVERY_STEP = 0.1  # requests per second added after each success
+DECREASE_FACTOR = 0.5  # rate multiplier applied on each 429
+BACKOFF_BASE = 5.0  # seconds
+BACKOFF_MAX = 60.0  # seconds
+
+
+class Priority:
+    """Priority of a `background_priority()` context, shared by the tasks started in it."""
+
+    __slots__ = ("background",)
+
+    def __init__(self) -> None:
+        self.background = True
+
+    def promote(self) -> None:
+        """Let the context's requests, including those already waiting, queue as interactive ones."""
+        self.background = False
+
+
+# Inherited by the tasks a background job starts, so their upstream requests yield too
+_priority: ContextVar[Priority | None] = ContextVar("azure_pricing_background_priority", default=None)
+
+
+@contextmanager
+def background_priority() -> Iterator[Priority]:
+    """Make the upstream requests started in this context yield to interactive ones."""
+    priority = Priority()
+    token = _priority.set(priority)
+    try:
+        yield priority
+    finally:
+        _priority.reset(token)
+
+
+def in_background() -> bool:
+    """Whether the current context runs at (unpromoted) background priority."""
+    priority = _priority.get()
+    return priority is not None and priority.background
+
+
+def parse_retry_after(value: str | None) -> float | None:
+    """
+    Parse a Retry-After header value into seconds.
+
+    Accepts both delay-seconds ("120") and HTTP-date forms. Returns None when the
+    header is missing or malformed.
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket with AIMD rate control and FIFO queuing.
+
+    Callers await `acquire()` before each upstream request and report the outcome
+    with `on_success()` or `on_throttle()`. Waiters are served in arrival order.
+    """
+
+    def __init__(
+        self,
+        rate: float = DEFAULT_RATE,
+        min_rate: float = MIN_RATE,
+        max_rate: float = MAX_RATE,
+        burst: int = DEFAULT_BURST,
+        recovery_step: float = RECOVERY_STEP,
+        decrease_factor: float = DECREASE_FACTOR,
+        backoff_base: float = BACKOFF_BASE,
+        backoff_max: float = BACKOFF_MAX,
+    ):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst
+        self.recovery_step = recovery_step
+        self.decrease_factor = decrease_factor
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._throttled = 0
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _queue_lock(self) -> asyncio.Lock:
+        """Get the FIFO queue lock for the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last update."""
+        self._tokens = min(float(self.burst), self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """
+        Wait for a token. Callers are released one at a time in arrival order.
+
+        In a `background_priority()` context, the caller first waits until no other
+        request is queued and a token is left over for the next interactive one,
+        or until the context is promoted.
+        """
+        if in_background():
+            await self._wait_idle()
+        self._waiting += 1
+        try:
+            async with self._queue_lock():
+                while True:
+                    now = time.monotonic()
+                    if now < self._blocked_until:
+                        await asyncio.sleep(self._blocked_until - now)
+                        continue
+                    self._refill(now)
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    await asyncio.sleep((1 - self._tokens) / self.rate)
+        finally:
+            self._waiting -= 1
+
+    async def _wait_idle(self) -> None:
+        """Wait until the queue is empty and the bucket holds a token beyond the one to take, or a promotion."""
+        reserve = 1 if self.burst > 1 else 0
+        while in_background():
+            now = time.monotonic()
+            self._refill(now)
+            if self._waiting == 0 and now >= self._blocked_until and self._tokens >= 1 + reserve:
+                return
+            await asyncio.sleep(max(1 / self.rate, 0.01))
+
+    def on_success(self) -> None:
+        """Additively increase the rate after a successful request."""
+        self.rate = min(self.max_rate, self.rate + self.recovery_step)
+
+    def on_throttle(self, retry_after: float | None = None) -> None:
+        """Multiplicatively decrease the rate after a 429 and honor Retry-After for everyone."""
+        now = time.monotonic()
+        self._refill(now)
+        self._throttled += 1
+        self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+        self._tokens = 0.0
+        if retry_after:
+            self._blocked_until = max(self._blocked_until, now + retry_after)
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Delay before retrying a throttled request.
+
+        Exponential in `attempt` with equal jitter so callers throttled together
+        spread out, and never shorter than the server's Retry-After.
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * 2.0**attempt)
+        delay = ceiling / 2 + random.uniform(0, ceiling / 2)
+        return max(delay, retry_after or 0.0)
+
+    def split(self, parts: int) -> "AdaptiveRateLimiter":
+        """
+        Build a limiter allowing 1/`parts` of this one's rates and burst.
+
+        Processes sharing one upstream quota each use a split limiter, so together
+        they stay within the rate a single process would use.
+        """
+        parts = max(1, parts)
+        return AdaptiveRateLimiter(
+            rate=self.rate / parts,
+            min_rate=self.min_rate / parts,
+            max_rate=self.max_rate / parts,
+            burst=max(1, self.burst // parts),
+            recovery_step=self.recovery_step / parts,
+            decrease_factor=self.decrease_factor,
+            backoff_base=self.backoff_base,
+            backoff_max=self.backoff_max,
+        )
+
+    def snapshot(self) -> dict[str, Any]:
+        """Report the current rate, queue depth and throttling state."""
+        return {
+            "rate": round(self.rate, 3),
+            "queue_depth": self._waiting,
+            "tokens": round(min(float(self.burst), self._tokens), 3),
+            "blocked_for": round(max(0.0, self._blocked_until - time.monotonic()), 3),
+            "throttled_total": self._throttled,
+        }
@@ -6,35 +6,80 @@ A Model Context Protocol server that provides tools for querying Azure retail pr
 """
 
 import asyncio
+import functools
 import hashlib
 import json
 import logging
+import math
+import os
 import sys
-from typing import Any
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Awaitable, Callable, Mapping, Sequence
+from typing import TYPE_CHECKING, Any, TypeVar
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
-import aiohttp
 from cachetools import TTLCache
 from mcp.server import NotificationOptions, Server
 from mcp.server.stdio import stdio_server
-from mcp.types import Tool
-
-# Configure logging - redirect to stderr to avoid corrupting JSON-RPC on stdout
-# For stdio transport, all logging MUST go to stderr, not stdout
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    stream=sys.stderr,
+
+from .columnar import compact_page, with_values
+from .metrics import (
+    CACHE_LOOKUPS,
+    COALESCED_REQUESTS,
+    CONTENT_TYPE_LATEST,
+    RATE_LIMIT_WAIT,
+    REGISTRY,
+    UPSTREAM_LATENCY,
+    UPSTREAM_REQUESTS,
+    render_latest,
 )
+from .odata import ODataFilter, canonical_params, contains, eq
+from .ratelimit import AdaptiveRateLimiter, Priority, background_priority, in_background, parse_retry_after
+
+if TYPE_CHECKING:
+    # aiohttp is imported on the first upstream request; stdio sessions that only
+    # list tools or answer from the caches never pay for it (see startup.py)
+    import aiohttp
+
+    from .cache import DiskCache
+    from .catalog import PriceCatalog
+    from .names import ServiceNameIndex
+
 logger = logging.getLogger("azure_pricing_mcp")
 
+T = TypeVar("T")
+
 # Azure Retail Prices API configuration
 AZURE_PRICING_BASE_URL = "https://prices.azure.com/api/retail/prices"
 DEFAULT_API_VERSION = "2023-01-01-preview"
 MAX_RESULTS_PER_REQUEST = 1000
 
+# Pagination configuration
+PAGE_PREFETCH_DEPTH = 3  # pages requested ahead while the current page is processed
+MAX_PAGINATED_ITEMS = 5000  # hard cap on items collected by a single paginated query
+MAX_DISCOVERY_ITEMS = 50000  # items region discovery walks through before giving up on finding every region
+
+# Response cache configuration
+CACHE_TTL = 3600  # seconds a cached response is served as fresh
+CACHE_MAX_STALENESS = 6 * 3600  # stale responses are served while refreshing until this age
+STALE_KEY = "_stale"  # marks responses served from cache past CACHE_TTL
+FETCH_LEASE_POLL_INTERVAL = 0.05  # seconds between checks for a response another process is fetching
+CACHE_MAX_ENTRIES = 1000  # responses kept in memory; items are stored compactly (see columnar.py)
+
+# Fan-out configuration for tools that query many regions or services at once
+FAN_OUT_CONCURRENCY = 8  # subqueries of one tool call running at once
+FAN_OUT_TIMEOUT = 30.0  # seconds before a single subquery is given up
+
+# Batch query configuration
+MAX_BATCH_QUERIES = 50  # queries accepted by a single azure_price_batch call
+BATCH_MAX_CONCURRENCY = 8  # queries of a batch run at once
+BATCH_ITEMS_PER_QUERY = 10  # price items reported per search query of a batch
+
 # Retry and rate limiting configuration
 MAX_RETRIES = 3
-RATE_LIMIT_RETRY_BASE_WAIT = 5  # seconds
+RATE_LIMIT_RETRY_BASE_WAIT = 5  # seconds, doubled on each further attempt
+RATE_LIMIT_MAX_WAIT = 60  # seconds, unless the API asks for longer via Retry-After
 DEFAULT_CUSTOMER_DISCOUNT = 0.0  # percent (disabled by default)
 
 # Common service name mappings for fuzzy search
@@ -145,23 +190,108 @@ def normalize_sku_name(sku_name: str) -> tuple[list[str], str]:
     return (search_terms, display_name)
 
 
+def set_api_url(url: str) -> None:
+    """Point every query at another Retail Prices API endpoint (such as a local fake)."""
+    global AZURE_PRICING_BASE_URL
+    AZURE_PRICING_BASE_URL = url
+
+
+def split_page_link(link: str) -> tuple[str, dict[str, str]]:
+    """
+    Split a NextPageLink into a base URL and a query parameter dict.
+
+    Passing the parameters separately (rather than the raw link) keeps cache keys
+    consistent with the first-page request and lets the `$skip` offset be rewritten
+    to request later pages ahead of time.
+    """
+    parts = urlsplit(link)
+    base_url = urlunsplit((parts.scheme, parts.netloc, parts.path, "", ""))
+    return base_url, dict(parse_qsl(parts.query, keep_blank_values=True))
+
+
+def requested_top(params: dict[str, Any] | None) -> int:
+    """Number of items a query asks for in one page (the API's page size without `$top`)."""
+    try:
+        return int((params or {}).get("$top", MAX_RESULTS_PER_REQUEST))
+    except (TypeError, ValueError):
+        return MAX_RESULTS_PER_REQUEST
+
+
+def covers_top(data: dict[str, Any], top: int) -> bool:
+    """Whether a cached page holds at least `top` items, or everything left in the result set."""
+    return len(data.get("Items", [])) >= top or not data.get("NextPageLink")
+
+
+def limit_page(url: str, params: dict[str, Any] | None, data: dict[str, Any]) -> dict[str, Any]:
+    """
+    Trim a page cached for a larger `$top` to the size a query asked for.
+
+    NextPageLink is pointed at the first item left out, so pagination continues
+    exactly where the trimmed page ends.
+    """
+    top = requested_top(params)
+    items = data.get("Items", [])
+    if len(items) <= top:
+        return data
+    try:
+        skip = int((params or {}).get("$skip", 0))
+    except (TypeError, ValueError):
+        skip = 0
+    next_params = {**(params or {}), "$skip": str(skip + top)}
+    return {**data, "Items": items[:top], "Count": top, "NextPageLink": f"{url}?{urlencode(next_params)}"}
+
+
+class _InFlightRequest:
+    """An upstream request shared by every concurrent caller asking for the same cache key."""
+
+    __slots__ = ("task", "waiters", "priority")
+
+    def __init__(self, task: asyncio.Task, priority: Priority | None = None):
+        self.task = task
+        self.waiters = 0
+        # Set when started at background priority, so interactive callers joining it can promote it
+        self.priority = priority
+
+
 class AzurePricingServer:
     """Azure Pricing MCP Server implementation with singleton session and caching."""
 
-    _session: aiohttp.ClientSession | None = None
+    _session: "aiohttp.ClientSession | None" = None
     _session_lock: asyncio.Lock | None = None
-    # Cache responses for 1 hour (3600 seconds), max 100 entries
-    _cache: TTLCache = TTLCache(maxsize=100, ttl=3600)
+    # Cache (fetched_at, response) pairs with Items stored as columnar ItemTables, max
+    # CACHE_MAX_ENTRIES entries. Entries are fresh for CACHE_TTL, then served stale while
+    # revalidating until CACHE_MAX_STALENESS evicts them
+    _cache: TTLCache = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_MAX_STALENESS)
+    # Optional on-disk tier behind _cache that survives restarts
+    _disk_cache: "DiskCache | None" = None
+    # Optional local price catalog that answers covered queries without upstream calls
+    _catalog: "PriceCatalog | None" = None
+    # Requests currently on the wire, keyed by cache key, so duplicates can join them
+    _inflight: dict[str, _InFlightRequest] = {}
+    # Cache keys of complete result sets by query scope (everything but $filter), so that
+    # narrower filters can be evaluated locally over them instead of going upstream
+    _complete_results: dict[str, dict[ODataFilter, str]] = {}
+    # Sorted regions offering a SKU by (service, SKU search term, currency), so repeat
+    # region recommendations skip the discovery pass
+    _region_index: TTLCache = TTLCache(maxsize=CACHE_MAX_ENTRIES, ttl=CACHE_TTL)
+    # Trigram index of known service, product and family names, built on first use
+    _service_names: "ServiceNameIndex | None" = None
+    # Process-wide pacing of upstream requests, slowed down by 429s and Retry-After
+    _rate_limiter: AdaptiveRateLimiter = AdaptiveRateLimiter(
+        backoff_base=RATE_LIMIT_RETRY_BASE_WAIT, backoff_max=RATE_LIMIT_MAX_WAIT
+    )
 
     def __init__(self):
         if AzurePricingServer._session_lock is None:
             AzurePricingServer._session_lock = asyncio.Lock()
 
-    async def get_session(self) -> aiohttp.ClientSession:
+    async def get_session(self) -> "aiohttp.ClientSession":
         """Get or create singleton HTTP session with connection pooling."""
         if AzurePricingServer._session is None or AzurePricingServer._session.closed:
             async with AzurePricingServer._session_lock:
                 if AzurePricingServer._session is None or AzurePricingServer._session.closed:
+                    import aiohttp
+
                     # Configure timeout and connection pool
                     timeout = aiohttp.ClientTimeout(total=30, connect=10)
                     connector = aiohttp.TCPConnector(
@@ -189,71 +319,489 @@ class AzurePricingServer:
             await AzurePricingServer._session.close()
             AzurePricingServer._session = None
 
+    @staticmethod
+    def rate_limit_status() -> dict[str, Any]:
+        """Report the upstream rate limiter's current rate and queue depth."""
+        return AzurePricingServer._rate_limiter.snapshot()
+
+    @staticmethod
+    def attach_rate_limiter(rate_limiter: AdaptiveRateLimiter) -> None:
+        """Pace upstream requests with `rate_limiter`, e.g. a share of a limit split between processes."""
+        AzurePricingServer._rate_limiter = rate_limiter
+
+    @staticmethod
+    def attach_catalog(catalog: "PriceCatalog | None") -> None:
+        """Answer queries covered by a local price catalog instead of calling the API."""
+        AzurePricingServer._catalog = catalog
+        # The catalog's service and product names join the service name index
+        AzurePricingServer._service_names = None
+
+    @staticmethod
+    def attach_disk_cache(disk_cache: "DiskCache | None", warm: bool = False) -> int:
+        """
+        Back the in-memory response cache with a persistent disk tier.
+
+        Args:
+            disk_cache: Disk tier to use, or None to disable it
+            warm: Preload the most recently used disk entries into the memory tier
+
+        Returns:
+            Number of entries loaded into the memory tier
+        """
+        AzurePricingServer._disk_cache = disk_cache
+        if disk_cache is None or not warm:
+            return 0
+
+        loaded = 0
+        for key, value, fetched_at in disk_cache.recent(int(AzurePricingServer._cache.maxsize)):
+            if time.time() - fetched_at < CACHE_MAX_STALENESS:
+                AzurePricingServer._cache[key] = (fetched_at, compact_page(value))
+                loaded += 1
+        logger.info(f"Warmed response cache with {loaded} entries from {disk_cache.path}")
+        return loaded
+
     def _cache_key(self, url: str, params: dict[str, Any] | None) -> str:
-        """Generate cache key from URL and parameters."""
-        params_str = json.dumps(params or {}, sort_keys=True)
+        """
+        Generate cache key from URL and canonical parameters.
+
+        `$top` is left out so one cached page serves every request for the same
+        query asking for as many items or fewer (see covers_top and limit_page).
+        """
+        key_params = {name: value for name, value in canonical_params(params).items() if name != "$top"}
+        params_str = json.dumps(key_params, sort_keys=True)
         return hashlib.md5(f"{url}{params_str}".encode()).hexdigest()
 
+    @staticmethod
+    def _inflight_key(cache_key: str, params: dict[str, Any] | None) -> str:
+        """Key in-flight requests on `$top` too, so a caller never joins a request for fewer items."""
+        top = (params or {}).get("$top")
+        return cache_key if top is None else f"{cache_key}:{top}"
+
     async def _make_request(
-        self, url: str, params: dict[str, Any] | None = None, max_retries: int = MAX_RETRIES
+        self, url: str, params: dict[str, Any] | None = None, max_retries: int = MAX_RETRIES, use_cache: bool = True
     ) -> dict[str, Any]:
-        """Make HTTP request to Azure Pricing API with caching and retry logic."""
+        """
+        Make HTTP request to Azure Pricing API with caching, retry logic and request coalescing.
+
+        Concurrent callers asking for the same URL and parameters before the first
+        response lands share a single upstream request (single-flight). Its result or
+        error is delivered to every caller; a caller being cancelled only cancels the
+        shared request once no other caller is waiting on it. An interactive caller
+        joining a request started at background priority (see ratelimit.py) promotes it.
+
+        Cached responses older than CACHE_TTL are returned immediately, marked with
+        STALE_KEY, while a background task refreshes them (stale-while-revalidate).
+        Past CACHE_MAX_STALENESS they are evicted and the caller waits for a fresh fetch.
+
+        Parameters are sent in canonical form (see odata.canonical_params), and a
+        cached page fetched with a larger `$top` is trimmed to serve a smaller one.
+        On a cache miss, a fresh complete result for a broader filter is filtered
+        locally when possible (see _plan_from_cache).
+        """
+        if params:
+            params = canonical_params(params)
+        if not use_cache:
+            return await self._fetch(url, params, max_retries, cache_key=None)
+
         # Check cache first
         cache_key = self._cache_key(url, params)
-        if cache_key in AzurePricingServer._cache:
-            logger.debug(f"Cache hit for {url}")
-            return AzurePricingServer._cache[cache_key]
+        entry = AzurePricingServer._cache.get(cache_key)
+        if entry is not None and covers_top(entry[1], requested_top(params)):
+            fetched_at, cached = entry
+            data = limit_page(url, params, cached)
+            if time.time() - fetched_at < CACHE_TTL:
+                logger.debug(f"Cache hit for {url}")
+                CACHE_LOOKUPS.inc("memory", "hit")
+                return data
+            logger.debug(f"Stale cache hit for {url}, revalidating in background")
+            CACHE_LOOKUPS.inc("memory", "stale")
+            # Refresh the whole cached page, not just the part this caller asked for
+            refresh_params = params if data is cached else {**(params or {}), "$top": str(len(cached["Items"]))}
+            self._revalidate(url, refresh_params, max_retries, cache_key)
+            return {**data, STALE_KEY: True}
+
+        planned = self._plan_from_cache(url, params)
+        if planned is not None:
+            logger.debug(f"Answered {url} from a broader cached result")
+            CACHE_LOOKUPS.inc("planner", "hit")
+            return planned
+        CACHE_LOOKUPS.inc("memory", "miss")
+
+        inflight = AzurePricingServer._inflight.get(self._inflight_key(cache_key, params))
+        if inflight is None or inflight.task.done() or inflight.task.get_loop() is not asyncio.get_running_loop():
+            inflight = self._start_fetch(url, params, max_retries, cache_key)
+        else:
+            logger.debug(f"Joining in-flight request for {url}")
+            COALESCED_REQUESTS.inc()
+            if inflight.priority is not None and not in_background():
+                # Don't keep an interactive caller waiting behind background priority
+                inflight.priority.promote()
+
+        inflight.waiters += 1
+        try:
+            return limit_page(url, params, await asyncio.shield(inflight.task))
+        except asyncio.CancelledError:
+            if inflight.waiters == 1 and not inflight.task.done():
+                # Last interested caller went away - stop the upstream request
+                inflight.task.cancel()
+            raise
+        finally:
+            inflight.waiters -= 1
+
+    def _scope_key(self, url: str, params: dict[str, Any] | None) -> str:
+        """Key of a query's scope: the cache key of its parameters without `$filter` and `$skip`."""
+        return self._cache_key(url, {k: v for k, v in (params or {}).items() if k not in ("$filter", "$skip")})
+
+    def _index_complete(self, url: str, params: dict[str, Any] | None, cache_key: str, data: dict[str, Any]) -> None:
+        """Remember a cached response that holds a query's entire result set."""
+        params = params or {}
+        if params.get("$skip") not in (None, "0") or data.get("NextPageLink"):
+            return
+        if len(data.get("Items", [])) >= requested_top(params):
+            return  # a full page without NextPageLink may still have been cut off by $top
+        try:
+            odata_filter = ODataFilter.parse(params.get("$filter", ""))
+        except ValueError:
+            return
+
+        scope = AzurePricingServer._complete_results.setdefault(self._scope_key(url, params), {})
+        # Forget entries the memory cache has already evicted
+        for stale_filter in [f for f, key in scope.items() if key not in AzurePricingServer._cache]:
+            del scope[stale_filter]
+        scope[odata_filter] = cache_key
+
+    def _plan_from_cache(self, url: str, params: dict[str, Any] | None) -> dict[str, Any] | None:
+        """
+        Answer a query from a fresh cached complete result for a broader filter.
+
+        A cached result is usable when its filter subsumes the requested one (for
+        example the request only adds an `armRegionName eq` or `priceType eq`
+        condition). The requested filter is then evaluated over its items and
+        `$skip`/`$top` applied locally. Returns None when no such result is cached.
+        """
+        scope = AzurePricingServer._complete_results.get(self._scope_key(url, params))
+        if not scope:
+            return None
+        try:
+            odata_filter = ODataFilter.parse((params or {}).get("$filter", ""))
+            skip = int((params or {}).get("$skip", 0))
+        except ValueError:
+            return None
+
+        for broader, cache_key in list(scope.items()):
+            entry = AzurePricingServer._cache.get(cache_key)
+            if entry is None:
+                del scope[broader]
+                continue
+            fetched_at, data = entry
+            if broader == odata_filter or time.time() - fetched_at >= CACHE_TTL or data.get("NextPageLink"):
+                continue
+            if not broader.subsumes(odata_filter):
+                continue
+
+            items = [item for item in data.get("Items", []) if odata_filter.matches(item)][skip:]
+            return limit_page(url, params, {**data, "Items": items, "Count": len(items), "NextPageLink": None})
+        return None
+
+    def _start_fetch(
+        self, url: str, params: dict[str, Any] | None, max_retries: int, cache_key: str, revalidating: bool = False
+    ) -> _InFlightRequest:
+        """Start a shared upstream fetch and register it in the in-flight table."""
+        fetch = self._fetch(url, params, max_retries, cache_key, revalidating=revalidating)
+        if in_background():
+            # Its own priority, so promoting this fetch leaves the rest of the background job alone
+            with background_priority() as priority:
+                inflight = _InFlightRequest(asyncio.ensure_future(fetch), priority)
+        else:
+            inflight = _InFlightRequest(asyncio.ensure_future(fetch))
+        inflight_key = self._inflight_key(cache_key, params)
+        AzurePricingServer._inflight[inflight_key] = inflight
+        inflight.task.add_done_callback(lambda _: self._forget_inflight(inflight_key, inflight))
+        return inflight
+
+    def _revalidate(self, url: str, params: dict[str, Any] | None, max_retries: int, cache_key: str) -> None:
+        """Refresh a stale cache entry in the background unless a fetch for it is already running."""
+        inflight = AzurePricingServer._inflight.get(self._inflight_key(cache_key, params))
+        if inflight is not None and not inflight.task.done():
+            return
+
+        inflight = self._start_fetch(url, params, max_retries, cache_key, revalidating=True)
+        inflight.task.add_done_callback(self._log_revalidation_failure)
 
+    @staticmethod
+    def _log_revalidation_failure(task: asyncio.Task) -> None:
+        """Log (and thereby retrieve) errors of background refreshes nobody awaits."""
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background cache refresh failed, serving stale data: {task.exception()}")
+
+    @staticmethod
+    def _forget_inflight(inflight_key: str, entry: _InFlightRequest) -> None:
+        """Drop a finished request from the in-flight table."""
+        if AzurePricingServer._inflight.get(inflight_key) is entry:
+            del AzurePricingServer._inflight[inflight_key]
+
+    async def _fetch(
+        self,
+        url: str,
+        params: dict[str, Any] | None,
+        max_retries: int,
+        cache_key: str | None,
+        revalidating: bool = False,
+    ) -> dict[str, Any]:
+        """
+        Fetch from the API with 429 retries, caching the response under `cache_key` if given.
+
+        Cached fetches consult the disk tier first and write successful responses
+        through to it, promoting disk hits into the memory tier. A stale disk hit is
+        returned marked with STALE_KEY and refreshed in the background; that refresh
+        (`revalidating`) only accepts fresh disk entries and otherwise goes upstream.
+        On a disk miss, the fetch takes the key's lease so that other processes
+        sharing the disk tier wait for this response instead of fetching it again.
+        """
+        disk_cache = AzurePricingServer._disk_cache
+        if cache_key is None or disk_cache is None:
+            return await self._fetch_upstream(url, params, max_retries, cache_key)
+
+        cached = await self._read_disk(cache_key, params, CACHE_TTL if revalidating else CACHE_MAX_STALENESS)
+        if cached is not None:
+            logger.debug(f"Disk cache hit for {url}")
+            data = self._promote_disk_entry(url, params, cache_key, cached)
+            if time.time() - cached[1] < CACHE_TTL:
+                CACHE_LOOKUPS.inc("disk", "hit")
+                return data
+            CACHE_LOOKUPS.inc("disk", "stale")
+            # Runs once this fetch has finished and left the in-flight table
+            asyncio.get_running_loop().call_soon(self._revalidate, url, params, max_retries, cache_key)
+            return {**data, STALE_KEY: True}
+        CACHE_LOOKUPS.inc("disk", "miss")
+
+        waited = False
+        while not await asyncio.to_thread(disk_cache.acquire_lease, cache_key):
+            waited = True
+            await asyncio.sleep(FETCH_LEASE_POLL_INTERVAL)
+        try:
+            if waited:
+                cached = await self._read_disk(cache_key, params, CACHE_TTL)
+                if cached is not None:
+                    # Fetched by the process that held the lease
+                    COALESCED_REQUESTS.inc()
+                    return self._promote_disk_entry(url, params, cache_key, cached)
+            return await self._fetch_upstream(url, params, max_retries, cache_key)
+        finally:
+            await asyncio.to_thread(disk_cache.release_lease, cache_key)
+
+    async def _read_disk(
+        self, cache_key: str, params: dict[str, Any] | None, max_age: float
+    ) -> tuple[dict[str, Any], float] | None:
+        """Read a disk-tier entry younger than `max_age` seconds that holds the requested `$top`."""
+        disk_cache = AzurePricingServer._disk_cache
+        if disk_cache is None:
+            return None
+        cached: tuple[dict[str, Any], float] | None = await asyncio.to_thread(disk_cache.get_entry, cache_key)
+        if cached is None or time.time() - cached[1] >= max_age or not covers_top(cached[0], requested_top(params)):
+            return None
+        return cached
+
+    def _promote_disk_entry(
+        self, url: str, params: dict[str, Any] | None, cache_key: str, cached: tuple[dict[str, Any], float]
+    ) -> dict[str, Any]:
+        """Copy a disk-tier entry into the memory tier and return its compacted response."""
+        data, fetched_at = compact_page(cached[0]), cached[1]
+        AzurePricingServer._cache[cache_key] = (fetched_at, data)
+        self._index_complete(url, params, cache_key, data)
+        return data
+
+    async def _fetch_upstream(
+        self, url: str, params: dict[str, Any] | None, max_retries: int, cache_key: str | None
+    ) -> dict[str, Any]:
+        """Request a response from the API, retrying on 429, and cache it in both tiers."""
+        import aiohttp
+
+        disk_cache = AzurePricingServer._disk_cache
         session = await self.get_session()
+        rate_limiter = AzurePricingServer._rate_limiter
         last_exception = None
 
         for attempt in range(max_retries + 1):  # 0, 1, 2, 3 (4 total attempts)
+            with RATE_LIMIT_WAIT.time():
+                await rate_limiter.acquire()
+            started = time.perf_counter()
             try:
                 async with session.get(url, params=params) as response:
-                    if response.status == 429:  # Too Many Requests
-                        if attempt < max_retries:
-                            wait_time = RATE_LIMIT_RETRY_BASE_WAIT * \
-                                (attempt + 1)  # 5, 10, 15 seconds
-                            logger.warning(
-                                f"Rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries + 1})"
-                            )
-                            await asyncio.sleep(wait_time)
-                            continue
-                        else:
-                            # Last attempt failed, raise the error
-                            response.raise_for_status()
-
-                    response.raise_for_status()
-                    json_data: dict[str, Any] = await response.json()
-
-                    # Cache successful response
-                    AzurePricingServer._cache[cache_key] = json_data
-                    return json_data
+                    UPSTREAM_REQUESTS.inc(str(response.status))
+                    if response.status != 429:  # Too Many Requests
+                        response.raise_for_status()
+                        json_data: dict[str, Any] = await response.json()
+                        UPSTREAM_LATENCY.observe(time.perf_counter() - started)
+                        rate_limiter.on_success()
+
+                        # Cache successful response, compacted in memory and as plain JSON on disk
+                        if cache_key is not None:
+                            if disk_cache is not None:
+                                await asyncio.to_thread(disk_cache.set, cache_key, json_data)
+                            json_data = compact_page(json_data)
+                            AzurePricingServer._cache[cache_key] = (time.time(), json_data)
+                            self._index_complete(url, params, cache_key, json_data)
+                        return json_data
+
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                    rate_limiter.on_throttle(retry_after)
+                    if attempt >= max_retries:
+                        # Last attempt failed, raise the error
+                        response.raise_for_status()
 
             except aiohttp.ClientResponseError as e:
                 if e.status == 429 and attempt < max_retries:
-                    wait_time = RATE_LIMIT_RETRY_BASE_WAIT * (attempt + 1)
-                    logger.warning(
-                        f"Rate limited (429). Retrying in {wait_time} seconds... (attempt {attempt + 1}/{max_retries + 1})"
-                    )
-                    await asyncio.sleep(wait_time)
+                    retry_after = parse_retry_after(e.headers.get("Retry-After") if e.headers else None)
+                    rate_limiter.on_throttle(retry_after)
                     last_exception = e
-                    continue
                 else:
                     logger.error(f"HTTP request failed: {e}")
                     raise
             except aiohttp.ClientError as e:
+                UPSTREAM_REQUESTS.inc("error")
                 logger.error(f"HTTP request failed: {e}")
                 raise
             except Exception as e:
                 logger.error(f"Unexpected error during request: {e}")
                 raise
 
+            # Throttled: back off outside the response context so the connection is released
+            wait_time = rate_limiter.backoff(attempt, retry_after)
+            limiter_state = rate_limiter.snapshot()
+            logger.warning(
+                f"Rate limited (429). Retrying in {wait_time:.1f} seconds... (attempt {attempt + 1}/{max_retries + 1}, "
+                f"rate {limiter_state['rate']}/s, queue depth {limiter_state['queue_depth']})"
+            )
+            await asyncio.sleep(wait_time)
+
         # If we get here, all retries failed
         if last_exception:
             raise last_exception
         raise RuntimeError("Request failed without exception")
 
+    async def _iter_pages(
+        self,
+        url: str,
+        params: dict[str, Any] | None = None,
+        max_items: int = MAX_PAGINATED_ITEMS,
+        prefetch: int = PAGE_PREFETCH_DEPTH,
+        use_cache: bool = True,
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Walk the NextPageLink chain of a query as an async generator of raw pages.
+
+        The API pages with a `$skip` offset, so once the first NextPageLink reveals the
+        page stride, up to `prefetch` following pages are requested concurrently on the
+        shared session while the caller processes the current one. Pages are yielded in
+        order, and no more pages are requested than needed to reach `max_items`.
+        Bulk walks (such as catalog downloads) pass use_cache=False to keep pages out of
+        the response cache.
+        """
+        first_page = await self._make_request(url, params, use_cache=use_cache)
+        yield first_page
+
+        seen = len(first_page.get("Items", []))
+        next_link = first_page.get("NextPageLink")
+        if not next_link or seen >= max_items:
+            return
+
+        next_url, next_params = split_page_link(next_link)
+        try:
+            offset = int(next_params["$skip"])
+            stride = offset - int((params or {}).get("$skip", 0))
+        except (KeyError, ValueError):
+            stride = 0
+
+        if stride <= 0:
+            # Unknown link format - fall back to following links one at a time
+            while next_link and seen < max_items:
+                page = await self._make_request(*split_page_link(next_link), use_cache=use_cache)
+                yield page
+                seen += len(page.get("Items", []))
+                next_link = page.get("NextPageLink")
+            return
+
+        pages_left = math.ceil((max_items - seen) / stride)
+        pending: deque[asyncio.Task] = deque()
+        try:
+            while pending or pages_left > 0:
+                # Keep the prefetch window full
+                while pages_left > 0 and len(pending) < max(prefetch, 1):
+                    page_params = {**next_params, "$skip": str(offset)}
+                    pending.append(
+                        asyncio.ensure_future(self._make_request(next_url, page_params, use_cache=use_cache))
+                    )
+                    offset += stride
+                    pages_left -= 1
+
+                page = await pending.popleft()
+                yield page
+                seen += len(page.get("Items", []))
+                if not page.get("NextPageLink") or seen >= max_items:
+                    break
+        finally:
+            # Drop speculative requests past the end of the result set or the item budget
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    async def _collect_items(self, params: dict[str, Any], limit: int) -> tuple[list[dict[str, Any]], bool, bool]:
+        """
+        Collect up to `limit` items for a query across as many pages as needed.
+
+        Returns:
+            Tuple of (items, has_more, stale) where has_more means the upstream result
+            set holds items beyond those returned, and stale means at least one page
+            was served from cache past its freshness TTL.
+        """
+        budget = min(limit, MAX_PAGINATED_ITEMS)
+        items: list[dict[str, Any]] = []
+        has_more = False
+        stale = False
+
+        pages = self._iter_pages(AZURE_PRICING_BASE_URL, params, max_items=budget)
+        try:
+            async for page in pages:
+                items.extend(page.get("Items", []))
+                has_more = bool(page.get("NextPageLink"))
+                stale = stale or bool(page.get(STALE_KEY))
+        finally:
+            await pages.aclose()
+
+        if len(items) > budget:
+            items = items[:budget]
+            has_more = True
+        return items, has_more, stale
+
+    async def _fan_out(
+        self,
+        calls: Sequence[Callable[[], Awaitable[T]]],
+        limit: int = FAN_OUT_CONCURRENCY,
+        timeout: float | None = FAN_OUT_TIMEOUT,
+    ) -> list[T | Exception]:
+        """
+        Run independent subqueries concurrently and return their results in input order.
+
+        At most `limit` of the `calls` (coroutine functions without arguments) run
+        at once; their upstream requests still share the rate limiter and in-flight
+        table. A call that fails or takes longer than `timeout` seconds yields its
+        exception in place of a result, so callers can use the partial results.
+        """
+        semaphore = asyncio.Semaphore(max(1, limit))
+
+        async def run(call: Callable[[], Awaitable[T]]) -> T | Exception:
+            async with semaphore:
+                try:
+                    return await asyncio.wait_for(call(), timeout)
+                except asyncio.TimeoutError:
+                    return TimeoutError(f"Timed out after {timeout} seconds")
+                except Exception as e:
+                    return e
+
+        return list(await asyncio.gather(*(run(call) for call in calls)))
+
     async def search_azure_prices(
         self,
         service_name: str | None = None,
@@ -267,41 +815,30 @@ class AzurePricingServer:
         validate_sku: bool = True,
     ) -> dict[str, Any]:
         """Search Azure retail prices with various filters, SKU validation, and discount support."""
+        odata_filter, params = self._search_params(
+            service_name, service_family, region, sku_name, price_type, currency_code, limit
+        )
 
-        # Build filter conditions
-        filter_conditions = []
-
-        if service_name:
-            filter_conditions.append(f"serviceName eq '{service_name}'")
-        if service_family:
-            filter_conditions.append(f"serviceFamily eq '{service_family}'")
-        if region:
-            filter_conditions.append(f"armRegionName eq '{region}'")
-        if sku_name:
-            filter_conditions.append(f"contains(skuName, '{sku_name}')")
-        if price_type:
-            filter_conditions.append(f"priceType eq '{price_type}'")
-
-        # Construct query parameters
-        params = {"api-version": DEFAULT_API_VERSION,
-                  "currencyCode": currency_code}
-
-        if filter_conditions:
-            params["$filter"] = " and ".join(filter_conditions)
-
-        # Limit results
-        if limit < MAX_RESULTS_PER_REQUEST:
-            params["$top"] = str(limit)
-
-        # Make request
-        data = await self._make_request(AZURE_PRICING_BASE_URL, params)
-
-        # Process results
-        items = data.get("Items", [])
-
-        # If we have more results than requested, truncate
-        if len(items) > limit:
-            items = items[:limit]
+        # Answer from the local catalog when it holds the whole scope, otherwise
+        # make the request, following NextPageLink until the limit is reached
+        catalog = AzurePricingServer._catalog
+        if catalog is not None and not catalog.covers(service_name, region, currency_code):
+            catalog = None
+        from_catalog = catalog is not None
+        stale = False
+        items: Sequence[Mapping[str, Any]]
+        if catalog is not None:
+            items, has_more = catalog.query(
+                service_name=service_name,
+                service_family=service_family,
+                region=region,
+                sku_name=sku_name,
+                price_type=price_type,
+                currency_code=currency_code,
+                limit=limit,
+            )
+        else:
+            items, has_more, stale = await self._collect_items(params, limit)
 
         # SKU validation and clarification
         validation_info = {}
@@ -321,11 +858,16 @@ class AzurePricingServer:
         result = {
             "items": items,
             "count": len(items) if isinstance(items, list) else 0,
-            "has_more": bool(data.get("NextPageLink")),
+            "has_more": has_more,
             "currency": currency_code,
-            "filters_applied": filter_conditions,
+            "filters_applied": odata_filter.to_list(),
         }
 
+        if from_catalog:
+            result["data_source"] = "local_catalog"
+        if stale:
+            result["stale"] = True
+
         # Add discount info if applied
         if discount_percentage is not None and discount_percentage > 0:
             result["discount_applied"] = {
@@ -337,6 +879,83 @@ class AzurePricingServer:
 
         return result
 
+    async def warm_query(
+        self,
+        service_name: str | None = None,
+        region: str | None = None,
+        sku_name: str | None = None,
+        price_type: str | None = None,
+        currency_code: str = "USD",
+        fresh_for: float = 0.0,
+    ) -> str:
+        """
+        Fetch the first page of a search into the response cache ahead of demand.
+
+        The page is requested the way `search_azure_prices` requests it at its largest
+        limit, so searches in the same scope are cache hits and narrower ones can be
+        answered by the query planner. Nothing is fetched when the local catalog covers
+        the query or the cached page stays fresh for another `fresh_for` seconds; an
+        identical request already in flight is joined.
+
+        Returns "catalog", "fresh" or "warmed".
+        """
+        catalog = AzurePricingServer._catalog
+        if catalog is not None and catalog.covers(service_name, region, currency_code):
+            return "catalog"
+
+        _, params = self._search_params(
+            service_name, None, region, sku_name, price_type, currency_code, MAX_RESULTS_PER_REQUEST
+        )
+        url, params = AZURE_PRICING_BASE_URL, canonical_params(params)
+        cache_key = self._cache_key(url, params)
+        entry = AzurePricingServer._cache.get(cache_key)
+        if entry is not None and time.time() - entry[0] < CACHE_TTL - fresh_for:
+            return "fresh"
+
+        inflight = AzurePricingServer._inflight.get(self._inflight_key(cache_key, params))
+        if inflight is None or inflight.task.done() or inflight.task.get_loop() is not asyncio.get_running_loop():
+            inflight = self._start_fetch(url, params, MAX_RETRIES, cache_key, revalidating=True)
+        await asyncio.shield(inflight.task)
+        return "warmed"
+
+    @staticmethod
+    def _search_params(
+        service_name: str | None,
+        service_family: str | None,
+        region: str | None,
+        sku_name: str | None,
+        price_type: str | None,
+        currency_code: str,
+        limit: int,
+    ) -> tuple[ODataFilter, dict[str, Any]]:
+        """Build the filter and query parameters of a price search."""
+        # Build filter conditions
+        filter_conditions = []
+
+        if service_name:
+            filter_conditions.append(eq("serviceName", service_name))
+        if service_family:
+            filter_conditions.append(eq("serviceFamily", service_family))
+        if region:
+            filter_conditions.append(eq("armRegionName", region))
+        if sku_name:
+            filter_conditions.append(contains("skuName", sku_name))
+        if price_type:
+            filter_conditions.append(eq("priceType", price_type))
+        odata_filter = ODataFilter(filter_conditions)
+
+        # Construct query parameters
+        params = {"api-version": DEFAULT_API_VERSION,
+                  "currencyCode": currency_code}
+
+        if odata_filter:
+            params["$filter"] = str(odata_filter)
+
+        # Limit results
+        if limit < MAX_RESULTS_PER_REQUEST:
+            params["$top"] = str(limit)
+        return odata_filter, params
+
     async def _validate_and_suggest_skus(
         self, service_name: str | None, sku_name: str, currency_code: str = "USD"
     ) -> dict[str, Any]:
@@ -396,7 +1015,9 @@ class AzurePricingServer:
             }
         }
 
-    def _apply_discount_to_items(self, items: list[dict], discount_percentage: float) -> list[dict]:
+    def _apply_discount_to_items(
+        self, items: Sequence[Mapping[str, Any]], discount_percentage: float
+    ) -> list[Mapping[str, Any]]:
         """Apply discount percentage to pricing items."""
         if not items:
             return []
@@ -404,15 +1025,16 @@ class AzurePricingServer:
         discounted_items = []
 
         for item in items:
-            discounted_item = item.copy()
+            # Only the changed fields are stored; cached rows are shared, not copied
+            discounted_fields = {}
 
             # Apply discount to retail price
             if "retailPrice" in item and item["retailPrice"]:
                 original_price = item["retailPrice"]
                 discounted_price = original_price * \
                     (1 - discount_percentage / 100)
-                discounted_item["retailPrice"] = round(discounted_price, 6)
-                discounted_item["originalPrice"] = original_price
+                discounted_fields["retailPrice"] = round(discounted_price, 6)
+                discounted_fields["originalPrice"] = original_price
 
             # Apply discount to savings plans if present
             if "savingsPlan" in item and item["savingsPlan"] and isinstance(item["savingsPlan"], list):
@@ -427,12 +1049,26 @@ class AzurePricingServer:
                             discounted_plan_price, 6)
                         discounted_plan["originalPrice"] = original_plan_price
                     discounted_savings.append(discounted_plan)
-                discounted_item["savingsPlan"] = discounted_savings
+                discounted_fields["savingsPlan"] = discounted_savings
 
-            discounted_items.append(discounted_item)
+            discounted_items.append(with_values(item, **discounted_fields))
 
         return discounted_items
 
+    async def get_catalog_status(self) -> dict[str, Any]:
+        """Get local price catalog contents and delta sync state."""
+        catalog = AzurePricingServer._catalog
+        if catalog is None:
+            return {"configured": False}
+
+        stats = catalog.stats()
+        return {
+            "configured": True,
+            "path": stats["path"],
+            "total_items": stats["total_items"],
+            "scopes": catalog.sync_status(),
+        }
+
     async def get_customer_discount(self, customer_id: str | None = None) -> dict[str, Any]:
         """Get customer discount information. Currently returns 10% default discount for all customers."""
 
@@ -460,35 +1096,42 @@ class AzurePricingServer:
         """Compare prices across different regions or SKUs."""
 
         comparisons = []
+        failed_regions: list[str] = []
 
         if regions and isinstance(regions, list):
-            # Compare across regions
-            for region in regions:
-                try:
-                    result = await self.search_azure_prices(
+            # Compare across regions, querying them concurrently
+            results = await self._fan_out(
+                [
+                    functools.partial(
+                        self.search_azure_prices,
                         service_name=service_name,
                         sku_name=sku_name,
                         region=region,
                         currency_code=currency_code,
                         limit=10,
                     )
+                    for region in regions
+                ]
+            )
+            for region, result in zip(regions, results, strict=True):
+                if isinstance(result, Exception):
+                    logger.warning(f"Failed to get prices for region {region}: {result}")
+                    failed_regions.append(region)
+                    continue
 
-                    if result["items"]:
-                        # Get the first item for comparison
-                        item = result["items"][0]
-                        comparisons.append(
-                            {
-                                "region": region,
-                                "sku_name": item.get("skuName"),
-                                "retail_price": item.get("retailPrice"),
-                                "unit_of_measure": item.get("unitOfMeasure"),
-                                "product_name": item.get("productName"),
-                                "meter_name": item.get("meterName"),
-                            }
-                        )
-                except Exception as e:
-                    logger.warning(
-                        f"Failed to get prices for region {region}: {e}")
+                if result["items"]:
+                    # Get the first item for comparison
+                    item = result["items"][0]
+                    comparisons.append(
+                        {
+                            "region": region,
+                            "sku_name": item.get("skuName"),
+                            "retail_price": item.get("retailPrice"),
+                            "unit_of_measure": item.get("unitOfMeasure"),
+                            "product_name": item.get("productName"),
+                            "meter_name": item.get("meterName"),
+                        }
+                    )
         else:
             # Compare different SKUs within the same service
             result = await self.search_azure_prices(service_name=service_name, currency_code=currency_code, limit=20)
@@ -529,6 +1172,8 @@ class AzurePricingServer:
             "currency": currency_code,
             "comparison_type": "regions" if regions else "skus",
         }
+        if failed_regions:
+            result["failed_regions"] = failed_regions
 
         # Add discount info if applied
         if discount_percentage is not None and discount_percentage > 0:
@@ -548,8 +1193,10 @@ class AzurePricingServer:
         """
         Recommend the cheapest Azure regions for a given service and SKU.
 
-        Dynamically discovers all available regions, fetches pricing in parallel batches,
-        and returns ranked recommendations sorted by price.
+        Runs in two passes: the first discovers every region offering the SKU from the
+        local catalog or by paging through its prices (see `_discover_regions`), the
+        second fetches each region's Consumption prices concurrently, each region
+        cached as its own response, and ranks them by price.
 
         Args:
             service_name: Azure service name (e.g., 'Virtual Machines')
@@ -570,20 +1217,16 @@ class AzurePricingServer:
 
         # Step 1: Discover all regions where this SKU is available
         # Try each search term variant until we get results
-        discovery_result: dict[str, Any] = {"items": []}
+        regions: list[str] = []
+        regions_complete = True
+        search_term = ""
 
         for search_term in search_terms:
-            discovery_result = await self.search_azure_prices(
-                service_name=service_name,
-                sku_name=search_term,
-                currency_code=currency_code,
-                limit=500,  # Get many results to discover regions
-                validate_sku=False,  # Skip validation for discovery
-            )
-            if discovery_result.get("items"):
+            regions, regions_complete = await self._discover_regions(service_name, search_term, currency_code)
+            if regions:
                 break
 
-        if not discovery_result["items"]:
+        if not regions:
             return {
                 "error": f"No pricing found for {display_sku} in service {service_name}",
                 "service_name": service_name,
@@ -593,13 +1236,39 @@ class AzurePricingServer:
                 "recommendations": [],
             }
 
+        # Step 2: Fetch each region's prices concurrently. When discovery fit in one
+        # page, these are answered locally from it (see _plan_from_cache)
+        region_results = await self._fan_out(
+            [
+                functools.partial(
+                    self.search_azure_prices,
+                    service_name=service_name,
+                    sku_name=search_term,
+                    region=region,
+                    price_type="Consumption",
+                    currency_code=currency_code,
+                    limit=MAX_RESULTS_PER_REQUEST,
+                    validate_sku=False,
+                )
+                for region in regions
+            ]
+        )
+        items: list[dict[str, Any]] = []
+        failed_regions: list[str] = []
+        for region_name, region_result in zip(regions, region_results, strict=True):
+            if isinstance(region_result, Exception):
+                logger.warning(f"Failed to get prices for region {region_name}: {region_result}")
+                failed_regions.append(region_name)
+            else:
+                items.extend(region_result["items"])
+
         # Extract unique regions with non-zero prices
         # Track both On-Demand and Spot pricing separately per region
         region_data: dict[str, dict[str, Any]] = {}
         # Track Spot pricing separately
         spot_data: dict[str, dict[str, Any]] = {}
 
-        for item in discovery_result["items"]:
+        for item in items:
             region = item.get("armRegionName")
             price = item.get("retailPrice", 0)
             location = item.get("location", region)
@@ -650,8 +1319,6 @@ class AzurePricingServer:
                 "recommendations": [],
             }
 
-        # Step 2: If we need more detailed pricing, fetch in parallel batches
-        # For now, we already have pricing from discovery - use it directly
         recommendations = list(region_data.values())
 
         # Step 3: Apply discount if provided
@@ -691,6 +1358,10 @@ class AzurePricingServer:
             "showing_top": min(top_n, len(recommendations)),
             "recommendations": top_recommendations,
         }
+        if failed_regions:
+            result["failed_regions"] = failed_regions
+        if not regions_complete:
+            result["regions_incomplete"] = True
 
         # Add summary statistics
         if recommendations:
@@ -713,6 +1384,53 @@ class AzurePricingServer:
 
         return result
 
+    async def _discover_regions(self, service_name: str, sku_term: str, currency_code: str) -> tuple[list[str], bool]:
+        """
+        List the regions with a Consumption price for a SKU.
+
+        Reads the distinct regions from the local catalog when it holds the whole
+        service. Otherwise walks every page of the SKU's Consumption prices, keeping
+        only the region of each item, since the API can't return region names alone.
+        Spot, Low Priority and Windows meters fill the first pages of large SKUs, so
+        stopping early would drop regions from the ranking. A result that fits in one
+        page is also what the per-region queries are planned from.
+
+        Returns:
+            Tuple of (regions, complete) where complete is False only when the walk hit
+            MAX_DISCOVERY_ITEMS before the last page. Complete upstream lists are kept
+            in the region index for CACHE_TTL.
+        """
+        catalog = AzurePricingServer._catalog
+        if catalog is not None and catalog.covers(service_name, None, currency_code):
+            return catalog.regions(service_name, sku_term, "Consumption", currency_code), True
+
+        index_key = (service_name, sku_term, currency_code.upper())
+        cached_regions = AzurePricingServer._region_index.get(index_key)
+        if cached_regions is not None:
+            return cached_regions, True
+
+        _, params = self._search_params(
+            service_name, None, None, sku_term, "Consumption", currency_code, MAX_RESULTS_PER_REQUEST
+        )
+        found: set[str] = set()
+        has_more = False
+        pages = self._iter_pages(AZURE_PRICING_BASE_URL, params, max_items=MAX_DISCOVERY_ITEMS)
+        try:
+            async for page in pages:
+                found.update(item["armRegionName"] for item in page.get("Items", []) if item.get("armRegionName"))
+                has_more = bool(page.get("NextPageLink"))
+        finally:
+            await pages.aclose()
+
+        regions = sorted(found)
+        if has_more:
+            logger.warning(
+                f"Region discovery for {sku_term} in {service_name} stopped after {MAX_DISCOVERY_ITEMS} prices"
+            )
+        elif regions:
+            AzurePricingServer._region_index[index_key] = regions
+        return regions, not has_more
+
     async def estimate_costs(
         self,
         service_name: str,
@@ -823,36 +1541,288 @@ class AzurePricingServer:
 
         return result
 
+    async def price_batch(
+        self, queries: list[dict[str, Any]], max_concurrency: int = BATCH_MAX_CONCURRENCY
+    ) -> dict[str, Any]:
+        """
+        Run many price searches and cost estimates concurrently.
+
+        Each query holds `search_azure_prices` arguments, or `estimate_costs` arguments
+        with `"kind": "estimate"`, and an optional `id` echoed in its result. Up to
+        `max_concurrency` queries run at once (see `_fan_out`) and identical queries
+        run only once. Results are compact and in input order, each with its own
+        status, so one bad or slow query doesn't fail the batch.
+        """
+        if not isinstance(queries, list) or not queries:
+            return {"error": "queries must be a non-empty list of query objects"}
+        if len(queries) > MAX_BATCH_QUERIES:
+            return {"error": f"A batch holds at most {MAX_BATCH_QUERIES} queries, got {len(queries)}"}
+
+        # Identical queries (ignoring their ids) share one run
+        unique: dict[str, Any] = {}
+        query_keys = []
+        for query in queries:
+            arguments = {k: v for k, v in query.items() if k != "id"} if isinstance(query, dict) else query
+            key = json.dumps(arguments, sort_keys=True, default=str)
+            unique.setdefault(key, arguments)
+            query_keys.append(key)
+        outcomes = dict(
+            zip(
+                unique,
+                await self._fan_out(
+                    [functools.partial(self._run_batch_query, arguments) for arguments in unique.values()],
+                    limit=max_concurrency,
+                ),
+                strict=True,
+            )
+        )
+
+        results = []
+        monthly_totals: dict[str, float] = {}
+        for index, (query, key) in enumerate(zip(queries, query_keys, strict=True)):
+            entry: dict[str, Any] = {"index": index}
+            if isinstance(query, dict) and "id" in query:
+                entry["id"] = query["id"]
+            outcome = outcomes[key]
+            if isinstance(outcome, Exception):
+                entry.update(status="error", error=str(outcome))
+            else:
+                entry.update(status="ok", **outcome)
+                if "monthly_cost" in entry:
+                    currency = entry["currency"]
+                    monthly_totals[currency] = round(monthly_totals.get(currency, 0) + entry["monthly_cost"], 2)
+            results.append(entry)
+
+        failed = sum(1 for entry in results if entry["status"] == "error")
+        summary = {
+            "results": results,
+            "total_queries": len(results),
+            "unique_queries": len(unique),
+            "succeeded": len(results) - failed,
+            "failed": failed,
+        }
+        if monthly_totals:
+            summary["monthly_cost_totals"] = monthly_totals
+        return summary
+
+    async def _run_batch_query(self, query: dict[str, Any]) -> dict[str, Any]:
+        """Run one batch query and reduce its result to the fields an estimate needs."""
+        if not isinstance(query, dict):
+            raise ValueError("query must be an object")
+        arguments = dict(query)
+        kind = arguments.pop("kind", "search")
+
+        if kind == "estimate":
+            result = await self.estimate_costs(**arguments)
+            if "error" in result:
+                raise ValueError(result["error"])
+            pricing = result["on_demand_pricing"]
+            return {
+                "kind": kind,
+                "service_name": result["service_name"],
+                "sku_name": result["sku_name"],
+                "region": result["region"],
+                "product_name": result["product_name"],
+                "unit_of_measure": result["unit_of_measure"],
+                "currency": result["currency"],
+                "hourly_rate": pricing["hourly_rate"],
+                "monthly_cost": pricing["monthly_cost"],
+                "yearly_cost": pricing["yearly_cost"],
+                "savings_plans": [
+                    {"term": plan["term"], "monthly_cost": plan["monthly_cost"]} for plan in result["savings_plans"]
+                ],
+            }
+
+        if kind != "search":
+            raise ValueError(f"Unknown query kind '{kind}', expected 'search' or 'estimate'")
+        result = await self.search_azure_prices(**arguments)
+        compact = {
+            "kind": kind,
+            "count": result["count"],
+            "has_more": result["has_more"],
+            "currency": result["currency"],
+            "items": [
+                {
+                    "sku_name": item.get("skuName"),
+                    "product_name": item.get("productName"),
+                    "region": item.get("armRegionName"),
+                    "retail_price": item.get("retailPrice"),
+                    "unit_of_measure": item.get("unitOfMeasure"),
+                    "type": item.get("type"),
+                }
+                for item in result["items"][:BATCH_ITEMS_PER_QUERY]
+            ],
+        }
+        if result.get("stale"):
+            compact["stale"] = True
+        return compact
+
+    async def estimate_bom(
+        self,
+        resources: list[dict[str, Any]],
+        region: str | None = None,
+        currency_code: str = "USD",
+        discount_percentage: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Estimate the monthly and annual cost of a whole bill of materials.
+
+        Each resource gives service_name, sku_name, region (or the default `region`),
+        and optionally quantity, hours_per_month, storage_gb, transactions and a
+        product_name hint. The price items of every distinct (service, SKU, region)
+        are looked up once, FAN_OUT_CONCURRENCY at a time, and the BOM is priced in
+        one pass (see bom.py). A resource whose lookup fails is reported without
+        failing the BOM.
+        """
+        from .bom import lookup_key, parse_resources, price_bom, select_meters
+
+        try:
+            parsed = parse_resources(resources, default_region=region)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        keys = list(dict.fromkeys(lookup_key(resource) for resource in parsed))
+        lookups = dict(
+            zip(
+                keys,
+                await self._fan_out([functools.partial(self._lookup_bom_items, *key, currency_code) for key in keys]),
+                strict=True,
+            )
+        )
+
+        meters: list[Any] = []
+        stale = False
+        for resource in parsed:
+            lookup = lookups[lookup_key(resource)]
+            if isinstance(lookup, Exception):
+                meters.append(lookup)
+                continue
+            items, sku_names, lookup_stale = lookup
+            stale = stale or lookup_stale
+            meters.append(select_meters(resource, items, sku_names))
+
+        result = {"currency": currency_code, **price_bom(parsed, meters, discount_percentage)}
+        result["unique_lookups"] = len(keys)
+        if discount_percentage is not None and discount_percentage > 0:
+            result["discount_applied"] = {
+                "percentage": discount_percentage, "note": "All prices shown are after discount"}
+        if stale:
+            result["stale"] = True
+        return result
+
+    async def _lookup_bom_items(
+        self, service_name: str, sku_name: str, region: str, currency_code: str
+    ) -> tuple[list[dict[str, Any]], list[str], bool]:
+        """
+        Fetch the Consumption price items a BOM resource is priced from.
+
+        The SKU is searched as given first, then in its other formats (see
+        `normalize_sku_name`) and without spaces, as some services write "P1 v3"
+        and others "P1v3". Returns (items, SKU names searched, stale).
+        """
+        search_terms, _ = normalize_sku_name(sku_name)
+        search_terms = list(dict.fromkeys([sku_name, *search_terms, sku_name.replace(" ", "")]))
+        for search_term in search_terms:
+            result = await self.search_azure_prices(
+                service_name=service_name,
+                sku_name=search_term,
+                region=region,
+                price_type="Consumption",
+                currency_code=currency_code,
+                limit=MAX_RESULTS_PER_REQUEST,
+                validate_sku=False,
+            )
+            if result["items"]:
+                return result["items"], search_terms, bool(result.get("stale"))
+        return [], search_terms, False
+
+    async def estimate_template(
+        self,
+        template_path: str,
+        parameters: dict[str, Any] | None = None,
+        parameters_file: str | None = None,
+        region: str | None = None,
+        usage: dict[str, dict[str, Any]] | None = None,
+        currency_code: str = "USD",
+        discount_percentage: float | None = None,
+    ) -> dict[str, Any]:
+        """
+        Estimate the cost of deploying a compiled ARM template, such as a bicep project's main.json.
+
+        The template's resources, including those of nested deployments, are mapped
+        to a bill of materials (see arm.py) and priced with `estimate_bom`.
+        `parameters` override the values of `parameters_file`, or of a main.bicepparam
+        next to the template. `usage` adds usage (storage_gb, transactions,
+        hours_per_month) to resources by name or type, and `region` stands in for
+        locations the template only knows at deployment time.
+        """
+        from .arm import TemplateError, load_template, resolve_template_path, template_bom, template_resources
+
+        try:
+            path = resolve_template_path(template_path)
+            template, values = load_template(path, parameters_file)
+            resources = template_resources(template, {**values, **(parameters or {})}, region)
+        except TemplateError as e:
+            return {"error": str(e)}
+        lines, not_priced, free = template_bom(resources, region, usage)
+
+        if lines:
+            result = await self.estimate_bom(
+                lines, currency_code=currency_code, discount_percentage=discount_percentage
+            )
+            if "error" in result:
+                return result
+        else:
+            from .bom import price_bom
+
+            result = {"currency": currency_code, **price_bom([], []), "unique_lookups": 0}
+        result["template"] = {
+            "path": str(path),
+            "resources": len(resources),
+            "priced": len(lines),
+            "free": free,
+            "not_priced": not_priced,
+        }
+        return result
+
     async def discover_skus(
         self, service_name: str, region: str | None = None, price_type: str = "Consumption", limit: int = 100
     ) -> dict[str, Any]:
         """Discover available SKUs for a specific Azure service."""
 
         # Build filter conditions
-        filter_conditions = [f"serviceName eq '{service_name}'"]
+        filter_conditions = [eq("serviceName", service_name)]
 
         if region:
-            filter_conditions.append(f"armRegionName eq '{region}'")
+            filter_conditions.append(eq("armRegionName", region))
 
         if price_type:
-            filter_conditions.append(f"priceType eq '{price_type}'")
+            filter_conditions.append(eq("priceType", price_type))
+        odata_filter = ODataFilter(filter_conditions)
 
         # Construct query parameters
         params = {"api-version": DEFAULT_API_VERSION, "currencyCode": "USD"}
 
-        if filter_conditions:
-            params["$filter"] = " and ".join(filter_conditions)
+        if odata_filter:
+            params["$filter"] = str(odata_filter)
 
         # Limit results
         if limit < MAX_RESULTS_PER_REQUEST:
             params["$top"] = str(limit)
 
-        # Make request
-        data = await self._make_request(AZURE_PRICING_BASE_URL, params)
+        # Answer from the local catalog when it holds the whole scope, otherwise
+        # make the request, following NextPageLink until the limit is reached
+        catalog = AzurePricingServer._catalog
+        stale = False
+        if catalog is not None and catalog.covers(service_name, region, "USD"):
+            items, has_more = catalog.query(
+                service_name=service_name, region=region, price_type=price_type, currency_code="USD", limit=limit
+            )
+        else:
+            items, has_more, stale = await self._collect_items(params, limit)
 
         # Process and deduplicate SKUs
         skus = {}
-        items = data.get("Items", [])
 
         for item in items:
             sku_name = item.get("skuName")
@@ -882,13 +1852,18 @@ class AzurePricingServer:
         sku_list = list(skus.values())
         sku_list.sort(key=lambda x: x["sku_name"])
 
-        return {
+        result = {
             "service_name": service_name,
             "skus": sku_list,
             "total_skus": len(sku_list),
             "price_type": price_type,
             "region_filter": region,
+            "has_more": has_more,
         }
+        if stale:
+            result["stale"] = True
+
+        return result
 
     async def search_azure_prices_with_fuzzy_matching(
         self,
@@ -929,6 +1904,18 @@ class AzurePricingServer:
 
         return exact_result
 
+    @staticmethod
+    def service_name_index() -> "ServiceNameIndex":
+        """The index resolving fuzzy service names: embedded snapshot, aliases and the local catalog's names."""
+        if AzurePricingServer._service_names is None:
+            from .names import ServiceNameIndex
+
+            catalog = AzurePricingServer._catalog
+            AzurePricingServer._service_names = ServiceNameIndex.build(
+                SERVICE_NAME_MAPPINGS, catalog.service_names() if catalog is not None else ()
+            )
+        return AzurePricingServer._service_names
+
     async def _find_similar_services(
         self,
         service_name: str | None = None,
@@ -936,75 +1923,46 @@ class AzurePricingServer:
         currency_code: str = "USD",
         limit: int = 50,
     ) -> dict[str, Any]:
-        """Find services with similar names or suggest alternatives."""
+        """
+        Find services with similar names or suggest alternatives.
 
-        suggestions = []
-        search_term = service_name.lower() if service_name else ""
+        Names are resolved locally by the service name index. The API is only
+        queried for the prices of the service an exact alias or product name
+        stands for, never to probe candidates.
+        """
+        from .names import SERVICE_FAMILY, suggestion_reason
 
-        # Try exact mapping first
-        if search_term in SERVICE_NAME_MAPPINGS:
-            correct_name = SERVICE_NAME_MAPPINGS[search_term]
-            result = await self.search_azure_prices(service_name=correct_name, currency_code=currency_code, limit=limit)
+        search_term = service_name or service_family or ""
+        matches = self.service_name_index().search(search_term)
+
+        # Try an exact alias or product name first
+        best = matches[0] if matches else None
+        if best and best.exact and best.field != SERVICE_FAMILY and best.service_name != service_name:
+            result = await self.search_azure_prices(
+                service_name=best.service_name, currency_code=currency_code, limit=limit
+            )
 
             if result["items"]:
-                result["suggestion_used"] = correct_name
+                result["suggestion_used"] = best.service_name
                 result["original_search"] = service_name
                 result["match_type"] = "exact_mapping"
                 return result
 
-        # Try partial matching for common terms
-        partial_matches = []
-        for user_term, azure_service in SERVICE_NAME_MAPPINGS.items():
-            if search_term in user_term or user_term in search_term:
-                partial_matches.append(azure_service)
-
-        # Remove duplicates and try each match
-        for azure_service in list(set(partial_matches)):
-            result = await self.search_azure_prices(service_name=azure_service, currency_code=currency_code, limit=5)
-
-            if result["items"]:
-                suggestions.append(
-                    {
-                        "service_name": azure_service,
-                        "match_reason": f"Partial match for '{service_name}'",
-                        "sample_items": result["items"][:3],
-                    }
-                )
-
-        # If still no matches, do a broad search and look for similar services
-        if not suggestions:
-            broad_result = await self.search_azure_prices(
-                service_family=service_family, currency_code=currency_code, limit=100
+        # Sample prices of the suggestions come from the local catalog, if one is attached
+        catalog = AzurePricingServer._catalog
+        suggestions = []
+        for match in matches:
+            sample_items: list[dict[str, Any]] = []
+            if catalog is not None:
+                sample_items, _ = catalog.query(service_name=match.service_name, currency_code=currency_code, limit=3)
+            suggestions.append(
+                {
+                    "service_name": match.service_name,
+                    "match_reason": suggestion_reason(match, search_term),
+                    "sample_items": sample_items,
+                }
             )
 
-            # Find services that contain the search term
-            matching_services = set()
-            for item in broad_result.get("items", []):
-                service = item.get("serviceName", "")
-                product = item.get("productName", "")
-
-                if (
-                    search_term in service.lower()
-                    or search_term in product.lower()
-                    or any(word in service.lower() for word in search_term.split())
-                ):
-                    matching_services.add(service)
-
-            # Create suggestions from found services
-            for service in list(matching_services)[:5]:  # Limit to top 5
-                service_result = await self.search_azure_prices(
-                    service_name=service, currency_code=currency_code, limit=3
-                )
-
-                if service_result["items"]:
-                    suggestions.append(
-                        {
-                            "service_name": service,
-                            "match_reason": f"Contains '{search_term}'",
-                            "sample_items": service_result["items"][:2],
-                        }
-                    )
-
         return {
             "items": [],
             "count": 0,
@@ -1100,208 +2058,30 @@ class AzurePricingServer:
         }
 
 
+REGISTRY.gauge(
+    "azure_pricing_cache_entries", "Responses held in the in-memory cache.", lambda: len(AzurePricingServer._cache)
+)
+REGISTRY.gauge(
+    "azure_pricing_inflight_requests", "Distinct upstream requests in flight.", lambda: len(AzurePricingServer._inflight)
+)
+REGISTRY.gauge(
+    "azure_pricing_rate_limit_rate",
+    "Current upstream request rate allowed by the adaptive limiter (requests per second).",
+    lambda: AzurePricingServer._rate_limiter.rate,
+)
+REGISTRY.gauge(
+    "azure_pricing_rate_limit_queue_depth",
+    "Requests waiting for an upstream rate limiter token.",
+    lambda: AzurePricingServer.rate_limit_status()["queue_depth"],
+)
+
+
 def create_server() -> Server:
     """Create and configure the MCP server instance."""
     server = Server("azure-pricing")
     pricing_server = AzurePricingServer()
 
-    @server.list_tools()
-    async def handle_list_tools() -> list[Tool]:
-        """List available tools."""
-        return [
-            Tool(
-                name="azure_price_search",
-                description="Search Azure retail prices with various filters",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service_name": {
-                            "type": "string",
-                            "description": "Azure service name (e.g., 'Virtual Machines', 'Storage')",
-                        },
-                        "service_family": {
-                            "type": "string",
-                            "description": "Service family (e.g., 'Compute', 'Storage', 'Networking')",
-                        },
-                        "region": {"type": "string", "description": "Azure region (e.g., 'eastus', 'westeurope')"},
-                        "sku_name": {
-                            "type": "string",
-                            "description": "SKU name to search for (partial matches supported)",
-                        },
-                        "price_type": {
-                            "type": "string",
-                            "description": "Price type: 'Consumption', 'Reservation', or 'DevTestConsumption'",
-                        },
-                        "currency_code": {
-                            "type": "string",
-                            "description": "Currency code (default: USD)",
-                            "default": "USD",
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results (default: 50)",
-                            "default": 50,
-                        },
-                        "discount_percentage": {
-                            "type": "number",
-                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
-                        },
-                        "validate_sku": {
-                            "type": "boolean",
-                            "description": "Whether to validate SKU names and provide suggestions (default: true)",
-                            "default": True,
-                        },
-                    },
-                },
-            ),
-            Tool(
-                name="azure_price_compare",
-                description="Compare Azure prices across regions or SKUs",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service_name": {"type": "string", "description": "Azure service name to compare"},
-                        "sku_name": {"type": "string", "description": "Specific SKU to compare (optional)"},
-                        "regions": {
-                            "type": "array",
-                            "items": {"type": "string"},
-                            "description": "List of regions to compare (if not provided, compares SKUs)",
-                        },
-                        "currency_code": {
-                            "type": "string",
-                            "description": "Currency code (default: USD)",
-                            "default": "USD",
-                        },
-                        "discount_percentage": {
-                            "type": "number",
-                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
-                        },
-                    },
-                    "required": ["service_name"],
-                },
-            ),
-            Tool(
-                name="azure_cost_estimate",
-                description="Estimate Azure costs based on usage patterns",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service_name": {"type": "string", "description": "Azure service name"},
-                        "sku_name": {"type": "string", "description": "SKU name"},
-                        "region": {"type": "string", "description": "Azure region"},
-                        "hours_per_month": {
-                            "type": "number",
-                            "description": "Expected hours of usage per month (default: 730 for full month)",
-                            "default": 730,
-                        },
-                        "currency_code": {
-                            "type": "string",
-                            "description": "Currency code (default: USD)",
-                            "default": "USD",
-                        },
-                        "discount_percentage": {
-                            "type": "number",
-                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
-                        },
-                    },
-                    "required": ["service_name", "sku_name", "region"],
-                },
-            ),
-            Tool(
-                name="azure_discover_skus",
-                description="Discover available SKUs for a specific Azure service",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service_name": {"type": "string", "description": "Azure service name"},
-                        "region": {"type": "string", "description": "Azure region (optional)"},
-                        "price_type": {
-                            "type": "string",
-                            "description": "Price type (default: 'Consumption')",
-                            "default": "Consumption",
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of SKUs to return (default: 100)",
-                            "default": 100,
-                        },
-                    },
-                    "required": ["service_name"],
-                },
-            ),
-            Tool(
-                name="azure_sku_discovery",
-                description="Discover available SKUs for Azure services with intelligent name matching",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service_hint": {
-                            "type": "string",
-                            "description": "Service name or description (e.g., 'app service', 'web app', 'vm', 'storage'). Supports fuzzy matching.",
-                        },
-                        "region": {"type": "string", "description": "Optional Azure region to filter results"},
-                        "currency_code": {
-                            "type": "string",
-                            "description": "Currency code (default: USD)",
-                            "default": "USD",
-                        },
-                        "limit": {
-                            "type": "integer",
-                            "description": "Maximum number of results (default: 30)",
-                            "default": 30,
-                        },
-                    },
-                    "required": ["service_hint"],
-                },
-            ),
-            Tool(
-                name="azure_region_recommend",
-                description="Find the cheapest Azure regions for a given service and SKU. Dynamically discovers all available regions, compares prices, and returns ranked recommendations with savings percentages.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "service_name": {
-                            "type": "string",
-                            "description": "Azure service name (e.g., 'Virtual Machines', 'Azure App Service')",
-                        },
-                        "sku_name": {
-                            "type": "string",
-                            "description": "SKU name to price across regions (e.g., 'D4s v3', 'P1v3')",
-                        },
-                        "top_n": {
-                            "type": "integer",
-                            "description": "Number of top recommendations to return (default: 10)",
-                            "default": 10,
-                        },
-                        "currency_code": {
-                            "type": "string",
-                            "description": "Currency code (default: USD)",
-                            "default": "USD",
-                        },
-                        "discount_percentage": {
-                            "type": "number",
-                            "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
-                        },
-                    },
-                    "required": ["service_name", "sku_name"],
-                },
-            ),
-            Tool(
-                name="get_customer_discount",
-                description="Get customer discount information. Returns default 10% discount for all customers.",
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "customer_id": {
-                            "type": "string",
-                            "description": "Customer ID (optional, defaults to 'default' customer)",
-                        }
-                    },
-                },
-            ),
-        ]
-
-    # Import and register the tool handler
+    # Import and register the tool handlers (see tools.py)
     from .handlers import register_tool_handlers
 
     register_tool_handlers(server, pricing_server)
@@ -1309,10 +2089,57 @@ def create_server() -> Server:
     return server
 
 
+def create_http_app(server: Server):
+    """
+    Build the Starlette app for the HTTP transport.
+
+    Serves MCP over SSE at `/sse` and `/messages/`, and metrics in the Prometheus
+    text format at `/metrics`.
+    """
+    from mcp.server.sse import SseServerTransport
+    from starlette.applications import Starlette
+    from starlette.requests import Request
+    from starlette.responses import Response
+    from starlette.routing import Mount, Route
+
+    # Create SSE transport
+    sse = SseServerTransport("/messages/")
+
+    async def handle_sse(request: Request):
+        async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+            initialization_options = server.create_initialization_options(
+                notification_options=NotificationOptions(tools_changed=True)
+            )
+            await server.run(streams[0], streams[1], initialization_options)
+        return Response()
+
+    async def handle_metrics(request: Request):
+        return Response(render_latest(), media_type=CONTENT_TYPE_LATEST)
+
+    return Starlette(
+        routes=[
+            Route("/sse", endpoint=handle_sse),
+            Route("/metrics", endpoint=handle_metrics),
+            Mount("/messages/", app=sse.handle_post_message),
+        ]
+    )
+
+
+def configure_logging() -> None:
+    """Log to stderr: on the stdio transport, stdout carries the JSON-RPC stream."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+        stream=sys.stderr,
+    )
+
+
 async def main():
     """Main entry point for the server."""
     import argparse
 
+    configure_logging()
+
     # Parse command-line arguments
     parser = argparse.ArgumentParser(description="Azure Pricing MCP Server")
     parser.add_argument(
@@ -1326,40 +2153,135 @@ async def main():
     )
     parser.add_argument("--port", type=int, default=8080,
                         help="Port for HTTP server (default: 8080)")
+    parser.add_argument(
+        "--catalog",
+        metavar="PATH",
+        help="Answer covered queries from a local price catalog (see: python -m azure_pricing_mcp.catalog)",
+    )
 
     # Only parse known args to avoid issues with MCP passing additional args
+    parser.add_argument(
+        "--cache-dir",
+        metavar="DIR",
+        help="Persist cached API responses in DIR so they survive restarts (default: memory only)",
+    )
+    parser.add_argument(
+        "--cache-max-mb",
+        type=float,
+        help="Size limit of the persistent cache in MB of compressed responses (default: 256)",
+    )
+    parser.add_argument(
+        "--cache-ttl",
+        type=float,
+        help="Lifetime of persistent cache entries in seconds (default: 86400)",
+    )
+    parser.add_argument(
+        "--warm-cache",
+        action="store_true",
+        help="Preload the in-memory cache from the persistent cache at startup",
+    )
+    parser.add_argument(
+        "--prewarm",
+        nargs="?",
+        const="",
+        metavar="MANIFEST",
+        help="Keep the hot queries of a JSON manifest cached, fetching them in the background after startup "
+        "and before they expire (without MANIFEST: App Service, SQL Database, Storage and Static Web Apps "
+        "in swedencentral, westeurope and eastus)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="HTTP worker processes behind a session-aware router, sharing one response cache (default: 1)",
+    )
+    # Set by the router on its workers: use 1/N of the upstream rate limit
+    parser.add_argument("--upstream-share", type=int, default=1, help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--api-url",
+        default=AZURE_PRICING_BASE_URL,
+        help="Retail Prices API endpoint, e.g. a local fake for load testing (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--print-startup-profile",
+        action="store_true",
+        help="Report the import cost of each module and the time to the first tools/list, then exit",
+    )
+
     args, _ = parser.parse_known_args()
 
-    server = create_server()
+    if args.print_startup_profile:
+        from .startup import startup_profile
 
-    if args.transport == "http":
-        # Use HTTP transport for remote access (Docker use case)
-        from mcp.server.sse import SseServerTransport
-        from starlette.applications import Starlette
-        from starlette.requests import Request
-        from starlette.responses import Response
-        from starlette.routing import Mount, Route
+        print(await startup_profile())
+        return
 
-        logger.info(f"Starting HTTP MCP server on {args.host}:{args.port}")
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+    if args.workers > 1:
+        if args.transport != "http":
+            parser.error("--workers requires --transport http")
+        from .workers import serve_workers
 
-        # Create SSE transport
-        sse = SseServerTransport("/messages/")
+        await serve_workers(args)
+        return
 
-        async def handle_sse(request: Request):
-            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
-                initialization_options = server.create_initialization_options(
-                    notification_options=NotificationOptions(
-                        tools_changed=True)
-                )
-                await server.run(streams[0], streams[1], initialization_options)
-            return Response()
+    if args.upstream_share > 1:
+        AzurePricingServer.attach_rate_limiter(AzurePricingServer._rate_limiter.split(args.upstream_share))
 
-        app = Starlette(
-            routes=[
-                Route("/sse", endpoint=handle_sse),
-                Mount("/messages/", app=sse.handle_post_message),
-            ]
+    if args.api_url != AZURE_PRICING_BASE_URL:
+        set_api_url(args.api_url)
+        logger.info(f"Using Retail Prices API at {args.api_url}")
+
+    if args.catalog:
+        from .catalog import PriceCatalog
+
+        AzurePricingServer.attach_catalog(PriceCatalog(args.catalog))
+        logger.info(f"Using local price catalog at {args.catalog}")
+
+    if args.cache_dir:
+        from .cache import DEFAULT_DISK_CACHE_MAX_BYTES, DEFAULT_DISK_CACHE_TTL, DISK_CACHE_FILENAME, DiskCache
+
+        disk_cache = DiskCache(
+            os.path.join(args.cache_dir, DISK_CACHE_FILENAME),
+            max_bytes=(
+                int(args.cache_max_mb * 1024 * 1024) if args.cache_max_mb is not None else DEFAULT_DISK_CACHE_MAX_BYTES
+            ),
+            ttl=args.cache_ttl if args.cache_ttl is not None else DEFAULT_DISK_CACHE_TTL,
         )
+        AzurePricingServer.attach_disk_cache(disk_cache, warm=args.warm_cache)
+        logger.info(f"Using persistent response cache at {disk_cache.path}")
+
+    prewarmer = None
+    if args.prewarm is not None:
+        from .prewarm import CachePrewarmer, load_manifest
+
+        try:
+            queries, interval = load_manifest(args.prewarm)
+        except ValueError as e:
+            parser.error(str(e))
+        prewarmer = CachePrewarmer(AzurePricingServer(), queries, interval)
+
+    server = create_server()
+
+    if prewarmer is not None:
+        # Runs behind the transport, which starts serving right away
+        prewarmer.start()
+        logger.info(f"Pre-warming {len(prewarmer.queries)} queries every {interval:.0f}s")
+
+    try:
+        await _serve(server, args)
+    finally:
+        if prewarmer is not None:
+            await prewarmer.stop()
+
+
+async def _serve(server: Server, args: Any) -> None:
+    """Serve MCP sessions over the transport chosen on the command line."""
+    if args.transport == "http":
+        # Use HTTP transport for remote access (Docker use case)
+        logger.info(f"Starting HTTP MCP server on {args.host}:{args.port}")
+        app = create_http_app(server)
 
         import uvicorn
 
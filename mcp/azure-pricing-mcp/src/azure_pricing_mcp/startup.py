@@ -0,0 +1,119 @@
+"""
+Startup profiling for Azure Pricing MCP Server.
+
+MCP clients start `python -m azure_pricing_mcp` once per editor window, so the
+time to the first tools/list counts against every agent session. Nearly all of
+it is spent importing modules; anything the stdio path doesn't need before the
+first tool call (aiohttp, the persistent cache and the price catalog, template
+pricing, service name resolution, pre-warming, the worker router) is imported
+where it is first used instead (DEFERRED_MODULES).
+
+Usage:
+    python -m azure_pricing_mcp --print-startup-profile
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import NamedTuple
+
+PACKAGE = "azure_pricing_mcp"
+STARTUP_MODULE = f"{PACKAGE}.__main__"
+
+# Modules kept off the stdio startup path
+DEFERRED_MODULES = (
+    "aiohttp",
+    "sqlite3",
+    f"{PACKAGE}.arm",
+    f"{PACKAGE}.cache",
+    f"{PACKAGE}.catalog",
+    f"{PACKAGE}.names",
+    f"{PACKAGE}.prewarm",
+    f"{PACKAGE}.startup",
+    f"{PACKAGE}.workers",
+)
+
+PROFILE_TOP_MODULES = 15  # slowest modules listed by the profile
+
+
+class ImportCost(NamedTuple):
+    """Import time of one module as reported by `python -X importtime`."""
+
+    module: str
+    self_ms: float
+    cumulative_ms: float
+
+
+def profile_imports(module: str = STARTUP_MODULE) -> list[ImportCost]:
+    """Import `module` in a fresh interpreter and return the cost of every module it imported."""
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))}
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        check=True,
+    )
+
+    costs = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:") :].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # the header line
+        costs.append(ImportCost(fields[2].strip(), int(fields[0]) / 1000, int(fields[1]) / 1000))
+    return costs
+
+
+async def time_to_tools_list() -> tuple[float, float]:
+    """Time creating the MCP server and answering tools/list in this process, in milliseconds."""
+    from mcp.types import ListToolsRequest
+
+    from .server import create_server
+
+    started = time.perf_counter()
+    server = create_server()
+    created = time.perf_counter()
+    await server.request_handlers[ListToolsRequest](ListToolsRequest(method="tools/list"))
+    return (created - started) * 1000, (time.perf_counter() - created) * 1000
+
+
+async def startup_profile() -> str:
+    """Report where the time to the first tools/list goes."""
+    costs = profile_imports()
+    setup_ms, list_tools_ms = await time_to_tools_list()
+    total_ms = max((cost.cumulative_ms for cost in costs if cost.module == STARTUP_MODULE), default=0.0)
+
+    by_package: dict[str, float] = {}
+    for cost in costs:
+        top_level = cost.module.split(".", 1)[0]
+        by_package[top_level] = by_package.get(top_level, 0.0) + cost.self_ms
+
+    lines = [
+        f"Startup profile of {STARTUP_MODULE}",
+        "",
+        f"Imports:       {total_ms:8.1f} ms ({len(costs)} modules)",
+        f"Server setup:  {setup_ms:8.1f} ms",
+        f"tools/list:    {list_tools_ms:8.1f} ms",
+        "",
+        "By top-level package (self time):",
+    ]
+    for package, self_ms in sorted(by_package.items(), key=lambda entry: -entry[1])[:PROFILE_TOP_MODULES]:
+        lines.append(f"  {self_ms:8.1f} ms  {package}")
+
+    lines += ["", "Slowest modules (self time, cumulative):"]
+    for cost in sorted(costs, key=lambda cost: -cost.self_ms)[:PROFILE_TOP_MODULES]:
+        lines.append(f"  {cost.self_ms:8.1f} ms  {cost.cumulative_ms:8.1f} ms  {cost.module}")
+
+    lines += ["", f"{PACKAGE} modules (self time, cumulative):"]
+    for cost in costs:
+        if cost.module == PACKAGE or cost.module.startswith(f"{PACKAGE}."):
+            lines.append(f"  {cost.self_ms:8.1f} ms  {cost.cumulative_ms:8.1f} ms  {cost.module}")
+
+    imported = {cost.module for cost in costs}
+    deferred = [module for module in DEFERRED_MODULES if module not in imported]
+    lines += ["", f"Deferred until first use: {', '.join(deferred) or 'none'}"]
+    return "\n".join(lines)
@@ -0,0 +1,474 @@
+"""
+Tool registry for Azure Pricing MCP Server.
+
+Every tool is declared once in TOOLS with its input schema and handler (the
+AzurePricingServer coroutine it calls and the formatter of its result, see
+handlers.py). The registry builds the `Tool` list and compiles an argument
+validator per schema once; a call is a dict lookup followed by validation,
+the handler and the TOOL_CALLS / TOOL_LATENCY hooks, whatever the tool.
+
+Adding a tool means adding its coroutine to AzurePricingServer, a formatter
+and a ToolHandler to handlers.py, and a ToolSpec here.
+"""
+
+import logging
+import time
+from collections.abc import Sequence
+from typing import Any, NamedTuple
+
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
+from mcp.types import CallToolResult, TextContent, Tool
+
+from .bom import MAX_BOM_RESOURCES
+from .formats import FORMAT_SCHEMA
+from .handlers import (
+    ToolHandler,
+    _handle_bom_estimate,
+    _handle_catalog_status,
+    _handle_cost_estimate,
+    _handle_customer_discount,
+    _handle_discover_skus,
+    _handle_price_batch,
+    _handle_price_compare,
+    _handle_price_search,
+    _handle_region_recommend,
+    _handle_sku_discovery,
+    _handle_template_estimate,
+)
+from .metrics import TOOL_CALLS, TOOL_LATENCY
+from .paging import CURSOR_SCHEMA, PAGE_SIZE_SCHEMA
+from .server import BATCH_MAX_CONCURRENCY, MAX_BATCH_QUERIES
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+
+class ToolSpec(NamedTuple):
+    """Declaration of one MCP tool."""
+
+    name: str
+    description: str
+    input_schema: dict[str, Any]
+    handler: ToolHandler
+
+
+TOOLS: tuple[ToolSpec, ...] = (
+    ToolSpec(
+        name="azure_price_search",
+        handler=_handle_price_search,
+        description="Search Azure retail prices with various filters",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "service_name": {
+                    "type": "string",
+                    "description": "Azure service name (e.g., 'Virtual Machines', 'Storage')",
+                },
+                "service_family": {
+                    "type": "string",
+                    "description": "Service family (e.g., 'Compute', 'Storage', 'Networking')",
+                },
+                "region": {"type": "string", "description": "Azure region (e.g., 'eastus', 'westeurope')"},
+                "sku_name": {
+                    "type": "string",
+                    "description": "SKU name to search for (partial matches supported)",
+                },
+                "price_type": {
+                    "type": "string",
+                    "description": "Price type: 'Consumption', 'Reservation', or 'DevTestConsumption'",
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 50)",
+                    "default": 50,
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                },
+                "validate_sku": {
+                    "type": "boolean",
+                    "description": "Whether to validate SKU names and provide suggestions (default: true)",
+                    "default": True,
+                },
+                "format": FORMAT_SCHEMA,
+            },
+        },
+    ),
+    ToolSpec(
+        name="azure_price_compare",
+        handler=_handle_price_compare,
+        description="Compare Azure prices across regions or SKUs",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "service_name": {"type": "string", "description": "Azure service name to compare"},
+                "sku_name": {"type": "string", "description": "Specific SKU to compare (optional)"},
+                "regions": {
+                    "type": "array",
+                    "items": {"type": "string"},
+                    "description": "List of regions to compare (if not provided, compares SKUs)",
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                },
+                "format": FORMAT_SCHEMA,
+            },
+            "required": ["service_name"],
+        },
+    ),
+    ToolSpec(
+        name="azure_cost_estimate",
+        handler=_handle_cost_estimate,
+        description="Estimate Azure costs based on usage patterns",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "service_name": {"type": "string", "description": "Azure service name"},
+                "sku_name": {"type": "string", "description": "SKU name"},
+                "region": {"type": "string", "description": "Azure region"},
+                "hours_per_month": {
+                    "type": "number",
+                    "description": "Expected hours of usage per month (default: 730 for full month)",
+                    "default": 730,
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                },
+            },
+            "required": ["service_name", "sku_name", "region"],
+        },
+    ),
+    ToolSpec(
+        name="azure_price_batch",
+        handler=_handle_price_batch,
+        description="Run many price searches and cost estimates in one call, concurrently. Use it to price a whole architecture or bill of materials at once.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "queries": {
+                    "type": "array",
+                    "description": f"Up to {MAX_BATCH_QUERIES} queries. Each takes the azure_price_search arguments, or the azure_cost_estimate arguments with kind 'estimate'.",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "kind": {
+                                "type": "string",
+                                "enum": ["search", "estimate"],
+                                "description": "Query kind (default: search)",
+                                "default": "search",
+                            },
+                            "id": {"type": "string", "description": "Label echoed in this query's result"},
+                        },
+                        "additionalProperties": True,
+                    },
+                },
+                "max_concurrency": {
+                    "type": "integer",
+                    "description": f"Queries run at once (default: {BATCH_MAX_CONCURRENCY})",
+                    "default": BATCH_MAX_CONCURRENCY,
+                },
+            },
+            "required": ["queries"],
+        },
+    ),
+    ToolSpec(
+        name="azure_bom_estimate",
+        handler=_handle_bom_estimate,
+        description="Estimate the monthly, annual and savings plan cost of a whole architecture from its bill of materials, with a breakdown by resource and by service family",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "resources": {
+                    "type": "array",
+                    "description": f"Up to {MAX_BOM_RESOURCES} resources of the architecture",
+                    "items": {
+                        "type": "object",
+                        "properties": {
+                            "name": {"type": "string", "description": "Label echoed in this resource's result"},
+                            "service_name": {
+                                "type": "string",
+                                "description": "Azure service name (e.g., 'Virtual Machines', 'Storage')",
+                            },
+                            "sku_name": {
+                                "type": "string",
+                                "description": "SKU name (e.g., 'D4s v5', 'P1v3', 'Hot LRS')",
+                            },
+                            "region": {
+                                "type": "string",
+                                "description": "Azure region (default: the top-level region)",
+                            },
+                            "quantity": {
+                                "type": "number",
+                                "description": "Number of instances (default: 1)",
+                                "default": 1,
+                            },
+                            "hours_per_month": {
+                                "type": "number",
+                                "description": "Hours each instance runs per month (default: 730)",
+                                "default": 730,
+                            },
+                            "storage_gb": {
+                                "type": "number",
+                                "description": "GB stored per instance per month",
+                            },
+                            "transactions": {
+                                "type": "number",
+                                "description": "Transactions per instance per month",
+                            },
+                            "product_name": {
+                                "type": "string",
+                                "description": "Only price products whose name contains this (e.g., 'Windows')",
+                            },
+                        },
+                        "required": ["service_name", "sku_name"],
+                    },
+                },
+                "region": {"type": "string", "description": "Default region for resources that don't name one"},
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                },
+            },
+            "required": ["resources"],
+        },
+    ),
+    ToolSpec(
+        name="azure_template_estimate",
+        handler=_handle_template_estimate,
+        description="Estimate the cost of a compiled ARM template (e.g. infra/bicep/<project>/main.json), including nested module deployments and main.bicepparam values, in one call",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "template_path": {
+                    "type": "string",
+                    "description": "Path to the ARM template JSON, or to a bicep project directory holding main.json",
+                },
+                "parameters": {
+                    "type": "object",
+                    "description": "Parameter values overriding the parameter file (e.g., {'environment': 'prod'})",
+                },
+                "parameters_file": {
+                    "type": "string",
+                    "description": "A .bicepparam or ARM parameters JSON file (default: main.bicepparam next to the template)",
+                },
+                "region": {
+                    "type": "string",
+                    "description": "Region for resources whose location is only known at deployment",
+                },
+                "usage": {
+                    "type": "object",
+                    "description": "Usage by resource name or type, e.g. {'Microsoft.Storage/storageAccounts': {'storage_gb': 500}}",
+                    "additionalProperties": {"type": "object"},
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                },
+            },
+            "required": ["template_path"],
+        },
+    ),
+    ToolSpec(
+        name="azure_discover_skus",
+        handler=_handle_discover_skus,
+        description="Discover available SKUs for a specific Azure service",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "service_name": {"type": "string", "description": "Azure service name"},
+                "region": {"type": "string", "description": "Azure region (optional)"},
+                "price_type": {
+                    "type": "string",
+                    "description": "Price type (default: 'Consumption')",
+                    "default": "Consumption",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of SKUs to return (default: 100)",
+                    "default": 100,
+                },
+                "format": FORMAT_SCHEMA,
+                "page_size": PAGE_SIZE_SCHEMA,
+                "cursor": CURSOR_SCHEMA,
+            },
+            "required": ["service_name"],
+        },
+    ),
+    ToolSpec(
+        name="azure_sku_discovery",
+        handler=_handle_sku_discovery,
+        description="Discover available SKUs for Azure services with intelligent name matching",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "service_hint": {
+                    "type": "string",
+                    "description": "Service name or description (e.g., 'app service', 'web app', 'vm', 'storage'). Supports fuzzy matching.",
+                },
+                "region": {"type": "string", "description": "Optional Azure region to filter results"},
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "limit": {
+                    "type": "integer",
+                    "description": "Maximum number of results (default: 30)",
+                    "default": 30,
+                },
+            },
+            "required": ["service_hint"],
+        },
+    ),
+    ToolSpec(
+        name="azure_region_recommend",
+        handler=_handle_region_recommend,
+        description="Find the cheapest Azure regions for a given service and SKU. Dynamically discovers all available regions, compares prices, and returns ranked recommendations with savings percentages.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "service_name": {
+                    "type": "string",
+                    "description": "Azure service name (e.g., 'Virtual Machines', 'Azure App Service')",
+                },
+                "sku_name": {
+                    "type": "string",
+                    "description": "SKU name to price across regions (e.g., 'D4s v3', 'P1v3')",
+                },
+                "top_n": {
+                    "type": "integer",
+                    "description": "Number of top recommendations to return (default: 10)",
+                    "default": 10,
+                },
+                "currency_code": {
+                    "type": "string",
+                    "description": "Currency code (default: USD)",
+                    "default": "USD",
+                },
+                "discount_percentage": {
+                    "type": "number",
+                    "description": "Discount percentage to apply to prices (e.g., 10 for 10% discount)",
+                },
+                "format": FORMAT_SCHEMA,
+                "page_size": PAGE_SIZE_SCHEMA,
+                "cursor": CURSOR_SCHEMA,
+            },
+            "required": ["service_name", "sku_name"],
+        },
+    ),
+    ToolSpec(
+        name="azure_catalog_status",
+        handler=_handle_catalog_status,
+        description="Show the local price catalog's downloaded scopes, delta sync watermarks and row counts",
+        input_schema={"type": "object", "properties": {}},
+    ),
+    ToolSpec(
+        name="get_customer_discount",
+        handler=_handle_customer_discount,
+        description="Get customer discount information. Returns default 10% discount for all customers.",
+        input_schema={
+            "type": "object",
+            "properties": {
+                "customer_id": {
+                    "type": "string",
+                    "description": "Customer ID (optional, defaults to 'default' customer)",
+                }
+            },
+        },
+    ),
+)
+
+
+class ToolRegistry:
+    """
+    Dispatches tool calls to their ToolSpec.
+
+    The `Tool` list and the argument validators are built once, when the
+    registry is created; `call` wraps every handler in the same hooks.
+    """
+
+    def __init__(self, specs: Sequence[ToolSpec]):
+        self._specs = {spec.name: spec for spec in specs}
+        if len(self._specs) != len(specs):
+            raise ValueError("Tool names must be unique")
+
+        self.tools = [
+            Tool(name=spec.name, description=spec.description, inputSchema=spec.input_schema) for spec in specs
+        ]
+        self._validators = {}
+        for spec in specs:
+            validator_class = validator_for(spec.input_schema)
+            validator_class.check_schema(spec.input_schema)
+            self._validators[spec.name] = validator_class(spec.input_schema)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._specs
+
+    def validate(self, name: str, arguments: dict[str, Any]) -> str | None:
+        """Check arguments against the tool's input schema and return the error message, if any."""
+        error = best_match(self._validators[name].iter_errors(arguments))
+        return None if error is None else error.message
+
+    async def call(
+        self, pricing_server: Any, name: str, arguments: dict[str, Any]
+    ) -> list[TextContent] | tuple[list[TextContent], dict[str, Any]] | CallToolResult:
+        """Validate the arguments, run the tool's handler and record its outcome and latency."""
+        started = time.perf_counter()
+        # Don't let arbitrary names create new metric series
+        tool_label, outcome = (name, "ok") if name in self._specs else ("unknown", "error")
+
+        try:
+            if tool_label == "unknown":
+                return [TextContent(type="text", text=f"Unknown tool: {name}")]
+
+            message = self.validate(name, arguments)
+            if message is not None:
+                outcome = "invalid"
+                return CallToolResult(
+                    content=[TextContent(type="text", text=f"Input validation error: {message}")], isError=True
+                )
+
+            async with pricing_server:
+                content, is_error = await self._specs[name].handler.run(pricing_server, arguments)
+            if is_error:
+                outcome = "error"
+            return content
+
+        except Exception as e:
+            outcome = "error"
+            logger.error(f"Error handling tool call {name}: {e}")
+            return [TextContent(type="text", text=f"Error: {str(e)}")]
+        finally:
+            TOOL_CALLS.inc(tool_label, outcome)
+            TOOL_LATENCY.observe(time.perf_counter() - started, tool_label)
+
+
+TOOL_REGISTRY = ToolRegistry(TOOLS)
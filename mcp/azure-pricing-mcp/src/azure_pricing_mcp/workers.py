@@ -0,0 +1,340 @@
+"""
+Multi-process HTTP serving for Azure Pricing MCP Server.
+
+`--transport http --workers N` starts N server processes on local ports behind a
+session-aware router on the public port. MCP over SSE is stateful: a session's
+`POST /messages/?session_id=...` must reach the process holding its `GET /sse`
+stream. The router therefore remembers which worker announced each session ID in
+the stream's `endpoint` event and forwards the session's messages there. New
+streams go to the worker with the fewest open sessions.
+
+Workers share one persistent response cache (the SQLite disk tier, see cache.py),
+so a response fetched by one worker is served from disk by the others instead of
+each warming its own memory cache. Each worker gets 1/N of the upstream rate limit.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import logging
+import os
+import re
+import signal
+import socket
+import sys
+import tempfile
+from collections.abc import Sequence
+
+import aiohttp
+from aiohttp import web
+
+from .metrics import CONTENT_TYPE_LATEST, Registry
+
+logger = logging.getLogger("azure_pricing_mcp")
+
+WORKER_READY_TIMEOUT = 30.0  # seconds for a worker to start answering
+WORKER_RESTART_DELAY = 1.0  # seconds before restarting a worker that exited
+SSE_HEADERS = ("Content-Type", "Cache-Control", "X-Accel-Buffering")
+
+# The endpoint event announcing a session's message URL, sent first on every stream
+_SESSION_ID = re.compile(rb"session_id=([0-9a-fA-F-]+)")
+_SESSION_ID_SEARCH_LIMIT = 4096  # bytes of a stream searched for the endpoint event
+
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+def _add_label(sample: str, name: str, value: str) -> str:
+    """Add a label to one sample line of the Prometheus text format."""
+    brace, space = sample.find("{"), sample.find(" ")
+    if brace != -1 and brace < space:
+        return f'{sample[:brace + 1]}{name}="{value}",{sample[brace + 1:]}'
+    return f'{sample[:space]}{{{name}="{value}"}}{sample[space:]}'
+
+
+def merge_metrics(expositions: Sequence[tuple[str, str]]) -> str:
+    """
+    Merge the metrics of several workers into one exposition.
+
+    Args:
+        expositions: (worker label, text exposition) pairs
+
+    Every sample gets a `worker` label, and samples of the same metric are kept
+    together under a single HELP/TYPE header as the text format requires.
+    """
+    families: dict[str, list[str]] = {}
+    for worker, text in expositions:
+        family = ""
+        for line in text.splitlines():
+            if line.startswith("# "):
+                family = line.split(" ", 3)[2]
+                lines = families.setdefault(family, [])
+                if line not in lines:
+                    lines.append(line)
+            elif line:
+                families.setdefault(family, []).append(_add_label(line, "worker", worker))
+    return "".join(line + "\n" for lines in families.values() for line in lines)
+
+
+class Worker:
+    """One server process of the pool, listening on a local port."""
+
+    def __init__(self, index: int, port: int, command: list[str]):
+        self.index = index
+        self.port = port
+        self.command = command
+        self.process: asyncio.subprocess.Process | None = None
+        # Open SSE streams routed to this worker
+        self.sessions = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self, env: dict[str, str]) -> None:
+        """Start the worker process."""
+        self.process = await asyncio.create_subprocess_exec(*self.command, env=env)
+
+    async def stop(self) -> None:
+        """Terminate the worker process, killing it if it doesn't exit in time."""
+        # The supervisor may replace the process meanwhile; stop the one seen here
+        process = self.process
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+
+class SessionRouter:
+    """Routes SSE sessions and their messages to worker processes."""
+
+    def __init__(self, workers: list[Worker]):
+        self.workers = workers
+        self._sessions: dict[str, Worker] = {}
+        self._next = 0
+        self._client: aiohttp.ClientSession | None = None
+        self.registry = Registry()
+        self.registry.gauge(
+            "azure_pricing_router_sessions", "Open SSE sessions across all workers.", lambda: len(self._sessions)
+        )
+        self.restarts = self.registry.counter(
+            "azure_pricing_worker_restarts_total", "Worker processes restarted after exiting.", ("worker",)
+        )
+
+    @property
+    def client(self) -> aiohttp.ClientSession:
+        """HTTP client for talking to workers (created on first use, in the serving loop)."""
+        if self._client is None or self._client.closed:
+            # No connection cap: every open SSE session holds one connection
+            self._client = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=0), timeout=aiohttp.ClientTimeout(total=None)
+            )
+        return self._client
+
+    async def close(self) -> None:
+        """Close the HTTP client."""
+        if self._client is not None:
+            await self._client.close()
+
+    def pick_worker(self) -> Worker:
+        """Pick the live worker with the fewest open sessions, rotating between equally loaded ones."""
+        candidates = [worker for worker in self.workers if worker.alive] or self.workers
+        self._next = (self._next + 1) % len(candidates)
+        rotated = candidates[self._next :] + candidates[: self._next]
+        return min(rotated, key=lambda worker: worker.sessions)
+
+    def forget_worker(self, worker: Worker) -> None:
+        """Drop the sessions of a worker that exited."""
+        for session_id in [sid for sid, owner in self._sessions.items() if owner is worker]:
+            del self._sessions[session_id]
+
+    async def wait_ready(self, worker: Worker, timeout: float = WORKER_READY_TIMEOUT) -> None:
+        """Wait for a worker to answer on its /metrics route."""
+        deadline = asyncio.get_running_loop().time() + timeout
+        while True:
+            if not worker.alive:
+                raise RuntimeError(f"Worker {worker.index} exited during startup")
+            try:
+                async with self.client.get(f"{worker.url}/metrics") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if asyncio.get_running_loop().time() > deadline:
+                raise TimeoutError(f"Worker {worker.index} did not start within {timeout} seconds")
+            await asyncio.sleep(0.1)
+
+    async def handle_sse(self, request: web.Request) -> web.StreamResponse:
+        """Proxy an SSE stream from the least loaded worker, noting which session it carries."""
+        worker = self.pick_worker()
+        worker.sessions += 1
+        session_id = None
+        head = b""
+        try:
+            async with self.client.get(f"{worker.url}/sse", params=request.query) as upstream:
+                response = web.StreamResponse(
+                    status=upstream.status,
+                    headers={name: upstream.headers[name] for name in SSE_HEADERS if name in upstream.headers},
+                )
+                await response.prepare(request)
+                async for chunk in upstream.content.iter_any():
+                    if session_id is None and len(head) < _SESSION_ID_SEARCH_LIMIT:
+                        head += chunk
+                        match = _SESSION_ID.search(head)
+                        if match:
+                            session_id = match.group(1).decode()
+                            self._sessions[session_id] = worker
+                    await response.write(chunk)
+                return response
+        finally:
+            worker.sessions -= 1
+            if session_id is not None:
+                self._sessions.pop(session_id, None)
+
+    async def handle_message(self, request: web.Request) -> web.Response:
+        """Forward a client message to the worker holding its session."""
+        session_id = request.query.get("session_id")
+        if not session_id:
+            return web.Response(status=400, text="session_id is required")
+        worker = self._sessions.get(session_id)
+        if worker is None:
+            return web.Response(status=404, text="Could not find session")
+
+        headers = {"Content-Type": request.headers.get("Content-Type", "application/json")}
+        async with self.client.post(
+            f"{worker.url}{request.path}", params=request.query, data=await request.read(), headers=headers
+        ) as upstream:
+            body = await upstream.read()
+            content_type = (
+                {"Content-Type": upstream.headers["Content-Type"]} if "Content-Type" in upstream.headers else {}
+            )
+            return web.Response(status=upstream.status, body=body, headers=content_type)
+
+    async def handle_metrics(self, request: web.Request) -> web.Response:
+        """Serve every live worker's metrics labelled by worker, plus the router's own."""
+
+        async def fetch(worker: Worker) -> tuple[str, str] | None:
+            try:
+                async with self.client.get(f"{worker.url}/metrics") as response:
+                    return str(worker.index), await response.text()
+            except aiohttp.ClientError:
+                return None
+
+        expositions = await asyncio.gather(*(fetch(worker) for worker in self.workers if worker.alive))
+        text = merge_metrics([exposition for exposition in expositions if exposition]) + self.registry.render()
+        return web.Response(body=text.encode(), headers={"Content-Type": CONTENT_TYPE_LATEST})
+
+    def create_app(self) -> web.Application:
+        """Build the router's aiohttp application."""
+        app = web.Application()
+        app.router.add_get("/sse", self.handle_sse)
+        app.router.add_post("/messages/", self.handle_message)
+        app.router.add_get("/metrics", self.handle_metrics)
+        return app
+
+    async def supervise(self, worker: Worker, env: dict[str, str]) -> None:
+        """Restart a worker whenever its process exits."""
+        while True:
+            process = worker.process
+            if process is None:
+                return
+            await process.wait()
+            logger.warning(f"Worker {worker.index} exited with code {process.returncode}, restarting")
+            self.forget_worker(worker)
+            self.restarts.inc(str(worker.index))
+            await asyncio.sleep(WORKER_RESTART_DELAY)
+            await worker.start(env)
+            with contextlib.suppress(Exception):
+                await self.wait_ready(worker)
+
+
+def worker_command(args: argparse.Namespace, port: int, cache_dir: str) -> list[str]:
+    """Command line starting one worker with the pool's settings."""
+    command = [
+        sys.executable,
+        "-m",
+        "azure_pricing_mcp",
+        "--transport",
+        "http",
+        "--host",
+        "127.0.0.1",
+        "--port",
+        str(port),
+        "--cache-dir",
+        cache_dir,
+        "--api-url",
+        args.api_url,
+        "--upstream-share",
+        str(args.workers),
+    ]
+    if args.cache_max_mb is not None:
+        command += ["--cache-max-mb", str(args.cache_max_mb)]
+    if args.cache_ttl is not None:
+        command += ["--cache-ttl", str(args.cache_ttl)]
+    if args.catalog:
+        command += ["--catalog", args.catalog]
+    if args.warm_cache:
+        command.append("--warm-cache")
+    if args.prewarm is not None:
+        command += ["--prewarm", args.prewarm] if args.prewarm else ["--prewarm"]
+    return command
+
+
+async def serve_workers(args: argparse.Namespace) -> None:
+    """Run `args.workers` worker processes behind a session router on `args.host`:`args.port` until stopped."""
+    temp_dir = None
+    cache_dir = args.cache_dir
+    if not cache_dir:
+        # Workers need a shared cache backend even when no persistent cache was asked for
+        temp_dir = tempfile.TemporaryDirectory(prefix="azure-pricing-mcp-")
+        cache_dir = temp_dir.name
+
+    # Workers import this package from wherever the router found it
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")]))}
+
+    workers = []
+    for index in range(args.workers):
+        port = _free_port()
+        workers.append(Worker(index, port, worker_command(args, port, cache_dir)))
+    router = SessionRouter(workers)
+    runner = web.AppRunner(router.create_app(), handler_cancellation=True, access_log=None)
+    supervisors: list[asyncio.Task] = []
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        with contextlib.suppress(NotImplementedError):  # not available on Windows
+            loop.add_signal_handler(sig, stop.set)
+
+    try:
+        await asyncio.gather(*(worker.start(env) for worker in workers))
+        await asyncio.gather(*(router.wait_ready(worker) for worker in workers))
+        supervisors = [asyncio.ensure_future(router.supervise(worker, env)) for worker in workers]
+
+        await runner.setup()
+        await web.TCPSite(runner, args.host, args.port).start()
+        logger.info(
+            f"Routing MCP sessions on {args.host}:{args.port} to {len(workers)} workers sharing cache in {cache_dir}"
+        )
+        await stop.wait()
+    finally:
+        for task in supervisors:
+            task.cancel()
+        await asyncio.gather(*supervisors, return_exceptions=True)
+        await runner.cleanup()
+        await router.close()
+        await asyncio.gather(*(worker.stop() for worker in workers))
+        if temp_dir is not None:
+            temp_dir.cleanup()
@@ -0,0 +1 @@
+"""Performance benchmarks for Azure Pricing MCP Server against a local fake Retail Prices API."""
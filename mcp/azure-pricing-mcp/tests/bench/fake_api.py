@@ -0,0 +1,133 @@
+"""
+Local aiohttp stand-in for the Azure Retail Prices API.
+
+Serves a fixed list of price items with the real API's paging contract:
+`$filter` is evaluated with the server's own OData parser, `$skip`/`$top` select
+a page of at most MAX_PAGE_SIZE items, and `NextPageLink` is an absolute URL with
+the next `$skip`. Latency, jitter and 429 responses are injected from a seeded
+random generator so runs are repeatable.
+"""
+
+import asyncio
+import random
+from collections import Counter
+from typing import Any
+from urllib.parse import urlencode
+
+from aiohttp import web
+
+from azure_pricing_mcp.odata import ODataFilter
+
+MAX_PAGE_SIZE = 1000
+API_PATH = "/api/retail/prices"
+
+
+class FakeRetailPricesAPI:
+    """
+    Fake Retail Prices API on a local port.
+
+    Args:
+        items: Price items to serve
+        latency_ms: Mean added latency per request
+        jitter_ms: Latency varies uniformly by up to this much either way
+        throttle_rate: Fraction of requests answered with 429
+        retry_after: Retry-After header sent with 429s (seconds), or None for no header
+        seed: Seed for latency and throttling decisions
+    """
+
+    def __init__(
+        self,
+        items: list[dict[str, Any]],
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: float | None = None,
+        seed: int = 0,
+    ):
+        self.items = items
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        # Responses served by status code, and requests by $filter
+        self.responses: Counter[int] = Counter()
+        self.filters: Counter[str] = Counter()
+        self._runner: web.AppRunner | None = None
+        self.url = ""
+
+    @property
+    def calls(self) -> int:
+        """Total requests served."""
+        return sum(self.responses.values())
+
+    def reset_counters(self) -> None:
+        """Forget request counts, e.g. between benchmark runs."""
+        self.responses.clear()
+        self.filters.clear()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the prices endpoint URL."""
+        app = web.Application()
+        app.router.add_get(API_PATH, self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        bound_port = self._runner.addresses[0][1]
+        self.url = f"http://{host}:{bound_port}{API_PATH}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    async def __aenter__(self) -> "FakeRetailPricesAPI":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.stop()
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        # Draw both decisions up front so the random sequence doesn't depend on the outcome
+        delay = max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+        throttled = self._rng.random() < self.throttle_rate
+        if delay:
+            await asyncio.sleep(delay)
+
+        query = request.query
+        self.filters[query.get("$filter", "")] += 1
+        if throttled:
+            self.responses[429] += 1
+            headers = {} if self.retry_after is None else {"Retry-After": str(self.retry_after)}
+            return web.json_response({"Error": {"Code": "TooManyRequests"}}, status=429, headers=headers)
+
+        try:
+            odata_filter = ODataFilter.parse(query.get("$filter", ""))
+            skip = int(query.get("$skip", 0))
+            top = min(int(query.get("$top", MAX_PAGE_SIZE)), MAX_PAGE_SIZE)
+        except ValueError as e:
+            self.responses[400] += 1
+            return web.json_response({"Error": {"Code": "BadRequest", "Message": str(e)}}, status=400)
+
+        matching = [item for item in self.items if odata_filter.matches(item)]
+        page = matching[skip : skip + top]
+        next_link = None
+        if skip + top < len(matching):
+            next_params = {name: value for name, value in query.items() if name != "$skip"}
+            next_link = f"{self.url}?{urlencode({**next_params, '$skip': skip + top})}"
+
+        self.responses[200] += 1
+        return web.json_response(
+            {
+                "BillingCurrency": query.get("currencyCode", "USD").strip("'"),
+                "CustomerEntityId": "Default",
+                "CustomerEntityType": "Retail",
+                "Items": page,
+                "NextPageLink": next_link,
+                "Count": len(page),
+            }
+        )
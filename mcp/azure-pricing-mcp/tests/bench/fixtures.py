@@ -0,0 +1,283 @@
+"""
+Price item fixtures for the benchmark's fake Retail Prices API.
+
+Fixtures are plain API response pages (`{"Items": [...], "NextPageLink": ...}`)
+saved as JSON, so they can be recorded from the live API once and replayed
+offline. When no recording is given, `synthetic_items()` builds a deterministic
+catalog shaped like the real one: the same fields, several services and regions,
+On-Demand, Spot, Low Priority and Windows meters, reservations and savings plans.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+LIVE_API_URL = "https://prices.azure.com/api/retail/prices"
+
+REGIONS = {
+    "eastus": ("US East", 1.00),
+    "eastus2": ("US East 2", 1.00),
+    "westus2": ("US West 2", 1.00),
+    "centralus": ("US Central", 1.08),
+    "northeurope": ("EU North", 1.10),
+    "westeurope": ("EU West", 1.14),
+    "swedencentral": ("Sweden Central", 1.06),
+    "uksouth": ("UK South", 1.16),
+    "japaneast": ("JA East", 1.27),
+    "australiaeast": ("AU East", 1.30),
+    "southeastasia": ("AP Southeast", 1.19),
+    "brazilsouth": ("BR South", 1.55),
+}
+
+# (skuName, armSkuName, productName, hourly Linux price in eastus)
+VM_SKUS = [
+    ("D2s v3", "Standard_D2s_v3", "Virtual Machines DSv3 Series", 0.096),
+    ("D4s v3", "Standard_D4s_v3", "Virtual Machines DSv3 Series", 0.192),
+    ("D8s v3", "Standard_D8s_v3", "Virtual Machines DSv3 Series", 0.384),
+    ("D2s_v5", "Standard_D2s_v5", "Virtual Machines Dsv5 Series", 0.096),
+    ("D4s_v5", "Standard_D4s_v5", "Virtual Machines Dsv5 Series", 0.192),
+    ("E4s_v5", "Standard_E4s_v5", "Virtual Machines Esv5 Series", 0.252),
+    ("B2s", "Standard_B2s", "Virtual Machines BS Series", 0.0416),
+    ("F4s v2", "Standard_F4s_v2", "Virtual Machines FSv2 Series", 0.169),
+]
+
+# (serviceName, serviceFamily, productName, [(skuName, meterName, unitOfMeasure, price in eastus)])
+FLAT_SERVICES = [
+    (
+        "Azure App Service",
+        "Web",
+        "Azure App Service Premium v3 Plan",
+        [("P1v3", "P1 v3 App", "1 Hour", 0.169), ("P2v3", "P2 v3 App", "1 Hour", 0.338)],
+    ),
+    (
+        "Azure App Service",
+        "Web",
+        "Azure App Service Basic Plan",
+        [("B1", "B1 App", "1 Hour", 0.075), ("B2", "B2 App", "1 Hour", 0.15)],
+    ),
+    (
+        "Azure App Service",
+        "Web",
+        "Azure App Service Standard Plan",
+        [("S1", "S1 App", "1 Hour", 0.1), ("S2", "S2 App", "1 Hour", 0.2)],
+    ),
+    (
+        "SQL Database",
+        "Databases",
+        "SQL Database Single Standard",
+        [("S0", "S0 DTUs", "1/Day", 0.4839), ("S1", "S1 DTUs", "1/Day", 0.9677)],
+    ),
+    (
+        "SQL Database",
+        "Databases",
+        "SQL Database Single/Elastic Pool General Purpose - Compute Gen5",
+        [("2 vCore", "vCore", "1 Hour", 0.5044), ("4 vCore", "vCore", "1 Hour", 1.0088)],
+    ),
+    (
+        "Storage",
+        "Storage",
+        "General Block Blob v2",
+        [
+            ("Hot LRS", "Hot LRS Data Stored", "1 GB/Month", 0.0184),
+            ("Cool LRS", "Cool LRS Data Stored", "1 GB/Month", 0.01),
+        ],
+    ),
+    (
+        "Storage",
+        "Storage",
+        "Standard SSD Managed Disks",
+        [("E10 LRS", "E10 LRS Disk", "1/Month", 9.6), ("E20 LRS", "E20 LRS Disk", "1/Month", 38.4)],
+    ),
+    (
+        "Azure Static Web Apps",
+        "Web",
+        "Azure Static Web Apps",
+        [("Standard", "Standard App", "1/Month", 9.0), ("Free", "Free App", "1/Month", 0.0)],
+    ),
+]
+
+
+def _item(rng: random.Random, **fields: Any) -> dict[str, Any]:
+    """Build one price item with the API's field order."""
+    region = fields["armRegionName"]
+    price = round(fields.pop("price"), 6)
+    item = {
+        "currencyCode": "USD",
+        "tierMinimumUnits": 0.0,
+        "retailPrice": price,
+        "unitPrice": price,
+        "armRegionName": region,
+        "location": REGIONS[region][0],
+        "effectiveStartDate": "2024-01-01T00:00:00Z",
+        "meterId": f"{rng.getrandbits(32):08x}-{rng.getrandbits(16):04x}-4{rng.getrandbits(12):03x}-8000-{rng.getrandbits(48):012x}",
+        "meterName": fields["meterName"],
+        "productId": f"DZH318Z0{rng.getrandbits(16):04X}",
+        "skuId": f"DZH318Z0{rng.getrandbits(16):04X}/{rng.getrandbits(16):04X}",
+        "productName": fields["productName"],
+        "skuName": fields["skuName"],
+        "serviceName": fields["serviceName"],
+        "serviceId": f"DZH31{rng.getrandbits(16):04X}",
+        "serviceFamily": fields["serviceFamily"],
+        "unitOfMeasure": fields["unitOfMeasure"],
+        "type": fields.get("type", "Consumption"),
+        "isPrimaryMeterRegion": True,
+        "armSkuName": fields.get("armSkuName", ""),
+    }
+    if "reservationTerm" in fields:
+        item["reservationTerm"] = fields["reservationTerm"]
+    if "savingsPlan" in fields:
+        item["savingsPlan"] = fields["savingsPlan"]
+    return item
+
+
+def synthetic_items(seed: int = 0) -> list[dict[str, Any]]:
+    """Build a deterministic catalog of a few thousand realistic price items."""
+    rng = random.Random(seed)
+    items: list[dict[str, Any]] = []
+
+    for region, (_, factor) in REGIONS.items():
+        for sku_name, arm_sku_name, product_name, base_price in VM_SKUS:
+            price = base_price * factor * rng.uniform(0.98, 1.02)
+            vm = {
+                "armRegionName": region,
+                "serviceName": "Virtual Machines",
+                "serviceFamily": "Compute",
+                "armSkuName": arm_sku_name,
+                "unitOfMeasure": "1 Hour",
+            }
+            items.append(
+                _item(
+                    rng,
+                    **vm,
+                    skuName=sku_name,
+                    meterName=sku_name,
+                    productName=product_name,
+                    price=price,
+                    savingsPlan=[
+                        {"unitPrice": round(price * 0.66, 6), "retailPrice": round(price * 0.66, 6), "term": "1 Year"},
+                        {"unitPrice": round(price * 0.45, 6), "retailPrice": round(price * 0.45, 6), "term": "3 Years"},
+                    ],
+                )
+            )
+            items.append(
+                _item(
+                    rng,
+                    **vm,
+                    skuName=sku_name,
+                    meterName=sku_name,
+                    productName=f"{product_name} Windows",
+                    price=price * 1.9,
+                )
+            )
+            for variant, discount in (("Spot", 0.2), ("Low Priority", 0.25)):
+                items.append(
+                    _item(
+                        rng,
+                        **vm,
+                        skuName=f"{sku_name} {variant}",
+                        meterName=f"{sku_name} {variant}",
+                        productName=product_name,
+                        price=price * discount,
+                    )
+                )
+            for term, ratio in (("1 Year", 0.62), ("3 Years", 0.4)):
+                items.append(
+                    _item(
+                        rng,
+                        **vm,
+                        skuName=sku_name,
+                        meterName=sku_name,
+                        productName=product_name,
+                        price=price * ratio * 8760,
+                        type="Reservation",
+                        reservationTerm=term,
+                    )
+                )
+            items.append(
+                _item(
+                    rng,
+                    **vm,
+                    skuName=sku_name,
+                    meterName=sku_name,
+                    productName=product_name,
+                    price=price * 0.75,
+                    type="DevTestConsumption",
+                )
+            )
+
+        for service_name, service_family, product_name, skus in FLAT_SERVICES:
+            for sku_name, meter_name, unit, base_price in skus:
+                items.append(
+                    _item(
+                        rng,
+                        armRegionName=region,
+                        serviceName=service_name,
+                        serviceFamily=service_family,
+                        productName=product_name,
+                        skuName=sku_name,
+                        meterName=meter_name,
+                        unitOfMeasure=unit,
+                        price=base_price * factor,
+                    )
+                )
+
+    return items
+
+
+def load_items(path: str | Path) -> list[dict[str, Any]]:
+    """
+    Load recorded items from a JSON file or a directory of JSON files.
+
+    Each file holds one API response page, a list of pages, or a bare list of items.
+    """
+    path = Path(path)
+    files = sorted(path.glob("*.json")) if path.is_dir() else [path]
+    items: list[dict[str, Any]] = []
+    for file in files:
+        data = json.loads(file.read_text(encoding="utf-8"))
+        pages = data if isinstance(data, list) and (not data or "Items" in data[0]) else [data]
+        for page in pages:
+            items.extend(page["Items"] if isinstance(page, dict) else page)
+    return items
+
+
+async def record(filters: Iterable[str], output: Path, max_items: int = 5000) -> int:
+    """Record pages of the live Retail Prices API for each filter into `output`."""
+    import aiohttp
+
+    output.mkdir(parents=True, exist_ok=True)
+    recorded = 0
+    async with aiohttp.ClientSession() as session:
+        for index, odata_filter in enumerate(filters):
+            pages = []
+            url: str | None = LIVE_API_URL
+            params: dict[str, str] | None = {"$filter": odata_filter}
+            while url and sum(len(page["Items"]) for page in pages) < max_items:
+                async with session.get(url, params=params) as response:
+                    response.raise_for_status()
+                    page = await response.json()
+                pages.append({"Items": page["Items"], "NextPageLink": page.get("NextPageLink")})
+                url, params = page.get("NextPageLink"), None
+            (output / f"{index:03d}.json").write_text(json.dumps(pages), encoding="utf-8")
+            recorded += sum(len(page["Items"]) for page in pages)
+    return recorded
+
+
+def main() -> None:
+    """Record live API pages for the benchmark, one `--filter` at a time."""
+    parser = argparse.ArgumentParser(description="Record Retail Prices API pages as benchmark fixtures")
+    parser.add_argument("--filter", action="append", required=True, help="OData $filter to record (repeatable)")
+    parser.add_argument("--output", type=Path, required=True, help="Directory to write the recorded pages to")
+    parser.add_argument("--max-items", type=int, default=5000, help="Items recorded per filter at most")
+    args = parser.parse_args()
+
+    recorded = asyncio.run(record(args.filter, args.output, args.max_items))
+    print(f"Recorded {recorded} items into {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Benchmark harness for Azure Pricing MCP Server.
+
+Runs a fixed, seeded mix of tool calls through the MCP `tools/call` handler at
+each requested concurrency level, against the fake Retail Prices API, and reports
+latency percentiles, throughput and upstream request counts as JSON:
+
+    PYTHONPATH=src python -m tests.bench.harness --concurrency 1,8,32 --requests 200
+
+Caches, in-flight requests and the rate limiter are reset before every level, so
+levels are independent and runs with the same arguments are comparable.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from azure_pricing_mcp import server as pricing_module
+from azure_pricing_mcp.ratelimit import MAX_RATE, AdaptiveRateLimiter
+from azure_pricing_mcp.server import AzurePricingServer, create_server, set_api_url
+
+from .fake_api import FakeRetailPricesAPI
+from .fixtures import load_items, synthetic_items
+
+REGIONS = ["eastus", "westeurope", "swedencentral", "japaneast", "uksouth", "brazilsouth"]
+VM_SKUS = ["D2s v3", "D4s v3", "D4s_v5", "E4s_v5", "B2s"]
+
+# Relative frequency of each tool in the workload
+TOOL_WEIGHTS = {
+    "azure_price_search": 30,
+    "azure_cost_estimate": 20,
+    "azure_price_compare": 15,
+    "azure_region_recommend": 10,
+    "azure_discover_skus": 10,
+    "azure_sku_discovery": 10,
+    "azure_catalog_status": 3,
+    "get_customer_discount": 2,
+}
+
+
+def tool_arguments(tool: str, rng: random.Random) -> dict[str, Any]:
+    """Pick arguments for one call of `tool`."""
+    region = rng.choice(REGIONS)
+    sku = rng.choice(VM_SKUS)
+    if tool == "azure_price_search":
+        return rng.choice(
+            [
+                {"service_name": "Virtual Machines", "region": region, "sku_name": sku},
+                {"service_name": "Azure App Service", "region": region, "price_type": "Consumption"},
+                {"service_name": "Storage", "region": region, "limit": 20},
+                {"service_name": "Virtual Machines", "sku_name": sku, "discount_percentage": 10},
+            ]
+        )
+    if tool == "azure_cost_estimate":
+        return {"service_name": "Virtual Machines", "sku_name": sku, "region": region}
+    if tool == "azure_price_compare":
+        return {"service_name": "Virtual Machines", "sku_name": sku, "regions": rng.sample(REGIONS, 3)}
+    if tool == "azure_region_recommend":
+        return {"service_name": "Virtual Machines", "sku_name": sku, "top_n": 5}
+    if tool == "azure_discover_skus":
+        return {"service_name": rng.choice(["Virtual Machines", "SQL Database", "Storage"]), "region": region}
+    if tool == "azure_sku_discovery":
+        return {"service_hint": rng.choice(["app service", "vm", "storage", "web app"]), "region": region}
+    if tool == "get_customer_discount":
+        return {"customer_id": "bench"}
+    return {}
+
+
+def build_workload(requests: int, seed: int, tools: Sequence[str] | None = None) -> list[tuple[str, dict[str, Any]]]:
+    """Build the sequence of (tool, arguments) calls for one run."""
+    rng = random.Random(seed)
+    names = list(tools or TOOL_WEIGHTS)
+    weights = [TOOL_WEIGHTS.get(name, 1) for name in names]
+    return [(tool, tool_arguments(tool, rng)) for tool in rng.choices(names, weights, k=requests)]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of `values` (0 for no values)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * q // 100))  # ceil without floats
+    return ordered[int(rank) - 1]
+
+
+def summarize(latencies: Sequence[float]) -> dict[str, float]:
+    """Latency percentiles in milliseconds."""
+    return {
+        "p50": round(percentile(latencies, 50) * 1000, 3),
+        "p95": round(percentile(latencies, 95) * 1000, 3),
+        "p99": round(percentile(latencies, 99) * 1000, 3),
+        "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+        "max": round(max(latencies, default=0.0) * 1000, 3),
+    }
+
+
+def reset_server_state(rate_limiter: AdaptiveRateLimiter) -> None:
+    """Empty every cache and install `rate_limiter`."""
+    AzurePricingServer._cache.clear()
+    AzurePricingServer._inflight.clear()
+    AzurePricingServer._complete_results.clear()
+    AzurePricingServer._region_index.clear()
+    AzurePricingServer._rate_limiter = rate_limiter
+
+
+async def run_level(
+    handler: Any,
+    api: FakeRetailPricesAPI,
+    workload: list[tuple[str, dict[str, Any]]],
+    concurrency: int,
+) -> dict[str, Any]:
+    """Run the workload with `concurrency` concurrent callers and collect statistics."""
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    queue = iter(workload)
+
+    async def worker() -> None:
+        for tool, arguments in queue:
+            request = CallToolRequest(method="tools/call", params=CallToolRequestParams(name=tool, arguments=arguments))
+            started = time.perf_counter()
+            try:
+                result = await handler(request)
+                failed = result.root.isError or any(
+                    getattr(content, "text", "").startswith("Error:") for content in result.root.content
+                )
+            except Exception:
+                failed = True
+            latencies.setdefault(tool, []).append(time.perf_counter() - started)
+            if failed:
+                errors[tool] = errors.get(tool, 0) + 1
+
+    api.reset_counters()
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    return {
+        "concurrency": concurrency,
+        "requests": len(all_latencies),
+        "errors": sum(errors.values()),
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(all_latencies) / wall, 2) if wall else 0.0,
+        "latency_ms": summarize(all_latencies),
+        "upstream": {
+            "requests": api.calls,
+            "throttled": api.responses[429],
+            "distinct_filters": len(api.filters),
+        },
+        "tools": {
+            tool: {"calls": len(values), "errors": errors.get(tool, 0), "latency_ms": summarize(values)}
+            for tool, values in sorted(latencies.items())
+        },
+    }
+
+
+async def run_benchmark(
+    concurrency_levels: Sequence[int],
+    requests: int = 200,
+    latency_ms: float = 50.0,
+    jitter_ms: float = 10.0,
+    throttle_rate: float = 0.0,
+    retry_after: float | None = None,
+    upstream_rate: float = 10.0,
+    backoff_base: float = 0.05,
+    backoff_max: float = 1.0,
+    seed: int = 0,
+    fixtures: str | Path | None = None,
+    tools: Sequence[str] | None = None,
+) -> dict[str, Any]:
+    """
+    Benchmark the server at each concurrency level.
+
+    Upstream retry backoff is scaled down from the production defaults (seconds)
+    so runs with injected 429s finish quickly; pass backoff_base/backoff_max to change it.
+    """
+    items = load_items(fixtures) if fixtures else synthetic_items(seed)
+    workload = build_workload(requests, seed, tools)
+    handler = create_server().request_handlers[CallToolRequest]
+
+    original_url = pricing_module.AZURE_PRICING_BASE_URL
+    original_limiter = AzurePricingServer._rate_limiter
+    levels = []
+    async with FakeRetailPricesAPI(items, latency_ms, jitter_ms, throttle_rate, retry_after, seed) as api:
+        set_api_url(api.url)
+        try:
+            for concurrency in concurrency_levels:
+                reset_server_state(
+                    AdaptiveRateLimiter(
+                        rate=upstream_rate,
+                        max_rate=max(upstream_rate, MAX_RATE),
+                        backoff_base=backoff_base,
+                        backoff_max=backoff_max,
+                    )
+                )
+                levels.append(await run_level(handler, api, workload, concurrency))
+        finally:
+            set_api_url(original_url)
+            reset_server_state(original_limiter)
+            await AzurePricingServer.close_session()
+
+    return {
+        "config": {
+            "requests": requests,
+            "latency_ms": latency_ms,
+            "jitter_ms": jitter_ms,
+            "throttle_rate": throttle_rate,
+            "retry_after": retry_after,
+            "upstream_rate": upstream_rate,
+            "seed": seed,
+            "fixture_items": len(items),
+            "fixtures": str(fixtures) if fixtures else "synthetic",
+        },
+        "levels": levels,
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark Azure Pricing MCP tools against a fake Retail Prices API")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument("--requests", type=int, default=200, help="Tool calls per level (default: 200)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Mean upstream latency (default: 50)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Upstream latency jitter (default: 10)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of upstream 429s (default: 0)")
+    parser.add_argument("--retry-after", type=float, help="Retry-After seconds sent with 429s (default: none)")
+    parser.add_argument(
+        "--upstream-rate", type=float, default=10.0, help="Initial upstream requests/second (default: 10)"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fixtures, workload and fault injection")
+    parser.add_argument("--fixtures", help="Recorded API pages to serve instead of the synthetic catalog")
+    parser.add_argument("--tools", help="Comma-separated tools to benchmark (default: all)")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+
+    report = asyncio.run(
+        run_benchmark(
+            [int(level) for level in args.concurrency.split(",")],
+            requests=args.requests,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            throttle_rate=args.throttle_rate,
+            retry_after=args.retry_after,
+            upstream_rate=args.upstream_rate,
+            seed=args.seed,
+            fixtures=args.fixtures,
+            tools=args.tools.split(",") if args.tools else None,
+        )
+    )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,326 @@
+"""
+Concurrent MCP session load generator for the HTTP (SSE) transport.
+
+At each load level, opens N concurrent `/sse` sessions. Each session runs the MCP
+initialize handshake, then replays a weighted mix of `tools/call` requests through
+`/messages/`. The generator measures session setup time, tool call latency and error
+rates per level, and reports the whole ramp as a saturation curve in JSON:
+
+    PYTHONPATH=src python -m tests.bench.loadgen --sessions 1,4,16,64 --output curve.json
+
+Without `--target`, the generator starts a fake Retail Prices API and a fresh server
+process pointed at it (`--api-url`) for every level, so levels are independent. With
+`--target`, it loads an already running server, whose caches carry over between levels.
+Pass `--baseline` with an earlier report to compare the two curves.
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import socket
+import sys
+import time
+from collections.abc import AsyncIterator, Sequence
+from pathlib import Path
+from typing import Any
+
+import aiohttp
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from .fake_api import FakeRetailPricesAPI
+from .fixtures import load_items, synthetic_items
+from .harness import build_workload, summarize
+
+SRC_DIR = Path(__file__).resolve().parents[2] / "src"
+
+# A level is saturated when throughput grows by less than this fraction over the previous one...
+MIN_THROUGHPUT_GAIN = 0.1
+# ...or more than this fraction of calls or session setups fail
+MAX_ERROR_RATE = 0.01
+
+
+def _free_port() -> int:
+    """Find a free local TCP port."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return int(sock.getsockname()[1])
+
+
+async def wait_until_ready(target: str, timeout: float = 30.0) -> None:
+    """Wait for the server's /metrics route to answer."""
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as http:
+        while True:
+            try:
+                async with http.get(f"{target}/metrics") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Server at {target} did not become ready within {timeout} seconds")
+            await asyncio.sleep(0.1)
+
+
+@contextlib.asynccontextmanager
+async def spawn_server(api_url: str) -> AsyncIterator[str]:
+    """Run `python -m azure_pricing_mcp --transport http` against `api_url` and yield its base URL."""
+    port = _free_port()
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(SRC_DIR), os.environ.get("PYTHONPATH")]))}
+    process = await asyncio.create_subprocess_exec(
+        sys.executable,
+        "-m",
+        "azure_pricing_mcp",
+        "--transport",
+        "http",
+        "--port",
+        str(port),
+        "--api-url",
+        api_url,
+        env=env,
+        stdout=asyncio.subprocess.DEVNULL,
+        stderr=asyncio.subprocess.DEVNULL,
+    )
+    target = f"http://127.0.0.1:{port}"
+    try:
+        await wait_until_ready(target)
+        yield target
+    finally:
+        if process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+
+
+def _is_error(result: Any) -> bool:
+    """Whether a tool result reports a failure (handlers return 'Error: ...' text)."""
+    return bool(result.isError) or any(getattr(content, "text", "").startswith("Error:") for content in result.content)
+
+
+async def run_level(
+    target: str, sessions: int, calls_per_session: int, seed: int, think_ms: float, call_timeout: float
+) -> dict[str, Any]:
+    """Open `sessions` concurrent sessions against `target`, replay the tool mix on each and collect statistics."""
+    setup_times: list[float] = []
+    setup_errors = 0
+    latencies: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    # Calls start once every session is set up, so each level runs at its full session count
+    ready = asyncio.Event()
+    pending_setups = sessions
+
+    def setup_done() -> None:
+        nonlocal pending_setups
+        pending_setups -= 1
+        if pending_setups == 0:
+            ready.set()
+
+    async def session_worker(index: int) -> None:
+        nonlocal setup_errors
+        workload = build_workload(calls_per_session, seed + index)
+        started = time.perf_counter()
+        set_up = False
+        try:
+            async with sse_client(f"{target}/sse", timeout=call_timeout) as streams:
+                async with ClientSession(*streams) as session:
+                    await asyncio.wait_for(session.initialize(), call_timeout)
+                    setup_times.append(time.perf_counter() - started)
+                    set_up = True
+                    setup_done()
+                    await ready.wait()
+
+                    for tool, arguments in workload:
+                        call_started = time.perf_counter()
+                        try:
+                            failed = _is_error(await asyncio.wait_for(session.call_tool(tool, arguments), call_timeout))
+                        except Exception:
+                            failed = True
+                        latencies.setdefault(tool, []).append(time.perf_counter() - call_started)
+                        if failed:
+                            errors[tool] = errors.get(tool, 0) + 1
+                        if think_ms:
+                            await asyncio.sleep(think_ms / 1000)
+        except Exception:
+            if not set_up:
+                setup_errors += 1
+                setup_done()
+
+    started = time.perf_counter()
+    workers = [asyncio.ensure_future(session_worker(index)) for index in range(sessions)]
+    await ready.wait()
+    calls_started = time.perf_counter()
+    await asyncio.gather(*workers)
+    finished = time.perf_counter()
+
+    all_latencies = [latency for values in latencies.values() for latency in values]
+    call_errors = sum(errors.values())
+    call_seconds = finished - calls_started
+    return {
+        "sessions": sessions,
+        "session_setup_ms": summarize(setup_times),
+        "session_setup_errors": setup_errors,
+        "calls": len(all_latencies),
+        "call_errors": call_errors,
+        "error_rate": round(call_errors / len(all_latencies), 4) if all_latencies else 0.0,
+        "throughput_rps": round(len(all_latencies) / call_seconds, 2) if call_seconds else 0.0,
+        "wall_seconds": round(finished - started, 3),
+        "latency_ms": summarize(all_latencies),
+        "tools": {
+            tool: {"calls": len(values), "errors": errors.get(tool, 0), "latency_ms": summarize(values)}
+            for tool, values in sorted(latencies.items())
+        },
+    }
+
+
+def find_saturation(levels: Sequence[dict[str, Any]]) -> dict[str, Any] | None:
+    """
+    Find the first level past the server's saturation point.
+
+    That is the first level whose calls or session setups fail more often than
+    MAX_ERROR_RATE, or whose throughput gains less than MIN_THROUGHPUT_GAIN over
+    the previous level although it has more sessions.
+    """
+    previous = None
+    for level in levels:
+        setup_error_rate = level["session_setup_errors"] / level["sessions"]
+        if level["error_rate"] > MAX_ERROR_RATE or setup_error_rate > MAX_ERROR_RATE:
+            return {"sessions": level["sessions"], "reason": "errors"}
+        if (
+            previous is not None
+            and level["sessions"] > previous["sessions"]
+            and level["throughput_rps"] < previous["throughput_rps"] * (1 + MIN_THROUGHPUT_GAIN)
+        ):
+            return {"sessions": level["sessions"], "reason": "throughput plateau"}
+        previous = level
+    return None
+
+
+def saturation_curve(levels: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """The per-level figures worth comparing between releases."""
+    return [
+        {
+            "sessions": level["sessions"],
+            "throughput_rps": level["throughput_rps"],
+            "p50_ms": level["latency_ms"]["p50"],
+            "p95_ms": level["latency_ms"]["p95"],
+            "p99_ms": level["latency_ms"]["p99"],
+            "session_setup_p95_ms": level["session_setup_ms"]["p95"],
+            "error_rate": level["error_rate"],
+        }
+        for level in levels
+    ]
+
+
+def compare_curves(baseline: Sequence[dict[str, Any]], current: Sequence[dict[str, Any]]) -> list[dict[str, Any]]:
+    """Ratios of current to baseline figures for every session count present in both curves."""
+    by_sessions = {point["sessions"]: point for point in baseline}
+    comparison = []
+    for point in current:
+        before = by_sessions.get(point["sessions"])
+        if before is None:
+            continue
+        ratios = {
+            f"{name}_ratio": round(point[name] / before[name], 3) if before[name] else None
+            for name in ("throughput_rps", "p50_ms", "p95_ms", "p99_ms")
+        }
+        comparison.append({"sessions": point["sessions"], **ratios})
+    return comparison
+
+
+async def run_load_test(
+    session_levels: Sequence[int],
+    calls_per_session: int = 10,
+    target: str | None = None,
+    latency_ms: float = 50.0,
+    jitter_ms: float = 10.0,
+    throttle_rate: float = 0.0,
+    think_ms: float = 0.0,
+    call_timeout: float = 60.0,
+    seed: int = 0,
+    fixtures: str | Path | None = None,
+) -> dict[str, Any]:
+    """Run every load level and build the report."""
+    levels = []
+    if target is not None:
+        await wait_until_ready(target)
+        for sessions in session_levels:
+            levels.append(await run_level(target, sessions, calls_per_session, seed, think_ms, call_timeout))
+        upstream = None
+    else:
+        items = load_items(fixtures) if fixtures else synthetic_items(seed)
+        async with FakeRetailPricesAPI(items, latency_ms, jitter_ms, throttle_rate, seed=seed) as api:
+            for sessions in session_levels:
+                api.reset_counters()
+                async with spawn_server(api.url) as spawned:
+                    level = await run_level(spawned, sessions, calls_per_session, seed, think_ms, call_timeout)
+                level["upstream"] = {"requests": api.calls, "throttled": api.responses[429]}
+                levels.append(level)
+        upstream = {"latency_ms": latency_ms, "jitter_ms": jitter_ms, "throttle_rate": throttle_rate}
+
+    return {
+        "config": {
+            "target": target or "spawned",
+            "calls_per_session": calls_per_session,
+            "think_ms": think_ms,
+            "seed": seed,
+            "fake_upstream": upstream,
+        },
+        "levels": levels,
+        "curve": saturation_curve(levels),
+        "saturation": find_saturation(levels),
+    }
+
+
+def main(argv: Sequence[str] | None = None) -> None:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Load test the Azure Pricing MCP server over its SSE transport")
+    parser.add_argument("--sessions", default="1,4,16,64", help="Comma-separated session counts (default: 1,4,16,64)")
+    parser.add_argument("--calls-per-session", type=int, default=10, help="Tool calls per session (default: 10)")
+    parser.add_argument("--target", help="Base URL of a running server (default: spawn one per level)")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Fake upstream mean latency (default: 50)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Fake upstream latency jitter (default: 10)")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of fake upstream 429s (default: 0)")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="Pause between a session's calls (default: 0)")
+    parser.add_argument("--call-timeout", type=float, default=60.0, help="Seconds before a call counts as failed")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for fixtures, tool mix and fault injection")
+    parser.add_argument("--fixtures", help="Recorded API pages to serve instead of the synthetic catalog")
+    parser.add_argument("--baseline", help="Earlier report to compare the saturation curve against")
+    parser.add_argument("--output", help="Write the JSON report to this file instead of stdout")
+    args = parser.parse_args(argv)
+    # Keep the MCP client's per-request logging out of the report
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    report = asyncio.run(
+        run_load_test(
+            [int(level) for level in args.sessions.split(",")],
+            calls_per_session=args.calls_per_session,
+            target=args.target.rstrip("/") if args.target else None,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            throttle_rate=args.throttle_rate,
+            think_ms=args.think_ms,
+            call_timeout=args.call_timeout,
+            seed=args.seed,
+            fixtures=args.fixtures,
+        )
+    )
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+        report["baseline_comparison"] = compare_curves(baseline["curve"], report["curve"])
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(text + "\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Smoke tests for the benchmark's fake Retail Prices API and harness."""
+
+import aiohttp
+import pytest
+
+from .fake_api import FakeRetailPricesAPI
+from .fixtures import load_items, synthetic_items
+from .harness import TOOL_WEIGHTS, build_workload, percentile, run_benchmark
+from .loadgen import compare_curves, find_saturation, run_load_test
+
+
+class TestFakeAPI:
+    """Test the fake API follows the Retail Prices paging contract."""
+
+    @pytest.mark.asyncio
+    async def test_filter_and_paging(self):
+        """Test $filter is applied and NextPageLink walks the whole result set."""
+        items = synthetic_items()
+        expected = [item for item in items if item["serviceName"] == "Virtual Machines"]
+        async with FakeRetailPricesAPI(items) as api, aiohttp.ClientSession() as session:
+            url, params = api.url, {"$filter": "serviceName eq 'Virtual Machines'", "$top": "300"}
+            collected = []
+            while url:
+                async with session.get(url, params=params) as response:
+                    page = await response.json()
+                collected.extend(page["Items"])
+                url, params = page["NextPageLink"], None
+
+        assert collected == expected
+        assert api.calls == -(-len(expected) // 300)
+
+    @pytest.mark.asyncio
+    async def test_throttling_and_bad_filters(self):
+        """Test injected 429s carry Retry-After and unsupported filters get a 400."""
+        async with FakeRetailPricesAPI([], throttle_rate=1.0, retry_after=2) as api:
+            async with aiohttp.ClientSession() as session, session.get(api.url) as response:
+                assert response.status == 429
+                assert response.headers["Retry-After"] == "2"
+            api.throttle_rate = 0.0
+            async with aiohttp.ClientSession() as session:
+                async with session.get(api.url, params={"$filter": "serviceName startswith 'X'"}) as response:
+                    assert response.status == 400
+
+        assert api.responses == {429: 1, 400: 1}
+
+    def test_fixtures(self, tmp_path):
+        """Test the synthetic catalog is deterministic and recorded pages load from a directory."""
+        assert synthetic_items(seed=5) == synthetic_items(seed=5)
+        (tmp_path / "000.json").write_text('[{"Items": [{"a": 1}], "NextPageLink": "x"}, {"Items": [{"a": 2}]}]')
+        (tmp_path / "001.json").write_text('{"Items": [{"a": 3}]}')
+
+        assert load_items(tmp_path) == [{"a": 1}, {"a": 2}, {"a": 3}]
+        assert load_items(tmp_path / "001.json") == [{"a": 3}]
+
+
+class TestHarness:
+    """Test the benchmark harness end to end."""
+
+    def test_workload_is_deterministic(self):
+        """Test the same seed yields the same calls, covering every tool."""
+        workload = build_workload(500, seed=7)
+        assert workload == build_workload(500, seed=7)
+        assert {tool for tool, _ in workload} == set(TOOL_WEIGHTS)
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(i) for i in range(1, 101)]
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 99) == 99.0
+        assert percentile([3.0], 95) == 3.0
+        assert percentile([], 50) == 0.0
+
+    @pytest.mark.asyncio
+    async def test_report(self):
+        """Test a small run drives every tool without errors and reports per-level statistics."""
+        report = await run_benchmark([1, 4], requests=40, latency_ms=1, jitter_ms=0, upstream_rate=500, seed=3)
+
+        assert [level["concurrency"] for level in report["levels"]] == [1, 4]
+        for level in report["levels"]:
+            assert level["requests"] == 40
+            assert level["errors"] == 0
+            assert level["upstream"]["requests"] > 0
+            assert level["latency_ms"]["p50"] <= level["latency_ms"]["p95"] <= level["latency_ms"]["p99"]
+            assert sum(tool["calls"] for tool in level["tools"].values()) == 40
+
+
+def _level(sessions: int, throughput: float, error_rate: float = 0.0) -> dict:
+    """Build the fields of a load level that saturation detection looks at."""
+    return {"sessions": sessions, "throughput_rps": throughput, "error_rate": error_rate, "session_setup_errors": 0}
+
+
+class TestLoadGenerator:
+    """Test the SSE session load generator."""
+
+    def test_find_saturation(self):
+        """Test the knee is the first level with errors or without a throughput gain."""
+        assert find_saturation([_level(1, 10), _level(4, 38), _level(16, 120)]) is None
+        assert find_saturation([_level(1, 10), _level(4, 38), _level(16, 40)]) == {
+            "sessions": 16,
+            "reason": "throughput plateau",
+        }
+        assert find_saturation([_level(1, 10), _level(4, 38, error_rate=0.05)]) == {"sessions": 4, "reason": "errors"}
+
+    def test_compare_curves(self):
+        """Test curves are compared per session count."""
+        baseline = [{"sessions": 4, "throughput_rps": 20.0, "p50_ms": 10.0, "p95_ms": 40.0, "p99_ms": 0.0}]
+        current = [
+            {"sessions": 4, "throughput_rps": 30.0, "p50_ms": 5.0, "p95_ms": 40.0, "p99_ms": 7.0},
+            {"sessions": 8, "throughput_rps": 50.0, "p50_ms": 5.0, "p95_ms": 40.0, "p99_ms": 7.0},
+        ]
+
+        assert compare_curves(baseline, current) == [
+            {"sessions": 4, "throughput_rps_ratio": 1.5, "p50_ms_ratio": 0.5, "p95_ms_ratio": 1.0, "p99_ms_ratio": None}
+        ]
+
+    @pytest.mark.asyncio
+    async def test_sessions_against_spawned_server(self):
+        """Test concurrent SSE sessions set up and call tools on a server process pointed at the fake API."""
+        report = await run_load_test([2], calls_per_session=3, latency_ms=1, jitter_ms=0, seed=1)
+
+        (level,) = report["levels"]
+        assert level["session_setup_errors"] == 0
+        assert level["calls"] == 6
+        assert level["call_errors"] == 0
+        assert level["upstream"]["requests"] > 0
+        assert report["curve"][0]["sessions"] == 2
@@ -0,0 +1,313 @@
+"""Tests for pricing compiled ARM templates."""
+
+import json
+
+import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import synthetic_items
+
+from azure_pricing_mcp import arm
+from azure_pricing_mcp import server as pricing_module
+from azure_pricing_mcp.arm import (
+    UNRESOLVED,
+    TemplateScope,
+    parse_bicepparam,
+    template_bom,
+    template_resources,
+)
+from azure_pricing_mcp.handlers import _handle_template_estimate
+from azure_pricing_mcp.server import AzurePricingServer, set_api_url
+
+# A main.json as bicep compiles it: a module deployment with its own (inner) scope,
+# a copy loop, a condition and resources that are free or billed by usage only.
+TEMPLATE = {
+    "$schema": "https://schema.management.azure.com/schemas/2019-04-01/deploymentTemplate.json#",
+    "contentVersion": "1.0.0.0",
+    "parameters": {
+        "location": {"type": "string", "defaultValue": "[resourceGroup().location]"},
+        "environment": {"type": "string", "defaultValue": "dev"},
+        "storageCount": {"type": "int", "defaultValue": 1},
+        "deployStaticSite": {"type": "bool", "defaultValue": False},
+    },
+    "variables": {
+        "isProd": "[equals(parameters('environment'), 'prod')]",
+        "suffix": "[uniqueString(resourceGroup().id)]",
+    },
+    "resources": [
+        {
+            "type": "Microsoft.Resources/deployments",
+            "apiVersion": "2022-09-01",
+            "name": "app-service-deployment",
+            "properties": {
+                "expressionEvaluationOptions": {"scope": "inner"},
+                "mode": "Incremental",
+                "parameters": {
+                    "location": {"value": "[parameters('location')]"},
+                    "capacity": {"value": "[if(variables('isProd'), 2, 1)]"},
+                },
+                "template": {
+                    "parameters": {"location": {"type": "string"}, "capacity": {"type": "int"}},
+                    "resources": [
+                        {
+                            "type": "Microsoft.Web/serverfarms",
+                            "name": "asp-web",
+                            "location": "[parameters('location')]",
+                            "sku": {"name": "P1v3", "capacity": "[parameters('capacity')]"},
+                        },
+                        {
+                            "type": "Microsoft.Web/sites",
+                            "name": "app-web",
+                            "location": "[parameters('location')]",
+                        },
+                    ],
+                },
+            },
+        },
+        {
+            "type": "Microsoft.Storage/storageAccounts",
+            "name": "[format('st{0}{1}', copyIndex(), variables('suffix'))]",
+            "location": "[parameters('location')]",
+            "sku": {"name": "Standard_LRS"},
+            "kind": "StorageV2",
+            "copy": {"name": "storage", "count": "[parameters('storageCount')]"},
+        },
+        {
+            "condition": "[parameters('deployStaticSite')]",
+            "type": "Microsoft.Web/staticSites",
+            "name": "swa-web",
+            "location": "[parameters('location')]",
+            "sku": {"name": "Standard"},
+        },
+        {
+            "type": "Microsoft.OperationalInsights/workspaces",
+            "name": "log-web",
+            "location": "[parameters('location')]",
+        },
+        {
+            "type": "Microsoft.KeyVault/vaults",
+            "name": "[format('kv-{0}', variables('suffix'))]",
+            "location": "[parameters('location')]",
+            "properties": {"sku": {"family": "A", "name": "standard"}},
+            "resources": [{"type": "secrets", "name": "connection-string"}],
+        },
+    ],
+}
+
+
+class TestExpressions:
+    """Test offline evaluation of template expressions."""
+
+    @pytest.mark.parametrize(
+        ("expression", "expected"),
+        [
+            ("[parameters('environment')]", "prod"),
+            ("[if(equals(parameters('environment'), 'prod'), 'P1v3', 'B1')]", "P1v3"),
+            ("[format('asp-{0}-{1:D3}', toLower(parameters('environment')), 1)]", "asp-prod-001"),
+            ("[variables('skus')[parameters('environment')].name]", "P1v3"),
+            ("[length(createArray(1, 2, 3))]", 3),
+            ("[coalesce(parameters('owner'), 'platform')]", "platform"),
+            ("[tryGet(parameters('tags'), 'missing')]", None),
+            ("[[not an expression]", "[not an expression]"),
+        ],
+    )
+    def test_evaluate(self, expression, expected):
+        """Test functions, parameters, variables and indexing evaluate to their values."""
+        template = {
+            "parameters": {
+                "environment": {"type": "string"},
+                "owner": {"type": "string", "nullable": True},
+                "tags": {"type": "object", "defaultValue": {}},
+            },
+            "variables": {"skus": {"prod": {"name": "P1v3"}, "dev": {"name": "B1"}}},
+        }
+
+        assert TemplateScope(template, {"environment": "prod"}).evaluate(expression) == expected
+
+    def test_deployment_time_values_are_unresolved(self):
+        """Test values only known at deployment stay unresolved, except where they don't matter."""
+        scope = TemplateScope({"parameters": {"name": {"type": "string"}}}, {})
+
+        assert scope.evaluate("[uniqueString(resourceGroup().id)]") is UNRESOLVED
+        assert scope.evaluate("[toUpper(parameters('name'))]") is UNRESOLVED
+        assert scope.evaluate("[resourceGroup().location]") is UNRESOLVED
+        assert scope.evaluate("[if(true(), 'B1', parameters('name'))]") == "B1"
+        assert scope.describe("[format('kv-{0}', uniqueString(resourceGroup().id))]") == "kv-*"
+
+    def test_bicepparam(self):
+        """Test .bicepparam files yield their literal values and skip expressions."""
+        text = """
+using './main.bicep'
+
+// Production settings
+param environment = 'prod'
+param capacity = 2
+param zoneRedundant = true
+param tags = {
+  owner: 'platform'
+  'cost-center': 'it\\'s'
+}
+param regions = [
+  'swedencentral'
+  'germanywestcentral'
+]
+param secret = readEnvironmentVariable('SECRET')
+"""
+
+        assert parse_bicepparam(text) == {
+            "environment": "prod",
+            "capacity": 2,
+            "zoneRedundant": True,
+            "tags": {"owner": "platform", "cost-center": "it's"},
+            "regions": ["swedencentral", "germanywestcentral"],
+        }
+
+
+class TestTemplateBom:
+    """Test mapping template resources to BOM lines."""
+
+    def test_resources_walk_nested_deployments(self):
+        """Test nested deployments, copy loops, conditions and child resources are walked."""
+        resources = template_resources(TEMPLATE, {"environment": "prod", "storageCount": 3}, region="eastus")
+
+        assert [(resource.label, resource.type, resource.quantity) for resource in resources] == [
+            ("asp-web", "Microsoft.Web/serverfarms", 1),
+            ("app-web", "Microsoft.Web/sites", 1),
+            ("st**", "Microsoft.Storage/storageAccounts", 3),
+            ("log-web", "Microsoft.OperationalInsights/workspaces", 1),
+            ("kv-*", "Microsoft.KeyVault/vaults", 1),
+            ("connection-string", "Microsoft.KeyVault/vaults/secrets", 1),
+        ]
+        assert [resource.path for resource in resources[:2]] == ["app-service-deployment"] * 2
+
+    def test_copy_count_must_be_an_integer(self):
+        """Test a copy loop whose count is not an integer has an unresolved quantity."""
+        template = {
+            "resources": [
+                {"type": "Microsoft.KeyVault/vaults", "name": "kv", "copy": {"name": "vaults", "count": count}}
+                for count in (True, "[reference('x').count]")
+            ]
+        }
+
+        assert [resource.quantity for resource in template_resources(template)] == [UNRESOLVED, UNRESOLVED]
+
+    def test_bom_lines_and_reasons(self):
+        """Test priced resources become BOM lines and the rest are counted or explained."""
+        resources = template_resources(TEMPLATE, {"environment": "prod", "storageCount": 3}, region="eastus")
+
+        lines, not_priced, free = template_bom(
+            resources, usage={"Microsoft.Storage/storageAccounts": {"storage_gb": 100, "quantity": 50}}
+        )
+
+        assert lines == [
+            {
+                "name": "asp-web",
+                "service_name": "Azure App Service",
+                "sku_name": "P1 v3",
+                "quantity": 2,
+                "region": "eastus",
+            },
+            {
+                "name": "st**",
+                "service_name": "Storage",
+                "sku_name": "Hot LRS",
+                "product_name": "General Block Blob v2",
+                "region": "eastus",
+                "quantity": 3,
+                "storage_gb": 100,
+            },
+            {"name": "kv-*", "service_name": "Key Vault", "sku_name": "Standard", "region": "eastus", "quantity": 1},
+        ]
+        assert not_priced == [
+            {"name": "log-web", "type": "Microsoft.OperationalInsights/workspaces", "reason": arm.USAGE_BASED}
+        ]
+        # The web app and the secret are billed through their plan and vault
+        assert free == 2
+
+    def test_unresolved_location_needs_region(self):
+        """Test resources in an unknown location are reported unless a region is given."""
+        resources = template_resources(TEMPLATE)
+
+        lines, not_priced, _ = template_bom(resources)
+        assert lines == []
+        assert {entry["reason"] for entry in not_priced} == {
+            "Location could not be resolved from the template",
+            arm.USAGE_BASED,
+        }
+
+        lines, _, _ = template_bom(resources, region="westeurope")
+        assert {line["region"] for line in lines} == {"westeurope"}
+
+
+class TestEstimateTemplate:
+    """Test azure_template_estimate against the fake Retail Prices API."""
+
+    @pytest.fixture
+    async def fake_api(self, monkeypatch):
+        """Serve the synthetic catalog with a fresh server state."""
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        # Sessions opened by earlier tests belong to event loops that are closed by now
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        async with FakeRetailPricesAPI(synthetic_items()) as api:
+            set_api_url(api.url)
+            try:
+                yield api
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+
+    @pytest.fixture
+    def project(self, tmp_path):
+        """A bicep project directory with a compiled main.json and a main.bicepparam."""
+        (tmp_path / "main.json").write_text(json.dumps(TEMPLATE))
+        (tmp_path / "main.bicepparam").write_text(
+            "using './main.bicep'\nparam location = 'eastus'\nparam environment = 'prod'\n"
+        )
+        return tmp_path
+
+    @pytest.mark.asyncio
+    async def test_prices_project_directory(self, fake_api, project):
+        """Test a project directory is priced with its main.bicepparam and parameter overrides."""
+        result = await AzurePricingServer().estimate_template(
+            str(project),
+            parameters={"deployStaticSite": True},
+            usage={"Microsoft.Storage/storageAccounts": {"storage_gb": 1000}},
+        )
+
+        by_name = {entry["name"]: entry for entry in result["resources"]}
+        # P1v3 at 0.169/hour, two instances
+        assert by_name["asp-web"]["monthly_cost"] == pytest.approx(0.169 * 730 * 2)
+        assert by_name["st**"]["monthly_cost"] == pytest.approx(18.4)
+        assert by_name["swa-web"]["monthly_cost"] == 9.0
+        assert by_name["kv-*"]["status"] == "error"
+        assert result["template"] == {
+            "path": str(project / "main.json"),
+            "resources": 7,
+            "priced": 4,
+            "free": 2,
+            "not_priced": [
+                {"name": "log-web", "type": "Microsoft.OperationalInsights/workspaces", "reason": arm.USAGE_BASED}
+            ],
+        }
+
+    @pytest.mark.asyncio
+    async def test_handler(self, fake_api, project, tmp_path):
+        """Test the handler reports the estimate and unpriced resources, and errors for missing templates."""
+        (content,) = await _handle_template_estimate(AzurePricingServer(), {"template_path": str(project)})
+
+        assert "main.json" in content.text
+        assert "log-web (Microsoft.OperationalInsights/workspaces)" in content.text
+
+        (content,) = await _handle_template_estimate(AzurePricingServer(), {"template_path": str(tmp_path / "missing")})
+        assert content.text.startswith("Error: Template not found")
+
+    def test_cli_reports_missing_template(self, tmp_path, capsys):
+        """Test the command line prints the error and exits non-zero."""
+        with pytest.raises(SystemExit) as exit_info:
+            arm.main([str(tmp_path / "missing"), "--param", "environment=prod"])
+
+        assert exit_info.value.code == 1
+        assert json.loads(capsys.readouterr().out)["error"].startswith("Template not found")
@@ -1,20 +1,25 @@
 """Comprehensive tests for Azure Pricing MCP Server."""
 
+import asyncio
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import REGIONS, synthetic_items
 from mcp.types import TextContent
 
+from azure_pricing_mcp import server as pricing_module
 from azure_pricing_mcp.handlers import (
     _handle_cost_estimate,
     _handle_customer_discount,
     _handle_discover_skus,
+    _handle_price_batch,
     _handle_price_compare,
     _handle_price_search,
     _handle_sku_discovery,
 )
-from azure_pricing_mcp.server import AzurePricingServer
+from azure_pricing_mcp.server import AZURE_PRICING_BASE_URL, AzurePricingServer, set_api_url
 
 
 @pytest.fixture
@@ -544,3 +549,398 @@ class TestErrorHandling:
             )
 
             assert "error" in result
+
+
+def _fake_paged_api(total: int, page_size: int = 1000) -> tuple[Any, dict[str, int]]:
+    """Build a fake _make_request serving `total` items in $skip-offset pages."""
+    stats = {"calls": 0, "in_flight": 0, "max_in_flight": 0}
+
+    async def fake_make_request(url: str, params: dict[str, Any] | None = None, **kwargs: Any):
+        stats["calls"] += 1
+        stats["in_flight"] += 1
+        stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        await asyncio.sleep(0.01)
+        stats["in_flight"] -= 1
+
+        skip = int((params or {}).get("$skip", 0))
+        end = min(skip + page_size, total)
+        items = [{"meterId": str(i), "skuName": f"SKU{i}", "retailPrice": 1.0} for i in range(skip, end)]
+        next_link = f"{AZURE_PRICING_BASE_URL}?$filter=serviceName%20eq%20%27X%27&$skip={end}" if end < total else None
+        return {"Items": items, "NextPageLink": next_link, "Count": len(items)}
+
+    return fake_make_request, stats
+
+
+class TestPagination:
+    """Test NextPageLink pagination with concurrent prefetch."""
+
+    @pytest.mark.asyncio
+    async def test_search_follows_all_pages_in_order(self, pricing_server):
+        """Test that every page is collected, in order, with pages fetched concurrently."""
+        fake, stats = _fake_paged_api(total=3500)
+        with patch.object(pricing_server, "_make_request", side_effect=fake):
+            result = await pricing_server.search_azure_prices(service_name="X", limit=3500)
+
+        assert result["count"] == 3500
+        assert result["has_more"] is False
+        assert [item["meterId"] for item in result["items"]] == [str(i) for i in range(3500)]
+        assert stats["calls"] == 4
+        assert stats["max_in_flight"] > 1
+
+    @pytest.mark.asyncio
+    async def test_item_budget_limits_requests(self, pricing_server):
+        """Test that no pages beyond the item budget are requested."""
+        fake, stats = _fake_paged_api(total=10000)
+        with patch.object(pricing_server, "_make_request", side_effect=fake):
+            result = await pricing_server.search_azure_prices(service_name="X", limit=2500)
+
+        assert result["count"] == 2500
+        assert result["has_more"] is True
+        assert stats["calls"] == 3
+
+    @pytest.mark.asyncio
+    async def test_speculative_pages_past_end_are_discarded(self, pricing_server):
+        """Test that prefetched pages past the last NextPageLink are not returned."""
+        fake, _ = _fake_paged_api(total=1500)
+        with patch.object(pricing_server, "_make_request", side_effect=fake):
+            result = await pricing_server.discover_skus(service_name="X", price_type="", limit=5000)
+
+        assert result["total_skus"] == 1500
+        assert result["has_more"] is False
+
+
+class TestRequestCoalescing:
+    """Test single-flight deduplication of concurrent identical requests."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_identical_requests_share_one_fetch(self, pricing_server, mock_pricing_response):
+        """Test that concurrent callers with the same cache key trigger one upstream fetch."""
+        AzurePricingServer._cache.clear()
+
+        async def slow_fetch(url, params, max_retries, cache_key, **kwargs):
+            await asyncio.sleep(0.05)
+            return mock_pricing_response
+
+        params = {"$filter": "serviceName eq 'Coalesce'"}
+        with patch.object(pricing_server, "_fetch", side_effect=slow_fetch) as mock_fetch:
+            results = await asyncio.gather(
+                *(pricing_server._make_request(AZURE_PRICING_BASE_URL, params) for _ in range(5))
+            )
+
+        assert mock_fetch.call_count == 1
+        assert all(result is mock_pricing_response for result in results)
+        assert AzurePricingServer._inflight == {}
+
+    @pytest.mark.asyncio
+    async def test_error_propagates_to_all_waiters(self, pricing_server):
+        """Test that a failed shared fetch raises in every caller."""
+
+        async def failing_fetch(url, params, max_retries, cache_key, **kwargs):
+            await asyncio.sleep(0.01)
+            raise ValueError("upstream failed")
+
+        params = {"$filter": "serviceName eq 'CoalesceError'"}
+        with patch.object(pricing_server, "_fetch", side_effect=failing_fetch) as mock_fetch:
+            results = await asyncio.gather(
+                *(pricing_server._make_request(AZURE_PRICING_BASE_URL, params) for _ in range(3)),
+                return_exceptions=True,
+            )
+
+        assert mock_fetch.call_count == 1
+        assert all(isinstance(result, ValueError) for result in results)
+
+    @pytest.mark.asyncio
+    async def test_cancelling_one_waiter_keeps_shared_fetch(self, pricing_server, mock_pricing_response):
+        """Test that cancellation only stops the upstream fetch when nobody else waits."""
+        started = asyncio.Event()
+        fetch_cancelled = asyncio.Event()
+
+        async def slow_fetch(url, params, max_retries, cache_key, **kwargs):
+            started.set()
+            try:
+                await asyncio.sleep(0.05)
+            except asyncio.CancelledError:
+                fetch_cancelled.set()
+                raise
+            return mock_pricing_response
+
+        params = {"$filter": "serviceName eq 'CoalesceCancel'"}
+        with patch.object(pricing_server, "_fetch", side_effect=slow_fetch):
+            first = asyncio.ensure_future(pricing_server._make_request(AZURE_PRICING_BASE_URL, params))
+            second = asyncio.ensure_future(pricing_server._make_request(AZURE_PRICING_BASE_URL, params))
+            await started.wait()
+
+            first.cancel()
+            assert await second is mock_pricing_response
+            assert not fetch_cancelled.is_set()
+
+            lone = asyncio.ensure_future(pricing_server._make_request(AZURE_PRICING_BASE_URL, params))
+            await asyncio.sleep(0.01)
+            lone.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await lone
+            await asyncio.sleep(0)
+            assert fetch_cancelled.is_set()
+
+
+class TestFanOut:
+    """Test the bounded concurrent executor behind the multi-region and batch tools."""
+
+    @pytest.mark.asyncio
+    async def test_results_in_input_order_with_bounded_concurrency(self, pricing_server):
+        """Test calls overlap up to the limit and results keep the input order."""
+        running = 0
+        peak = 0
+
+        async def call(value: int, delay: float) -> int:
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(delay)
+            running -= 1
+            return value
+
+        calls = [lambda v=v: call(v, 0.03 - v * 0.005) for v in range(6)]
+        results = await pricing_server._fan_out(calls, limit=3)
+
+        assert results == [0, 1, 2, 3, 4, 5]
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_failures_and_timeouts_leave_partial_results(self, pricing_server):
+        """Test a failing or slow call yields its exception without affecting the others."""
+
+        async def fail():
+            raise RuntimeError("boom")
+
+        async def hang():
+            await asyncio.sleep(1)
+
+        async def ok():
+            return "ok"
+
+        results = await pricing_server._fan_out([fail, hang, ok], timeout=0.05)
+
+        assert isinstance(results[0], RuntimeError)
+        assert isinstance(results[1], TimeoutError) and "Timed out" in str(results[1])
+        assert results[2] == "ok"
+
+    @pytest.mark.asyncio
+    async def test_compare_prices_queries_regions_concurrently(self, pricing_server, mock_pricing_response):
+        """Test region comparison takes about one round-trip and reports failed regions."""
+        item = mock_pricing_response["Items"][0]
+
+        async def search(**kwargs):
+            await asyncio.sleep(0.05)
+            if kwargs["region"] == "brokenregion":
+                raise RuntimeError("upstream unavailable")
+            return {"items": [{**item, "armRegionName": kwargs["region"]}], "count": 1}
+
+        regions = ["eastus", "westus", "brokenregion", "northeurope", "westeurope", "uksouth"]
+        with patch.object(pricing_server, "search_azure_prices", side_effect=search):
+            started = asyncio.get_running_loop().time()
+            result = await pricing_server.compare_prices(service_name="Virtual Machines", regions=regions)
+            elapsed = asyncio.get_running_loop().time() - started
+
+        assert elapsed < 0.05 * 3
+        assert [c["region"] for c in result["comparisons"]] == regions[:2] + regions[3:]
+        assert result["failed_regions"] == ["brokenregion"]
+
+
+class TestRecommendRegions:
+    """Test two-pass region recommendations against the fake Retail Prices API."""
+
+    @pytest.fixture
+    async def fake_api(self, monkeypatch):
+        """Serve a catalog where Spot meters of a few regions come first and crowd out the rest."""
+        filler = [
+            {**item, "skuName": "D4s v3 Spot", "meterName": f"D4s v3 Spot {n}", "retailPrice": 0.05 + n / 1000}
+            for item in synthetic_items()
+            if item["skuName"] == "D4s v3"
+            and item["armRegionName"] in ("eastus", "eastus2", "westus2")
+            and item["type"] == "Consumption"
+            and "Windows" not in item["productName"]
+            for n in range(200)
+        ]
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        # Sessions opened by earlier tests belong to event loops that are closed by now
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        AzurePricingServer._region_index.clear()
+        async with FakeRetailPricesAPI(filler + synthetic_items()) as api:
+            set_api_url(api.url)
+            try:
+                yield api
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+                AzurePricingServer._region_index.clear()
+
+    @pytest.mark.asyncio
+    async def test_every_region_ranked_at_its_consumption_price(self, pricing_server, fake_api):
+        """Test all regions are ranked even past the old 500-item budget, at Linux On-Demand prices."""
+        result = await pricing_server.recommend_regions("Virtual Machines", "D4s v3", top_n=50)
+
+        linux_prices = {
+            item["armRegionName"]: item["retailPrice"]
+            for item in synthetic_items()
+            if item["skuName"] == "D4s v3" and item["type"] == "Consumption" and "Windows" not in item["productName"]
+        }
+        ranked = {rec["region"]: rec["retail_price"] for rec in result["recommendations"]}
+        assert set(ranked) == set(REGIONS)
+        assert ranked == pytest.approx(linux_prices)
+        assert "failed_regions" not in result
+        # One discovery query per search term variant; per-region prices come from the discovery page
+        assert fake_api.calls == 2
+
+    @staticmethod
+    async def _recommend_behind_spot_crowd(pricing_server, monkeypatch) -> tuple[dict, FakeRetailPricesAPI]:
+        """Recommend regions for D4s v3 when Spot meters of eastus fill the first page but for one item."""
+        items = synthetic_items()
+        spot = next(item for item in items if item["skuName"] == "D4s v3" and item["type"] == "Consumption")
+        crowd = [
+            {**spot, "meterId": f"spot-{n}", "skuName": "D4s v3 Spot", "meterName": f"D4s v3 Spot {n}"}
+            for n in range(999)
+        ]
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        AzurePricingServer._region_index.clear()
+        async with FakeRetailPricesAPI(crowd + items) as api:
+            set_api_url(api.url)
+            try:
+                result = await pricing_server.recommend_regions("Virtual Machines", "D4s v3", top_n=50)
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+                AzurePricingServer._region_index.clear()
+        return result, api
+
+    @pytest.mark.asyncio
+    async def test_regions_past_the_first_page_are_ranked(self, pricing_server, monkeypatch):
+        """Test discovery pages on when the first page holds only some of the regions."""
+        result, api = await self._recommend_behind_spot_crowd(pricing_server, monkeypatch)
+
+        discovery = [f for f in api.filters if "armRegionName" not in f]
+        assert any(api.filters[f] > 1 for f in discovery)  # discovery read more than one page
+        assert result["total_regions_found"] == len(REGIONS)
+        assert {rec["region"] for rec in result["recommendations"]} == set(REGIONS)
+        assert "regions_incomplete" not in result
+
+    @pytest.mark.asyncio
+    async def test_discovery_limit_flags_missed_regions(self, pricing_server, monkeypatch):
+        """Test regions beyond the discovery item limit are reported as possibly missing."""
+        monkeypatch.setattr(pricing_module, "MAX_DISCOVERY_ITEMS", 1000)
+        result, _ = await self._recommend_behind_spot_crowd(pricing_server, monkeypatch)
+
+        assert 0 < result["total_regions_found"] < len(REGIONS)
+        assert result["regions_incomplete"] is True
+
+    @pytest.mark.asyncio
+    async def test_repeat_recommendation_reuses_region_index(self, pricing_server, fake_api):
+        """Test a repeated recommendation is answered without upstream requests."""
+        first = await pricing_server.recommend_regions("Virtual Machines", "D4s v3")
+        calls = fake_api.calls
+        second = await pricing_server.recommend_regions("Virtual Machines", "D4s v3")
+
+        assert fake_api.calls == calls
+        assert second["recommendations"] == first["recommendations"]
+
+
+class TestPriceBatch:
+    """Test the azure_price_batch bulk query tool."""
+
+    @pytest.mark.asyncio
+    async def test_queries_run_concurrently_in_input_order(self, pricing_server, mock_pricing_response_with_savings):
+        """Test searches and estimates overlap, keep input order and identical queries run once."""
+        item = mock_pricing_response_with_savings["Items"][0]
+        running = 0
+        peak = 0
+
+        async def search(**kwargs):
+            nonlocal running, peak
+            running += 1
+            peak = max(peak, running)
+            await asyncio.sleep(0.02)
+            running -= 1
+            items = [{**item, "armRegionName": kwargs.get("region")}]
+            return {"items": items, "count": 1, "has_more": False, "currency": "USD"}
+
+        queries = [
+            {"id": "web", "service_name": "Virtual Machines", "sku_name": "D4s v3", "region": "eastus"},
+            {"kind": "estimate", "service_name": "Virtual Machines", "sku_name": "D4s v3", "region": "westus"},
+            {"id": "again", "service_name": "Virtual Machines", "sku_name": "D4s v3", "region": "eastus"},
+            {"kind": "estimate", "service_name": "Virtual Machines", "sku_name": "D4s v3", "region": "northeurope"},
+        ]
+        with patch.object(pricing_server, "search_azure_prices", side_effect=search) as mock_search:
+            result = await pricing_server.price_batch(queries, max_concurrency=2)
+
+        assert mock_search.call_count == 3
+        assert peak == 2
+        assert [entry["index"] for entry in result["results"]] == [0, 1, 2, 3]
+        assert result["results"][0]["id"] == "web" and result["results"][2]["id"] == "again"
+        assert result["results"][0]["items"][0]["region"] == "eastus"
+        assert result["results"][1]["region"] == "westus"
+        assert result["results"][1]["monthly_cost"] == pytest.approx(0.096 * 730, abs=0.01)
+        assert result["monthly_cost_totals"] == {"USD": pytest.approx(2 * 0.096 * 730, abs=0.01)}
+        assert result["unique_queries"] == 3
+        assert result["succeeded"] == 4 and result["failed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_failures_are_reported_per_query(self, pricing_server):
+        """Test a failing or malformed query doesn't fail the rest of the batch."""
+
+        async def search(**kwargs):
+            if kwargs.get("region") == "broken":
+                raise RuntimeError("upstream unavailable")
+            return {"items": [], "count": 0, "has_more": False, "currency": "USD"}
+
+        queries = [
+            {"service_name": "Storage", "region": "eastus"},
+            {"service_name": "Storage", "region": "broken"},
+            {"kind": "quote", "service_name": "Storage"},
+            {"kind": "estimate", "service_name": "Storage", "sku_name": "Hot LRS", "region": "eastus"},
+        ]
+        with patch.object(pricing_server, "search_azure_prices", side_effect=search):
+            result = await pricing_server.price_batch(queries)
+
+        statuses = [entry["status"] for entry in result["results"]]
+        assert statuses == ["ok", "error", "error", "error"]
+        assert result["results"][1]["error"] == "upstream unavailable"
+        assert "Unknown query kind 'quote'" in result["results"][2]["error"]
+        assert "No pricing found" in result["results"][3]["error"]
+        assert result["failed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_rejects_empty_and_oversized_batches(self, pricing_server):
+        """Test the batch size limits."""
+        assert "error" in await pricing_server.price_batch([])
+        assert "at most" in (await pricing_server.price_batch([{}] * 51))["error"]
+
+    @pytest.mark.asyncio
+    async def test_handle_price_batch(self, pricing_server):
+        """Test the batch handler summarizes outcomes and totals."""
+        with patch.object(pricing_server, "price_batch") as mock_batch:
+            mock_batch.return_value = {
+                "results": [
+                    {"index": 0, "status": "ok", "kind": "estimate", "monthly_cost": 70.08, "currency": "USD"},
+                    {"index": 1, "status": "error", "error": "No pricing found for X in eastus"},
+                ],
+                "total_queries": 2,
+                "unique_queries": 2,
+                "succeeded": 1,
+                "failed": 1,
+                "monthly_cost_totals": {"USD": 70.08},
+            }
+
+            result = await _handle_price_batch(pricing_server, {"queries": [{}, {}]})
+
+        assert "Batch of 2 queries: 1 succeeded, 1 failed" in result[0].text
+        assert "Estimated monthly total: 70.08 USD" in result[0].text
+        assert "No pricing found for X" in result[0].text
@@ -0,0 +1,210 @@
+"""Tests for bill-of-materials cost estimation."""
+
+import time
+
+import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import synthetic_items
+
+from azure_pricing_mcp import server as pricing_module
+from azure_pricing_mcp.bom import BomResource, parse_resources, parse_unit, price_bom, select_meters
+from azure_pricing_mcp.handlers import _handle_bom_estimate
+from azure_pricing_mcp.ratelimit import AdaptiveRateLimiter
+from azure_pricing_mcp.server import AzurePricingServer, set_api_url
+
+
+def _meter(sku_name: str, unit: str, price: float, **fields) -> dict:
+    """Build a minimal Consumption price item."""
+    return {
+        "skuName": sku_name,
+        "meterName": sku_name,
+        "productName": fields.pop("productName", "Product"),
+        "serviceFamily": fields.pop("serviceFamily", "Compute"),
+        "unitOfMeasure": unit,
+        "retailPrice": price,
+        "type": "Consumption",
+        **fields,
+    }
+
+
+class TestParsing:
+    """Test BOM input and unit parsing."""
+
+    @pytest.mark.parametrize(
+        ("unit", "expected"),
+        [
+            ("1 Hour", (1.0, "hour")),
+            ("100 Hours", (100.0, "hour")),
+            ("1/Day", (1.0, "day")),
+            ("1 GB/Month", (1.0, "gb_month")),
+            ("1 GiB/Month", (1.0, "gb_month")),
+            ("1/Month", (1.0, "month")),
+            ("10K", (10_000.0, "count")),
+            ("1M", (1_000_000.0, "count")),
+            ("1 GB", (1.0, None)),
+        ],
+    )
+    def test_units(self, unit, expected):
+        """Test unitOfMeasure values split into block size and usage kind."""
+        assert parse_unit(unit) == expected
+
+    def test_resources_take_defaults_and_default_region(self):
+        """Test optional fields get defaults and the default region fills in."""
+        (resource,) = parse_resources(
+            [{"service_name": "Storage", "sku_name": "Hot LRS"}], default_region="West Europe"
+        )
+
+        assert resource == BomResource(None, "Storage", "Hot LRS", "westeurope")
+
+    @pytest.mark.parametrize(
+        ("resources", "message"),
+        [
+            ([], "non-empty list"),
+            ([{"service_name": "Storage", "sku_name": "Hot LRS"}], "Resource 0: region is required"),
+            ([{"service_name": "Storage", "region": "eastus"}], "Resource 0: sku_name is required"),
+            (
+                [{"service_name": "Storage", "sku_name": "Hot LRS", "region": "eastus", "quantity": -1}],
+                "Resource 0: quantity must be a non-negative number",
+            ),
+            ([{"service_name": "Storage", "sku_name": "Hot LRS", "region": "eastus"}] * 101, "at most 100"),
+        ],
+    )
+    def test_invalid_resources_rejected(self, resources, message):
+        """Test invalid resources raise ValueError naming the problem."""
+        with pytest.raises(ValueError, match=message):
+            parse_resources(resources)
+
+
+class TestPricing:
+    """Test meter selection and BOM pricing."""
+
+    def test_meter_selection(self):
+        """Test Spot, reserved and other-product meters are skipped and the cheapest exact SKU wins."""
+        items = [
+            _meter("D4s v3 Spot", "1 Hour", 0.04),
+            _meter("D4s v3", "1 Hour", 0.9, type="Reservation"),
+            _meter("D4s v3", "1 Hour", 0.36, productName="Virtual Machines DSv3 Series Windows"),
+            _meter("D4s v3", "1 Hour", 0.19, productName="Virtual Machines DSv3 Series"),
+            _meter("D4s v3 Promo", "1 Hour", 0.1, productName="Virtual Machines DSv3 Series"),
+        ]
+        resource = BomResource(None, "Virtual Machines", "D4s v3", "eastus")
+
+        assert select_meters(resource, items)["compute"]["retailPrice"] == 0.19
+        windows = resource._replace(product_name="windows")
+        assert select_meters(windows, items)["compute"]["retailPrice"] == 0.36
+        assert select_meters(resource._replace(sku_name="D4s v3 Spot"), items)["compute"]["retailPrice"] == 0.04
+
+    def test_totals_breakdown_and_savings_plans(self):
+        """Test charges are priced by usage and quantity, then totalled by resource, family and savings plan."""
+        vm = _meter(
+            "D4s v3",
+            "1 Hour",
+            0.2,
+            savingsPlan=[{"term": "1 Year", "retailPrice": 0.1}, {"term": "3 Years", "retailPrice": 0.05}],
+        )
+        blob = _meter("Hot LRS", "1 GB/Month", 0.02, serviceFamily="Storage")
+        writes = _meter("Hot LRS", "10K", 0.05, serviceFamily="Storage")
+        resources = [
+            BomResource("vm", "Virtual Machines", "D4s v3", "eastus", quantity=2, hours_per_month=100),
+            BomResource("blob", "Storage", "Hot LRS", "eastus", storage_gb=500, transactions=1_000_000),
+            BomResource("queue", "Storage", "Queue", "eastus", storage_gb=10),
+        ]
+        meters = [{"compute": vm}, {"storage": blob, "transactions": writes}, RuntimeError("boom")]
+
+        result = price_bom(resources, meters, discount_percentage=10)
+
+        vm_entry, blob_entry, failed_entry = result["resources"]
+        # 0.2 * 0.9 * 100 hours * 2 instances
+        assert vm_entry["monthly_cost"] == 36.0
+        # 500 GB * 0.018 + 100 blocks of 10K * 0.045
+        assert blob_entry["monthly_cost"] == 13.5
+        assert [component["component"] for component in blob_entry["components"]] == ["storage", "transactions"]
+        assert failed_entry == {
+            "index": 2,
+            "name": "queue",
+            "service_name": "Storage",
+            "sku_name": "Queue",
+            "region": "eastus",
+            "quantity": 1,
+            "status": "error",
+            "error": "Price lookup failed: boom",
+        }
+        assert result["totals"] == {"monthly_cost": 49.5, "annual_cost": 594.0}
+        assert [(family["service_family"], family["monthly_cost"]) for family in result["by_service_family"]] == [
+            ("Compute", 36.0),
+            ("Storage", 13.5),
+        ]
+        # Savings plans cover the compute charge only
+        assert [(plan["term"], plan["monthly_cost"]) for plan in result["savings_plans"]] == [
+            ("1 Year", 31.5),
+            ("3 Years", 22.5),
+        ]
+        assert (result["priced_resources"], result["failed_resources"]) == (2, 1)
+
+
+class TestEstimateBom:
+    """Test azure_bom_estimate against the fake Retail Prices API."""
+
+    @pytest.fixture
+    async def fake_api(self, monkeypatch):
+        """Serve the synthetic catalog with a fixed latency and a fresh server state."""
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        # Sessions opened by earlier tests belong to event loops that are closed by now
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        monkeypatch.setattr(AzurePricingServer, "_rate_limiter", AdaptiveRateLimiter(rate=100, burst=20))
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        async with FakeRetailPricesAPI(synthetic_items(), latency_ms=300) as api:
+            set_api_url(api.url)
+            try:
+                yield api
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+
+    @pytest.mark.asyncio
+    async def test_lookups_are_deduplicated_and_concurrent(self, fake_api):
+        """Test each distinct meter is fetched once and all lookups share one latency window."""
+        resources = [
+            {"service_name": "Virtual Machines", "sku_name": "D4s v3", "quantity": 2},
+            {"service_name": "Virtual Machines", "sku_name": "D4s v3", "hours_per_month": 200},
+            {"service_name": "Azure App Service", "sku_name": "P1v3"},
+            {"service_name": "Storage", "sku_name": "Hot LRS", "storage_gb": 1000},
+            {"service_name": "Storage", "sku_name": "E10 LRS", "quantity": 3},
+            {"service_name": "SQL Database", "sku_name": "S1"},
+        ] * 5
+
+        started = time.perf_counter()
+        result = await AzurePricingServer().estimate_bom(resources, region="eastus")
+        elapsed = time.perf_counter() - started
+
+        assert result["unique_lookups"] == 5
+        assert fake_api.calls == 5
+        assert result["priced_resources"] == 30
+        # Serial lookups would take five latency windows
+        assert elapsed < 0.9
+        assert {family["service_family"] for family in result["by_service_family"]} == {
+            "Compute",
+            "Web",
+            "Storage",
+            "Databases",
+        }
+
+    @pytest.mark.asyncio
+    async def test_handler_reports_totals_and_failures(self, fake_api):
+        """Test the handler shows totals, the family breakdown and unpriced resources."""
+        arguments = {
+            "resources": [
+                {"name": "web", "service_name": "Azure App Service", "sku_name": "P1v3", "quantity": 2},
+                {"name": "ghost", "service_name": "Azure App Service", "sku_name": "Z9"},
+            ],
+            "region": "eastus",
+        }
+
+        (content,) = await _handle_bom_estimate(AzurePricingServer(), arguments)
+
+        assert "Bill of Materials Estimate (2 resources)" in content.text
+        assert "| Web | 1 |" in content.text
+        assert "ghost (Z9): No price found for Z9 in eastus" in content.text
@@ -0,0 +1,385 @@
+"""Tests for the persistent two-tier response cache."""
+
+import asyncio
+import time
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.cache import DiskCache
+from azure_pricing_mcp.server import AZURE_PRICING_BASE_URL, CACHE_TTL, STALE_KEY, AzurePricingServer
+
+
+class FakeResponse:
+    """Minimal stand-in for an aiohttp response context manager."""
+
+    def __init__(self, payload: dict[str, Any], status: int = 200):
+        self.payload = payload
+        self.status = status
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return self.payload
+
+
+@pytest.fixture
+def disk_cache(tmp_path):
+    """Create a disk cache and detach it from the server afterwards."""
+    cache = DiskCache(str(tmp_path / "responses.db"))
+    AzurePricingServer._cache.clear()
+    yield cache
+    AzurePricingServer.attach_disk_cache(None)
+    AzurePricingServer._cache.clear()
+    cache.close()
+
+
+class TestDiskCache:
+    """Test the on-disk cache tier."""
+
+    def test_roundtrip(self, disk_cache):
+        """Test values survive compression and storage."""
+        disk_cache.set("k", {"Items": [{"retailPrice": 1.5}]})
+        assert disk_cache.get("k") == {"Items": [{"retailPrice": 1.5}]}
+        assert disk_cache.get("missing") is None
+
+    def test_expired_entries_are_ignored(self, disk_cache):
+        """Test entries older than the TTL are not returned."""
+        disk_cache.set("k", {"Items": []})
+        disk_cache.ttl = 0.01
+        time.sleep(0.02)
+        assert disk_cache.get("k") is None
+
+    def test_lru_eviction_respects_byte_budget(self, tmp_path):
+        """Test least recently used entries are evicted once over budget."""
+        cache = DiskCache(str(tmp_path / "small.db"))
+        payload = {"Items": [{"meterId": str(i), "price": i * 1.37} for i in range(200)]}
+        cache.set("a", payload)
+        entry_size = cache.stats()["bytes"]
+        cache.max_bytes = entry_size * 2 + entry_size // 2
+
+        cache.set("b", payload)
+        cache.get("a")  # touch "a" so "b" becomes least recently used
+        cache.set("c", payload)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.get("c") is not None
+        assert cache.stats()["bytes"] <= cache.max_bytes
+        cache.close()
+
+    def test_fetch_leases_exclude_other_processes(self, disk_cache):
+        """Test a key's lease is held by one process at a time and lapses after its TTL."""
+        other = DiskCache(disk_cache.path)
+        other.owner = "other-process"
+
+        assert disk_cache.acquire_lease("k")
+        assert disk_cache.acquire_lease("k")  # re-entrant for the holder
+        assert not other.acquire_lease("k")
+
+        disk_cache.release_lease("k")
+        assert other.acquire_lease("k", ttl=0.01)
+        time.sleep(0.02)
+        assert disk_cache.acquire_lease("k")
+        other.close()
+
+
+class TestTwoTierCache:
+    """Test the pricing server's use of the disk tier."""
+
+    @pytest.mark.asyncio
+    async def test_disk_hit_avoids_upstream(self, disk_cache):
+        """Test a cold memory tier is filled from disk without an HTTP request."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'Disk'"}
+        disk_cache.set(server._cache_key(AZURE_PRICING_BASE_URL, params), {"Items": [{"skuName": "S1"}]})
+        AzurePricingServer.attach_disk_cache(disk_cache)
+
+        with patch.object(server, "get_session", side_effect=AssertionError("upstream called")):
+            result = await server._make_request(AZURE_PRICING_BASE_URL, params)
+
+        assert result == {"Items": [{"skuName": "S1"}]}
+        assert server._cache_key(AZURE_PRICING_BASE_URL, params) in AzurePricingServer._cache
+
+    @pytest.mark.asyncio
+    async def test_responses_written_through_to_disk(self, disk_cache):
+        """Test upstream responses are persisted to the disk tier."""
+        server = AzurePricingServer()
+        AzurePricingServer.attach_disk_cache(disk_cache)
+        params = {"$filter": "serviceName eq 'WriteThrough'"}
+        session = MagicMock()
+        session.get.return_value = FakeResponse({"Items": [{"skuName": "P1v3"}]})
+
+        with patch.object(server, "get_session", return_value=session):
+            await server._make_request(AZURE_PRICING_BASE_URL, params)
+
+        assert disk_cache.get(server._cache_key(AZURE_PRICING_BASE_URL, params)) == {"Items": [{"skuName": "P1v3"}]}
+
+    @pytest.mark.asyncio
+    async def test_stale_disk_hit_refreshed_upstream(self, disk_cache):
+        """Test the background refresh of a stale disk entry goes upstream instead of re-reading it."""
+        server = AzurePricingServer()
+        AzurePricingServer.attach_disk_cache(disk_cache)
+        params = {"$filter": "serviceName eq 'StaleDisk'"}
+        key = server._cache_key(AZURE_PRICING_BASE_URL, params)
+        disk_cache.set(key, {"Items": [{"retailPrice": 1.0}]})
+        with disk_cache._conn:
+            disk_cache._conn.execute("UPDATE entries SET created_at = ?", (time.time() - CACHE_TTL - 10,))
+        session = MagicMock()
+        session.get.return_value = FakeResponse({"Items": [{"retailPrice": 2.0}]})
+
+        with patch.object(server, "get_session", return_value=session):
+            stale = await server._make_request(AZURE_PRICING_BASE_URL, params)
+            await asyncio.sleep(0.05)
+
+        assert stale[STALE_KEY] is True
+        assert session.get.call_count == 1
+        assert AzurePricingServer._cache[key][1] == {"Items": [{"retailPrice": 2.0}]}
+        assert disk_cache.get(key) == {"Items": [{"retailPrice": 2.0}]}
+
+    @pytest.mark.asyncio
+    async def test_waits_for_response_leased_by_other_process(self, disk_cache):
+        """Test a disk miss leased by another process is served from disk once that process writes it."""
+        server = AzurePricingServer()
+        AzurePricingServer.attach_disk_cache(disk_cache)
+        params = {"$filter": "serviceName eq 'Leased'"}
+        key = server._cache_key(AZURE_PRICING_BASE_URL, params)
+        other = DiskCache(disk_cache.path)
+        other.owner = "other-process"
+        assert other.acquire_lease(key)
+        session = MagicMock()
+
+        with patch.object(server, "get_session", return_value=session):
+            waiting = asyncio.ensure_future(server._make_request(AZURE_PRICING_BASE_URL, params))
+            await asyncio.sleep(0.1)
+            assert not waiting.done()
+            other.set(key, {"Items": [{"retailPrice": 3.0}]})
+            other.release_lease(key)
+            result = await waiting
+
+        assert result["Items"] == [{"retailPrice": 3.0}]
+        session.get.assert_not_called()
+        other.close()
+
+    def test_warm_loads_memory_tier(self, disk_cache):
+        """Test startup warming copies disk entries into memory."""
+        disk_cache.set("warm-1", {"Items": []})
+        disk_cache.set("warm-2", {"Items": []})
+
+        loaded = AzurePricingServer.attach_disk_cache(disk_cache, warm=True)
+
+        assert loaded == 2
+        assert "warm-1" in AzurePricingServer._cache
+        assert "warm-2" in AzurePricingServer._cache
+
+
+class TestStaleWhileRevalidate:
+    """Test serving stale cache entries while refreshing them in the background."""
+
+    @pytest.mark.asyncio
+    async def test_stale_entry_served_and_refreshed_once(self):
+        """Test stale entries return immediately and trigger a single background refresh."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'Stale'"}
+        key = server._cache_key(AZURE_PRICING_BASE_URL, params)
+        AzurePricingServer._cache[key] = (time.time() - CACHE_TTL - 10, {"Items": [{"retailPrice": 1.0}]})
+
+        async def refresh(url, params, max_retries, cache_key, **kwargs):
+            await asyncio.sleep(0.01)
+            AzurePricingServer._cache[cache_key] = (time.time(), {"Items": [{"retailPrice": 2.0}]})
+            return AzurePricingServer._cache[cache_key][1]
+
+        with patch.object(server, "_fetch", side_effect=refresh) as mock_fetch:
+            first, second = await asyncio.gather(
+                server._make_request(AZURE_PRICING_BASE_URL, params),
+                server._make_request(AZURE_PRICING_BASE_URL, params),
+            )
+            assert first["Items"][0]["retailPrice"] == 1.0
+            assert first[STALE_KEY] is True
+            assert second[STALE_KEY] is True
+
+            await asyncio.sleep(0.05)
+            refreshed = await server._make_request(AZURE_PRICING_BASE_URL, params)
+
+        assert mock_fetch.call_count == 1
+        assert refreshed == {"Items": [{"retailPrice": 2.0}]}
+        AzurePricingServer._cache.pop(key, None)
+
+    @pytest.mark.asyncio
+    async def test_failed_refresh_keeps_serving_stale(self):
+        """Test a failing background refresh doesn't surface to callers."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'StaleFailure'"}
+        key = server._cache_key(AZURE_PRICING_BASE_URL, params)
+        AzurePricingServer._cache[key] = (time.time() - CACHE_TTL - 10, {"Items": []})
+
+        with patch.object(server, "_fetch", side_effect=ValueError("upstream down")):
+            result = await server._make_request(AZURE_PRICING_BASE_URL, params)
+            await asyncio.sleep(0.01)
+            again = await server._make_request(AZURE_PRICING_BASE_URL, params)
+
+        assert result[STALE_KEY] is True
+        assert again[STALE_KEY] is True
+        AzurePricingServer._cache.pop(key, None)
+
+    @pytest.mark.asyncio
+    async def test_search_flags_stale_results(self):
+        """Test stale pages are reported in the search result metadata."""
+        server = AzurePricingServer()
+        page = {"Items": [{"skuName": "S1", "retailPrice": 1.0}], "NextPageLink": None, STALE_KEY: True}
+
+        with patch.object(server, "_make_request", return_value=page):
+            result = await server.search_azure_prices(service_name="Storage")
+
+        assert result["stale"] is True
+
+
+class TestCacheKeySharing:
+    """Test that equivalent queries share cache entries."""
+
+    def test_equivalent_filters_share_key(self):
+        """Test condition order, region casing and `$top` don't split the cache."""
+        server = AzurePricingServer()
+        first = {"$filter": "serviceName eq 'VM' and armRegionName eq 'EastUS'", "currencyCode": "usd", "$top": "5"}
+        second = {"$filter": "armRegionName eq 'eastus' and serviceName eq 'VM'", "currencyCode": "USD", "$top": "50"}
+
+        assert server._cache_key(AZURE_PRICING_BASE_URL, first) == server._cache_key(AZURE_PRICING_BASE_URL, second)
+
+    @pytest.mark.asyncio
+    async def test_larger_top_serves_smaller(self):
+        """Test a cached page fetched with a larger `$top` is trimmed for a smaller one."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'TopShare'", "$top": "10"}
+        items = [{"meterId": str(i)} for i in range(10)]
+        page = {"Items": items, "Count": 10, "NextPageLink": f"{AZURE_PRICING_BASE_URL}?$skip=10"}
+        AzurePricingServer._cache[server._cache_key(AZURE_PRICING_BASE_URL, params)] = (time.time(), page)
+
+        with patch.object(server, "_fetch", side_effect=AssertionError("upstream called")):
+            result = await server._make_request(AZURE_PRICING_BASE_URL, {**params, "$top": "4"})
+
+        assert result["Items"] == items[:4]
+        assert "%24skip=4" in result["NextPageLink"]
+        AzurePricingServer._cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_smaller_top_does_not_serve_larger(self):
+        """Test a cached page with too few items for the request goes upstream."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'TopMiss'", "$top": "2"}
+        page = {"Items": [{"meterId": "a"}, {"meterId": "b"}], "NextPageLink": f"{AZURE_PRICING_BASE_URL}?$skip=2"}
+        AzurePricingServer._cache[server._cache_key(AZURE_PRICING_BASE_URL, params)] = (time.time(), page)
+        larger = {"Items": [{"meterId": c} for c in "abcde"], "NextPageLink": None}
+
+        with patch.object(server, "_fetch", return_value=larger) as mock_fetch:
+            result = await server._make_request(AZURE_PRICING_BASE_URL, {**params, "$top": "5"})
+
+        assert mock_fetch.called
+        assert len(result["Items"]) == 5
+        AzurePricingServer._cache.clear()
+
+
+class TestQuerySubsumption:
+    """Test answering narrow queries from complete cached broader results."""
+
+    BROAD = {"$filter": "serviceName eq 'Planner' and contains(skuName, 'D4')", "currencyCode": "USD", "$top": "500"}
+    ITEMS = [
+        {"serviceName": "Planner", "skuName": "D4s v3", "armRegionName": region, "type": price_type}
+        for region in ("eastus", "westeurope")
+        for price_type in ("Consumption", "Reservation")
+    ]
+
+    @pytest.fixture(autouse=True)
+    def clean_cache(self):
+        """Reset the memory cache and the complete-result index."""
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        yield
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+
+    @pytest.mark.asyncio
+    async def test_narrow_query_answered_locally(self):
+        """Test an extra region and price type predicate is evaluated over the cached broad result."""
+        server = AzurePricingServer()
+        session = MagicMock()
+        session.get.return_value = FakeResponse({"Items": self.ITEMS, "NextPageLink": None})
+
+        with patch.object(server, "get_session", return_value=session):
+            await server._make_request(AZURE_PRICING_BASE_URL, self.BROAD)
+            result = await server._make_request(
+                AZURE_PRICING_BASE_URL,
+                {
+                    "$filter": "serviceName eq 'Planner' and contains(skuName, 'D4s') and armRegionName eq 'WestEurope'"
+                    " and priceType eq 'Consumption'",
+                    "currencyCode": "USD",
+                    "$top": "5",
+                },
+            )
+
+        assert session.get.call_count == 1
+        assert [(item["armRegionName"], item["type"]) for item in result["Items"]] == [("westeurope", "Consumption")]
+        assert result["NextPageLink"] is None
+
+    @pytest.mark.asyncio
+    async def test_mixed_case_query_answered_locally(self):
+        """Test values that differ from the stored items only by case still match, as upstream."""
+        server = AzurePricingServer()
+        session = MagicMock()
+        session.get.return_value = FakeResponse({"Items": self.ITEMS, "NextPageLink": None})
+
+        with patch.object(server, "get_session", return_value=session):
+            await server._make_request(
+                AZURE_PRICING_BASE_URL,
+                {**self.BROAD, "$filter": "serviceName eq 'planner' and contains(skuName, 'd4')"},
+            )
+            result = await server._make_request(
+                AZURE_PRICING_BASE_URL,
+                {
+                    "$filter": "serviceName eq 'planner' and contains(skuName, 'd4S') and armRegionName eq 'eastus'",
+                    "currencyCode": "USD",
+                },
+            )
+
+        assert session.get.call_count == 1
+        assert len(result["Items"]) == 2
+        assert {item["armRegionName"] for item in result["Items"]} == {"eastus"}
+
+    @pytest.mark.asyncio
+    async def test_truncated_result_not_used(self):
+        """Test a broad result that may have been cut off by `$top` is not used for planning."""
+        server = AzurePricingServer()
+        session = MagicMock()
+        session.get.return_value = FakeResponse({"Items": self.ITEMS, "NextPageLink": None})
+
+        with patch.object(server, "get_session", return_value=session):
+            await server._make_request(AZURE_PRICING_BASE_URL, {**self.BROAD, "$top": "4"})
+            await server._make_request(
+                AZURE_PRICING_BASE_URL,
+                {"$filter": "serviceName eq 'Planner' and armRegionName eq 'eastus'", "currencyCode": "USD"},
+            )
+
+        assert session.get.call_count == 2
+
+    @pytest.mark.asyncio
+    async def test_unrelated_scope_goes_upstream(self):
+        """Test a different currency or a non-subsumed filter is not answered locally."""
+        server = AzurePricingServer()
+        session = MagicMock()
+        session.get.return_value = FakeResponse({"Items": self.ITEMS, "NextPageLink": None})
+
+        with patch.object(server, "get_session", return_value=session):
+            await server._make_request(AZURE_PRICING_BASE_URL, self.BROAD)
+            await server._make_request(AZURE_PRICING_BASE_URL, {**self.BROAD, "currencyCode": "EUR"})
+            await server._make_request(
+                AZURE_PRICING_BASE_URL, {"$filter": "serviceName eq 'Planner'", "currencyCode": "USD"}
+            )
+
+        assert session.get.call_count == 3
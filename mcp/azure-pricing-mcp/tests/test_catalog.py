@@ -0,0 +1,233 @@
+"""Tests for the offline local price catalog."""
+
+from typing import Any
+from unittest.mock import patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PriceCatalog, download_catalog, sync_catalog
+from azure_pricing_mcp.handlers import _handle_catalog_status
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+def _price_item(
+    meter_id: str, region: str, sku: str, price: float, service: str = "Virtual Machines"
+) -> dict[str, Any]:
+    """Build a minimal Retail Prices item."""
+    return {
+        "currencyCode": "USD",
+        "meterId": meter_id,
+        "skuId": f"{meter_id}/sku",
+        "type": "Consumption",
+        "tierMinimumUnits": 0.0,
+        "serviceName": service,
+        "serviceFamily": "Compute",
+        "armRegionName": region,
+        "location": region,
+        "skuName": sku,
+        "productName": f"{service} Series",
+        "retailPrice": price,
+        "unitOfMeasure": "1 Hour",
+        "effectiveStartDate": "2024-01-01T00:00:00Z",
+    }
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """Create a catalog holding a full Virtual Machines snapshot."""
+    catalog = PriceCatalog(str(tmp_path / "catalog.db"))
+    items = [
+        _price_item("m1", "eastus", "D4s v3", 0.192),
+        _price_item("m2", "westeurope", "D4s v3", 0.23),
+        _price_item("m3", "eastus", "D2s v3", 0.096),
+    ]
+    catalog.upsert_items(items, "USD", "2024-06-01T00:00:00+00:00")
+    catalog.record_scope("Virtual Machines", None, "USD", "2024-06-01T00:00:00+00:00", len(items))
+    yield catalog
+    AzurePricingServer.attach_catalog(None)
+    catalog.close()
+
+
+class TestPriceCatalog:
+    """Test catalog storage and queries."""
+
+    def test_query_filters(self, catalog):
+        """Test equality and substring filters."""
+        items, has_more = catalog.query(service_name="virtual machines", region="EastUS", sku_name="d4s")
+        assert [item["meterId"] for item in items] == ["m1"]
+        assert has_more is False
+
+    def test_query_limit_reports_has_more(self, catalog):
+        """Test that truncated results report has_more."""
+        items, has_more = catalog.query(service_name="Virtual Machines", limit=2)
+        assert len(items) == 2
+        assert has_more is True
+
+    def test_covers(self, catalog):
+        """Test scope coverage checks."""
+        assert catalog.covers("Virtual Machines", "eastus", "USD")
+        assert catalog.covers("Virtual Machines", None, "USD")
+        assert not catalog.covers("Storage", "eastus", "USD")
+        assert not catalog.covers("Virtual Machines", "eastus", "EUR")
+        assert not catalog.covers(None, "eastus", "USD")
+
+    def test_display_name_regions(self, catalog):
+        """Test display-name regions match the armRegionName the prices are stored under."""
+        catalog.record_scope("Storage", "West Europe", "USD", "2024-06-01T00:00:00+00:00", 0)
+
+        assert catalog.covers("Virtual Machines", "East US", "USD")
+        assert catalog.covers("Storage", "westeurope", "USD")
+        items, _ = catalog.query(service_name="Virtual Machines", region="East US", sku_name="D4s")
+        assert [item["meterId"] for item in items] == ["m1"]
+
+    def test_regions(self, catalog):
+        """Test distinct regions of a SKU are listed without decoding items."""
+        assert catalog.regions("virtual machines", "d4s") == ["eastus", "westeurope"]
+        assert catalog.regions("Virtual Machines", "D2s", "Consumption") == ["eastus"]
+        assert catalog.regions("Virtual Machines", "D4s", "Reservation") == []
+
+    def test_record_scope_drops_stale_rows(self, catalog):
+        """Test that a fresh snapshot removes meters missing from it."""
+        catalog.upsert_items([_price_item("m1", "eastus", "D4s v3", 0.2)], "USD", "2024-07-01T00:00:00+00:00")
+        catalog.record_scope("Virtual Machines", None, "USD", "2024-07-01T00:00:00+00:00", 1)
+
+        items, _ = catalog.query(service_name="Virtual Machines")
+        assert [(item["meterId"], item["retailPrice"]) for item in items] == [("m1", 0.2)]
+
+
+class TestCatalogIntegration:
+    """Test that the pricing server answers covered queries from the catalog."""
+
+    @pytest.mark.asyncio
+    async def test_search_served_from_catalog(self, catalog):
+        """Test that covered searches make no upstream requests."""
+        AzurePricingServer.attach_catalog(catalog)
+        server = AzurePricingServer()
+
+        with patch.object(server, "_make_request", side_effect=AssertionError("upstream called")):
+            result = await server.search_azure_prices(service_name="Virtual Machines", region="eastus", limit=10)
+            estimate = await server.estimate_costs(service_name="Virtual Machines", sku_name="D2s v3", region="eastus")
+
+        assert result["count"] == 2
+        assert result["data_source"] == "local_catalog"
+        assert estimate["on_demand_pricing"]["hourly_rate"] == 0.096
+
+    @pytest.mark.asyncio
+    async def test_display_name_region_served_from_catalog(self, catalog):
+        """Test a region given by display name is answered from the catalog like the API would."""
+        AzurePricingServer.attach_catalog(catalog)
+        server = AzurePricingServer()
+
+        with patch.object(server, "_make_request", side_effect=AssertionError("upstream called")):
+            result = await server.search_azure_prices(service_name="Virtual Machines", region="East US", limit=10)
+
+        assert result["data_source"] == "local_catalog"
+        assert sorted(item["meterId"] for item in result["items"]) == ["m1", "m3"]
+
+    @pytest.mark.asyncio
+    async def test_region_recommendation_discovers_from_catalog(self, catalog):
+        """Test region discovery reads the catalog instead of paging through upstream prices."""
+        AzurePricingServer.attach_catalog(catalog)
+        server = AzurePricingServer()
+
+        with patch.object(server, "_make_request", side_effect=AssertionError("upstream called")):
+            result = await server.recommend_regions("Virtual Machines", "D4s v3")
+
+        assert [rec["region"] for rec in result["recommendations"]] == ["eastus", "westeurope"]
+        assert "regions_incomplete" not in result
+
+    @pytest.mark.asyncio
+    async def test_uncovered_search_goes_upstream(self, catalog):
+        """Test that queries outside the snapshot still use the API."""
+        AzurePricingServer.attach_catalog(catalog)
+        server = AzurePricingServer()
+        response = {"Items": [_price_item("s1", "eastus", "Hot LRS", 0.02, service="Storage")], "NextPageLink": None}
+
+        with patch.object(server, "_make_request", return_value=response) as mock_request:
+            result = await server.search_azure_prices(service_name="Storage", region="eastus")
+
+        assert mock_request.called
+        assert result["count"] == 1
+        assert "data_source" not in result
+
+    @pytest.mark.asyncio
+    async def test_download_catalog(self, tmp_path):
+        """Test bulk download writes every page and records the scope."""
+        catalog = PriceCatalog(str(tmp_path / "download.db"))
+        server = AzurePricingServer()
+        pages = [
+            {"Items": [_price_item("a", "eastus", "S1", 1.0, service="Storage")], "NextPageLink": "next"},
+            {"Items": [_price_item("b", "eastus", "S2", 2.0, service="Storage")], "NextPageLink": None},
+        ]
+
+        async def fake_iter_pages(url, params=None, **kwargs):
+            assert params["$filter"] == "serviceName eq 'Storage' and armRegionName eq 'eastus'"
+            for page in pages:
+                yield page
+
+        with patch.object(server, "_iter_pages", side_effect=fake_iter_pages):
+            summary = await download_catalog(server, catalog, ["Storage"], ["eastus"])
+
+        assert summary["total_items"] == 2
+        assert catalog.covers("Storage", "eastus", "USD")
+        catalog.close()
+
+
+class TestCatalogSync:
+    """Test incremental delta sync keyed on effectiveStartDate."""
+
+    @pytest.mark.asyncio
+    async def test_sync_fetches_only_changes(self, catalog):
+        """Test that sync filters on the watermark and upserts the changed rows."""
+        server = AzurePricingServer()
+        changed = _price_item("m2", "westeurope", "D4s v3", 0.21)
+        changed["effectiveStartDate"] = "2024-08-01T00:00:00Z"
+        requested_filters = []
+
+        async def fake_iter_pages(url, params=None, **kwargs):
+            requested_filters.append(params["$filter"])
+            yield {"Items": [changed], "NextPageLink": None}
+
+        with patch.object(server, "_iter_pages", side_effect=fake_iter_pages):
+            summary = await sync_catalog(server, catalog)
+
+        assert requested_filters == ["serviceName eq 'Virtual Machines' and effectiveStartDate ge 2024-01-01T00:00:00Z"]
+        assert summary["rows_upserted"] == 1
+
+        items, _ = catalog.query(service_name="Virtual Machines", region="westeurope")
+        assert items[0]["retailPrice"] == 0.21
+
+        status = catalog.sync_status()[0]
+        assert status["watermark"] == "2024-08-01T00:00:00Z"
+        assert status["current_rows"] == 3
+        assert status["last_rows_upserted"] == 1
+        assert status["total_rows_upserted"] == 1
+
+    @pytest.mark.asyncio
+    async def test_sync_without_changes_keeps_watermark(self, catalog):
+        """Test that an empty delta still checkpoints the scope."""
+        server = AzurePricingServer()
+
+        async def fake_iter_pages(url, params=None, **kwargs):
+            yield {"Items": [], "NextPageLink": None}
+
+        with patch.object(server, "_iter_pages", side_effect=fake_iter_pages):
+            await sync_catalog(server, catalog)
+
+        status = catalog.sync_status()[0]
+        assert status["watermark"] == "2024-01-01T00:00:00Z"
+        assert status["last_sync_at"] is not None
+        assert status["total_rows_upserted"] == 0
+
+    @pytest.mark.asyncio
+    async def test_catalog_status_tool(self, catalog):
+        """Test the azure_catalog_status tool output."""
+        server = AzurePricingServer()
+
+        result = await _handle_catalog_status(server, {})
+        assert "No local price catalog" in result[0].text
+
+        AzurePricingServer.attach_catalog(catalog)
+        result = await _handle_catalog_status(server, {})
+        assert "Virtual Machines" in result[0].text
+        assert "2024-01-01T00:00:00Z" in result[0].text
@@ -0,0 +1,133 @@
+"""Tests for the compact columnar item store."""
+
+import gc
+import json
+import time
+import tracemalloc
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.columnar import ItemTable, PriceRow, compact_page
+from azure_pricing_mcp.server import AZURE_PRICING_BASE_URL, AzurePricingServer
+
+
+def _vm_item(i: int) -> dict[str, Any]:
+    """Build a realistic Virtual Machines price item."""
+    region = ("eastus", "westus", "westeurope")[i % 3]
+    return {
+        "currencyCode": "USD",
+        "tierMinimumUnits": 0.0,
+        "retailPrice": 0.1 + i * 0.001,
+        "unitPrice": 0.1 + i * 0.001,
+        "armRegionName": region,
+        "location": region.upper(),
+        "effectiveStartDate": "2024-01-01T00:00:00Z",
+        "meterId": f"{i:08x}-0000-4000-8000-000000000000",
+        "meterName": f"D{i % 20} v3",
+        "productId": "DZH318Z0BQ4L",
+        "skuId": f"DZH318Z0BQ4L/{i:04d}",
+        "productName": "Virtual Machines Dv3 Series",
+        "skuName": f"D{i % 20} v3",
+        "serviceName": "Virtual Machines",
+        "serviceId": "DZH313Z7MMC8",
+        "serviceFamily": "Compute",
+        "unitOfMeasure": "1 Hour",
+        "type": "Consumption",
+        "isPrimaryMeterRegion": True,
+        "armSkuName": f"Standard_D{i % 20}_v3",
+    }
+
+
+class TestItemTable:
+    """Test the columnar table and its row views."""
+
+    def test_roundtrip(self):
+        """Test rows read back exactly like the original items, key order included."""
+        items = [_vm_item(i) for i in range(50)]
+        items[3]["savingsPlan"] = [{"term": "1 Year", "retailPrice": 0.05}]
+        del items[7]["location"]
+        table = ItemTable(items)
+
+        assert len(table) == 50
+        assert table == items
+        assert table.to_dicts() == items
+        assert list(table[3]) == list(items[3])
+        assert "location" not in table[7]
+        assert table[7].get("location", "n/a") == "n/a"
+        assert table[-1]["meterId"] == items[-1]["meterId"]
+        with pytest.raises(KeyError):
+            table[7]["location"]
+
+    def test_slices_and_types(self):
+        """Test slicing yields row views and value types survive."""
+        table = ItemTable([{"a": 1, "b": True, "retailPrice": 2}, {"a": 1.0, "b": None, "retailPrice": 2.5}])
+
+        rows = table[:1]
+        assert isinstance(rows, list) and isinstance(rows[0], PriceRow)
+        assert type(table[0]["a"]) is int and type(table[1]["a"]) is float
+        assert table[0]["b"] is True and table[1]["b"] is None
+        assert table[1]["retailPrice"] == 2.5
+
+    def test_with_values_overlays_without_copying(self):
+        """Test derived rows override fields while the table stays untouched."""
+        table = ItemTable([_vm_item(0)])
+        discounted = table[0].with_values(retailPrice=0.05, originalPrice=0.1)
+
+        assert discounted["retailPrice"] == 0.05
+        assert list(discounted)[-1] == "originalPrice"
+        assert table[0]["retailPrice"] == 0.1
+        assert "originalPrice" not in table[0]
+
+    def test_memory_per_item(self):
+        """Test a compacted page takes an order of magnitude less memory than parsed JSON."""
+        raw = json.dumps({"Items": [_vm_item(i) for i in range(1000)]})
+        gc.collect()
+        tracemalloc.start()
+        try:
+            items = json.loads(raw)["Items"]
+            parsed_size = tracemalloc.get_traced_memory()[0]
+            table = ItemTable(items)
+            del items
+            gc.collect()
+            compact_size = tracemalloc.get_traced_memory()[0]
+        finally:
+            tracemalloc.stop()
+
+        assert len(table) == 1000
+        assert compact_size * 8 < parsed_size
+
+
+class TestCompactCache:
+    """Test the pricing server keeps compact items in its memory cache."""
+
+    @pytest.mark.asyncio
+    async def test_cached_items_are_compact(self):
+        """Test fetched pages are cached as ItemTables and discounts don't mutate them."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'Columnar'"}
+        response = AsyncMock()
+        response.status = 200
+        response.json.return_value = {"Items": [_vm_item(i) for i in range(3)], "NextPageLink": None}
+        response.raise_for_status = MagicMock()
+        session = MagicMock()
+        session.get.return_value.__aenter__.return_value = response
+
+        with patch.object(server, "get_session", return_value=session):
+            page = await server._make_request(AZURE_PRICING_BASE_URL, params)
+
+        fetched_at, cached = AzurePricingServer._cache[server._cache_key(AZURE_PRICING_BASE_URL, params)]
+        assert isinstance(cached["Items"], ItemTable)
+        assert fetched_at <= time.time()
+
+        discounted = server._apply_discount_to_items(list(page["Items"]), 10.0)
+        assert discounted[0]["retailPrice"] == 0.09
+        assert cached["Items"][0]["retailPrice"] == 0.1
+        AzurePricingServer._cache.clear()
+
+    def test_compact_page_leaves_other_fields(self):
+        """Test compaction only touches Items."""
+        page = compact_page({"Items": [{"a": 1}], "NextPageLink": "next", "Count": 1})
+        assert page["NextPageLink"] == "next" and page["Count"] == 1
+        assert compact_page({"error": "x"}) == {"error": "x"}
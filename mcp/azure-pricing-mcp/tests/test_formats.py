@@ -0,0 +1,121 @@
+"""Tests for the compact and structured output formats."""
+
+import json
+
+import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import synthetic_items
+from mcp.types import CallToolRequest, CallToolRequestParams
+
+from azure_pricing_mcp import server as pricing_module
+from azure_pricing_mcp.formats import ResultTable, compact_text, render_table, structured_content
+from azure_pricing_mcp.handlers import PRICE_SEARCH_COLUMNS, _handle_price_search, _handle_region_recommend
+from azure_pricing_mcp.server import AzurePricingServer, create_server, set_api_url
+
+TABLE = ResultTable(
+    "Found 3 Azure pricing results",
+    ("service", "sku", "region", "price", "original_price", "regions"),
+    [
+        ("Virtual Machines", "D2s v3", "eastus", 0.096, None, ["eastus", "westus"]),
+        ("Virtual Machines", "D4s v3", "eastus", 0.192, None, ["eastus"]),
+        ("Virtual Machines", "D8s v3", "eastus", 0.384, None, ["eastus"]),
+    ],
+    {"currency": "USD", "discount_percentage": None},
+    ["Cached prices shown while a refresh runs in the background."],
+)
+
+
+class TestRendering:
+    """Test rendering a result table."""
+
+    def test_compact(self):
+        """Test shared values are stated once and empty columns dropped."""
+        assert compact_text(TABLE) == (
+            "Found 3 Azure pricing results\n"
+            "Cached prices shown while a refresh runs in the background.\n"
+            "currency: USD; service: Virtual Machines; region: eastus\n"
+            "sku|price|regions\n"
+            "D2s v3|0.096|eastus,westus\n"
+            "D4s v3|0.192|eastus\n"
+            "D8s v3|0.384|eastus"
+        )
+
+    def test_structured(self):
+        """Test structured content keeps every column in order."""
+        content, structured = render_table(TABLE, "structured")
+
+        assert structured == structured_content(TABLE)
+        assert structured["columns"] == list(TABLE.columns)
+        assert structured["rows"][0] == ["Virtual Machines", "D2s v3", "eastus", 0.096, None, ["eastus", "westus"]]
+        assert json.loads(content[0].text) == structured
+
+
+class TestToolFormats:
+    """Test the format argument of the tools against the fake Retail Prices API."""
+
+    @pytest.fixture
+    async def fake_api(self, monkeypatch):
+        """Serve the synthetic catalog with a fresh server state."""
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        # Sessions opened by earlier tests belong to event loops that are closed by now
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        async with FakeRetailPricesAPI(synthetic_items()) as api:
+            set_api_url(api.url)
+            try:
+                yield api
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+
+    @pytest.mark.asyncio
+    async def test_price_search_formats(self, fake_api):
+        """Test compact results are several times smaller and structured rows follow the fixed columns."""
+        arguments = {"service_name": "Virtual Machines", "region": "eastus", "limit": 50}
+        pricing_server = AzurePricingServer()
+
+        (markdown,) = await _handle_price_search(pricing_server, arguments)
+        (compact,) = await _handle_price_search(pricing_server, {**arguments, "format": "compact"})
+        content, structured = await _handle_price_search(pricing_server, {**arguments, "format": "structured"})
+
+        assert len(compact.text) * 3 < len(markdown.text)
+        assert len(content[0].text) * 2 < len(markdown.text)
+        assert "savings_plan_3y" in compact.text.splitlines()[2]
+        assert structured["columns"] == list(PRICE_SEARCH_COLUMNS)
+        assert len(structured["rows"]) == 50
+        assert all(len(row) == len(PRICE_SEARCH_COLUMNS) for row in structured["rows"])
+
+    @pytest.mark.asyncio
+    async def test_errors_stay_text(self, fake_api):
+        """Test results without rows are reported as text in every format."""
+        pricing_server = AzurePricingServer()
+
+        (content,) = await _handle_region_recommend(
+            pricing_server, {"service_name": "Virtual Machines", "sku_name": "NoSuchSku", "format": "structured"}
+        )
+
+        assert content.type == "text"
+        assert not content.text.startswith("{")
+
+    @pytest.mark.asyncio
+    async def test_structured_content_over_mcp(self, fake_api):
+        """Test the MCP server returns structured content and rejects unknown formats."""
+        handler = create_server().request_handlers[CallToolRequest]
+
+        def request(output_format: str) -> CallToolRequest:
+            arguments = {"service_name": "Storage", "region": "westeurope", "format": output_format}
+            return CallToolRequest(
+                method="tools/call", params=CallToolRequestParams(name="azure_discover_skus", arguments=arguments)
+            )
+
+        result = (await handler(request("structured"))).root
+        assert not result.isError
+        assert result.structuredContent["columns"][0] == "sku"
+        assert result.structuredContent["meta"]["service"] == "Storage"
+
+        result = (await handler(request("yaml"))).root
+        assert result.isError
+        assert "'yaml' is not one of" in result.content[0].text
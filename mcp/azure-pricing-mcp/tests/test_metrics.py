@@ -0,0 +1,132 @@
+"""Tests for Prometheus-style metrics."""
+
+import time
+from unittest.mock import patch
+
+import pytest
+from mcp.types import CallToolRequest, CallToolRequestParams
+from starlette.testclient import TestClient
+
+from azure_pricing_mcp.metrics import CACHE_LOOKUPS, TOOL_CALLS, TOOL_LATENCY, Registry
+from azure_pricing_mcp.server import AZURE_PRICING_BASE_URL, AzurePricingServer, create_http_app, create_server
+
+
+class TestRegistry:
+    """Test metric types and the text exposition format."""
+
+    def test_counter_and_gauge(self):
+        """Test counters render per label set and gauges read their callback."""
+        registry = Registry()
+        counter = registry.counter("requests_total", "Requests.", ("status",))
+        registry.gauge("queue_depth", "Queue depth.", lambda: 3)
+        counter.inc("200")
+        counter.inc("200")
+        counter.inc("429", amount=0.5)
+
+        text = registry.render()
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{status="200"} 2' in text
+        assert 'requests_total{status="429"} 0.5' in text
+        assert "# TYPE queue_depth gauge\nqueue_depth 3" in text
+
+    def test_histogram(self):
+        """Test histogram buckets are cumulative and include +Inf, sum and count."""
+        registry = Registry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("tool",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value, "search")
+
+        text = registry.render()
+        assert 'latency_seconds_bucket{tool="search",le="0.1"} 1' in text
+        assert 'latency_seconds_bucket{tool="search",le="1"} 2' in text
+        assert 'latency_seconds_bucket{tool="search",le="+Inf"} 3' in text
+        assert 'latency_seconds_sum{tool="search"} 5.55' in text
+        assert 'latency_seconds_count{tool="search"} 3' in text
+
+    def test_label_values_are_escaped(self):
+        """Test quotes and backslashes in label values are escaped."""
+        registry = Registry()
+        registry.counter("odd_total", "Odd labels.", ("name",)).inc('a"b\\c')
+        assert 'odd_total{name="a\\"b\\\\c"} 1' in registry.render()
+
+
+class TestInstrumentation:
+    """Test metrics recorded by the server."""
+
+    @pytest.mark.asyncio
+    async def test_cache_hits_counted(self):
+        """Test memory cache hits are counted."""
+        server = AzurePricingServer()
+        params = {"$filter": "serviceName eq 'Metrics'"}
+        AzurePricingServer._cache[server._cache_key(AZURE_PRICING_BASE_URL, params)] = (time.time(), {"Items": []})
+        before = CACHE_LOOKUPS.value("memory", "hit")
+
+        await server._make_request(AZURE_PRICING_BASE_URL, params)
+
+        assert CACHE_LOOKUPS.value("memory", "hit") == before + 1
+        AzurePricingServer._cache.clear()
+
+    @pytest.mark.asyncio
+    async def test_tool_calls_counted(self):
+        """Test tool calls are counted and timed per tool name and outcome."""
+        server = create_server()
+        handler = server.request_handlers[CallToolRequest]
+        ok_before = TOOL_CALLS.value("azure_catalog_status", "ok")
+        error_before = TOOL_CALLS.value("azure_price_search", "error")
+        timed_before = TOOL_LATENCY.count("azure_catalog_status")
+
+        with patch.object(AzurePricingServer, "get_session"):
+            await handler(
+                CallToolRequest(
+                    method="tools/call", params=CallToolRequestParams(name="azure_catalog_status", arguments={})
+                )
+            )
+            with patch.object(AzurePricingServer, "search_azure_prices", side_effect=RuntimeError("boom")):
+                await handler(
+                    CallToolRequest(
+                        method="tools/call", params=CallToolRequestParams(name="azure_price_search", arguments={})
+                    )
+                )
+
+        assert TOOL_CALLS.value("azure_catalog_status", "ok") == ok_before + 1
+        assert TOOL_CALLS.value("azure_price_search", "error") == error_before + 1
+        assert TOOL_LATENCY.count("azure_catalog_status") == timed_before + 1
+
+    @pytest.mark.asyncio
+    async def test_error_results_counted_as_errors(self):
+        """Test a tool whose result reports an error is counted as an error, not ok."""
+        server = create_server()
+        handler = server.request_handlers[CallToolRequest]
+        ok_before = TOOL_CALLS.value("azure_region_recommend", "ok")
+        error_before = TOOL_CALLS.value("azure_region_recommend", "error")
+
+        with (
+            patch.object(AzurePricingServer, "get_session"),
+            patch.object(AzurePricingServer, "recommend_regions", return_value={"error": "No pricing found"}),
+        ):
+            await handler(
+                CallToolRequest(
+                    method="tools/call",
+                    params=CallToolRequestParams(
+                        name="azure_region_recommend", arguments={"service_name": "X", "sku_name": "Y"}
+                    ),
+                )
+            )
+
+        assert TOOL_CALLS.value("azure_region_recommend", "ok") == ok_before
+        assert TOOL_CALLS.value("azure_region_recommend", "error") == error_before + 1
+
+
+class TestMetricsEndpoint:
+    """Test the /metrics route of the HTTP transport."""
+
+    def test_metrics_route(self):
+        """Test /metrics serves the Prometheus text format."""
+        client = TestClient(create_http_app(create_server()))
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE azure_pricing_cache_lookups_total counter" in response.text
+        assert "azure_pricing_rate_limit_rate " in response.text
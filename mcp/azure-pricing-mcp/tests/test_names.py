@@ -0,0 +1,133 @@
+"""Tests for the service name index."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from azure_pricing_mcp.catalog import PriceCatalog
+from azure_pricing_mcp.names import ALIAS, PRODUCT_NAME, SERVICE_NAME, ServiceNameIndex, normalize, trigrams
+from azure_pricing_mcp.server import SERVICE_NAME_MAPPINGS, AzurePricingServer
+
+
+def _price_item(meter_id: str, service: str, family: str, product: str) -> dict:
+    """Build a minimal Retail Prices item."""
+    return {
+        "currencyCode": "USD",
+        "meterId": meter_id,
+        "skuId": f"{meter_id}/sku",
+        "type": "Consumption",
+        "serviceName": service,
+        "serviceFamily": family,
+        "armRegionName": "eastus",
+        "skuName": "Standard",
+        "productName": product,
+        "retailPrice": 1.0,
+        "unitOfMeasure": "1 Hour",
+    }
+
+
+@pytest.fixture
+def index():
+    """The index over the embedded snapshot and the built-in aliases."""
+    return ServiceNameIndex.build(SERVICE_NAME_MAPPINGS)
+
+
+@pytest.fixture
+def catalog(tmp_path):
+    """A catalog holding a service missing from the embedded snapshot."""
+    catalog = PriceCatalog(str(tmp_path / "catalog.db"))
+    catalog.upsert_items(
+        [
+            _price_item("q1", "Azure Quantum", "Compute", "Azure Quantum Credits"),
+            _price_item("v1", "Virtual Machines", "Compute", "Virtual Machines DSv3 Series"),
+        ],
+        "USD",
+    )
+    AzurePricingServer.attach_catalog(catalog)
+    yield catalog
+    AzurePricingServer.attach_catalog(None)
+    catalog.close()
+
+
+class TestServiceNameIndex:
+    """Test ranking names by trigram similarity."""
+
+    def test_trigrams(self):
+        """Test names are normalized and split into padded word trigrams."""
+        assert normalize("Azure Cosmos-DB ") == "azure cosmos db"
+        assert trigrams("db") == {"  d", " db", "db "}
+
+    @pytest.mark.parametrize(
+        ("query", "service_name", "field"),
+        [
+            ("cosmo db", "Azure Cosmos DB", ALIAS),
+            ("keyvault", "Key Vault", SERVICE_NAME),
+            ("Front-Door", "Azure Front Door Service", SERVICE_NAME),
+            ("postgres", "Azure Database for PostgreSQL", SERVICE_NAME),
+        ],
+    )
+    def test_misspelt_names(self, index, query, service_name, field):
+        """Test typos, missing spaces and partial names rank the intended service first."""
+        best = index.search(query)[0]
+
+        assert (best.service_name, best.field, best.exact) == (service_name, field, False)
+
+    def test_exact_names_outrank_families(self, index):
+        """Test a service's own name beats services that only share its family name."""
+        matches = index.search("Storage")
+
+        assert matches[0].service_name == "Storage" and matches[0].exact
+        assert all(match.score < matches[0].score for match in matches[1:])
+
+    def test_no_match(self, index):
+        """Test unrelated queries return nothing."""
+        assert index.search("zzzz") == []
+        assert index.search("  ") == []
+
+    def test_catalog_names(self, catalog):
+        """Test services and products of an attached catalog are indexed."""
+        index = AzurePricingServer.service_name_index()
+
+        assert index.search("azure quantm")[0].service_name == "Azure Quantum"
+        best = index.search("virtual machines dsv3 series")[0]
+        assert (best.service_name, best.field, best.exact) == ("Virtual Machines", PRODUCT_NAME, True)
+
+
+class TestFindSimilarServices:
+    """Test resolving fuzzy service names without probing the API."""
+
+    @pytest.mark.asyncio
+    async def test_typo_makes_no_requests(self):
+        """Test misspelt names are answered with local suggestions only."""
+        server = AzurePricingServer()
+
+        with patch.object(server, "search_azure_prices", new=AsyncMock(side_effect=AssertionError("upstream"))):
+            result = await server._find_similar_services(service_name="app servce")
+
+        assert result["match_type"] == "suggestions_only"
+        assert result["suggestions"][0]["service_name"] == "Azure App Service"
+        assert result["suggestions"][0]["sample_items"] == []
+
+    @pytest.mark.asyncio
+    async def test_alias_searches_its_service(self):
+        """Test an exact alias is searched as its service with one request."""
+        server = AzurePricingServer()
+        response = {"items": [{"serviceName": "Azure Kubernetes Service"}], "count": 1}
+
+        with patch.object(server, "search_azure_prices", new=AsyncMock(return_value=response)) as search:
+            result = await server._find_similar_services(service_name="AKS")
+
+        search.assert_awaited_once_with(service_name="Azure Kubernetes Service", currency_code="USD", limit=50)
+        assert result["match_type"] == "exact_mapping"
+        assert result["suggestion_used"] == "Azure Kubernetes Service"
+
+    @pytest.mark.asyncio
+    async def test_catalog_samples(self, catalog):
+        """Test suggestions carry sample prices from an attached catalog."""
+        server = AzurePricingServer()
+
+        with patch.object(server, "search_azure_prices", new=AsyncMock(side_effect=AssertionError("upstream"))):
+            result = await server._find_similar_services(service_name="quantum")
+
+        assert result["suggestions"][0]["service_name"] == "Azure Quantum"
+        assert [item["meterId"] for item in result["suggestions"][0]["sample_items"]] == ["q1"]
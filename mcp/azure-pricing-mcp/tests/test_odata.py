@@ -0,0 +1,94 @@
+"""Tests for OData filter normalization."""
+
+import pytest
+
+from azure_pricing_mcp.odata import ODataFilter, canonical_params, compare, contains, eq
+
+
+class TestODataFilter:
+    """Test building, parsing and canonical serialization of filters."""
+
+    def test_canonical_order_and_values(self):
+        """Test condition order and value casing don't change the serialized filter."""
+        first = ODataFilter([eq("priceType", "consumption"), eq("armRegionName", "East US"), eq("serviceName", "VM")])
+        second = ODataFilter([eq("serviceName", "VM"), eq("armRegionName", "eastus"), eq("priceType", "Consumption")])
+
+        assert str(first) == "serviceName eq 'VM' and armRegionName eq 'eastus' and priceType eq 'Consumption'"
+        assert first == second
+        assert hash(first) == hash(second)
+
+    def test_roundtrip(self):
+        """Test parsing the serialized form yields the same filter."""
+        odata_filter = ODataFilter(
+            [
+                eq("serviceName", "Azure Cosmos DB"),
+                contains("skuName", "D4s"),
+                compare("effectiveStartDate", "ge", "2024-01-01T00:00:00Z"),
+            ]
+        )
+        assert ODataFilter.parse(str(odata_filter)) == odata_filter
+
+    def test_quotes_and_and_inside_values(self):
+        """Test escaped quotes and the word 'and' inside values survive parsing."""
+        text = "productName eq 'Foo and Bar''s' and serviceName eq 'Storage'"
+        odata_filter = ODataFilter.parse(text)
+
+        assert [condition.value for condition in odata_filter.conditions] == ["Storage", "Foo and Bar's"]
+        assert ODataFilter.parse(str(odata_filter)) == odata_filter
+
+    def test_unsupported_syntax(self):
+        """Test unsupported expressions are rejected by the parser and left alone by canonical_params."""
+        with pytest.raises(ValueError):
+            ODataFilter.parse("serviceName eq 'A' or serviceName eq 'B'")
+        params = canonical_params({"$filter": "serviceName eq 'A' or serviceName eq 'B'", "currencyCode": "eur"})
+        assert params == {"$filter": "serviceName eq 'A' or serviceName eq 'B'", "currencyCode": "EUR"}
+
+    def test_empty(self):
+        """Test an empty filter is falsy and serializes to nothing."""
+        assert not ODataFilter()
+        assert str(ODataFilter.parse("")) == ""
+
+
+class TestSubsumption:
+    """Test local evaluation and subsumption of filters."""
+
+    ITEM = {
+        "serviceName": "Virtual Machines",
+        "armRegionName": "eastus",
+        "skuName": "D4s v3",
+        "retailPrice": 0.19,
+        "type": "Consumption",
+    }
+
+    def test_matches(self):
+        """Test conditions evaluate against items like the API does."""
+        assert ODataFilter([eq("armRegionName", "East US"), contains("skuName", "D4s")]).matches(self.ITEM)
+        assert not ODataFilter([eq("armRegionName", "westus")]).matches(self.ITEM)
+        assert ODataFilter([compare("retailPrice", "lt", "1")]).matches(self.ITEM)
+        assert ODataFilter([eq("priceType", "consumption")]).matches(self.ITEM)
+        assert not ODataFilter([eq("priceType", "Reservation")]).matches(self.ITEM)
+
+    def test_matches_ignores_case(self):
+        """Test quoted values compare case-insensitively, as the Retail Prices API does."""
+        assert ODataFilter([eq("serviceName", "virtual machines"), contains("skuName", "d4S")]).matches(self.ITEM)
+        assert not ODataFilter([eq("serviceName", "virtual machine")]).matches(self.ITEM)
+
+    def test_subsumes(self):
+        """Test broader filters subsume narrower ones but not the other way round."""
+        broad = ODataFilter([eq("serviceName", "Virtual Machines"), contains("skuName", "D4")])
+        narrow = ODataFilter(
+            [eq("serviceName", "Virtual Machines"), eq("skuName", "D4s v3"), eq("armRegionName", "eastus")]
+        )
+
+        assert broad.subsumes(narrow)
+        assert not narrow.subsumes(broad)
+        assert not broad.subsumes(ODataFilter([eq("serviceName", "Virtual Machines")]))
+        assert ODataFilter().subsumes(broad)
+
+    def test_subsumes_ignores_case(self):
+        """Test filters differing only in value case subsume each other."""
+        broad = ODataFilter([eq("serviceName", "virtual machines"), contains("skuName", "d4")])
+        narrow = ODataFilter([eq("serviceName", "Virtual Machines"), eq("skuName", "D4s v3")])
+
+        assert broad.subsumes(narrow)
+        assert ODataFilter([eq("serviceName", "VIRTUAL MACHINES")]).subsumes(narrow)
@@ -0,0 +1,131 @@
+"""Tests for result cursors."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import synthetic_items
+
+from azure_pricing_mcp import server as pricing_module
+from azure_pricing_mcp.handlers import _handle_discover_skus, _handle_region_recommend
+from azure_pricing_mcp.paging import DEFAULT_PAGE_SIZE, ResultStore
+from azure_pricing_mcp.server import AzurePricingServer, set_api_url
+
+
+def _result(count: int) -> dict:
+    return {"service_name": "Virtual Machines", "skus": [{"sku_name": f"sku-{i}"} for i in range(count)]}
+
+
+class TestResultStore:
+    """Test storing results and reading them page by page."""
+
+    def test_short_result_unchanged(self):
+        """Test results that fit on one page are neither stored nor marked as paged."""
+        store = ResultStore()
+        result = _result(DEFAULT_PAGE_SIZE)
+
+        assert store.first_page(result, "skus") is result
+        assert store.first_page({"error": "No prices"}, "skus") == {"error": "No prices"}
+        assert len(store) == 0
+
+    def test_pages(self):
+        """Test a cursor walks through the stored result to its last page."""
+        store = ResultStore()
+
+        page = store.first_page(_result(25), "skus", page_size=10)
+        names = [sku["sku_name"] for sku in page["skus"]]
+        while page["page"]["next_cursor"]:
+            page = store.page(page["page"]["next_cursor"])
+            names += [sku["sku_name"] for sku in page["skus"]]
+
+        assert names == [f"sku-{i}" for i in range(25)]
+        assert page["page"] == {"offset": 20, "count": 5, "total": 25, "next_cursor": None}
+        assert page["service_name"] == "Virtual Machines"
+
+    def test_page_size_override(self):
+        """Test a follow-up call can change the page size."""
+        store = ResultStore()
+        first = store.first_page(_result(25), "skus", page_size=10)
+
+        page = store.page(first["page"]["next_cursor"], page_size=3)
+
+        assert [sku["sku_name"] for sku in page["skus"]] == ["sku-10", "sku-11", "sku-12"]
+        assert page["page"]["next_cursor"].endswith(".13")
+
+    def test_unknown_and_evicted_cursors(self):
+        """Test malformed cursors and results evicted from the bounded store are rejected."""
+        store = ResultStore(max_entries=1)
+        first = store.first_page(_result(25), "skus", page_size=10)
+        store.first_page(_result(25), "skus", page_size=10)
+
+        for cursor in (first["page"]["next_cursor"], "not-a-cursor", "token.x"):
+            with pytest.raises(ValueError, match="unknown or expired"):
+                store.page(cursor)
+
+
+class TestToolCursors:
+    """Test paging through tool results against the fake Retail Prices API."""
+
+    @pytest.fixture
+    async def fake_api(self, monkeypatch):
+        """Serve the synthetic catalog with a fresh server state."""
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        # Sessions opened by earlier tests belong to event loops that are closed by now
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        async with FakeRetailPricesAPI(synthetic_items()) as api:
+            set_api_url(api.url)
+            try:
+                yield api
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+
+    @pytest.mark.asyncio
+    async def test_discover_skus_pages(self, fake_api):
+        """Test the next page is served from the result store without a new query."""
+        pricing_server = AzurePricingServer()
+        arguments = {"service_name": "Virtual Machines", "limit": 1000, "page_size": 5, "format": "structured"}
+
+        _, first = await _handle_discover_skus(pricing_server, arguments)
+        cursor = first["meta"]["next_cursor"]
+        with patch.object(AzurePricingServer, "discover_skus", new=AsyncMock(side_effect=AssertionError)):
+            _, second = await _handle_discover_skus(pricing_server, {**arguments, "cursor": cursor})
+
+        assert len(first["rows"]) == len(second["rows"]) == 5
+        assert first["rows"][-1][0] < second["rows"][0][0]  # sorted by SKU name across pages
+        assert "Entries 6-10 of" in second["notes"][-1]
+
+    @pytest.mark.asyncio
+    async def test_region_ranks_continue(self, fake_api):
+        """Test recommendations on later pages keep their overall rank."""
+        pricing_server = AzurePricingServer()
+        arguments = {"service_name": "Virtual Machines", "sku_name": "D4s v3", "top_n": 50, "page_size": 2}
+
+        (first,) = await _handle_region_recommend(pricing_server, arguments)
+        cursor = first.text.split('pass cursor "', 1)[1].split('"', 1)[0]
+        (second,) = await _handle_region_recommend(pricing_server, {**arguments, "cursor": cursor})
+
+        assert "| 🥇 1 |" in first.text
+        assert "| 🥉 3 |" in second.text and "| 4 |" in second.text
+        assert "Entries 3-4 of" in second.text
+
+    @pytest.mark.asyncio
+    async def test_cursor_of_another_tool(self, fake_api):
+        """Test a cursor is only accepted by the tool whose result it pages."""
+        pricing_server = AzurePricingServer()
+        arguments = {"service_name": "Virtual Machines", "sku_name": "D4s v3", "top_n": 50, "page_size": 2}
+
+        (first,) = await _handle_region_recommend(pricing_server, arguments)
+        cursor = first.text.split('pass cursor "', 1)[1].split('"', 1)[0]
+        with pytest.raises(ValueError, match="another tool"):
+            await _handle_discover_skus(pricing_server, {"service_name": "Virtual Machines", "cursor": cursor})
+
+    @pytest.mark.asyncio
+    async def test_expired_cursor(self, fake_api):
+        """Test an unknown cursor is reported as an error."""
+        with pytest.raises(ValueError, match="repeat the query"):
+            await _handle_discover_skus(AzurePricingServer(), {"service_name": "Storage", "cursor": "gone.10"})
@@ -0,0 +1,148 @@
+"""Tests for background cache pre-warming."""
+
+import asyncio
+
+import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import synthetic_items
+
+from azure_pricing_mcp import server as pricing_module
+from azure_pricing_mcp.prewarm import CachePrewarmer, WarmQuery, load_manifest, parse_manifest
+from azure_pricing_mcp.server import CACHE_TTL, AzurePricingServer, set_api_url
+
+QUERIES = [
+    WarmQuery("Azure App Service", "eastus"),
+    WarmQuery("SQL Database", "eastus"),
+    WarmQuery("Storage", "westeurope"),
+]
+
+
+class TestManifest:
+    """Test manifest parsing."""
+
+    def test_entries_expand_per_region(self):
+        """Test each region of an entry becomes a query and duplicates are dropped."""
+        queries, interval = parse_manifest(
+            {
+                "interval_seconds": 600,
+                "currency_code": "eur",
+                "queries": [
+                    {"service_name": "Storage", "regions": ["eastus", "westeurope"]},
+                    {"service_name": "Storage", "region": "eastus"},
+                    {"service_name": "Virtual Machines", "price_type": "Consumption", "currency_code": "USD"},
+                ],
+            }
+        )
+
+        assert interval == 600.0
+        assert queries == [
+            WarmQuery("Storage", "eastus", currency_code="EUR"),
+            WarmQuery("Storage", "westeurope", currency_code="EUR"),
+            WarmQuery("Virtual Machines", None, price_type="Consumption"),
+        ]
+
+    def test_default_manifest(self):
+        """Test the built-in manifest covers the hot services in the hot regions."""
+        queries, _ = load_manifest()
+
+        assert len(queries) == 12
+        assert {query.region for query in queries} == {"swedencentral", "westeurope", "eastus"}
+
+    @pytest.mark.parametrize(
+        ("manifest", "message"),
+        [
+            ([], "'queries' list"),
+            ({"queries": [], "interval_seconds": 0}, "interval_seconds"),
+            ({"queries": [{"region": "eastus"}]}, "Query 0: service_name is required"),
+            ({"queries": [{"service_name": "Storage", "regions": []}]}, "Query 0: regions must be a non-empty list"),
+            ({"queries": [{"service_name": "Storage", "sku": "Hot LRS"}]}, "Query 0: unknown fields sku"),
+        ],
+    )
+    def test_invalid_manifest_rejected(self, manifest, message):
+        """Test invalid manifests raise ValueError naming the problem."""
+        with pytest.raises(ValueError, match=message):
+            parse_manifest(manifest)
+
+    def test_unreadable_file(self, tmp_path):
+        """Test a manifest that isn't JSON is reported with its path."""
+        path = tmp_path / "hot.json"
+        path.write_text("{")
+
+        with pytest.raises(ValueError, match="Cannot read pre-warm manifest"):
+            load_manifest(str(path))
+
+
+class TestCachePrewarmer:
+    """Test pre-warming against the fake Retail Prices API."""
+
+    @pytest.fixture
+    async def fake_api(self, monkeypatch):
+        """Serve the synthetic catalog with a fresh server state."""
+        original_url = pricing_module.AZURE_PRICING_BASE_URL
+        # Sessions opened by earlier tests belong to event loops that are closed by now
+        monkeypatch.setattr(AzurePricingServer, "_session", None)
+        AzurePricingServer._cache.clear()
+        AzurePricingServer._complete_results.clear()
+        async with FakeRetailPricesAPI(synthetic_items()) as api:
+            set_api_url(api.url)
+            try:
+                yield api
+            finally:
+                set_api_url(original_url)
+                await AzurePricingServer.close_session()
+                AzurePricingServer._cache.clear()
+                AzurePricingServer._complete_results.clear()
+
+    @pytest.mark.asyncio
+    async def test_warmed_queries_are_served_from_cache(self, fake_api):
+        """Test searches in a warmed scope, and narrower ones, make no upstream calls."""
+        counts = await CachePrewarmer(AzurePricingServer(), QUERIES).warm_once()
+
+        assert counts == {"warmed": 3}
+        assert fake_api.calls == 3
+
+        server = AzurePricingServer()
+        result = await server.search_azure_prices(service_name="Azure App Service", region="eastus", limit=20)
+        narrower = await server.search_azure_prices(service_name="SQL Database", region="eastus", sku_name="S1")
+
+        assert result["count"] > 0
+        assert {item["skuName"] for item in narrower["items"]} == {"S1"}
+        assert fake_api.calls == 3
+
+    @pytest.mark.asyncio
+    async def test_rewarms_only_pages_expiring_before_next_pass(self, fake_api):
+        """Test a pass skips pages fresh until the next pass and refreshes the rest."""
+        await CachePrewarmer(AzurePricingServer(), QUERIES).warm_once()
+
+        assert await CachePrewarmer(AzurePricingServer(), QUERIES, interval=60).warm_once() == {"fresh": 3}
+        assert fake_api.calls == 3
+
+        # Pages would expire before a pass one TTL away
+        assert await CachePrewarmer(AzurePricingServer(), QUERIES, interval=CACHE_TTL).warm_once() == {"warmed": 3}
+        assert fake_api.calls == 6
+
+    @pytest.mark.asyncio
+    async def test_failures_are_counted(self, fake_api):
+        """Test a failing query is logged and counted without stopping the pass."""
+        # Nothing listens on the discard port
+        set_api_url("http://127.0.0.1:9/api/retail/prices")
+
+        counts = await CachePrewarmer(AzurePricingServer(), QUERIES).warm_once()
+
+        assert counts == {"error": 3}
+
+    @pytest.mark.asyncio
+    async def test_start_runs_in_background(self, fake_api):
+        """Test start() returns at once and the first pass runs after the start delay."""
+        prewarmer = CachePrewarmer(AzurePricingServer(), QUERIES, start_delay=0.05)
+
+        task = prewarmer.start()
+        assert fake_api.calls == 0
+        for _ in range(100):
+            if fake_api.calls == 3:
+                break
+            await asyncio.sleep(0.02)
+        await prewarmer.stop()
+
+        assert fake_api.calls == 3
+        assert task.cancelled()
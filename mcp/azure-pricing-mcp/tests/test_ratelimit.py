@@ -0,0 +1,221 @@
+"""Tests for the adaptive upstream rate limiter."""
+
+import asyncio
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from azure_pricing_mcp.ratelimit import AdaptiveRateLimiter, background_priority, parse_retry_after
+from azure_pricing_mcp.server import AzurePricingServer
+
+
+class FakeResponse:
+    """Minimal stand-in for an aiohttp response context manager."""
+
+    def __init__(self, status: int, headers: dict[str, str] | None = None):
+        self.status = status
+        self.headers = headers or {}
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    async def json(self):
+        return {"Items": []}
+
+
+@pytest.fixture
+def rate_limiter():
+    """Install a fresh limiter on the server and restore the original afterwards."""
+    original = AzurePricingServer._rate_limiter
+    limiter = AdaptiveRateLimiter(rate=10.0, burst=2)
+    AzurePricingServer._rate_limiter = limiter
+    yield limiter
+    AzurePricingServer._rate_limiter = original
+
+
+class TestParseRetryAfter:
+    """Test Retry-After header parsing."""
+
+    def test_delay_seconds(self):
+        """Test the delay-seconds form."""
+        assert parse_retry_after("12") == 12.0
+        assert parse_retry_after(" 0.5 ") == 0.5
+
+    def test_http_date(self):
+        """Test the HTTP-date form."""
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        delay = parse_retry_after(format_datetime(retry_at, usegmt=True))
+        assert 28 <= delay <= 30
+
+    def test_missing_or_malformed(self):
+        """Test unusable values are ignored."""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("") is None
+        assert parse_retry_after("soon") is None
+
+
+class TestAdaptiveRateLimiter:
+    """Test token bucket pacing and AIMD adjustments."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_paced(self):
+        """Test a full bucket admits a burst and then paces callers at the current rate."""
+        limiter = AdaptiveRateLimiter(rate=50.0, burst=2)
+        start = time.monotonic()
+        for _ in range(4):
+            await limiter.acquire()
+        # Two tokens from the bucket, then two more at 50/s
+        assert time.monotonic() - start >= 0.035
+
+    def test_aimd(self):
+        """Test multiplicative decrease on 429 and additive recovery on success."""
+        limiter = AdaptiveRateLimiter(rate=8.0, min_rate=1.0, recovery_step=0.5)
+        limiter.on_throttle()
+        assert limiter.rate == 4.0
+        limiter.on_success()
+        assert limiter.rate == 4.5
+        for _ in range(5):
+            limiter.on_throttle()
+        assert limiter.rate == 1.0
+
+    @pytest.mark.asyncio
+    async def test_retry_after_blocks_all_callers(self):
+        """Test Retry-After pauses the bucket for every waiter."""
+        limiter = AdaptiveRateLimiter(rate=1000.0, burst=5)
+        limiter.on_throttle(retry_after=0.05)
+        start = time.monotonic()
+        await asyncio.gather(limiter.acquire(), limiter.acquire())
+        assert time.monotonic() - start >= 0.05
+        assert limiter.snapshot()["throttled_total"] == 1
+
+    @pytest.mark.asyncio
+    async def test_waiters_served_in_arrival_order(self):
+        """Test queued callers acquire tokens first come, first served."""
+        limiter = AdaptiveRateLimiter(rate=200.0, burst=1)
+        order = []
+
+        async def caller(n):
+            await limiter.acquire()
+            order.append(n)
+
+        tasks = [asyncio.create_task(caller(n)) for n in range(5)]
+        await asyncio.sleep(0)
+        assert limiter.snapshot()["queue_depth"] == 4
+        await asyncio.gather(*tasks)
+        assert order == [0, 1, 2, 3, 4]
+        assert limiter.snapshot()["queue_depth"] == 0
+
+    @pytest.mark.asyncio
+    async def test_background_callers_yield_to_interactive_ones(self):
+        """Test background requests wait until no interactive request is queued."""
+        limiter = AdaptiveRateLimiter(rate=200.0, burst=2)
+        order = []
+
+        async def caller(name):
+            await limiter.acquire()
+            order.append(name)
+
+        interactive = [asyncio.create_task(caller(n)) for n in range(4)]
+        await asyncio.sleep(0)
+        with background_priority():
+            background = asyncio.create_task(caller("background"))
+        interactive.append(asyncio.create_task(caller(4)))
+        await asyncio.gather(background, *interactive)
+        assert order == [0, 1, 2, 3, 4, "background"]
+
+    @pytest.mark.asyncio
+    async def test_promoted_background_caller_stops_yielding(self):
+        """Test promoting a background context lets its waiting request queue like an interactive one."""
+        limiter = AdaptiveRateLimiter(rate=4.0, burst=2)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        with background_priority() as priority:
+            background = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0.05)
+        priority.promote()
+        started = time.monotonic()
+        await background
+
+        # One token takes 0.25s to refill; the two a background caller waits for take 0.5s
+        assert time.monotonic() - started < 0.4
+
+    def test_backoff_is_jittered_and_honors_retry_after(self):
+        """Test backoff grows exponentially with jitter and never undercuts Retry-After."""
+        limiter = AdaptiveRateLimiter(backoff_base=2.0, backoff_max=60.0)
+        for attempt in range(3):
+            delay = limiter.backoff(attempt)
+            ceiling = 2.0 * 2**attempt
+            assert ceiling / 2 <= delay <= ceiling
+        assert limiter.backoff(0, retry_after=30.0) == 30.0
+        assert limiter.backoff(10) <= 60.0
+
+    def test_split_divides_rates(self):
+        """Test a split limiter allows a proportional share of the rate and burst."""
+        limiter = AdaptiveRateLimiter(rate=10.0, max_rate=20.0, burst=5, recovery_step=0.1)
+        share = limiter.split(4)
+        assert (share.rate, share.max_rate, share.burst) == (2.5, 5.0, 1)
+        assert share.recovery_step == pytest.approx(0.025)
+        assert limiter.split(0).rate == 10.0
+
+
+class TestRateLimitedRequests:
+    """Test the pricing server's use of the shared limiter."""
+
+    @pytest.mark.asyncio
+    async def test_429_uses_retry_after_and_slows_limiter(self, rate_limiter):
+        """Test a throttled request backs off for Retry-After and lowers the shared rate."""
+        server = AzurePricingServer()
+        session = MagicMock()
+        session.get.side_effect = [FakeResponse(429, {"Retry-After": "7"}), FakeResponse(200)]
+
+        with (
+            patch.object(server, "get_session", return_value=session),
+            patch.object(rate_limiter, "acquire", new_callable=AsyncMock),
+            patch("azure_pricing_mcp.server.asyncio.sleep", new_callable=AsyncMock) as mock_sleep,
+        ):
+            result = await server._make_request("https://test.com/ratelimit", use_cache=False)
+
+        assert result == {"Items": []}
+        assert mock_sleep.await_args.args[0] >= 7
+        assert rate_limiter.snapshot()["throttled_total"] == 1
+        assert AzurePricingServer.rate_limit_status()["rate"] < 10.0
+
+    @pytest.mark.asyncio
+    async def test_interactive_caller_promotes_joined_background_fetch(self):
+        """Test an interactive caller joining a pre-warming fetch doesn't wait at background priority."""
+        original = AzurePricingServer._rate_limiter
+        limiter = AdaptiveRateLimiter(rate=4.0, burst=2)
+        AzurePricingServer._rate_limiter = limiter
+        AzurePricingServer._cache.clear()
+        server = AzurePricingServer()
+        session = MagicMock()
+        session.get.return_value = FakeResponse(200)
+        params = {"$filter": "serviceName eq 'Promoted'"}
+        try:
+            await limiter.acquire()
+            await limiter.acquire()
+            with patch.object(server, "get_session", return_value=session):
+                with background_priority():
+                    prewarm = asyncio.create_task(server._make_request("https://test.com/promote", params))
+                await asyncio.sleep(0.05)
+                started = time.monotonic()
+                result = await server._make_request("https://test.com/promote", params)
+                elapsed = time.monotonic() - started
+                await prewarm
+        finally:
+            AzurePricingServer._rate_limiter = original
+            AzurePricingServer._cache.clear()
+
+        assert result == {"Items": []}
+        assert session.get.call_count == 1
+        assert elapsed < 0.4
@@ -0,0 +1,48 @@
+"""Tests for the stdio server's startup cost."""
+
+import os
+import subprocess
+import sys
+
+import pytest
+
+import azure_pricing_mcp
+from azure_pricing_mcp.startup import DEFERRED_MODULES, PACKAGE, STARTUP_MODULE, profile_imports, startup_profile
+
+# Self time of the package's own modules. Measured at a few milliseconds; the
+# budget leaves room for slow runners and only trips on real regressions such as
+# heavy work at import time.
+PACKAGE_IMPORT_BUDGET_MS = 50.0
+
+
+class TestStartup:
+    """Test the stdio startup path stays light."""
+
+    def test_deferred_modules_are_not_imported(self):
+        """Test starting the server imports none of the modules deferred to first use."""
+        code = f"import sys, {STARTUP_MODULE}; print(' '.join(m for m in {DEFERRED_MODULES!r} if m in sys.modules))"
+
+        package_root = os.path.dirname(os.path.dirname(azure_pricing_mcp.__file__))
+        env = {**os.environ, "PYTHONPATH": package_root}
+
+        completed = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env, check=True)
+
+        assert completed.stdout.strip() == ""
+
+    def test_package_import_budget(self):
+        """Test the package's own modules import within budget (dependencies are measured separately)."""
+        costs = profile_imports()
+
+        own = [cost for cost in costs if cost.module.split(".", 1)[0] == PACKAGE]
+        assert {cost.module for cost in own} >= {PACKAGE, f"{PACKAGE}.server", STARTUP_MODULE}
+        assert sum(cost.self_ms for cost in own) < PACKAGE_IMPORT_BUDGET_MS
+
+    @pytest.mark.asyncio
+    async def test_profile_report(self):
+        """Test the startup profile reports imports, tools/list and the deferred modules."""
+        report = await startup_profile()
+
+        assert f"Startup profile of {STARTUP_MODULE}" in report
+        assert "tools/list:" in report
+        assert f"{PACKAGE}.server" in report
+        assert "Deferred until first use: aiohttp" in report
@@ -0,0 +1,113 @@
+"""Tests for the tool registry."""
+
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from mcp.server import Server
+from mcp.types import CallToolRequest, CallToolRequestParams, CallToolResult, ListToolsRequest
+
+from azure_pricing_mcp.handlers import ToolHandler, register_tool_handlers
+from azure_pricing_mcp.metrics import TOOL_CALLS
+from azure_pricing_mcp.server import AzurePricingServer, create_server
+from azure_pricing_mcp.tools import TOOL_REGISTRY, TOOLS, ToolRegistry, ToolSpec
+
+
+def _spec(name: str = "echo_tool") -> ToolSpec:
+    return ToolSpec(
+        name=name,
+        description="Echo the arguments",
+        input_schema={
+            "type": "object",
+            "properties": {"count": {"type": "integer", "minimum": 1}},
+            "required": ["count"],
+        },
+        handler=ToolHandler("get_customer_discount", lambda result: result),
+    )
+
+
+class TestToolRegistry:
+    """Test tool declarations, validation and dispatch."""
+
+    def test_every_tool_is_declared_once(self):
+        """Test each declared tool has a unique name and a handler on AzurePricingServer."""
+        names = [spec.name for spec in TOOLS]
+
+        assert len(names) == len(set(names))
+        assert [tool.name for tool in TOOL_REGISTRY.tools] == names
+        for spec in TOOLS:
+            assert callable(getattr(AzurePricingServer, spec.handler.method)), spec.name
+
+    def test_duplicate_names_rejected(self):
+        """Test a registry refuses two tools with the same name."""
+        with pytest.raises(ValueError, match="unique"):
+            ToolRegistry([_spec(), _spec()])
+
+    def test_validate(self):
+        """Test arguments are checked against the precompiled schema."""
+        registry = ToolRegistry([_spec()])
+
+        assert registry.validate("echo_tool", {"count": 2}) is None
+        assert "'count' is a required property" in registry.validate("echo_tool", {})
+        assert "0 is less than the minimum of 1" in registry.validate("echo_tool", {"count": 0})
+
+    @pytest.mark.asyncio
+    async def test_invalid_arguments_skip_handler(self):
+        """Test invalid arguments return an error result without calling the tool."""
+        registry = ToolRegistry([_spec()])
+        pricing_server = AzurePricingServer()
+        before = TOOL_CALLS.value("echo_tool", "invalid")
+
+        with patch.object(AzurePricingServer, "get_customer_discount", new=AsyncMock()) as implementation:
+            result = await registry.call(pricing_server, "echo_tool", {"count": "two"})
+
+        assert isinstance(result, CallToolResult)
+        assert result.isError
+        assert result.content[0].text.startswith("Input validation error: 'two' is not of type 'integer'")
+        implementation.assert_not_called()
+        assert TOOL_CALLS.value("echo_tool", "invalid") == before + 1
+
+    @pytest.mark.asyncio
+    async def test_dispatch(self):
+        """Test a call runs the tool's implementation and formatter, and unknown names are reported."""
+        registry = ToolRegistry([_spec()])
+        pricing_server = AzurePricingServer()
+
+        with (
+            patch.object(AzurePricingServer, "get_session"),
+            patch.object(AzurePricingServer, "get_customer_discount", new=AsyncMock(return_value=["ok"])),
+        ):
+            assert await registry.call(pricing_server, "echo_tool", {"count": 1}) == ["ok"]
+
+        (content,) = await registry.call(pricing_server, "missing_tool", {})
+        assert content.text == "Unknown tool: missing_tool"
+
+
+class TestServerTools:
+    """Test the MCP server serves the registry."""
+
+    @pytest.mark.asyncio
+    async def test_tools_list_is_cached(self):
+        """Test tools/list returns the Tool objects built by the registry."""
+        server = create_server()
+        handler = server.request_handlers[ListToolsRequest]
+
+        first = await handler(ListToolsRequest(method="tools/list"))
+        second = await handler(ListToolsRequest(method="tools/list"))
+
+        assert first.root.tools == TOOL_REGISTRY.tools
+        assert all(a is b for a, b in zip(first.root.tools, second.root.tools, strict=True))
+
+    @pytest.mark.asyncio
+    async def test_custom_registry(self):
+        """Test a server can be built around another registry."""
+        server = Server("test-server")
+        register_tool_handlers(server, AzurePricingServer(), ToolRegistry([_spec()]))
+
+        tools = await server.request_handlers[ListToolsRequest](ListToolsRequest(method="tools/list"))
+        result = await server.request_handlers[CallToolRequest](
+            CallToolRequest(method="tools/call", params=CallToolRequestParams(name="echo_tool", arguments={}))
+        )
+
+        assert [tool.name for tool in tools.root.tools] == ["echo_tool"]
+        assert result.root.isError
+        assert "'count' is a required property" in result.root.content[0].text
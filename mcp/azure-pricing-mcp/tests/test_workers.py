@@ -0,0 +1,128 @@
+"""Tests for multi-process HTTP serving with session-aware routing."""
+
+import asyncio
+import os
+import sys
+from pathlib import Path
+
+import aiohttp
+import pytest
+from bench.fake_api import FakeRetailPricesAPI
+from bench.fixtures import synthetic_items
+from mcp import ClientSession
+from mcp.client.sse import sse_client
+
+from azure_pricing_mcp.workers import SessionRouter, Worker, _free_port, merge_metrics
+
+SRC_DIR = Path(__file__).resolve().parents[1] / "src"
+
+
+class TestMergeMetrics:
+    """Test merging worker metrics into one exposition."""
+
+    def test_samples_are_labelled_and_grouped(self):
+        """Test each sample gets a worker label and metric families stay contiguous."""
+        worker_text = (
+            "# HELP calls_total Calls.\n"
+            "# TYPE calls_total counter\n"
+            'calls_total{tool="search"} {n}\n'
+            "# HELP entries Entries.\n"
+            "# TYPE entries gauge\n"
+            "entries {n}\n"
+        )
+        merged = merge_metrics([("0", worker_text.replace("{n}", "1")), ("1", worker_text.replace("{n}", "2"))])
+
+        assert merged.splitlines() == [
+            "# HELP calls_total Calls.",
+            "# TYPE calls_total counter",
+            'calls_total{worker="0",tool="search"} 1',
+            'calls_total{worker="1",tool="search"} 2',
+            "# HELP entries Entries.",
+            "# TYPE entries gauge",
+            'entries{worker="0"} 1',
+            'entries{worker="1"} 2',
+        ]
+
+
+class TestSessionRouter:
+    """Test worker selection."""
+
+    def test_least_loaded_worker_is_picked(self):
+        """Test new sessions go to the worker with the fewest open sessions, skipping dead ones."""
+        workers = [Worker(index, 0, []) for index in range(3)]
+        for worker in workers:
+            worker.process = type("Process", (), {"returncode": None})()
+        router = SessionRouter(workers)
+
+        workers[0].sessions, workers[1].sessions, workers[2].sessions = 2, 0, 1
+        assert router.pick_worker() is workers[1]
+
+        workers[1].process.returncode = 1
+        assert router.pick_worker() is workers[2]
+
+
+class TestMultiWorkerServer:
+    """Test `--workers` end to end against the fake Retail Prices API."""
+
+    @pytest.mark.asyncio
+    async def test_sessions_are_routed_and_share_cache(self, tmp_path):
+        """Test sessions spread over workers, their calls succeed, and workers share fetched responses."""
+        port = _free_port()
+        env = {**os.environ, "PYTHONPATH": str(SRC_DIR)}
+        async with FakeRetailPricesAPI(synthetic_items()) as api:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-m",
+                "azure_pricing_mcp",
+                "--transport",
+                "http",
+                "--port",
+                str(port),
+                "--workers",
+                "2",
+                "--cache-dir",
+                str(tmp_path),
+                "--api-url",
+                api.url,
+                env=env,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+            url = f"http://127.0.0.1:{port}"
+            try:
+                async with aiohttp.ClientSession() as http:
+                    for _ in range(300):
+                        try:
+                            async with http.get(f"{url}/metrics") as response:
+                                if response.status == 200:
+                                    break
+                        except aiohttp.ClientError:
+                            pass
+                        await asyncio.sleep(0.1)
+
+                    arguments = {"service_name": "Storage", "region": "westeurope"}
+                    async with (
+                        sse_client(f"{url}/sse") as first_streams,
+                        sse_client(f"{url}/sse") as second_streams,
+                        ClientSession(*first_streams) as first,
+                        ClientSession(*second_streams) as second,
+                    ):
+                        await asyncio.gather(first.initialize(), second.initialize())
+                        first_result = await first.call_tool("azure_price_search", arguments)
+                        second_result = await second.call_tool("azure_price_search", arguments)
+                        discount = await second.call_tool("get_customer_discount", {})
+
+                    async with http.get(f"{url}/metrics") as response:
+                        metrics = await response.text()
+                    async with http.post(f"{url}/messages/?session_id=unknown", json={}) as response:
+                        unknown_status = response.status
+            finally:
+                process.terminate()
+                await process.wait()
+
+        assert not first_result.isError and not discount.isError
+        assert first_result.content[0].text == second_result.content[0].text
+        # Fetched once by one worker, served from the shared cache to the other
+        assert sum(api.filters.values()) == 1
+        assert 'azure_pricing_tool_calls_total{worker="0",tool="azure_price_search",outcome="ok"} 1' in metrics
+        assert 'azure_pricing_tool_calls_total{worker="1",tool="azure_price_search",outcome="ok"} 1' in metrics
+        assert unknown_status == 404